@@ -210,9 +210,9 @@ def _reset_login_attempts(username):
 # ═══════════════════════════════════════════════════════
 
 def _get_supabase_conn():
-    """取得 Supabase 連線實例"""
-    from modules.supabase_connection import SupabaseConnection
-    return SupabaseConnection()
+    """取得行程共用的 Supabase 連線實例"""
+    from modules.supabase_connection import get_shared_connection
+    return get_shared_connection()
 
 
 def authenticate_user(username, password):
@@ -275,6 +275,27 @@ def authenticate_user(username, password):
         return None
 
 
+def _new_user_record(username, password, role, name,
+                     student_id=None, department=None, extension=None, email=None):
+    """組合 pediatric_users 新增資料（密碼已是 hash 時不重複 hash）"""
+    # 確保密碼是 hash（bcrypt 以 $2b$ 開頭，SHA-256 長度 64）
+    is_already_hashed = (
+        password.startswith(('$2b$', '$2a$', '$2y$')) or len(password) == 64
+    )
+    password_hash = password if is_already_hashed else hash_password(password)
+
+    return {
+        'username': username,
+        'full_name': name,
+        'user_type': role,
+        'password_hash': password_hash,
+        'is_active': True,
+        'department': department,
+        'email': email,
+        'student_id': student_id,
+    }
+
+
 def create_user(username, password, role, name,
                 student_id=None, department=None, extension=None, email=None):
     """
@@ -293,22 +314,8 @@ def create_user(username, password, role, name,
         if existing.data and len(existing.data) > 0:
             return False, "使用者名稱已存在"
 
-        # 確保密碼是 hash（bcrypt 以 $2b$ 開頭，SHA-256 長度 64）
-        is_already_hashed = (
-            password.startswith(('$2b$', '$2a$', '$2y$')) or len(password) == 64
-        )
-        password_hash = password if is_already_hashed else hash_password(password)
-
-        user_data = {
-            'username': username,
-            'full_name': name,
-            'user_type': role,
-            'password_hash': password_hash,
-            'is_active': True,
-            'department': department,
-            'email': email,
-            'student_id': student_id,
-        }
+        user_data = _new_user_record(username, password, role, name,
+                                     student_id=student_id, department=department, email=email)
 
         result = conn.client.table('pediatric_users').insert(user_data).execute()
 
@@ -321,6 +328,25 @@ def create_user(username, password, role, name,
         return False, "建立失敗，請稍後再試"
 
 
+def create_users(users, progress=None):
+    """
+    批次建立使用者（CSV 匯入用），結果與逐筆 create_user 相同：已存在的帳號不覆寫
+
+    Args:
+        users (list[dict]): 每筆為 create_user 的參數（username, password, role, name, ...）
+        progress (callable, optional): progress(已完成筆數, 總筆數)
+
+    Returns:
+        list[tuple]: 依輸入順序的 (username, success, message)
+    """
+    try:
+        records = [_new_user_record(**user) for user in users]
+        conn = _get_supabase_conn()
+        return conn.batch_create_users(records, progress=progress)
+    except Exception:
+        return [(user.get('username'), False, "建立失敗，請稍後再試") for user in users]
+
+
 def change_password(username, old_password, new_password):
     """
     修改使用者密碼
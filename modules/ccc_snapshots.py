@@ -0,0 +1,210 @@
+"""
+CCC 達標狀態快照（本機 SQLite）
+
+每位住院醫師的達標判定結果（calculate_resident_status 的回傳結構）依
+(快照日期, 門檻設定雜湊, 資料範圍, 住院醫師, 級職) 存檔，並記錄計算時該住院醫師評核資料的指紋：
+- 同一天、同一門檻設定下指紋未變的住院醫師直接沿用快照，不重新計算
+- 有新評核（指紋改變）的住院醫師才重新計算並覆寫當天快照
+- 過去日期的快照保留下來，可直接查詢「某日當時的達標狀態」而不必重播歷史資料
+
+快照日期即計算當天：近半年（180 天）視窗隨日期移動，隔天會重新計算一次。
+資料範圍（scope）區分資料來源、科別與是否包含展示資料：切換這些選項時各自保留快照，不互相覆寫。
+
+使用方式：
+    from modules.ccc_snapshots import get_snapshot_store
+    store = get_snapshot_store()
+    cached = store.load(as_of, settings_hash, residents)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from modules.local_cache import DEFAULT_CACHE_DIR
+
+SNAPSHOT_FILENAME = 'ccc_snapshots.sqlite3'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ccc_status_snapshots (
+    as_of TEXT NOT NULL,
+    settings_hash TEXT NOT NULL,
+    scope TEXT NOT NULL DEFAULT '',
+    resident TEXT NOT NULL,
+    level TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    computed_at REAL NOT NULL,
+    PRIMARY KEY (as_of, settings_hash, scope, resident, level)
+);
+CREATE INDEX IF NOT EXISTS idx_ccc_snapshots_resident ON ccc_status_snapshots(resident, as_of);
+"""
+
+
+class CCCSnapshotStore:
+    """
+    住院醫師達標狀態快照的本機存放區
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str, optional): SQLite 檔案路徑，預設 DEFAULT_CACHE_DIR/SNAPSHOT_FILENAME
+        """
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, SNAPSHOT_FILENAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """開啟 SQLite 連線，區塊結束時提交（例外時回滾）並關閉"""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def load(self, as_of, settings_hash, residents, scope=''):
+        """
+        讀取指定日期、門檻設定與資料範圍下的快照
+
+        Args:
+            as_of (str): 快照日期（ISO 格式）
+            settings_hash (str): 門檻設定雜湊
+            residents (list): 住院醫師姓名
+            scope (str): 資料範圍
+
+        Returns:
+            dict: {姓名: {指紋: status_dict}}，沒有快照的住院醫師不在結果中
+        """
+        residents = list(residents)
+        if not residents:
+            return {}
+        placeholders = ','.join('?' * len(residents))
+        with self._connect() as db:
+            rows = db.execute(
+                'SELECT resident, fingerprint, status FROM ccc_status_snapshots '
+                f'WHERE as_of = ? AND settings_hash = ? AND scope = ? AND resident IN ({placeholders})',
+                [as_of, settings_hash, scope] + residents
+            ).fetchall()
+        snapshots = {}
+        for resident, fingerprint, status in rows:
+            snapshots.setdefault(resident, {})[fingerprint] = json.loads(status)
+        return snapshots
+
+    def save(self, as_of, settings_hash, entries, scope=''):
+        """
+        寫入（覆寫）快照
+
+        同一住院醫師當天同一資料範圍內其他級職的快照會一併移除，確保每人每天每個範圍只保留最新一筆。
+
+        Args:
+            as_of (str): 快照日期（ISO 格式）
+            settings_hash (str): 門檻設定雜湊
+            entries (list[tuple]): [(姓名, 指紋, status_dict)]，status_dict 需含 'level'
+            scope (str): 資料範圍
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._connect() as db:
+            db.executemany(
+                'DELETE FROM ccc_status_snapshots WHERE as_of = ? AND settings_hash = ? AND scope = ? '
+                'AND resident = ?',
+                [(as_of, settings_hash, scope, name) for name, _, _ in entries]
+            )
+            db.executemany(
+                'INSERT INTO ccc_status_snapshots '
+                '(as_of, settings_hash, scope, resident, level, fingerprint, status, computed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(as_of, settings_hash, scope, name, str(status.get('level', '未知')), fingerprint,
+                  json.dumps(status, ensure_ascii=False), now)
+                 for name, fingerprint, status in entries]
+            )
+
+    def snapshot_dates(self, settings_hash=None, scope=None):
+        """
+        有快照的日期（新到舊）
+
+        Args:
+            settings_hash (str, optional): 只列出此門檻設定下的日期
+            scope (str, optional): 只列出此資料範圍的日期
+
+        Returns:
+            list[str]: ISO 日期
+        """
+        sql, params = self._filters('SELECT DISTINCT as_of FROM ccc_status_snapshots WHERE 1 = 1',
+                                    settings_hash, scope)
+        with self._connect() as db:
+            return [r[0] for r in db.execute(sql + ' ORDER BY as_of DESC', params).fetchall()]
+
+    @staticmethod
+    def _filters(sql, settings_hash, scope, params=None):
+        """附加門檻設定與資料範圍條件（None 表示不限）"""
+        params = list(params or [])
+        if settings_hash is not None:
+            sql += ' AND settings_hash = ?'
+            params.append(settings_hash)
+        if scope is not None:
+            sql += ' AND scope = ?'
+            params.append(scope)
+        return sql, params
+
+    def status_as_of(self, as_of, residents=None, settings_hash=None, scope=None):
+        """
+        各住院醫師在指定日期（含）之前最近一次的快照
+
+        Args:
+            as_of (str): ISO 日期
+            residents (list, optional): 只查詢這些住院醫師，預設全部
+            settings_hash (str, optional): 只採用此門檻設定下的快照
+            scope (str, optional): 只採用此資料範圍的快照
+
+        Returns:
+            dict: {姓名: status_dict}，status_dict 另含 'as_of'（快照日期）
+        """
+        sql, params = self._filters('SELECT resident, as_of, status FROM ccc_status_snapshots WHERE as_of <= ?',
+                                    settings_hash, scope, [as_of])
+        if residents is not None:
+            residents = list(residents)
+            if not residents:
+                return {}
+            sql += f" AND resident IN ({','.join('?' * len(residents))})"
+            params.extend(residents)
+        sql += ' ORDER BY as_of, computed_at'
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        result = {}
+        for resident, snapshot_date, status in rows:  # 由舊到新，後者覆蓋前者
+            result[resident] = dict(json.loads(status), as_of=snapshot_date)
+        return result
+
+
+# ─── 行程共用快照存放區 ───
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """
+    取得行程共用的快照存放區
+
+    Returns:
+        CCCSnapshotStore | None: 無法建立快照檔時回傳 None
+    """
+    global _shared_store
+    if _shared_store is not None:
+        return _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            try:
+                _shared_store = CCCSnapshotStore()
+            except Exception as e:
+                print(f"建立 CCC 快照檔失敗: {str(e)}")
+                return None
+        return _shared_store
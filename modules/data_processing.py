@@ -130,6 +130,65 @@ def convert_date_to_batch(date_str):
         print(f"日期轉換錯誤: {e}")
         return '未知梯次'
 
+# 梯次基準日（星期一），每兩週一梯
+BATCH_BASE_MONDAY = np.datetime64('2020-06-29', 'D')
+UNKNOWN_BATCH = '未知梯次'
+# 日期字串尾端的時間部分（含上午/下午），例如 '2025/5/2 下午 9:48:17' → '2025/5/2'
+_TIME_SUFFIX_PATTERN = r'\s*(?:上午|下午|AM|PM)?\s*\d{1,2}:\d{2}(?::\d{2})?.*$'
+
+
+def dates_to_batches(values):
+    """整欄將日期轉換為梯次名稱（結果與逐列 convert_date_to_batch 相同）
+
+    字串以一次向量化字串運算去除時間部分後，依 'YYYY/M/D'、'YYYY-M-D' 各解析一次；
+    其餘少見格式或非字串值才逐個（依不重複值）交給 convert_date_to_batch。
+    梯次起始星期一以 datetime64 整數運算求得：基準日 + (相差天數 // 14) * 14。
+
+    Args:
+        values (pd.Series): 日期字串、datetime/date 物件或 datetime64 欄位
+
+    Returns:
+        pd.Series: 梯次名稱 'YYYY/MM/DD'，無法解析為 '未知梯次'（index 與輸入相同）
+    """
+    values = pd.Series(values)
+    days = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    labels = pd.Series(None, index=values.index, dtype=object)
+
+    if pd.api.types.is_datetime64_dtype(values):
+        days = values
+    else:
+        is_str = values.map(type) == str
+        text = values[is_str].str.strip()
+        unknown = (text == '') | text.str.lower().isin(['nan', 'none', 'nat'])
+        labels[text.index[unknown]] = UNKNOWN_BATCH
+        text = text[~unknown]
+
+        cleaned = text.str.replace(_TIME_SUFFIX_PATTERN, '', regex=True).str.strip()
+        cleaned = cleaned.where(cleaned != '', text)
+        parsed = pd.to_datetime(cleaned, format='%Y/%m/%d', errors='coerce')
+        missing = parsed.isna()
+        if missing.any():
+            parsed[missing] = pd.to_datetime(cleaned[missing], format='%Y-%m-%d', errors='coerce')
+        days[parsed.index] = parsed
+
+        # 少見格式與非字串值：依不重複值逐個轉換
+        fallback = values[~is_str].index.append(parsed.index[parsed.isna()])
+        if len(fallback):
+            others = values[fallback]
+            uniques = pd.unique(others.astype(object))
+            lookup = {v: convert_date_to_batch(v) for v in uniques}
+            labels[fallback] = others.map(lookup).fillna(UNKNOWN_BATCH)
+
+    valid = days.notna()
+    if valid.any():
+        offsets = (days[valid].to_numpy().astype('datetime64[D]') - BATCH_BASE_MONDAY).astype(np.int64)
+        batch_days = (offsets // 14) * 14
+        unique_days, inverse = np.unique(batch_days, return_inverse=True)
+        names = pd.DatetimeIndex(BATCH_BASE_MONDAY + unique_days).strftime('%Y/%m/%d')
+        labels[days.index[valid]] = np.asarray(names, dtype=object)[inverse]
+    return labels.fillna(UNKNOWN_BATCH)
+
+
 def convert_tw_time(time_str):
     """將中文時間格式轉換為標準日期時間格式
     
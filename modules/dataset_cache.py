@@ -0,0 +1,176 @@
+"""
+行程共用的資料集快取（跨 Streamlit rerun 與 session）
+
+- 以 (資料集名稱, 呼叫端 key, 資料集版本) 為鍵，條目超過 TTL 即重新載入
+- 寫入端呼叫 bump_dataset_version() 讓該資料集的所有快取條目失效
+- 記錄命中／未命中次數，供管理員檢視
+
+版本號存在行程記憶體中：多個 Streamlit 行程（多台主機）之間不共享，
+其他行程寫入的資料最晚在 TTL 到期後才會出現。
+
+使用方式：
+    from modules.dataset_cache import get_dataset_cache
+    value = get_dataset_cache().get_or_load('pediatric_evaluations', (dept, source), loader)
+"""
+
+import copy
+import threading
+import time
+
+# 快取條目存活時間（秒）
+DEFAULT_TTL = 600
+# 最多保留的條目數（超過時淘汰最久未使用者）
+DEFAULT_MAX_ENTRIES = 32
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def dataset_version(dataset):
+    """
+    取得資料集目前的版本號
+
+    Args:
+        dataset (str): 資料集名稱（通常為資料表名稱）
+
+    Returns:
+        int: 版本號，從 0 開始
+    """
+    with _versions_lock:
+        return _versions.get(dataset, 0)
+
+
+def bump_dataset_version(dataset):
+    """
+    資料集有寫入時呼叫：版本號 +1，舊版本的快取條目不再命中
+
+    Args:
+        dataset (str): 資料集名稱
+
+    Returns:
+        int: 新的版本號
+    """
+    with _versions_lock:
+        _versions[dataset] = _versions.get(dataset, 0) + 1
+        return _versions[dataset]
+
+
+class DatasetCache:
+    """
+    執行緒安全的 TTL 快取，鍵包含資料集版本號
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            ttl (float): 條目存活秒數
+            max_entries (int): 最多保留的條目數
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # {(dataset, key, version): (寫入時間, 值)}
+        self._lock = threading.Lock()
+        self._loading = {}  # {完整鍵: threading.Lock}，避免同一份資料被多個 session 同時載入
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0}
+
+    def get_or_load(self, dataset, key, loader):
+        """
+        取得快取值，未命中或已過期時呼叫 loader 載入
+
+        loader 回傳 None 時不寫入快取（例如連線失敗），下次會再嘗試。
+        回傳值為快取內容的副本，呼叫端修改不會影響其他 session。
+
+        Args:
+            dataset (str): 資料集名稱
+            key (tuple): 呼叫端的其他鍵（如科別、資料來源）
+            loader (callable): 無參數函數，回傳要快取的值
+
+        Returns:
+            快取值的副本，或 loader 回傳的 None
+        """
+        full_key = (dataset, key, dataset_version(dataset))
+        value = self._lookup(full_key)
+        if value is not None:
+            return copy.deepcopy(value)
+
+        with self._lock:
+            load_lock = self._loading.setdefault(full_key, threading.Lock())
+        with load_lock:
+            # 等待期間其他執行緒可能已載入完成
+            value = self._lookup(full_key, count=False)
+            if value is None:
+                value = loader()
+                if value is not None:
+                    self._store(full_key, value)
+        with self._lock:
+            self._loading.pop(full_key, None)
+        return copy.deepcopy(value) if value is not None else None
+
+    def _lookup(self, full_key, count=True):
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[full_key]
+                if count:
+                    self._stats['expired'] += 1
+                entry = None
+            if count:
+                self._stats['hits' if entry is not None else 'misses'] += 1
+            if entry is None:
+                return None
+            # 重新插入以維持「最近使用」順序
+            self._entries[full_key] = self._entries.pop(full_key)
+            return entry[1]
+
+    def _store(self, full_key, value):
+        with self._lock:
+            dataset, key, _ = full_key
+            # 同一 (dataset, key) 的舊版本條目已不可能命中，直接移除
+            for stale in [k for k in self._entries if k[0] == dataset and k[1] == key]:
+                del self._entries[stale]
+            self._entries[full_key] = (time.monotonic(), value)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, dataset=None):
+        """
+        清除快取條目
+
+        Args:
+            dataset (str, optional): 只清除指定資料集，預設全部
+        """
+        with self._lock:
+            if dataset is None:
+                self._entries.clear()
+            else:
+                for k in [k for k in self._entries if k[0] == dataset]:
+                    del self._entries[k]
+
+    def stats(self):
+        """
+        取得快取統計
+
+        Returns:
+            dict: hits、misses、expired、hit_rate（%）、entries、versions
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / total * 100 if total else 0.0
+        with _versions_lock:
+            stats['versions'] = dict(_versions)
+        return stats
+
+
+_shared_cache = DatasetCache()
+
+
+def get_dataset_cache():
+    """
+    取得行程共用的資料集快取
+
+    Returns:
+        DatasetCache: 共用快取實例
+    """
+    return _shared_cache
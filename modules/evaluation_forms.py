@@ -24,9 +24,9 @@ from config.department_config import (
 # ═══════════════════════════════════════════════════════
 
 def _get_supabase_conn():
-    """取得 Supabase 連線實例"""
-    from modules.supabase_connection import SupabaseConnection
-    return SupabaseConnection()
+    """取得行程共用的 Supabase 連線實例"""
+    from modules.supabase_connection import get_shared_connection
+    return get_shared_connection()
 
 
 def _get_active_residents(department=None):
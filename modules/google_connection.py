@@ -1,16 +1,22 @@
 import streamlit as st
 import gspread
+from gspread.utils import absolute_range_name, numericise, rowcol_to_a1
 from google.oauth2.service_account import Credentials
 import re
 import json
 from modules.utils.data_utils import extract_spreadsheet_id, extract_gid
+import numpy as np
 import pandas as pd
 import os
 import traceback
 from google.oauth2 import service_account
 from typing import Optional, Tuple, Dict, Any, List
 import base64
+import hashlib
+import itertools
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # 全局變數控制診斷訊息的顯示
 SHOW_DIAGNOSTICS = False
@@ -188,8 +194,11 @@ def get_credentials_from_secrets() -> Optional[Dict[str, Any]]:
         st.error(f"處理 Streamlit Secrets 時發生錯誤：{str(e)}")
         return None
 
+# 本地憑證檔快取：{路徑: (修改時間, 憑證)}，檔案未變動時不重新讀取與修復私鑰
+_file_credentials_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
 def get_credentials_from_file() -> Optional[Dict[str, Any]]:
-    """從本地檔案獲取憑證"""
+    """從本地檔案獲取憑證（檔案未變動時沿用上次讀取結果）"""
     try:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         credentials_path = os.path.join(current_dir, 'credentials.json')
@@ -197,6 +206,11 @@ def get_credentials_from_file() -> Optional[Dict[str, Any]]:
         if not os.path.exists(credentials_path):
             show_diagnostic(f"未找到憑證檔案：{credentials_path}", "info")
             return None
+
+        mtime = os.path.getmtime(credentials_path)
+        cached = _file_credentials_cache.get(credentials_path)
+        if cached is not None and cached[0] == mtime:
+            return dict(cached[1])
         
         # 顯示檔案信息
         show_diagnostic(f"憑證檔案路徑：{credentials_path}", "info")
@@ -251,6 +265,7 @@ def get_credentials_from_file() -> Optional[Dict[str, Any]]:
                     return None
                 else:
                     show_diagnostic("憑證驗證成功", "success")
+                    _file_credentials_cache[credentials_path] = (mtime, dict(credentials))
                     return credentials
                     
         except Exception as e:
@@ -274,8 +289,87 @@ def test_connection(client: gspread.Client) -> bool:
         st.warning(f"⚠️ Google API 連接測試失敗：{str(e)}")
         return False
 
+# ─── 行程共用的 gspread 用戶端 ───
+# 每組憑證（+ scopes）只建立一次 Credentials 與 gspread.Client：
+# - gspread.Client 內含 AuthorizedSession（requests 連線池），跨 Streamlit rerun / session 共用
+# - 存取權杖過期時 AuthorizedSession 於下一次請求前自動 refresh，不需重新 authorize
+# - 連線測試（test_connection）只在首次建立時執行一次
+_shared_clients: Dict[str, gspread.Client] = {}
+_shared_clients_lock = threading.Lock()
+_client_stats = {'created': 0, 'reused': 0, 'probes': 0}
+
+
+def _credentials_key(credentials: Dict[str, Any], scopes: List[str]) -> str:
+    """憑證組的快取鍵（服務帳號、金鑰與 scopes 的雜湊，不保留私鑰原文）"""
+    material = json.dumps([credentials.get('client_email'), credentials.get('private_key_id'),
+                           credentials.get('private_key'), sorted(scopes)])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def get_google_client(credentials: Dict[str, Any], scopes: Optional[List[str]] = None,
+                      probe: bool = False) -> Optional[gspread.Client]:
+    """
+    取得憑證對應的共用 gspread 用戶端（執行緒安全，首次呼叫時建立）
+
+    Args:
+        credentials: 服務帳號憑證 dict
+        scopes: Google API 範圍，預設 GOOGLE_API_SCOPES
+        probe: 首次建立時是否先以 test_connection 確認連線，失敗時不快取並回傳 None
+
+    Returns:
+        gspread.Client | None
+
+    Raises:
+        Exception: 建立 Credentials 或授權失敗（私鑰格式錯誤等），與 gspread.authorize 相同
+    """
+    scopes = list(scopes or GOOGLE_API_SCOPES)
+    key = _credentials_key(credentials, scopes)
+    client = _shared_clients.get(key)
+    if client is not None:
+        with _shared_clients_lock:
+            _client_stats['reused'] += 1
+        return client
+
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is not None:
+            _client_stats['reused'] += 1
+            return client
+        creds = service_account.Credentials.from_service_account_info(credentials, scopes=scopes)
+        client = gspread.authorize(creds)
+        if probe:
+            _client_stats['probes'] += 1
+            if not test_connection(client):
+                return None
+        _shared_clients[key] = client
+        _client_stats['created'] += 1
+        return client
+
+
+def get_client_stats() -> Dict[str, int]:
+    """
+    取得共用 gspread 用戶端的使用統計
+
+    Returns:
+        dict: {'created': 建立次數, 'reused': 重用次數, 'probes': 連線測試次數}
+    """
+    with _shared_clients_lock:
+        return dict(_client_stats)
+
+
+def reset_google_clients() -> None:
+    """清除所有共用用戶端（更換憑證或測試時使用），下次取得時重新授權"""
+    with _shared_clients_lock:
+        clients = list(_shared_clients.values())
+        _shared_clients.clear()
+    for client in clients:
+        try:
+            client.http_client.session.close()
+        except Exception:
+            pass
+
 def setup_google_connection() -> Optional[gspread.Client]:
-    """設定與 Google API 的連接"""
+    """設定與 Google API 的連接（同一組憑證共用已授權的用戶端）"""
     client = None
     credentials = None
     source = ""
@@ -307,20 +401,13 @@ def setup_google_connection() -> Optional[gspread.Client]:
 
     show_diagnostic(f"使用來源 '{source}' 的憑證建立連接...", "info")
     try:
-        creds = service_account.Credentials.from_service_account_info(
-            credentials, 
-            scopes=GOOGLE_API_SCOPES
-        )
-        client = gspread.authorize(creds)
-        show_diagnostic("Google API 認證成功", "success")
-        
-        if test_connection(client):
-            show_diagnostic("Google API 連接測試成功", "success")
-            return client
-        else:
+        client = get_google_client(credentials, GOOGLE_API_SCOPES, probe=True)
+        if client is None:
             show_diagnostic("Google API 連接測試失敗", "error")
             return None
-            
+        show_diagnostic("Google API 認證成功", "success")
+        return client
+
     except Exception as e:
         show_diagnostic(f"建立 Google API 認證時發生錯誤：{str(e)}", "error")
         show_diagnostic("這通常由私鑰格式或內容問題引起。請檢查：", "error")
@@ -330,8 +417,410 @@ def setup_google_connection() -> Optional[gspread.Client]:
         show_diagnostic(f"詳細錯誤信息: {traceback.format_exc()}", "error")
         return None
 
-def fetch_google_form_data(spreadsheet_url: Optional[str] = None, sheet_title: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Optional[List[str]]]:
-    """從 Google 表單獲取評核資料"""
+# ─── Sheets API 讀取配額排程 ───
+# Sheets API 讀取配額為每位使用者每分鐘 60 次：行程內所有讀取共用一個 token bucket，
+# 平均速率不超過配額；遇到配額錯誤（RESOURCE_EXHAUSTED）時暫停整個 bucket 後重試，
+# 其他執行緒也一併等待，而不是各自盲目 sleep 後再撞配額。
+SHEETS_READ_REQUESTS_PER_MINUTE = 60
+QUOTA_BACKOFF_SECONDS = 2
+QUOTA_MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """
+    執行緒安全的 token bucket 速率限制器
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            rate_per_minute: 每分鐘補充的 token 數
+            capacity: 最多累積的 token 數（允許的瞬間突發量），預設同 rate_per_minute
+            clock / sleep: 時間來源與等待函數（測試時可替換）
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity or rate_per_minute)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        取得 token，不足時等待
+
+        Returns:
+            float: 等待的秒數
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def penalize(self, seconds: float) -> None:
+        """清空 token 並額外暫停 seconds 秒（收到配額錯誤時呼叫）"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+_sheets_read_limiter = TokenBucket(SHEETS_READ_REQUESTS_PER_MINUTE)
+
+
+def _is_quota_error(error: Exception) -> bool:
+    message = str(error)
+    return "Quota exceeded" in message or "RESOURCE_EXHAUSTED" in message
+
+
+def _call_sheets_api(fn):
+    """經由共用 token bucket 呼叫一次 Sheets API；配額錯誤時暫停 bucket 並重試"""
+    for attempt in range(QUOTA_MAX_RETRIES + 1):
+        _sheets_read_limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            if not _is_quota_error(e) or attempt == QUOTA_MAX_RETRIES:
+                raise
+            _sheets_read_limiter.penalize(QUOTA_BACKOFF_SECONDS * 2 ** attempt)
+
+# ─── 增量讀取（依列數水位）───
+# 表單回應只會附加在工作表尾端：記住每張工作表 (spreadsheet_id, 工作表) 已讀取的列數，
+# 之後每次只以一次 batch_get 讀取標題列與「最後一筆已知列 + 新增列」：
+# - 標題列改變，或最後一筆已知列內容不同（尾端被修改／刪除）時改為整張重新讀取
+# - 超過 INCREMENTAL_FULL_RELOAD_SECONDS 也整張重新讀取一次，涵蓋中段列被修改的情況
+# 快取存在行程記憶體中，跨 Streamlit rerun 與 session 共用。
+INCREMENTAL_FULL_RELOAD_SECONDS = 3600
+_sheet_states: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+_sheet_locks: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+_sheet_states_lock = threading.Lock()
+_sheet_stats = {'full': 0, 'incremental': 0, 'unchanged': 0, 'rows_fetched': 0}
+
+
+def _strip_trailing_blanks(row: List[Any]) -> List[Any]:
+    """去除列尾空白儲存格（Sheets API 回傳的列不含尾端空白）"""
+    row = list(row)
+    while row and row[-1] == '':
+        row.pop()
+    return row
+
+
+def _dedupe_headers(header: List[Any]) -> List[str]:
+    """
+    整理標題列：空白標題改為 'Unnamed: 欄位索引'，重複標題依序加上 '.1'、'.2'…（與 pandas.read_csv 相同）
+    """
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = str(name) if name != '' else f'Unnamed: {i}'
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f'{name}.{count}')
+    return names
+
+
+def _numericise_column(column: np.ndarray) -> np.ndarray:
+    """與 get_all_records 相同的數值轉換，但只對欄內的唯一值轉換一次"""
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    converted = np.empty(len(uniques), dtype=object)
+    converted[:] = [numericise(v) for v in uniques]
+    return converted[codes]
+
+
+def _apply_dtype(column: np.ndarray, dtype: Any) -> pd.Series:
+    """依型別提示轉換欄位：'str'、'int'（可為空的 Int64）、'float'、'numeric'、'datetime' 或 pandas dtype"""
+    series = pd.Series(column, dtype=object)
+    if dtype == 'str':
+        return series.astype(str)
+    if dtype in ('int', 'float', 'numeric'):
+        numeric = pd.to_numeric(series.replace('', np.nan), errors='coerce')
+        return numeric.round().astype('Int64') if dtype == 'int' else numeric.astype(float)
+    if dtype == 'datetime':
+        return pd.to_datetime(series.replace('', np.nan), errors='coerce')
+    return series.astype(dtype)
+
+
+def _rows_to_frame(header: List[Any], rows: List[List[Any]], dtypes: Optional[Dict[str, Any]] = None,
+                   numericise_values: bool = True) -> pd.DataFrame:
+    """
+    將工作表列逐欄轉為 DataFrame（不為每列建立 dict）
+
+    Args:
+        header: 標題列，空白或重複標題依 _dedupe_headers 處理
+        rows: 資料列（可長短不一，不足補空字串，超出標題寬度的儲存格捨棄）
+        dtypes: {欄名: 型別提示}，見 _apply_dtype；指定的欄位不做 numericise
+        numericise_values: 其他欄位是否做與 get_all_records 相同的數值轉換，False 時保留字串
+
+    Returns:
+        pd.DataFrame: 無標題時為空 DataFrame
+    """
+    if not header:
+        return pd.DataFrame([])
+    names = _dedupe_headers(header)
+    width, n_rows = len(names), len(rows)
+    # zip_longest 一次完成轉置與補齊，每欄為一個 tuple
+    columns = list(itertools.zip_longest(*rows, fillvalue=''))[:width] if rows else []
+    columns += [('',) * n_rows] * (width - len(columns))
+    dtypes = dtypes or {}
+
+    data = {}
+    for name, values in zip(names, columns):
+        column = np.empty(n_rows, dtype=object)
+        column[:] = values
+        if name in dtypes:
+            data[name] = _apply_dtype(column, dtypes[name])
+        elif numericise_values:
+            data[name] = _numericise_column(column)
+        else:
+            data[name] = column
+    frame = pd.DataFrame(data, columns=names)
+    return frame.infer_objects() if numericise_values else frame
+
+
+def values_to_frame(values: List[List[Any]], dtypes: Optional[Dict[str, Any]] = None,
+                    numericise_values: bool = True) -> pd.DataFrame:
+    """
+    get_all_values() 的結果（第一列為標題列）轉為 DataFrame
+
+    與 pd.DataFrame(worksheet.get_all_records()) 結果相同（數值轉換方式一致），但逐欄建立、
+    數值轉換只針對欄內唯一值；重複或空白標題會改名而非拋出例外。
+
+    Args:
+        values: 二維串列
+        dtypes: {欄名: 型別提示}，見 _apply_dtype
+        numericise_values: 未指定型別的欄位是否轉換數值，False 時全部保留字串
+
+    Returns:
+        pd.DataFrame
+    """
+    header, rows = _split_header(values)
+    return _rows_to_frame(header, rows, dtypes, numericise_values)
+
+
+def _split_header(values: List[List[Any]]) -> Tuple[List[Any], List[List[Any]]]:
+    """拆出標題列與資料列"""
+    if not values or values == [[]]:
+        return [], []
+    return list(values[0]), values[1:]
+
+
+def _load_sheet_state(worksheet, sheet_titles: List[str],
+                      dtypes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """整張讀取工作表並建立增量讀取狀態"""
+    header, rows = _split_header(_call_sheets_api(lambda: worksheet.get(pad_values=True)))
+    with _sheet_states_lock:
+        _sheet_stats['full'] += 1
+        _sheet_stats['rows_fetched'] += len(rows)
+    return {
+        'worksheet': worksheet,
+        'sheet_titles': list(sheet_titles),
+        'header': header,
+        'row_count': len(rows),
+        'last_row': _strip_trailing_blanks(rows[-1]) if rows else None,
+        'dtypes': dict(dtypes or {}),
+        'frame': _rows_to_frame(header, rows, dtypes),
+        'loaded_at': time.monotonic(),
+    }
+
+
+def _refresh_sheet_state(state: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    只讀取新增的列並附加到快取的 DataFrame
+
+    Returns:
+        pd.DataFrame | None: 更新後的 DataFrame；需要整張重新讀取時回傳 None
+    """
+    header, row_count = state['header'], state['row_count']
+    if not header:
+        return None
+    last_col = re.sub(r'\d', '', rowcol_to_a1(1, len(header)))
+    # 第 1 列為標題列，已知最後一筆資料在第 row_count + 1 列；從該列開始讀取以確認尾端未變
+    start = row_count + 1 if row_count else 2
+    header_range, tail = _call_sheets_api(
+        lambda: state['worksheet'].batch_get(['1:1', f'A{start}:{last_col}']))
+    current_header = list(header_range[0]) if header_range else []
+    if _strip_trailing_blanks(current_header) != _strip_trailing_blanks(header):
+        return None
+    tail = [list(r) for r in tail]
+    if row_count:
+        if not tail or _strip_trailing_blanks(tail[0]) != state['last_row']:
+            return None
+        tail = tail[1:]
+
+    with _sheet_states_lock:
+        _sheet_stats['incremental' if tail else 'unchanged'] += 1
+        _sheet_stats['rows_fetched'] += len(tail)
+    if tail:
+        new_frame = _rows_to_frame(header, tail, state['dtypes'])
+        frame = state['frame']
+        state['frame'] = new_frame if frame.empty else pd.concat([frame, new_frame], ignore_index=True)
+        state['row_count'] = row_count + len(tail)
+        state['last_row'] = _strip_trailing_blanks(tail[-1])
+    return state['frame']
+
+
+def _fetch_incremental(client: gspread.Client, spreadsheet_id: str, sheet_title: Optional[str],
+                       dtypes: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    增量讀取工作表：有快取狀態時只讀取新增列，否則（或需要時）整張讀取
+
+    Returns:
+        (DataFrame 副本, 所有工作表標題)
+
+    Raises:
+        Exception: API 錯誤（含配額不足），由呼叫端處理重試
+    """
+    key = (spreadsheet_id, sheet_title)
+    with _sheet_states_lock:
+        key_lock = _sheet_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        state = _sheet_states.get(key)
+        if (state is not None and state['dtypes'] == (dtypes or {})
+                and time.monotonic() - state['loaded_at'] < INCREMENTAL_FULL_RELOAD_SECONDS):
+            try:
+                frame = _refresh_sheet_state(state)
+                if frame is not None:
+                    return frame.copy(), list(state['sheet_titles'])
+            except Exception as e:
+                if _is_quota_error(e):
+                    raise
+                show_diagnostic(f"增量讀取失敗，改為整張重新讀取：{str(e)}", "warning")
+
+        spreadsheet = _call_sheets_api(lambda: client.open_by_key(spreadsheet_id))
+        all_worksheets = _call_sheets_api(spreadsheet.worksheets)
+        sheet_titles = [sheet.title for sheet in all_worksheets]
+        if not sheet_title and sheet_titles:
+            worksheet = all_worksheets[0]
+        else:
+            worksheet = _call_sheets_api(lambda: spreadsheet.worksheet(sheet_title))
+        state = _load_sheet_state(worksheet, sheet_titles, dtypes)
+        with _sheet_states_lock:
+            _sheet_states[key] = state
+        return state['frame'].copy(), sheet_titles
+
+
+def get_sheet_fetch_stats() -> Dict[str, int]:
+    """
+    取得增量讀取統計
+
+    Returns:
+        dict: {'full': 整張讀取次數, 'incremental': 讀到新增列的次數,
+               'unchanged': 無新增列的次數, 'rows_fetched': 累計讀取的資料列數}
+    """
+    with _sheet_states_lock:
+        return dict(_sheet_stats)
+
+
+def reset_sheet_cache() -> None:
+    """清除所有工作表的增量讀取狀態，下次讀取時整張重新讀取"""
+    with _sheet_states_lock:
+        _sheet_states.clear()
+
+
+def fetch_google_worksheets(spreadsheet_url: Optional[str] = None, worksheets: Optional[List[Any]] = None,
+                            max_workers: int = 4, dtypes: Optional[Dict[str, Any]] = None,
+                            client: Optional[gspread.Client] = None
+                            ) -> Tuple[Optional[Dict[str, pd.DataFrame]], Optional[List[str]]]:
+    """
+    一次載入同一試算表的多張工作表
+
+    以一次 values_batch_get 讀取所有指定工作表；批次讀取失敗（非配額錯誤）時改以
+    最多 max_workers 個執行緒並行逐張讀取。所有 API 呼叫經由共用的讀取配額 token bucket。
+
+    Args:
+        spreadsheet_url: 試算表網址，預設 DEFAULT_SPREADSHEET_URL
+        worksheets: 工作表標題或索引（0 為第一張）的清單，預設全部；不存在的工作表略過
+        max_workers: 逐張讀取時的執行緒數上限
+        dtypes: {欄名: 型別提示}（見 _apply_dtype），套用到所有工作表中同名的欄位
+        client: 已授權的 gspread 用戶端（頁面自有的憑證來源，例如上傳的憑證檔），
+                預設由 setup_google_connection 建立
+
+    Returns:
+        ({標題: DataFrame}（依工作表順序，空工作表為空 DataFrame）, 所有工作表標題)；
+        失敗時為 (None, None)
+    """
+    try:
+        spreadsheet_url = spreadsheet_url or DEFAULT_SPREADSHEET_URL
+        if client is None:
+            client = setup_google_connection()
+        if client is None:
+            return None, None
+        spreadsheet_id = extract_spreadsheet_id(spreadsheet_url)
+        if not spreadsheet_id:
+            st.error("無法從 URL 提取 spreadsheet ID")
+            return None, None
+
+        spreadsheet = _call_sheets_api(lambda: client.open_by_key(spreadsheet_id))
+        all_worksheets = _call_sheets_api(spreadsheet.worksheets)
+        sheet_titles = [ws.title for ws in all_worksheets]
+
+        if worksheets is None:
+            targets = list(all_worksheets)
+        else:
+            targets = []
+            for wanted in worksheets:
+                if isinstance(wanted, int):
+                    ws = all_worksheets[wanted] if -len(all_worksheets) <= wanted < len(all_worksheets) else None
+                else:
+                    ws = next((w for w in all_worksheets if w.title == wanted), None)
+                if ws is None:
+                    st.warning(f"找不到工作表：{wanted}")
+                elif ws not in targets:
+                    targets.append(ws)
+            targets.sort(key=all_worksheets.index)
+        if not targets:
+            return {}, sheet_titles
+
+        try:
+            response = _call_sheets_api(lambda: spreadsheet.values_batch_get(
+                [absolute_range_name(ws.title) for ws in targets]))
+            values = [vr.get('values', []) for vr in response['valueRanges']]
+        except Exception as e:
+            if _is_quota_error(e):
+                raise
+            show_diagnostic(f"批次讀取失敗，改為逐張讀取：{str(e)}", "warning")
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets)))) as pool:
+                values = list(pool.map(lambda ws: _call_sheets_api(lambda: ws.get(pad_values=True)), targets))
+
+        frames = {}
+        for ws, sheet_values in zip(targets, values):
+            frames[ws.title] = values_to_frame(sheet_values, dtypes)
+        return frames, sheet_titles
+
+    except Exception as e:
+        if _is_quota_error(e):
+            st.error("已達到 Google Sheets API 讀取配額上限，請稍後再試")
+        else:
+            st.error(f"載入 Google 試算表時發生錯誤：{str(e)}")
+        return None, None
+
+def fetch_google_form_data(spreadsheet_url: Optional[str] = None, sheet_title: Optional[str] = None,
+                           incremental: bool = False,
+                           dtypes: Optional[Dict[str, Any]] = None) -> Tuple[Optional[pd.DataFrame], Optional[List[str]]]:
+    """
+    從 Google 表單獲取評核資料
+
+    Args:
+        spreadsheet_url: 試算表網址，預設 DEFAULT_SPREADSHEET_URL
+        sheet_title: 工作表標題，預設第一張工作表
+        incremental: 依列數水位只讀取新增的列並附加到快取（見 _fetch_incremental），
+                     預設每次整張讀取
+        dtypes: {欄名: 型別提示}（見 _apply_dtype），其他欄位的數值轉換與 get_all_records 相同
+
+    Returns:
+        (DataFrame 或 None, 所有工作表標題或 None)
+    """
     try:
         spreadsheet_url = spreadsheet_url or DEFAULT_SPREADSHEET_URL
         client = setup_google_connection()
@@ -344,46 +833,136 @@ def fetch_google_form_data(spreadsheet_url: Optional[str] = None, sheet_title: O
             st.error("無法從 URL 提取 spreadsheet ID")
             return None, None
             
-        # 設定重試參數
-        max_retries = 3
-        retry_delay = 2  # 秒
-        current_retry = 0
-        
-        while current_retry < max_retries:
-            try:
-                spreadsheet = client.open_by_key(spreadsheet_id)
-                all_worksheets = spreadsheet.worksheets()
-                sheet_titles = [sheet.title for sheet in all_worksheets]
-                
-                if not sheet_title and sheet_titles:
-                    worksheet = all_worksheets[0]
-                    sheet_title = sheet_titles[0]
-                else:
-                    worksheet = spreadsheet.worksheet(sheet_title)
-                    
-                data = worksheet.get_all_records()
-                
-                if not data:
-                    st.warning(f"工作表 '{sheet_title}' 中沒有資料")
-                    return None, sheet_titles
-                    
-                return pd.DataFrame(data), sheet_titles
-                
-            except Exception as e:
-                error_message = str(e)
-                if "Quota exceeded" in error_message or "RESOURCE_EXHAUSTED" in error_message:
-                    current_retry += 1
-                    if current_retry < max_retries:
-                        st.warning(f"遇到 API 速率限制，等待 {retry_delay} 秒後重試... (嘗試 {current_retry}/{max_retries})")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # 指數退避
-                    else:
-                        st.error("已達到最大重試次數，請稍後再試")
-                        return None, None
-                else:
-                    st.error(f"處理試算表時發生錯誤：{error_message}")
-                    return None, None
-                    
+        # 所有 API 呼叫經由共用 token bucket，配額錯誤由 _call_sheets_api 暫停後重試
+        try:
+            df, sheet_titles, shown_title = _read_worksheet(client, spreadsheet_id, sheet_title,
+                                                            incremental, dtypes)
+            if df.empty:
+                st.warning(f"工作表 '{shown_title}' 中沒有資料")
+                return None, sheet_titles
+            return df, sheet_titles
+
+        except Exception as e:
+            if _is_quota_error(e):
+                st.error("已達到最大重試次數，請稍後再試")
+            else:
+                st.error(f"處理試算表時發生錯誤：{str(e)}")
+            return None, None
+
     except Exception as e:
         st.error(f"獲取 Google 表單資料時發生錯誤：{str(e)}")
-        return None, None
\ No newline at end of file
+        return None, None
+
+
+def _read_worksheet(client: gspread.Client, spreadsheet_id: str, sheet_title: Optional[str],
+                    incremental: bool, dtypes: Optional[Dict[str, Any]]
+                    ) -> Tuple[pd.DataFrame, List[str], str]:
+    """
+    讀取一張工作表（未指定標題時為第一張）
+
+    Returns:
+        (DataFrame（可能為空）, 所有工作表標題, 實際讀取的工作表標題)
+
+    Raises:
+        Exception: API 錯誤（配額錯誤已由 _call_sheets_api 重試）
+    """
+    if incremental:
+        df, sheet_titles = _fetch_incremental(client, spreadsheet_id, sheet_title, dtypes)
+        return df, sheet_titles, sheet_title or (sheet_titles[0] if sheet_titles else '')
+
+    spreadsheet = _call_sheets_api(lambda: client.open_by_key(spreadsheet_id))
+    all_worksheets = _call_sheets_api(spreadsheet.worksheets)
+    sheet_titles = [sheet.title for sheet in all_worksheets]
+
+    if not sheet_title and sheet_titles:
+        worksheet = all_worksheets[0]
+        sheet_title = sheet_titles[0]
+    else:
+        worksheet = _call_sheets_api(lambda: spreadsheet.worksheet(sheet_title))
+
+    return values_to_frame(_call_sheets_api(worksheet.get_all_values), dtypes), sheet_titles, sheet_title
+
+
+# ─── 無人值守讀取（排程、命令列） ───
+# setup_google_connection / fetch_google_form_data 只以 st.* 回報錯誤並回傳 None，
+# 在 Streamlit 之外等同靜默失敗；以下函式改為拋出 GoogleSheetsError，由呼叫端記錄失敗原因。
+
+class GoogleSheetsError(RuntimeError):
+    """無法讀取 Google 試算表（憑證、授權或 API 錯誤）"""
+
+
+def load_google_credentials(credentials_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    讀取服務帳號憑證（不經由 st.*）
+
+    依序使用：credentials_path、環境變數 GOOGLE_APPLICATION_CREDENTIALS、
+    Streamlit Secrets 的 [gcp_service_account]、modules/credentials.json。
+    明確指定的檔案（參數或環境變數）不存在時直接失敗，不改用其他來源。
+
+    Raises:
+        GoogleSheetsError: 找不到憑證，或憑證檔無法解析、欄位不完整
+    """
+    path = credentials_path or os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+    if path:
+        if not os.path.exists(path):
+            raise GoogleSheetsError(f"憑證檔不存在：{path}")
+    else:
+        try:
+            section = st.secrets["gcp_service_account"] if "gcp_service_account" in st.secrets else None
+        except Exception:
+            section = None  # 沒有 secrets.toml
+        if section is not None:
+            credentials = {k: section[k] for k in REQUIRED_CREDENTIAL_FIELDS if k in section}
+            credentials['private_key'] = str(credentials.get('private_key', '')).replace('\\n', '\n')
+            return _checked_credentials(credentials, 'Streamlit Secrets')
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credentials.json')
+        if not os.path.exists(path):
+            raise GoogleSheetsError(
+                "找不到 Google API 憑證：請設定 GOOGLE_APPLICATION_CREDENTIALS、"
+                "Streamlit Secrets 的 [gcp_service_account] 或 modules/credentials.json")
+
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            credentials = json.load(f)
+    except (OSError, ValueError) as e:
+        raise GoogleSheetsError(f"無法讀取憑證檔 {path}：{str(e)}") from e
+    if not isinstance(credentials, dict) or 'private_key' not in credentials:
+        raise GoogleSheetsError(f"憑證檔 {path} 中未找到 'private_key' 欄位")
+    credentials['private_key'] = fix_private_key_format(credentials['private_key'])
+    return _checked_credentials(credentials, path)
+
+
+def _checked_credentials(credentials: Dict[str, Any], source: str) -> Dict[str, Any]:
+    is_valid, error_msg = validate_credentials(credentials)
+    if not is_valid:
+        raise GoogleSheetsError(f"憑證驗證失敗（{source}）：{error_msg}")
+    return credentials
+
+
+def read_google_form_data(spreadsheet_url: Optional[str] = None, sheet_title: Optional[str] = None,
+                          incremental: bool = False, dtypes: Optional[Dict[str, Any]] = None,
+                          credentials_path: Optional[str] = None) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    讀取表單回應（fetch_google_form_data 的無人值守版本，失敗時拋出例外而非 st.error）
+
+    Args:
+        與 fetch_google_form_data 相同；credentials_path 見 load_google_credentials
+
+    Returns:
+        (DataFrame（工作表沒有資料時為空 DataFrame）, 所有工作表標題)
+
+    Raises:
+        GoogleSheetsError: 憑證、授權、網址或 API 錯誤
+    """
+    credentials = load_google_credentials(credentials_path)
+    spreadsheet_url = spreadsheet_url or DEFAULT_SPREADSHEET_URL
+    spreadsheet_id = extract_spreadsheet_id(spreadsheet_url)
+    if not spreadsheet_id:
+        raise GoogleSheetsError(f"無法從 URL 提取 spreadsheet ID：{spreadsheet_url}")
+    try:
+        client = get_google_client(credentials, GOOGLE_API_SCOPES)
+        df, sheet_titles, _ = _read_worksheet(client, spreadsheet_id, sheet_title, incremental, dtypes)
+    except Exception as e:
+        reason = "已達到 Google Sheets API 讀取配額上限" if _is_quota_error(e) else str(e)
+        raise GoogleSheetsError(f"讀取 Google 試算表失敗：{reason}") from e
+    return df, sheet_titles
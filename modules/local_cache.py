@@ -0,0 +1,30 @@
+"""
+本機快取目錄與狀態檔
+
+本機鏡像、CCC 快照、排程同步狀態與遷移續傳點等本機檔案都放在同一個目錄，
+可用環境變數 CBME_CACHE_DIR 指定，預設為專案根目錄下的 .cache/。
+"""
+
+import json
+import os
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.getenv('CBME_CACHE_DIR', os.path.join(_PROJECT_ROOT, '.cache'))
+
+
+def load_json_file(path):
+    """讀取 JSON 狀態檔，檔案不存在或損毀時回傳空 dict"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_json_file(data, path):
+    """寫入 JSON 狀態檔（先寫暫存檔再取代，中途中斷不會留下半個檔案）"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
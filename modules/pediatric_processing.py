@@ -0,0 +1,277 @@
+"""
+小兒部評核資料前處理（不依賴 Streamlit）
+
+Google Sheets 或 Supabase 載入的評核資料經 process_pediatric_data 轉換後，
+供 CCC 儀表板、遷移工具與排程同步共用；頁面端的警告顯示見
+pages.pediatric.pediatric_analysis.process_pediatric_data。
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# 兒科 EPA 信賴等級評估項目（表單 Q18）
+PEDIATRIC_EPA_ITEMS = ['門診表現(OPD)', '一般病人照護（WARD）', '緊急處置（ED, DR）', '重症照護（PICU, NICU）', '病歷書寫']
+
+def _normalize_paren(s):
+    """統一全形/半形括號，方便比對 EPA 項目名稱"""
+    return str(s).replace('（', '(').replace('）', ')').replace('︵', '(').replace('︶', ')')
+
+@lru_cache(maxsize=1024)
+def _resolve_epa_item(text):
+    """
+    將 EPA項目原始文字對應到 PEDIATRIC_EPA_ITEMS 的標準名稱（容許全形/半形括號差異）
+
+    Returns:
+        str | None: 第一個被包含的標準項目名稱，無對應時為 None
+    """
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return None
+    normalized = _normalize_paren(text)
+    for item in PEDIATRIC_EPA_ITEMS:
+        if _normalize_paren(item) in normalized:
+            return item
+    return None
+
+
+def process_pediatric_data(df):
+    """
+    處理小兒部評核資料：日期解析、評分文字轉數值、EPA 項目標準化
+
+    不呼叫 st.*，轉換失敗時拋出例外；需要提示使用者的狀況記錄在回傳資料的 attrs：
+    - 'date_conversion_error': 評核日期轉換錯誤訊息（評核日期維持原值）
+    - 'unparsed_timestamps': {列 index: 原始值}，無法解析為評核日期的時間戳記
+
+    Returns:
+        pd.DataFrame: 處理後的資料（新增 *_數值、熟練程度(自動判定)、EPA項目_key 等欄位）
+    """
+    # 複製資料框
+    processed_df = df.copy()
+    # 正規化欄位名稱：去除前後空白（Google 表單匯出可能帶尾端空格）
+    processed_df.columns = [str(c).strip() if c is not None else '' for c in processed_df.columns]
+
+    # 處理評核日期
+    if '評核日期' in processed_df.columns:
+        # 如果評核日期已經是日期格式，直接使用
+        if processed_df['評核日期'].dtype == 'object':
+            # 嘗試將字串轉換為日期
+            try:
+                processed_df['評核日期'] = pd.to_datetime(processed_df['評核日期'], errors='coerce').dt.date
+            except Exception as e:
+                processed_df.attrs['date_conversion_error'] = str(e)
+
+    # 如果沒有評核日期欄位，嘗試從時間戳記解析
+    elif '時間戳記' in processed_df.columns:
+        # 解析時間戳記中的日期部分（如 "2024/3/5 下午 2:15:30"）
+        dates, unparsed = _parse_timestamp_dates(processed_df['時間戳記'])
+        processed_df['評核日期'] = dates
+        if not unparsed.empty:
+            # 無法解析的列另外記錄，不再默默略過
+            processed_df.attrs['unparsed_timestamps'] = unparsed.to_dict()
+
+    # 處理數值評分欄位
+    score_columns = ['內容是否充分', '辯證資料的能力', '口條、呈現方式是否清晰',
+                    '是否具開創、建設性的想法', '回答提問是否具邏輯、有條有理']
+
+    for col in score_columns:
+        if col in processed_df.columns:
+            # 將文字評分轉換為數值
+            processed_df[f'{col}_數值'] = _convert_by_uniques(processed_df[col], convert_score_to_numeric)
+
+    # 處理可信賴程度
+    if '可信賴程度' in processed_df.columns:
+        processed_df['可信賴程度_數值'] = _convert_by_uniques(processed_df['可信賴程度'], convert_reliability_to_numeric)
+
+    # 處理熟練程度（向後相容舊資料）
+    if '熟練程度' in processed_df.columns:
+        processed_df['熟練程度_數值'] = _convert_by_uniques(processed_df['熟練程度'], convert_proficiency_to_numeric)
+
+    # 從可信賴程度推導熟練度（統一判定標準）
+    if '可信賴程度_數值' in processed_df.columns:
+        processed_df['熟練程度(自動判定)'] = _convert_by_uniques(processed_df['可信賴程度_數值'], derive_proficiency_from_reliability)
+
+    # 處理 EPA 可信賴程度（沿用兒科 convert_reliability_to_numeric 對照表）
+    if 'EPA可信賴程度' in processed_df.columns:
+        processed_df['EPA可信賴程度_數值'] = _convert_by_uniques(processed_df['EPA可信賴程度'], convert_reliability_to_numeric)
+
+    # 標準化 EPA 項目名稱，後續各項目篩選直接比對此欄
+    if 'EPA項目' in processed_df.columns:
+        processed_df['EPA項目_key'] = _convert_by_uniques(processed_df['EPA項目'], _resolve_epa_item)
+
+    return processed_df
+
+
+def _parse_timestamp_dates(timestamps):
+    """
+    將 Google 表單時間戳記（"YYYY/M/D 上午/下午 h:mm:ss"）轉換為評核日期
+
+    取第一個空格前的日期部分，以 '%Y/%m/%d' 解析；同一天的時間戳記只解析一次。
+    空值與空白字串的評核日期為 None。
+
+    Args:
+        timestamps (pd.Series): 時間戳記欄位
+
+    Returns:
+        tuple: (評核日期 ndarray（datetime.date 或 None）, 無法解析的原始值 Series（以列 index 為索引）)
+    """
+    dates = np.full(len(timestamps), None, dtype=object)
+    stripped = timestamps.astype(str).str.strip()
+    # 空白時間戳記視為缺值（不列入無法解析）
+    present = (timestamps.notna() & (stripped != '')).to_numpy()
+    date_parts = stripped[present].str.split(' ', n=1).str[0]
+
+    codes, uniques = pd.factorize(date_parts)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format='%Y/%m/%d', errors='coerce')
+    unique_dates = np.array([ts.date() if pd.notna(ts) else None for ts in parsed], dtype=object)
+
+    row_dates = unique_dates[codes]
+    dates[present] = row_dates
+    unparsed = timestamps[present][pd.isna(row_dates)]
+    return dates, unparsed
+
+def _convert_by_uniques(series, converter):
+    """
+    以查表方式套用逐值轉換函數，結果（含 dtype）與 series.apply(converter) 相同。
+
+    評分欄位只有少數幾種不同文字：先 factorize 取出不重複值，每個值只轉換一次，
+    空值另外轉換一次，再依 factorize 代碼展開回每一列。
+    """
+    if series.empty:
+        return series.apply(converter)
+    codes, uniques = pd.factorize(series)
+    values = list(uniques)
+    if (codes < 0).any():
+        # 最後一格放空值的轉換結果，factorize 的空值代碼 -1 正好取到它；
+        # 沒有空值時不加，以免影響 dtype 推斷
+        values.append(np.nan)
+    lookup = pd.Series(values, dtype=object).apply(converter)
+    return pd.Series(lookup.to_numpy()[codes], index=series.index, name=series.name)
+
+def convert_score_to_numeric(score_text):
+    """將評分文字轉換為數值"""
+    if pd.isna(score_text) or score_text == '':
+        return None
+
+    # 如果已經是數字（例如從 Supabase 載入的整數），直接返回
+    try:
+        num_value = float(score_text)
+        if 1 <= num_value <= 5:
+            return num_value
+    except (ValueError, TypeError):
+        pass
+
+    score_text = str(score_text).strip()
+    
+    # 定義評分對應（含表單「5 卓越～1 不符合期待」）
+    score_mapping = {
+        '非常同意': 5,
+        '同意': 4,
+        '普通': 3,
+        '不同意': 2,
+        '非常不同意': 1,
+        '優秀': 5,
+        '良好': 4,
+        '待改進': 2,
+        '需加強': 1,
+        # 會議報告表單用語（有空格）
+        '5 卓越': 5,
+        '4 充分': 4,
+        '3 尚可': 3,
+        '2 稍差': 2,
+        '1 不符合期待': 1,
+        # 會議報告表單用語（數字與文字連在一起，如表格匯出）
+        '5卓越': 5,
+        '4充分': 4,
+        '3尚可': 3,
+        '2稍差': 2,
+        '1不符合期待': 1,
+        '卓越': 5,
+        '充分': 4,
+        '尚可': 3,
+        '稍差': 2,
+        '不符合期待': 1,
+    }
+    
+    return score_mapping.get(score_text, None)
+
+def convert_reliability_to_numeric(reliability_text):
+    """將可信賴程度轉換為數值（兒科專用，9級量表 → 1.5-5.0分）"""
+    if pd.isna(reliability_text) or reliability_text == '':
+        return None
+
+    reliability_text = str(reliability_text).strip()
+
+    # 如果已經是數字，直接返回
+    try:
+        num_value = float(reliability_text)
+        if 1 <= num_value <= 5:
+            return num_value
+    except (ValueError, TypeError):
+        pass
+
+    # 兒科評核表單對應（主要）
+    reliability_mapping = {
+        # 新格式：五分制小數點顯示（符合學會規範）
+        '1.5 — 允許住院醫師在旁觀察': 1.5,
+        '2.0 — 教師在旁逐步共同操作': 2.0,
+        '2.5 — 教師在旁必要時協助': 2.5,
+        '3.0 — 教師可立即到場協助，事後逐項確認': 3.0,
+        '3.3 — 教師可立即到場協助，事後重點確認': 3.3,
+        '3.6 — 教師可稍後到場協助，必要時事後確認': 3.6,
+        '4.0 — 教師on call提供監督': 4.0,
+        '4.5 — 教師不需on call，事後提供回饋及監督': 4.5,
+        '5.0 — 學員可對其他資淺的學員進行監督與教學': 5.0,
+        # 舊格式向後相容
+        '允許住院醫師在旁觀察': 1.5,
+        '教師在旁逐步共同操作': 2.0,
+        '教師在旁必要時協助': 2.5,
+        '教師可立即到場協助，事後逐項確認': 3.0,
+        '教師可立即到場協助，事後重點確認': 3.3,
+        '教師可稍後到場協助，必要時事後確認': 3.6,
+        '教師on call提供監督': 4.0,
+        '教師不需on call，事後提供回饋及監督': 4.5,
+        '學員可對其他資淺的學員進行監督與教學': 5.0,
+
+        # 向下相容：舊資料可能的格式變體
+        '不允許學員觀察': 1.0,  # 舊資料（兒科表單已無此選項）
+        '學員在旁觀察': 1.5,
+        '允許學員在旁觀察': 1.5,
+        '教師在旁必要時協助 ': 2.5,  # 尾部空格
+        '教師可立即到場協助，事後須再確認': 3.0,
+        '教師可稍後到場協助，重點須再確認': 4.0,
+        '我可獨立執行': 5.0,
+    }
+
+    return reliability_mapping.get(reliability_text, None)
+
+def derive_proficiency_from_reliability(reliability_score):
+    """
+    從可信賴程度分數推導熟練度標籤。
+    >= 3.5 → 熟練 / < 3.5 → 不熟練
+    """
+    if pd.isna(reliability_score):
+        return None
+    return '熟練' if float(reliability_score) >= 3.5 else '不熟練'
+
+
+def convert_proficiency_to_numeric(proficiency_text):
+    """[Deprecated] 將熟練程度轉換為數值 — 僅供向後相容舊資料"""
+    if pd.isna(proficiency_text) or proficiency_text == '':
+        return None
+    
+    proficiency_text = str(proficiency_text).strip()
+    
+    # 定義熟練程度對應
+    proficiency_mapping = {
+        '熟練': 5,
+        '基本熟練': 4,
+        '部分熟練': 3,
+        '初學': 2,
+        '不熟練': 1,
+        '一兩次內完成': 5,
+        '協助下完成': 3,
+        '需指導完成': 2
+    }
+    
+    return proficiency_mapping.get(proficiency_text, None)
@@ -0,0 +1,83 @@
+"""
+住院醫師研究進度彙總（CCC 頁面共用）
+
+以一次欄位投影查詢（columns='summary'）取得所有研究進度，彙總為：
+- 全體各階段件數
+- 每位住院醫師的件數、各階段件數、已接受/發表篇數與最新一筆記錄
+
+結果存在 modules.dataset_cache 的共用快取（資料集 'pediatric_research_progress'），
+SupabaseConnection 新增/更新/刪除研究進度成功時會遞增版本號，讓快取失效。
+
+使用方式：
+    from modules.research_summary import get_research_summary
+    summary = get_research_summary(reader)
+    published = summary['by_resident'].get(name, {}).get('published', 0)
+"""
+
+from modules.dataset_cache import get_dataset_cache
+
+RESEARCH_DATASET = 'pediatric_research_progress'
+
+# 研究進度階段（依序）
+RESEARCH_STAGES = ['構思中', '撰寫中', '投稿中', '接受', '發表']
+# 計入 R3 文章發表的階段
+PUBLISHED_STAGES = ('接受', '發表')
+
+
+def summarize_research_progress(records):
+    """
+    彙總研究進度記錄
+
+    Args:
+        records (list[dict]): fetch_research_progress 的結果（依 updated_at 遞減排序）
+
+    Returns:
+        dict: {
+            'records': 原始記錄,
+            'stage_counts': {階段: 件數},
+            'by_resident': {姓名: {'count', 'stage_counts', 'published', 'latest', 'records'}},
+        }
+        by_resident 的 records 維持原順序，latest 為其中第一筆（最近更新）
+    """
+    records = list(records or [])
+    stage_counts = {s: 0 for s in RESEARCH_STAGES}
+    by_resident = {}
+    for rec in records:
+        status = rec.get('current_status', '構思中')
+        name = rec.get('resident_name', '未知')
+        entry = by_resident.get(name)
+        if entry is None:
+            entry = by_resident[name] = {
+                'count': 0,
+                'stage_counts': {s: 0 for s in RESEARCH_STAGES},
+                'published': 0,
+                'latest': rec,
+                'records': [],
+            }
+        entry['count'] += 1
+        entry['records'].append(rec)
+        if status in stage_counts:
+            stage_counts[status] += 1
+            entry['stage_counts'][status] += 1
+        if status in PUBLISHED_STAGES:
+            entry['published'] += 1
+    return {'records': records, 'stage_counts': stage_counts, 'by_resident': by_resident}
+
+
+def get_research_summary(reader, department=None):
+    """
+    取得研究進度彙總（跨 rerun 與 session 共用快取，寫入研究進度時失效）
+
+    Args:
+        reader: 提供 fetch_research_progress 的物件（SupabaseConnection 或 SupabaseMirror）
+        department (str, optional): 科別過濾
+
+    Returns:
+        dict: summarize_research_progress 的結果
+    """
+    filters = {'department': department} if department else None
+
+    def _load():
+        return summarize_research_progress(reader.fetch_research_progress(filters=filters, columns='summary'))
+
+    return get_dataset_cache().get_or_load(RESEARCH_DATASET, (department,), _load)
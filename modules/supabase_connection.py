@@ -1,10 +1,205 @@
 import os
 import hashlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import datetime
+import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
+import pandas as pd
 import streamlit as st
 
+from modules.dataset_cache import bump_dataset_version
+
+# PostgREST 單次回應上限（max-rows 預設 1000），分頁大小不應超過此值
+DEFAULT_PAGE_SIZE = 1000
+
+# PostgREST HTTP 連線池：整個行程共用同一個 client，閒置連線保留較久，
+# 讓同一使用者連續操作（Streamlit rerun 間隔常超過 httpx 預設的 5 秒）仍可重用 TLS 連線
+HTTP_POOL_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=120,
+)
+
+# ─── 批次寫入（bulk_write）───
+# 每批筆數、同時進行中的批次數、429/5xx 重試次數與退避秒數（第 n 次重試等待 base * 2**(n-1)）
+BULK_WRITE_CHUNK_SIZE = 500
+BULK_WRITE_MAX_IN_FLIGHT = 4
+BULK_WRITE_MAX_RETRIES = 3
+BULK_WRITE_BACKOFF_SECONDS = 0.5
+# 以 in_ 查詢既有帳號時每次的帳號數（避免 URL 過長）
+USER_LOOKUP_CHUNK_SIZE = 200
+# PostgREST / PostgreSQL 的暫時性錯誤碼（連線、逾時、死結、序列化衝突），可重試；
+# 這些錯誤由伺服器回報且交易已回滾，insert 重試也不會重複寫入
+RETRYABLE_ERROR_CODES = {'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003', '40001', '40P01', '53300', '57014'}
+# 確定請求未送達伺服器（或未被處理）的錯誤：不冪等的 insert 只重試這些
+_UNSENT_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_UNSENT_STATUS_CODES = {429, 503}
+
+
+def is_retryable_write_error(exc, idempotent=True):
+    """
+    判斷寫入錯誤是否為暫時性（429、5xx、連線/逾時），值得重試
+
+    資料錯誤（欄位不存在、違反唯一鍵等 4xx）重試也不會成功，直接回報。
+    idempotent=False（insert）時只重試確定未寫入的錯誤：連線建立失敗、連線池逾時、429、503
+    與資料庫回報的暫時性錯誤碼；讀取逾時、502/504 等可能已在伺服器提交，重試會重複寫入。
+    """
+    if isinstance(exc, httpx.TransportError):
+        return idempotent or isinstance(exc, _UNSENT_TRANSPORT_ERRORS)
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    code = getattr(exc, 'code', None)
+    if status is None and code is not None and str(code).isdigit() and len(str(code)) == 3:
+        status = int(code)  # 非 JSON 的閘道錯誤，postgrest 以 HTTP 狀態碼作為 code
+    if status is not None:
+        if not idempotent:
+            return status in _UNSENT_STATUS_CODES
+        return status == 429 or status >= 500
+    return str(code) in RETRYABLE_ERROR_CODES
+
+
+@dataclass
+class BulkWriteResult:
+    """
+    bulk_write 的結果
+
+    failed_rows 為寫入失敗的列在輸入中的位置（0 起算）；committed 為從頭連續寫入成功的筆數
+    （只寫入不冪等的 insert 可從這裡續傳）。errors 每一項為
+    {'rows': (起, 迄), 'attempts': 嘗試次數, 'error': 訊息}。
+    """
+    total: int = 0
+    written: int = 0
+    committed: int = 0
+    retries: int = 0
+    failed_rows: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+
+    @property
+    def failed(self):
+        return len(self.failed_rows)
+
+    @property
+    def ok(self):
+        return self.written == self.total
+
+
+def _record_chunks(records, chunk_size):
+    """依序產生 (起始位置, 記錄)；DataFrame 只在送出前才轉為 dict"""
+    if isinstance(records, pd.DataFrame):
+        for start in range(0, len(records), chunk_size):
+            yield start, records.iloc[start:start + chunk_size].to_dict('records')
+    else:
+        for start in range(0, len(records), chunk_size):
+            yield start, records[start:start + chunk_size]
+
+
+# ─── 欄位投影（column projection）───
+# 各檢視只取需要的欄位，避免拉回大量自由文字回饋；
+# fetch_* 的 columns 參數可傳入下列 key、欄位 list 或 None（= select('*')）
+_EVALUATION_SCORE_COLUMNS = [
+    'id', 'evaluation_date', 'evaluated_resident', 'resident_level',
+    'evaluation_type', 'evaluation_item', 'department', 'form_version',
+    'technical_skill_item', 'reliability_level', 'proficiency_level',
+    'epa_item', 'epa_reliability_level', 'meeting_name',
+    'content_sufficient', 'data_analysis_ability', 'presentation_clarity',
+    'innovative_ideas', 'logical_response',
+]
+PEDIATRIC_EVALUATION_COLUMNS = {
+    # 達標判定（calculate_resident_status）、熱圖等只需分數與日期
+    'scores': _EVALUATION_SCORE_COLUMNS,
+    # CCC 儀表板：分數 + 教師與回饋文字
+    'dashboard': _EVALUATION_SCORE_COLUMNS + [
+        'evaluator_teacher', 'patient_id', 'sedation_medication', 'meeting_feedback',
+        'technical_feedback', 'epa_qualitative_feedback',
+    ],
+}
+RESEARCH_PROGRESS_COLUMNS = {
+    # 總覽／泳道圖：不含進度說明、困難、下一步等長文字
+    'summary': [
+        'id', 'resident_name', 'resident_level', 'research_title', 'research_type',
+        'supervisor_name', 'current_status', 'updated_at', 'department',
+    ],
+}
+LEARNING_REFLECTION_COLUMNS = {
+    # 清單：不含 Gibbs 反思內文
+    'list': [
+        'id', 'resident_name', 'reflection_date', 'reflection_title', 'reflection_type',
+        'related_epa', 'related_skill', 'is_private', 'department',
+    ],
+}
+USER_COLUMNS = {
+    # 帳號清單：不含 password_hash
+    'directory': [
+        'id', 'username', 'full_name', 'email', 'user_type', 'department',
+        'resident_level', 'is_active',
+    ],
+}
+
+# ─── 型別對照（建立 DataFrame 時一次套用）───
+PEDIATRIC_EVALUATION_DTYPES = {
+    'id': 'Int64',
+    'reliability_level': 'float64',
+    'proficiency_level': 'float64',
+    'epa_reliability_level': 'float64',
+    'content_sufficient': 'float64',
+    'data_analysis_ability': 'float64',
+    'presentation_clarity': 'float64',
+    'innovative_ideas': 'float64',
+    'logical_response': 'float64',
+    'is_deleted': 'boolean',
+}
+
+
+def _select_clause(views, columns, required=()):
+    """
+    將 columns 參數轉為 PostgREST select 字串
+
+    Args:
+        views (dict): 該表的投影定義（如 PEDIATRIC_EVALUATION_COLUMNS）
+        columns (str | list | None): 投影名稱、欄位清單，或 None 表示全部欄位
+        required (tuple): 投影時一定要帶上的欄位（例如分頁游標欄位）
+
+    Returns:
+        str: select 字串
+    """
+    if columns is None or columns == '*':
+        return '*'
+    if isinstance(columns, str):
+        if columns not in views:
+            raise ValueError(f"未知的欄位投影：{columns}")
+        columns = views[columns]
+    cols = list(columns)
+    for col in required:
+        if col not in cols:
+            cols.append(col)
+    return ','.join(cols)
+
+
+def apply_dtypes(df, dtypes):
+    """
+    依型別對照表轉換 DataFrame 欄位（僅處理存在的欄位）
+
+    Args:
+        df (pd.DataFrame): 原始資料
+        dtypes (dict): {欄位: dtype}
+
+    Returns:
+        pd.DataFrame: 轉換後的資料（原地修改並回傳）
+    """
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if dtype == 'boolean':
+            df[col] = df[col].astype('boolean')
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return df
+
+
 class SupabaseConnection:
     """
     Supabase 資料庫連接類別
@@ -35,6 +230,30 @@ class SupabaseConnection:
             raise ValueError("請在 .env 或 Streamlit secrets 中設置 SUPABASE_URL 和 SUPABASE_KEY")
 
         self.client: Client = create_client(self.url, self.key)
+        self._configure_http_pool()
+
+    def _configure_http_pool(self):
+        """
+        以 HTTP_POOL_LIMITS 重建 PostgREST 的 httpx session（keep-alive + 連線池）
+
+        supabase-py 未開放設定連線池參數，這裡沿用其 base_url / headers / timeout
+        換上自訂 limits 的 session；失敗時保留原本的 session。
+        """
+        try:
+            from postgrest.utils import SyncClient as PostgrestSession
+            postgrest = self.client.postgrest
+            old_session = postgrest.session
+            postgrest.session = PostgrestSession(
+                base_url=old_session.base_url,
+                headers=old_session.headers,
+                timeout=old_session.timeout,
+                follow_redirects=True,
+                http2=True,
+                limits=HTTP_POOL_LIMITS,
+            )
+            old_session.close()
+        except Exception as e:
+            print(f"設定 Supabase 連線池失敗，使用預設設定: {str(e)}")
 
     def get_client(self) -> Client:
         """
@@ -60,13 +279,164 @@ class SupabaseConnection:
             print(f"Supabase 連接測試失敗: {str(e)}")
             return False
 
+    def bulk_write(self, table, records, on_conflict=None, chunk_size=BULK_WRITE_CHUNK_SIZE,
+                   max_in_flight=BULK_WRITE_MAX_IN_FLIGHT, max_retries=BULK_WRITE_MAX_RETRIES,
+                   backoff=BULK_WRITE_BACKOFF_SECONDS, stop_on_error=False, progress=None, sleep=time.sleep):
+        """
+        分批寫入（insert，或指定 on_conflict 時 upsert）
+
+        每批一次請求，最多 max_in_flight 批同時進行；429/5xx/連線錯誤以指數退避重試
+        （insert 只重試確定未寫入的錯誤，見 is_retryable_write_error），
+        其他錯誤或重試用盡時記錄該批的列位置，其餘批次照常寫入。
+
+        Args:
+            table (str): 資料表
+            records (list[dict] | pd.DataFrame): 寫入資料（DataFrame 每批才轉為 dict）
+            on_conflict (str, optional): upsert 的衝突欄位；None 表示 insert
+            chunk_size (int): 每批筆數
+            max_in_flight (int): 同時進行中的批次數（1 = 依序寫入）
+            max_retries (int): 暫時性錯誤的重試次數
+            backoff (float): 第一次重試前等待秒數，之後每次加倍
+            stop_on_error (bool): 有批次失敗後不再送出新的批次（搭配 max_in_flight=1 可確保
+                已寫入的資料為連續前綴，從 committed 續傳）
+            progress (callable, optional): progress(已完成筆數, 總筆數)
+
+        Returns:
+            BulkWriteResult
+        """
+        result = BulkWriteResult(total=len(records))
+        if not result.total:
+            return result
+
+        def _write(chunk):
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    query = self.client.table(table)
+                    if on_conflict:
+                        query = query.upsert(chunk, on_conflict=on_conflict)
+                    else:
+                        query = query.insert(chunk)
+                    query.execute()
+                    return attempts, None
+                except Exception as e:
+                    if attempts > max_retries or not is_retryable_write_error(e, idempotent=bool(on_conflict)):
+                        return attempts, e
+                    sleep(backoff * 2 ** (attempts - 1))
+
+        done_rows = 0
+        succeeded = {}  # 起始位置 -> 筆數，用來計算連續前綴
+        chunks = _record_chunks(records, chunk_size)
+        stopped = False
+        with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+            pending = {}
+            while True:
+                while not stopped and len(pending) < max(1, max_in_flight):
+                    nxt = next(chunks, None)
+                    if nxt is None:
+                        break
+                    start, chunk = nxt
+                    pending[pool.submit(_write, chunk)] = (start, len(chunk))
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    start, size = pending.pop(future)
+                    attempts, error = future.result()
+                    result.retries += attempts - 1
+                    if error is None:
+                        result.written += size
+                        succeeded[start] = size
+                    else:
+                        result.failed_rows.extend(range(start, start + size))
+                        result.errors.append({'rows': (start, start + size - 1), 'attempts': attempts,
+                                              'error': str(error)})
+                        stopped = stopped or stop_on_error
+                    done_rows += size
+                    if progress is not None:
+                        progress(done_rows, result.total)
+
+        while result.committed in succeeded:
+            result.committed += succeeded[result.committed]
+        result.failed_rows.sort()
+        result.errors.sort(key=lambda e: e['rows'])
+        return result
+
     # =============================================
     # 兒科 CCC 評估系統方法
     # =============================================
 
-    def fetch_pediatric_evaluations(self, filters=None):
+    def _apply_evaluation_filters(self, query, filters):
+        """將 filters dict 套用到 pediatric_evaluations 查詢（共用過濾邏輯）"""
+        if not filters:
+            return query
+        if filters.get('evaluation_type'):
+            query = query.eq('evaluation_type', filters['evaluation_type'])
+        if filters.get('evaluated_resident'):
+            query = query.eq('evaluated_resident', filters['evaluated_resident'])
+        if filters.get('evaluator_teacher'):
+            query = query.eq('evaluator_teacher', filters['evaluator_teacher'])
+        if filters.get('date_from'):
+            query = query.gte('evaluation_date', filters['date_from'])
+        if filters.get('date_to'):
+            query = query.lte('evaluation_date', filters['date_to'])
+        if filters.get('department'):
+            query = query.eq('department', filters['department'])
+        return query
+
+    def iter_pediatric_evaluation_pages(self, filters=None, page_size=DEFAULT_PAGE_SIZE, columns=None):
+        """
+        以 (evaluation_date, id) keyset 分頁逐頁查詢兒科評核記錄。
+
+        排序與 fetch_pediatric_evaluations 相同（日期新→舊，同日再依 id 遞減），
+        每頁以上一頁最後一筆的 (evaluation_date, id) 為游標，不使用 offset，
+        因此資料量再大也不會被 PostgREST 的 max-rows 上限截斷。
+
+        Args:
+            filters (dict, optional): 與 fetch_pediatric_evaluations 相同
+            page_size (int): 每頁筆數，不應超過 PostgREST max-rows（預設 1000）
+            columns (str | list, optional): 欄位投影，見 PEDIATRIC_EVALUATION_COLUMNS；
+                投影時自動帶上游標欄位 evaluation_date、id
+
+        Yields:
+            list[dict]: 每頁的評核記錄（非空）
+
+        Raises:
+            Exception: 查詢失敗時直接拋出，避免呼叫端拿到不完整的資料
+        """
+        if page_size <= 0:
+            raise ValueError("page_size 必須大於 0")
+
+        select = _select_clause(PEDIATRIC_EVALUATION_COLUMNS, columns,
+                                required=('evaluation_date', 'id'))
+        cursor = None  # (evaluation_date, id)
+        while True:
+            query = self.client.table('pediatric_evaluations') \
+                .select(select) \
+                .eq('is_deleted', False)
+            query = self._apply_evaluation_filters(query, filters)
+            if cursor is not None:
+                last_date, last_id = cursor
+                query = query.or_(
+                    f'evaluation_date.lt.{last_date},'
+                    f'and(evaluation_date.eq.{last_date},id.lt.{last_id})'
+                )
+            query = query.order('evaluation_date', desc=True) \
+                .order('id', desc=True) \
+                .limit(page_size)
+
+            rows = query.execute().data or []
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1]['evaluation_date'], rows[-1]['id'])
+
+    def fetch_pediatric_evaluations(self, filters=None, page_size=DEFAULT_PAGE_SIZE, columns=None):
         """
-        查詢兒科評核記錄
+        查詢兒科評核記錄（內部以 keyset 分頁取回全部資料）
 
         Args:
             filters (dict, optional): 過濾條件，支援的 key：
@@ -76,35 +446,50 @@ class SupabaseConnection:
                 - date_from: 起始日期 (str 'YYYY-MM-DD')
                 - date_to: 結束日期 (str 'YYYY-MM-DD')
                 - department: 科別名稱（用於科別隔離）
+            page_size (int): 每頁筆數
+            columns (str | list, optional): 欄位投影，預設全部欄位
 
         Returns:
             list[dict]: 評核記錄列表，空列表表示無資料
         """
         try:
-            query = self.client.table('pediatric_evaluations') \
-                .select('*') \
-                .eq('is_deleted', False) \
-                .order('evaluation_date', desc=True)
+            records = []
+            for page in self.iter_pediatric_evaluation_pages(filters=filters, page_size=page_size,
+                                                             columns=columns):
+                records.extend(page)
+            return records
+        except Exception as e:
+            print(f"查詢兒科評核記錄失敗: {str(e)}")
+            return []
 
-            if filters:
-                if filters.get('evaluation_type'):
-                    query = query.eq('evaluation_type', filters['evaluation_type'])
-                if filters.get('evaluated_resident'):
-                    query = query.eq('evaluated_resident', filters['evaluated_resident'])
-                if filters.get('evaluator_teacher'):
-                    query = query.eq('evaluator_teacher', filters['evaluator_teacher'])
-                if filters.get('date_from'):
-                    query = query.gte('evaluation_date', filters['date_from'])
-                if filters.get('date_to'):
-                    query = query.lte('evaluation_date', filters['date_to'])
-                if filters.get('department'):
-                    query = query.eq('department', filters['department'])
+    def fetch_pediatric_evaluations_df(self, filters=None, page_size=DEFAULT_PAGE_SIZE, columns=None):
+        """
+        逐頁查詢兒科評核記錄並直接組成 DataFrame。
 
-            result = query.execute()
-            return result.data if result.data else []
+        每頁 JSON 取回後立即轉為 DataFrame 並釋放原始 dict，
+        記憶體中同時只保留一頁 dict，最後再一次 concat 並套用
+        PEDIATRIC_EVALUATION_DTYPES。
+
+        Args:
+            filters (dict, optional): 與 fetch_pediatric_evaluations 相同
+            page_size (int): 每頁筆數
+            columns (str | list, optional): 欄位投影，例如 'scores'、'dashboard'
+
+        Returns:
+            pd.DataFrame: 評核記錄，無資料或失敗時回傳空 DataFrame
+        """
+        try:
+            frames = [
+                pd.DataFrame(page)
+                for page in self.iter_pediatric_evaluation_pages(filters=filters, page_size=page_size,
+                                                                 columns=columns)
+            ]
+            if not frames:
+                return pd.DataFrame()
+            return apply_dtypes(pd.concat(frames, ignore_index=True), PEDIATRIC_EVALUATION_DTYPES)
         except Exception as e:
             print(f"查詢兒科評核記錄失敗: {str(e)}")
-            return []
+            return pd.DataFrame()
 
     def insert_pediatric_evaluation(self, data):
         """
@@ -121,6 +506,7 @@ class SupabaseConnection:
         """
         try:
             result = self.client.table('pediatric_evaluations').insert(data).execute()
+            bump_dataset_version('pediatric_evaluations')
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"新增兒科評核記錄失敗: {str(e)}")
@@ -147,47 +533,38 @@ class SupabaseConnection:
         """
         try:
             result = self.client.table('pediatric_evaluations').insert(data).execute()
+            bump_dataset_version('pediatric_evaluations')
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"新增評核記錄失敗: {str(e)}")
             return None
 
-    def fetch_evaluations(self, department=None, filters=None):
+    def fetch_evaluations(self, department=None, filters=None, page_size=DEFAULT_PAGE_SIZE, columns=None):
         """
-        通用查詢評核記錄（全科別共用）。
+        通用查詢評核記錄（全科別共用，內部以 keyset 分頁取回全部資料）。
 
         Args:
             department (str, optional): 科別名稱（用於科別過濾）
             filters (dict, optional): 額外過濾條件，支援的 key：
                 - evaluation_type, evaluated_resident,
                   evaluator_teacher, date_from, date_to
+            page_size (int): 每頁筆數
+            columns (str | list, optional): 欄位投影，預設全部欄位
 
         Returns:
             list[dict]: 評核記錄列表
         """
         try:
-            query = self.client.table('pediatric_evaluations') \
-                .select('*') \
-                .eq('is_deleted', False) \
-                .order('evaluation_date', desc=True)
-
+            merged = dict(filters or {})
             if department:
-                query = query.eq('department', department)
-
-            if filters:
-                if filters.get('evaluation_type'):
-                    query = query.eq('evaluation_type', filters['evaluation_type'])
-                if filters.get('evaluated_resident'):
-                    query = query.eq('evaluated_resident', filters['evaluated_resident'])
-                if filters.get('evaluator_teacher'):
-                    query = query.eq('evaluator_teacher', filters['evaluator_teacher'])
-                if filters.get('date_from'):
-                    query = query.gte('evaluation_date', filters['date_from'])
-                if filters.get('date_to'):
-                    query = query.lte('evaluation_date', filters['date_to'])
-
-            result = query.execute()
-            return result.data if result.data else []
+                merged['department'] = department
+            else:
+                merged.pop('department', None)
+            records = []
+            for page in self.iter_pediatric_evaluation_pages(filters=merged, page_size=page_size,
+                                                             columns=columns):
+                records.extend(page)
+            return records
         except Exception as e:
             print(f"查詢評核記錄失敗: {str(e)}")
             return []
@@ -202,12 +579,26 @@ class SupabaseConnection:
         Returns:
             int: 成功新增的筆數
         """
-        try:
-            result = self.client.table('pediatric_evaluations').insert(records).execute()
-            return len(result.data) if result.data else 0
-        except Exception as e:
-            print(f"批次新增兒科評核記錄失敗: {str(e)}")
-            return 0
+        result = self.insert_pediatric_evaluations_bulk(records)
+        for error in result.errors:
+            print(f"批次新增兒科評核記錄失敗（第 {error['rows'][0] + 1}–{error['rows'][1] + 1} 筆）: {error['error']}")
+        return result.written
+
+    def insert_pediatric_evaluations_bulk(self, records, **options):
+        """
+        分批新增兒科評核記錄
+
+        Args:
+            records (list[dict] | pd.DataFrame): 評核資料
+            **options: 傳給 bulk_write（chunk_size、max_in_flight、stop_on_error、progress 等）
+
+        Returns:
+            BulkWriteResult
+        """
+        result = self.bulk_write('pediatric_evaluations', records, **options)
+        if result.written:
+            bump_dataset_version('pediatric_evaluations')
+        return result
 
     def fetch_pediatric_users(self, user_type=None, active_only=True):
         """
@@ -363,18 +754,19 @@ class SupabaseConnection:
     # 全科別帳號管理方法
     # =============================================
 
-    def fetch_all_users(self, active_only=True):
+    def fetch_all_users(self, active_only=True, columns=None):
         """
         查詢所有使用者（不限 user_type）
 
         Args:
             active_only (bool): 是否僅查詢啟用中的帳號
+            columns (str | list, optional): 欄位投影，見 USER_COLUMNS，預設全部欄位
 
         Returns:
             list[dict]: 使用者列表
         """
         try:
-            query = self.client.table('pediatric_users').select('*')
+            query = self.client.table('pediatric_users').select(_select_clause(USER_COLUMNS, columns))
             if active_only:
                 query = query.eq('is_active', True)
             query = query.order('department').order('full_name')
@@ -394,24 +786,68 @@ class SupabaseConnection:
         Returns:
             tuple[int, list[str]]: (成功筆數, 錯誤訊息列表)
         """
-        success_count = 0
+        now = datetime.now().isoformat()
+        records = [dict(rec, updated_at=now) for rec in records]
+        result = self.bulk_write('pediatric_users', records, on_conflict='username')
         errors = []
-        for rec in records:
+        for error in result.errors:
+            first, last = error['rows']
+            names = '、'.join(str(rec.get('username', '?')) for rec in records[first:last + 1])
+            errors.append(f"{names}: {error['error']}")
+        return result.written, errors
+
+    def batch_create_users(self, records, progress=None):
+        """
+        批次新增使用者（CSV 匯入使用），已存在的帳號不覆寫
+
+        先以 in_ 查詢一次找出已存在與檔案內重複的帳號，其餘以 bulk_write 分批 insert；
+        寫入失敗的批次再逐筆 insert，回報每一筆的失敗原因（username 有唯一鍵，不會重複寫入）。
+
+        Args:
+            records (list[dict]): pediatric_users 新增資料，每筆需含 username
+            progress (callable, optional): progress(已完成筆數, 總筆數)
+
+        Returns:
+            list[tuple]: 依輸入順序的 (username, success, message)
+        """
+        names = [rec['username'] for rec in records]
+        existing = set()
+        for start in range(0, len(names), USER_LOOKUP_CHUNK_SIZE):
+            chunk = list(dict.fromkeys(names[start:start + USER_LOOKUP_CHUNK_SIZE]))
+            result = self.client.table('pediatric_users').select('username').in_('username', chunk).execute()
+            existing.update(row['username'] for row in result.data or [])
+
+        outcomes = [None] * len(records)
+        to_insert, positions, seen = [], [], set()
+        for i, name in enumerate(names):
+            if name in existing or name in seen:
+                outcomes[i] = (name, False, "使用者名稱已存在")
+            else:
+                seen.add(name)
+                to_insert.append(records[i])
+                positions.append(i)
+
+        written = self.bulk_write('pediatric_users', to_insert, progress=progress)
+        failed = set(written.failed_rows)
+        for j, i in enumerate(positions):
+            if j not in failed:
+                outcomes[i] = (names[i], True, "使用者建立成功")
+                continue
             try:
-                rec['updated_at'] = datetime.now().isoformat()
-                self.client.table('pediatric_users').upsert(
-                    rec, on_conflict='username'
-                ).execute()
-                success_count += 1
+                self.client.table('pediatric_users').insert(to_insert[j]).execute()
+                outcomes[i] = (names[i], True, "使用者建立成功")
             except Exception as e:
-                errors.append(f"{rec.get('username', '?')}: {str(e)}")
-        return success_count, errors
+                if str(getattr(e, 'code', '')) == '23505':
+                    outcomes[i] = (names[i], False, "使用者名稱已存在")
+                else:
+                    outcomes[i] = (names[i], False, f"建立失敗：{str(e)}")
+        return outcomes
 
     # =============================================
     # 研究進度管理方法
     # =============================================
 
-    def fetch_research_progress(self, filters=None):
+    def fetch_research_progress(self, filters=None, columns=None):
         """
         查詢研究進度記錄
 
@@ -421,13 +857,14 @@ class SupabaseConnection:
                 - current_status: 進度狀態
                 - supervisor_name: 指導老師
                 - department: 科別名稱（用於科別隔離）
+            columns (str | list, optional): 欄位投影，見 RESEARCH_PROGRESS_COLUMNS，預設全部欄位
 
         Returns:
             list[dict]: 研究進度列表
         """
         try:
             query = self.client.table('pediatric_research_progress') \
-                .select('*') \
+                .select(_select_clause(RESEARCH_PROGRESS_COLUMNS, columns)) \
                 .eq('is_deleted', False) \
                 .order('updated_at', desc=True)
 
@@ -459,6 +896,7 @@ class SupabaseConnection:
         """
         try:
             result = self.client.table('pediatric_research_progress').insert(data).execute()
+            bump_dataset_version('pediatric_research_progress')
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"新增研究進度失敗: {str(e)}")
@@ -481,6 +919,7 @@ class SupabaseConnection:
                 .update(data) \
                 .eq('id', research_id) \
                 .execute()
+            bump_dataset_version('pediatric_research_progress')
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"更新研究進度失敗: {str(e)}")
@@ -501,6 +940,7 @@ class SupabaseConnection:
                 'is_deleted': True,
                 'updated_at': datetime.now().isoformat()
             }).eq('id', research_id).execute()
+            bump_dataset_version('pediatric_research_progress')
             return True
         except Exception as e:
             print(f"刪除研究進度失敗: {str(e)}")
@@ -510,7 +950,7 @@ class SupabaseConnection:
     # 學習反思管理方法
     # =============================================
 
-    def fetch_learning_reflections(self, filters=None):
+    def fetch_learning_reflections(self, filters=None, columns=None):
         """
         查詢學習反思記錄
 
@@ -522,13 +962,14 @@ class SupabaseConnection:
                 - date_to: 結束日期
                 - include_private: 是否包含私人記錄（預設 False）
                 - department: 科別名稱（用於科別隔離）
+            columns (str | list, optional): 欄位投影，見 LEARNING_REFLECTION_COLUMNS，預設全部欄位
 
         Returns:
             list[dict]: 學習反思列表
         """
         try:
             query = self.client.table('pediatric_learning_reflections') \
-                .select('*') \
+                .select(_select_clause(LEARNING_REFLECTION_COLUMNS, columns)) \
                 .eq('is_deleted', False) \
                 .order('reflection_date', desc=True)
 
@@ -654,9 +1095,9 @@ class SupabaseConnection:
         try:
             # 確保必要欄位存在
             required_fields = ['full_name', 'desired_username', 'password_hash', 'email', 'user_type']
-            for field in required_fields:
-                if field not in data:
-                    st.error(f"缺少必要欄位：{field}")
+            for required in required_fields:
+                if required not in data:
+                    st.error(f"缺少必要欄位：{required}")
                     return None
 
             # 設定預設狀態
@@ -782,4 +1223,63 @@ class SupabaseConnection:
 
         except Exception as e:
             st.error(f"拒絕申請失敗：{str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+# ─── 行程共用連線 ───
+# SupabaseConnection 內含 httpx 連線池，應在整個行程（所有 Streamlit session / 執行緒）共用，
+# 各模組請透過 get_shared_connection() 取得，而非自行 SupabaseConnection()
+_shared_conn = None
+_shared_conn_lock = threading.Lock()
+_connection_stats = {'created': 0, 'reused': 0}
+
+
+def get_shared_connection():
+    """
+    取得行程共用的 SupabaseConnection（執行緒安全，首次呼叫時建立）
+
+    Returns:
+        SupabaseConnection: 共用連線實例
+
+    Raises:
+        ValueError: 未設定 SUPABASE_URL / SUPABASE_KEY（與 SupabaseConnection() 相同）
+    """
+    global _shared_conn
+    conn = _shared_conn
+    if conn is not None:
+        with _shared_conn_lock:
+            _connection_stats['reused'] += 1
+        return conn
+
+    with _shared_conn_lock:
+        if _shared_conn is None:
+            _shared_conn = SupabaseConnection()
+            _connection_stats['created'] += 1
+        else:
+            _connection_stats['reused'] += 1
+        return _shared_conn
+
+
+def get_connection_stats():
+    """
+    取得共用連線的使用統計
+
+    Returns:
+        dict: {'created': 建立次數, 'reused': 重用次數}
+    """
+    with _shared_conn_lock:
+        return dict(_connection_stats)
+
+
+def reset_shared_connection():
+    """
+    關閉並清除共用連線（更換金鑰或測試時使用），下次取得時重新建立
+    """
+    global _shared_conn
+    with _shared_conn_lock:
+        conn, _shared_conn = _shared_conn, None
+    if conn is not None:
+        try:
+            conn.client.postgrest.session.close()
+        except Exception:
+            pass
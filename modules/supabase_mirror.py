@@ -0,0 +1,435 @@
+"""
+Supabase 本機鏡像（SQLite）
+
+將 pediatric_evaluations、pediatric_research_progress、pediatric_learning_reflections
+鏡像到本機 SQLite，之後每次只同步 updated_at 超過水位（watermark）的記錄：
+- 第一次（冷啟動）完整下載一次
+- 之後（暖啟動）只取增量，通常是一次回傳 0 筆的查詢
+- is_deleted = TRUE 的記錄會從鏡像中移除
+- 伺服器端的硬刪除（DELETE）無法由增量偵測，因此每隔 FULL_RESYNC_SECONDS 重建一次
+
+讀取方法與 SupabaseConnection 同名同參數（fetch_pediatric_evaluations_df、
+fetch_research_progress、fetch_learning_reflections），可直接替換使用；
+鏡像從未成功同步過時會改為直接查詢 Supabase。
+
+使用方式：
+    from modules.supabase_mirror import get_shared_mirror
+    mirror = get_shared_mirror()
+    df = mirror.fetch_pediatric_evaluations_df(filters={'department': '小兒部'})
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from modules.supabase_connection import (
+    DEFAULT_PAGE_SIZE,
+    LEARNING_REFLECTION_COLUMNS,
+    PEDIATRIC_EVALUATION_COLUMNS,
+    PEDIATRIC_EVALUATION_DTYPES,
+    RESEARCH_PROGRESS_COLUMNS,
+    _select_clause,
+    apply_dtypes,
+)
+from modules.dataset_cache import dataset_version
+from modules.local_cache import DEFAULT_CACHE_DIR
+
+MIRROR_FILENAME = 'supabase_mirror.sqlite3'
+
+# 同一張表兩次增量同步的最短間隔（秒）：同一次畫面渲染內多次讀取只同步一次
+MIN_SYNC_INTERVAL = 10
+# 增量查詢往回多抓的時間，涵蓋 updated_at 較早但較晚 commit 的交易
+SYNC_OVERLAP = timedelta(minutes=5)
+# 定期完整重建，處理伺服器端硬刪除
+FULL_RESYNC_SECONDS = 6 * 3600
+
+# 各表的鏡像設定
+# - watermark: 增量同步依據的時間欄位
+# - filters: 讀取時支援的 filters key → (運算, 欄位)，與 SupabaseConnection 對應方法一致
+# - order: 讀取時的排序 [(欄位, 是否遞減)]
+# - views: 欄位投影定義
+MIRROR_TABLES = {
+    'pediatric_evaluations': {
+        'watermark': 'updated_at',
+        'filters': {
+            'evaluation_type': ('eq', 'evaluation_type'),
+            'evaluated_resident': ('eq', 'evaluated_resident'),
+            'evaluator_teacher': ('eq', 'evaluator_teacher'),
+            'date_from': ('gte', 'evaluation_date'),
+            'date_to': ('lte', 'evaluation_date'),
+            'department': ('eq', 'department'),
+        },
+        'order': [('evaluation_date', True), ('id', True)],
+        'views': PEDIATRIC_EVALUATION_COLUMNS,
+    },
+    'pediatric_research_progress': {
+        'watermark': 'updated_at',
+        'filters': {
+            'resident_name': ('eq', 'resident_name'),
+            'current_status': ('eq', 'current_status'),
+            'supervisor_name': ('eq', 'supervisor_name'),
+            'department': ('eq', 'department'),
+        },
+        'order': [('updated_at', True)],
+        'views': RESEARCH_PROGRESS_COLUMNS,
+    },
+    'pediatric_learning_reflections': {
+        'watermark': 'updated_at',
+        'filters': {
+            'resident_name': ('eq', 'resident_name'),
+            'reflection_type': ('eq', 'reflection_type'),
+            'date_from': ('gte', 'reflection_date'),
+            'date_to': ('lte', 'reflection_date'),
+            'include_private': ('private', 'is_private'),
+            'department': ('eq', 'department'),
+        },
+        'order': [('reflection_date', True)],
+        'views': LEARNING_REFLECTION_COLUMNS,
+    },
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_rows (
+    table_name TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    department TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_name, id)
+);
+CREATE INDEX IF NOT EXISTS idx_mirror_rows_department ON mirror_rows(table_name, department);
+CREATE TABLE IF NOT EXISTS mirror_watermarks (
+    table_name TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_id INTEGER,
+    full_synced_at REAL
+);
+"""
+
+
+def _parse_timestamp(value):
+    """解析 PostgREST 回傳的 ISO 時間字串（無時區視為 UTC）"""
+    ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def _matches(row, filters, spec):
+    """判斷一筆記錄是否符合 filters（語意與 SupabaseConnection 的查詢條件相同）"""
+    for key, (op, col) in spec.items():
+        if op == 'private':
+            # 與 fetch_learning_reflections 相同：有 filters 且未要求 include_private 時排除私人記錄
+            if not filters.get(key, False) and row.get(col) is not False:
+                return False
+            continue
+        target = filters.get(key)
+        if not target:
+            continue
+        value = row.get(col)
+        if op == 'eq' and value != target:
+            return False
+        if op == 'gte' and (value is None or str(value) < str(target)):
+            return False
+        if op == 'lte' and (value is None or str(value) > str(target)):
+            return False
+    return True
+
+
+class SupabaseMirror:
+    """
+    Supabase 資料表的本機 SQLite 鏡像，以 updated_at 水位做增量同步
+    """
+
+    def __init__(self, conn, path=None, page_size=DEFAULT_PAGE_SIZE,
+                 min_sync_interval=MIN_SYNC_INTERVAL):
+        """
+        Args:
+            conn (SupabaseConnection): 用來同步的 Supabase 連線
+            path (str, optional): SQLite 檔案路徑，預設 DEFAULT_CACHE_DIR/MIRROR_FILENAME
+            page_size (int): 同步時每頁筆數
+            min_sync_interval (float): 同一張表兩次增量同步的最短間隔（秒）
+        """
+        self.conn = conn
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, MIRROR_FILENAME)
+        self.page_size = page_size
+        self.min_sync_interval = min_sync_interval
+        self._lock = threading.Lock()
+        self._last_sync = {}  # {表名: time.monotonic()}
+        self._synced_version = {}  # {表名: 同步時的 dataset_version}，本行程有寫入時略過最短間隔
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as db:
+            # WAL 讓同步寫入時其他執行緒仍可讀取
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """開啟 SQLite 連線，區塊結束時提交（例外時回滾）並關閉"""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # =============================================
+    # 同步
+    # =============================================
+
+    def _get_watermark(self, db, table):
+        row = db.execute(
+            'SELECT watermark, last_id, full_synced_at FROM mirror_watermarks WHERE table_name = ?',
+            (table,)
+        ).fetchone()
+        return row if row else (None, None, None)
+
+    def _save_watermark(self, db, table, watermark, last_id, full_synced_at):
+        db.execute(
+            'INSERT OR REPLACE INTO mirror_watermarks '
+            '(table_name, watermark, last_id, full_synced_at) VALUES (?, ?, ?, ?)',
+            (table, watermark, last_id, full_synced_at)
+        )
+
+    def has_synced(self, table):
+        """
+        該表是否曾經成功同步過
+
+        Args:
+            table (str): 資料表名稱
+
+        Returns:
+            bool: 是否已有鏡像資料
+        """
+        with self._connect() as db:
+            return self._get_watermark(db, table)[2] is not None
+
+    def sync(self, table, force=False):
+        """
+        增量同步一張表到本機鏡像
+
+        依 (watermark 欄位, id) 遞增做 keyset 分頁，從上次水位往回 SYNC_OVERLAP 開始抓，
+        增量同步時每頁寫入與水位更新在同一個 SQLite 交易提交，中斷後下次可從中斷處續傳；
+        完整重建（首次或超過 FULL_RESYNC_SECONDS）則整批在單一交易內完成。
+
+        Args:
+            table (str): MIRROR_TABLES 中的資料表名稱
+            force (bool): 忽略 min_sync_interval 立即同步（本行程寫入過該表時也會立即同步）
+
+        Returns:
+            int: 本次寫入或刪除的記錄數（略過同步時為 0）
+
+        Raises:
+            Exception: 查詢 Supabase 失敗時拋出，鏡像保持上次同步的狀態
+        """
+        if table not in MIRROR_TABLES:
+            raise ValueError(f"未設定鏡像的資料表：{table}")
+        wm_col = MIRROR_TABLES[table]['watermark']
+
+        with self._lock:
+            last = self._last_sync.get(table)
+            version = dataset_version(table)
+            if (not force and last is not None and version == self._synced_version.get(table)
+                    and time.monotonic() - last < self.min_sync_interval):
+                return 0
+
+            with self._connect() as db:
+                watermark, _, full_synced_at = self._get_watermark(db, table)
+                full = full_synced_at is None or time.time() - full_synced_at > FULL_RESYNC_SECONDS
+                since = None
+                if full:
+                    # 完整重建在單一交易內完成，失敗時保留舊鏡像
+                    watermark = None
+                    full_synced_at = time.time()
+                    db.execute('DELETE FROM mirror_rows WHERE table_name = ?', (table,))
+                elif watermark:
+                    since = (_parse_timestamp(watermark) - SYNC_OVERLAP).isoformat()
+
+                changed = 0
+                cursor = None  # (watermark 值, id)
+                while True:
+                    query = self.conn.client.table(table).select('*')
+                    if cursor is not None:
+                        last_wm, last_id = cursor
+                        query = query.or_(
+                            f'{wm_col}.gt."{last_wm}",'
+                            f'and({wm_col}.eq."{last_wm}",id.gt.{last_id})'
+                        )
+                    elif since:
+                        query = query.gte(wm_col, since)
+                    rows = query.order(wm_col).order('id').limit(self.page_size).execute().data or []
+                    if not rows:
+                        break
+
+                    deleted = [(table, r['id']) for r in rows if r.get('is_deleted')]
+                    kept = [(table, r['id'], r.get('department'), json.dumps(r, ensure_ascii=False))
+                            for r in rows if not r.get('is_deleted')]
+                    if deleted:
+                        db.executemany('DELETE FROM mirror_rows WHERE table_name = ? AND id = ?', deleted)
+                    if kept:
+                        db.executemany(
+                            'INSERT OR REPLACE INTO mirror_rows (table_name, id, department, data) '
+                            'VALUES (?, ?, ?, ?)', kept
+                        )
+                    changed += len(rows)
+
+                    last_row = rows[-1]
+                    if last_row.get(wm_col) is None:
+                        # 水位欄位為 NULL 的記錄排在最後，無法再往後分頁
+                        break
+                    cursor = (last_row[wm_col], last_row['id'])
+                    if watermark is None or _parse_timestamp(cursor[0]) >= _parse_timestamp(watermark):
+                        watermark = cursor[0]
+                    if not full:
+                        # 增量同步逐頁提交，中斷後下次從已寫入的水位續傳
+                        self._save_watermark(db, table, watermark, cursor[1], full_synced_at)
+                        db.commit()
+                    if len(rows) < self.page_size:
+                        break
+
+                self._save_watermark(db, table, watermark, cursor[1] if cursor else None, full_synced_at)
+
+            self._last_sync[table] = time.monotonic()
+            self._synced_version[table] = version
+            return changed
+
+    def reset(self, table=None):
+        """
+        清除鏡像資料與水位，下次讀取時重新完整同步
+
+        Args:
+            table (str, optional): 只清除指定資料表，預設全部
+        """
+        with self._lock, self._connect() as db:
+            if table:
+                db.execute('DELETE FROM mirror_rows WHERE table_name = ?', (table,))
+                db.execute('DELETE FROM mirror_watermarks WHERE table_name = ?', (table,))
+                self._last_sync.pop(table, None)
+            else:
+                db.execute('DELETE FROM mirror_rows')
+                db.execute('DELETE FROM mirror_watermarks')
+                self._last_sync.clear()
+
+    # =============================================
+    # 讀取
+    # =============================================
+
+    def fetch_records(self, table, filters=None, columns=None):
+        """
+        從鏡像讀取記錄（讀取前先做增量同步）
+
+        Args:
+            table (str): MIRROR_TABLES 中的資料表名稱
+            filters (dict, optional): 與 SupabaseConnection 對應查詢方法相同
+            columns (str | list, optional): 欄位投影，預設全部欄位
+
+        Returns:
+            list[dict]: 記錄列表，排序與 SupabaseConnection 對應查詢方法相同
+
+        Raises:
+            Exception: 同步失敗且鏡像從未同步過時拋出
+        """
+        config = MIRROR_TABLES[table]
+        try:
+            self.sync(table)
+        except Exception as e:
+            if not self.has_synced(table):
+                raise
+            print(f"同步本機鏡像失敗，使用上次同步的資料: {str(e)}")
+
+        sql = 'SELECT data FROM mirror_rows WHERE table_name = ?'
+        params = [table]
+        if filters and filters.get('department'):
+            sql += ' AND department = ?'
+            params.append(filters['department'])
+        with self._connect() as db:
+            rows = [json.loads(data) for (data,) in db.execute(sql, params)]
+
+        if filters:
+            rows = [r for r in rows if _matches(r, filters, config['filters'])]
+        for col, desc in reversed(config['order']):
+            present = [r for r in rows if r.get(col) is not None]
+            missing = [r for r in rows if r.get(col) is None]
+            present.sort(key=lambda r: r[col], reverse=desc)
+            # 與 PostgreSQL 相同：遞減排序時 NULL 在前，遞增時在後
+            rows = missing + present if desc else present + missing
+
+        select = _select_clause(config['views'], columns)
+        if select != '*':
+            cols = select.split(',')
+            rows = [{c: r.get(c) for c in cols} for r in rows]
+        return rows
+
+    def fetch_pediatric_evaluations_df(self, filters=None, columns=None):
+        """
+        讀取兒科評核記錄為 DataFrame（同 SupabaseConnection.fetch_pediatric_evaluations_df）
+
+        Returns:
+            pd.DataFrame: 評核記錄，無資料或失敗時回傳空 DataFrame
+        """
+        try:
+            rows = self.fetch_records('pediatric_evaluations', filters=filters, columns=columns)
+        except Exception as e:
+            print(f"讀取本機鏡像失敗，改為直接查詢 Supabase: {str(e)}")
+            return self.conn.fetch_pediatric_evaluations_df(filters=filters, columns=columns)
+        if not rows:
+            return pd.DataFrame()
+        return apply_dtypes(pd.DataFrame(rows), PEDIATRIC_EVALUATION_DTYPES)
+
+    def fetch_research_progress(self, filters=None, columns=None):
+        """
+        讀取研究進度記錄（同 SupabaseConnection.fetch_research_progress）
+
+        Returns:
+            list[dict]: 研究進度列表
+        """
+        try:
+            return self.fetch_records('pediatric_research_progress', filters=filters, columns=columns)
+        except Exception as e:
+            print(f"讀取本機鏡像失敗，改為直接查詢 Supabase: {str(e)}")
+            return self.conn.fetch_research_progress(filters=filters, columns=columns)
+
+    def fetch_learning_reflections(self, filters=None, columns=None):
+        """
+        讀取學習反思記錄（同 SupabaseConnection.fetch_learning_reflections）
+
+        Returns:
+            list[dict]: 學習反思列表
+        """
+        try:
+            return self.fetch_records('pediatric_learning_reflections', filters=filters, columns=columns)
+        except Exception as e:
+            print(f"讀取本機鏡像失敗，改為直接查詢 Supabase: {str(e)}")
+            return self.conn.fetch_learning_reflections(filters=filters, columns=columns)
+
+
+# ─── 行程共用鏡像 ───
+_shared_mirror = None
+_shared_mirror_lock = threading.Lock()
+
+
+def get_shared_mirror():
+    """
+    取得行程共用的本機鏡像（以 get_shared_connection() 同步）
+
+    Returns:
+        SupabaseMirror | None: 無法連線 Supabase 或無法建立鏡像檔時回傳 None
+    """
+    global _shared_mirror
+    if _shared_mirror is not None:
+        return _shared_mirror
+    with _shared_mirror_lock:
+        if _shared_mirror is None:
+            try:
+                from modules.supabase_connection import get_shared_connection
+                _shared_mirror = SupabaseMirror(get_shared_connection())
+            except Exception as e:
+                print(f"建立本機鏡像失敗: {str(e)}")
+                return None
+        return _shared_mirror
@@ -15,8 +15,8 @@ from datetime import datetime
 
 
 def _get_supabase_conn():
-    from modules.supabase_connection import SupabaseConnection
-    return SupabaseConnection()
+    from modules.supabase_connection import get_shared_connection
+    return get_shared_connection()
 
 
 def hash_password(password):
@@ -1,10 +1,12 @@
+import hashlib
+import json
+import time
+
+import numpy as np
 import pandas as pd
 from modules.google_connection import fetch_google_form_data
-from supabase import create_client
-import os
-from dotenv import load_dotenv
+from modules.supabase_connection import get_shared_connection
 import streamlit as st
-from datetime import datetime, timezone
 import sys
 from pathlib import Path
 
@@ -13,240 +15,251 @@ current_dir = Path(__file__).resolve().parent
 root_dir = current_dir.parent
 sys.path.append(str(root_dir))
 
-def get_last_sync_time(supabase, table_name):
-    """獲取最後同步時間"""
-    try:
-        response = supabase.table(table_name)\
-            .select("timestamp")\
-            .order('timestamp', desc=True)\
-            .limit(1)\
-            .execute()
-        
-        if response.data:
-            return pd.to_datetime(response.data[0]['timestamp'])
-        return None
-    except Exception as e:
-        st.error(f"獲取最後同步時間失敗：{str(e)}")
-        return None
+# ========== EPA 評核資料同步（冪等批次 upsert）==========
+EPA_SYNC_TABLE = 'epa_evaluations'
+# 每次 upsert 的筆數（單一 HTTP 請求）
+SYNC_CHUNK_SIZE = 500
+# 讀取既有 record_key 的分頁大小（不超過 PostgREST max-rows）
+EXISTING_PAGE_SIZE = 1000
 
-def sanitize_float(value):
-    """處理浮點數值，確保符合 JSON 規範"""
-    try:
-        if pd.isna(value):
-            return None
-        float_val = float(value)
-        # 檢查是否為無限大或 NaN
-        if pd.isinf(float_val) or pd.isna(float_val):
-            return None
-        return float_val
-    except:
-        return None
-
-def convert_tw_time(time_str):
-    """轉換中文時間格式"""
-    try:
-        if pd.isna(time_str):
-            return None
-        # 處理上午/下午
-        if '上午' in time_str:
-            time_str = time_str.replace('上午', 'AM')
-        elif '下午' in time_str:
-            time_str = time_str.replace('下午', 'PM')
-        
-        # 使用 pandas 的時間解析
-        return pd.to_datetime(time_str, format='%Y/%m/%d %p %I:%M:%S')
-    except Exception as e:
-        st.error(f"時間轉換錯誤：{str(e)}")
-        return None
+EPA_COLUMN_MAPPING = {
+    '時間戳記': 'timestamp',
+    '學號': 'student_id',
+    '學員姓名': 'student_name',
+    '梯次': 'batch',
+    'EPA評核項目': 'epa_item',
+    '學員自評EPA等級': 'self_evaluation',
+    '教師評核EPA等級': 'teacher_evaluation',
+    '教師': 'teacher_name',
+    '回饋': 'feedback',
+    '臨床情境': 'clinical_scenario',
+    '地點': 'location'
+}
+# 自然鍵：同一學員、同一 EPA 項目、同一教師、同一時間戳記視為同一筆評核
+NATURAL_KEY_COLUMNS = ['student_name', 'epa_item', 'teacher_name', 'timestamp']
+STRING_COLUMNS = ['student_id', 'student_name', 'batch', 'epa_item',
+                  'teacher_name', 'feedback', 'clinical_scenario', 'location']
+# 空字串寫入時改為 NULL 的欄位
+NULLABLE_STRING_COLUMNS = ['clinical_scenario', 'location', 'batch', 'feedback']
+LOCAL_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def _md5_hex(values):
+    return [hashlib.md5(v.encode('utf-8')).hexdigest() for v in values]
+
+
+def parse_form_timestamps(timestamps):
+    """
+    向量化解析 Google 表單時間戳記（"2025/3/11 上午 8:15:25"，也接受 24 小時制 "2025/3/11 08:15:25"）
+
+    Args:
+        timestamps (pd.Series): 時間戳記欄位
+
+    Returns:
+        pd.Series: 台北時間（無時區）的 datetime，無法解析者為 NaT
+    """
+    text = timestamps.astype(str).str.replace('上午', 'AM', regex=False).str.replace('下午', 'PM', regex=False)
+    parsed = pd.to_datetime(text, format='%Y/%m/%d %p %I:%M:%S', errors='coerce')
+    missing = parsed.isna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(text[missing], format='%Y/%m/%d %H:%M:%S', errors='coerce')
+    return parsed
+
+
+def natural_record_keys(df):
+    """
+    自然鍵雜湊（與 sql/migrations/add_record_key_to_epa_evaluations.sql 的回填算法相同）
+
+    Args:
+        df (pd.DataFrame): 含 NATURAL_KEY_COLUMNS，timestamp 為台北時間（無時區）的 datetime，
+            或已格式化為 'YYYY-MM-DDTHH:MM:SS' 的字串
+
+    Returns:
+        list[str]: 每列的 md5 十六進位字串
+    """
+    parts = [df[c].fillna('').astype(str) for c in NATURAL_KEY_COLUMNS[:-1]]
+    timestamps = df['timestamp']
+    if pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = timestamps.dt.strftime(LOCAL_TIME_FORMAT)
+    parts.append(timestamps.fillna('').astype(str))
+    joined = parts[0].str.cat(parts[1:], sep='|')
+    return _md5_hex(joined)
+
+
+def prepare_epa_records(epa_df):
+    """
+    將 Google 表單的 EPA 評核資料整理為 epa_evaluations 的寫入格式（全部向量化處理）
+
+    Args:
+        epa_df (pd.DataFrame): fetch_google_form_data 的結果（中文欄名）
+
+    Returns:
+        tuple[pd.DataFrame, int]: (含 record_key、row_hash 的寫入資料（同一 record_key 只保留最後一筆）,
+                                   略過筆數（時間戳記無法解析或重複）)
+    """
+    df = epa_df.rename(columns=EPA_COLUMN_MAPPING)
+    df = df[[c for c in df.columns if c in EPA_COLUMN_MAPPING.values()]].copy()
+    for col in EPA_COLUMN_MAPPING.values():
+        if col not in df.columns:
+            df[col] = None
+
+    df['timestamp'] = parse_form_timestamps(df['timestamp'])
+    valid = df['timestamp'].notna()
+    df = df[valid].copy()
+    df['timestamp'] = df['timestamp'].dt.strftime(LOCAL_TIME_FORMAT)
+
+    for col in ['self_evaluation', 'teacher_evaluation']:
+        numeric = pd.to_numeric(df[col], errors='coerce')
+        df[col] = numeric.where(np.isfinite(numeric))
+    for col in STRING_COLUMNS:
+        df[col] = df[col].fillna('').astype(str)
+
+    df['record_key'] = natural_record_keys(df)
+    deduped = df.drop_duplicates('record_key', keep='last')
+    skipped = int((~valid).sum()) + len(df) - len(deduped)
+
+    out = deduped.copy()
+    # 台灣自 1980 年起無日光節約時間，等同 tz_localize('Asia/Taipei') 後以 %z 格式化
+    out['timestamp'] = out['timestamp'] + '+0800'
+    for col in NULLABLE_STRING_COLUMNS:
+        out[col] = out[col].replace('', None)
+    out = out.astype(object).where(out.notna(), None)
+
+    content = zip(*(out[c].tolist() for c in EPA_COLUMN_MAPPING.values()))
+    out['row_hash'] = _md5_hex(json.dumps(row, ensure_ascii=False, default=str) for row in content)
+    return out.reset_index(drop=True), skipped
+
+
+def fetch_existing_row_hashes(supabase, table_name=EPA_SYNC_TABLE, page_size=EXISTING_PAGE_SIZE):
+    """
+    以 record_key keyset 分頁讀取資料表中既有的 {record_key: row_hash}
+
+    Raises:
+        Exception: 查詢失敗時直接拋出（避免把既有資料誤判為新資料）
+    """
+    existing = {}
+    cursor = ''
+    while True:
+        rows = supabase.table(table_name) \
+            .select('record_key,row_hash') \
+            .gt('record_key', cursor) \
+            .order('record_key') \
+            .limit(page_size) \
+            .execute().data or []
+        for row in rows:
+            existing[row['record_key']] = row.get('row_hash')
+        if len(rows) < page_size:
+            return existing
+        cursor = rows[-1]['record_key']
+
+
+def upsert_epa_records(conn, records, existing, table_name=EPA_SYNC_TABLE,
+                       chunk_size=SYNC_CHUNK_SIZE, progress=None):
+    """
+    只寫入新增或內容有變動的資料，以 bulk_write 每 chunk_size 筆一次 upsert(on_conflict='record_key')
+
+    upsert 冪等，批次可同時進行，失敗的批次不影響其他批次（下次同步會再送出）。
+
+    Args:
+        conn: SupabaseConnection
+        records (pd.DataFrame): prepare_epa_records 的結果
+        existing (dict): fetch_existing_row_hashes 的結果
+        progress (callable, optional): progress(已處理筆數, 需寫入筆數)
+
+    Returns:
+        dict: {'inserted', 'updated', 'skipped', 'failed', 'errors'}；
+              skipped 為內容未變動而未送出的筆數
+    """
+    keys = records['record_key']
+    known = keys.map(existing.__contains__).astype(bool)
+    changed = keys.map(existing.get) != records['row_hash']
+    to_write = records[changed].reset_index(drop=True)
+    is_update = known[changed].to_numpy()
+
+    result = conn.bulk_write(table_name, to_write, on_conflict='record_key',
+                             chunk_size=chunk_size, progress=progress)
+    failed = np.zeros(len(to_write), dtype=bool)
+    failed[result.failed_rows] = True
+    return {
+        'inserted': int((~is_update & ~failed).sum()),
+        'updated': int((is_update & ~failed).sum()),
+        'skipped': int((~changed).sum()),
+        'failed': result.failed,
+        'errors': [f"第 {e['rows'][0] + 1}–{e['rows'][1] + 1} 筆：{e['error']}" for e in result.errors],
+    }
+
+
+def sync_epa_evaluations(conn, epa_df, table_name=EPA_SYNC_TABLE, chunk_size=SYNC_CHUNK_SIZE, progress=None):
+    """
+    EPA 評核資料同步：整理 → 比對既有 record_key / row_hash → 批次 upsert
+
+    重複執行是冪等的：未變動的資料不會再送出，也不會產生重複列。
+
+    Args:
+        conn: SupabaseConnection
+
+    Returns:
+        dict: {'inserted', 'updated', 'skipped', 'failed', 'errors'}；
+              skipped 含時間戳記無法解析、表單內重複與內容未變動的筆數
+    """
+    records, invalid = prepare_epa_records(epa_df)
+    existing = fetch_existing_row_hashes(conn.client, table_name)
+    stats = upsert_epa_records(conn, records, existing, table_name, chunk_size, progress)
+    stats['skipped'] += invalid
+    return stats
 
-def process_training_date(date_str):
-    """處理訓練科部日期格式"""
-    try:
-        if pd.isna(date_str):
-            return None
-        # 嘗試不同的日期格式
-        try:
-            # 如果是 "年/月/日" 格式
-            return pd.to_datetime(date_str, format='%Y/%m/%d')
-        except:
-            try:
-                # 如果是 "月/日/年" 格式
-                return pd.to_datetime(date_str, format='%m/%d/%Y')
-            except:
-                # 最後嘗試自動解析
-                return pd.to_datetime(date_str)
-    except Exception as e:
-        st.error(f"日期轉換錯誤：{str(e)}")
-        return None
 
 def sync_to_supabase():
     """同步 Google Sheet 資料到 Supabase"""
     try:
-        # 載入環境變數
-        load_dotenv()
-        SUPABASE_URL = os.getenv("SUPABASE_URL")
-        SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-        
-        if not SUPABASE_URL or not SUPABASE_KEY:
+        # 取得共用的 Supabase 連線（.env 或 Streamlit secrets）
+        try:
+            conn = get_shared_connection()
+        except ValueError:
             st.error("請確認 .env 檔案中有設定 SUPABASE_URL 和 SUPABASE_KEY")
             return
         
-        # 建立 Supabase 連線
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        
         # 檢查連線是否成功
         try:
             # 嘗試讀取資料表結構
-            response = supabase.table('epa_evaluations').select("*").limit(1).execute()
+            conn.client.table(EPA_SYNC_TABLE).select("record_key").limit(1).execute()
             st.success("成功連線到 Supabase")
         except Exception as e:
             st.error(f"無法連線到 Supabase：{str(e)}")
             st.error("請確認：")
             st.error("1. SUPABASE_URL 和 SUPABASE_KEY 是否正確")
-            st.error("2. 資料表 'epa_evaluations' 是否已建立")
+            st.error(f"2. 資料表 '{EPA_SYNC_TABLE}' 是否已建立，並已執行 "
+                     "sql/migrations/add_record_key_to_epa_evaluations.sql")
             return
         
         # ========== EPA 評核資料同步 ==========
         st.write("正在同步 EPA 評核資料...")
-        
-        # 獲取最後同步時間
-        last_sync_time = get_last_sync_time(supabase, 'epa_evaluations')
-        if last_sync_time:
-            st.info(f"上次同步時間：{last_sync_time}")
-        else:
-            st.info("資料表中目前沒有資料")
-        
-        # 載入 EPA 評核資料
         epa_df, _ = fetch_google_form_data()
         
-        if epa_df is not None and not epa_df.empty:
-            # 更新欄位對應
-            column_mapping = {
-                '時間戳記': 'timestamp',
-                '學號': 'student_id',
-                '學員姓名': 'student_name',
-                '梯次': 'batch',
-                'EPA評核項目': 'epa_item',
-                '學員自評EPA等級': 'self_evaluation',
-                '教師評核EPA等級': 'teacher_evaluation',
-                '教師': 'teacher_name',
-                '回饋': 'feedback',
-                '臨床情境': 'clinical_scenario',
-                '地點': 'location'  # 新增地點欄位對應
-            }
-            
-            # 重命名欄位
-            epa_df = epa_df.rename(columns=column_mapping)
-            
-            # 確保所有必要欄位都存在，如果不存在則新增並設為 None
-            for col in column_mapping.values():
-                if col not in epa_df.columns:
-                    epa_df[col] = None
-            
-            # 處理時間格式
-            epa_df['timestamp'] = epa_df['timestamp'].apply(convert_tw_time)
-            
-            # 處理數值欄位
-            epa_df['self_evaluation'] = epa_df['self_evaluation'].apply(sanitize_float)
-            epa_df['teacher_evaluation'] = epa_df['teacher_evaluation'].apply(sanitize_float)
-            
-            # 確保字串欄位不是 nan
-            string_columns = ['student_id', 'student_name', 'batch', 'epa_item', 
-                            'teacher_name', 'feedback', 'clinical_scenario', 'location']
-            for col in string_columns:
-                epa_df[col] = epa_df[col].fillna('')
-            
-            # 獲取最後同步時間
-            last_sync = supabase.table('epa_evaluations')\
-                .select("timestamp")\
-                .order('timestamp', desc=True)\
-                .limit(1)\
-                .execute()
-            
-            if last_sync.data:
-                last_sync_time = pd.to_datetime(last_sync.data[0]['timestamp'])
-                new_records = epa_df[epa_df['timestamp'] > last_sync_time]
-                st.write(f"發現 {len(new_records)} 筆新資料")
-            else:
-                new_records = epa_df
-                st.write(f"首次同步，共有 {len(new_records)} 筆資料")
-            
-            # 只取前五筆資料
-            new_records = new_records.head(5)
-            st.write(f"將上傳前 5 筆資料：")
-            st.write(new_records)
-            
-            # 批次插入資料
-            if not new_records.empty:
-                # 確保時間戳記格式正確（加入時區資訊）
-                new_records['timestamp'] = pd.to_datetime(new_records['timestamp']).dt.tz_localize('Asia/Taipei')
-                new_records['timestamp'] = new_records['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S%z')
-                
-                # 將 student_id 轉換為字串類型
-                new_records['student_id'] = new_records['student_id'].astype(str)
-                
-                # 處理數值欄位，將 NaN 轉換為 None
-                new_records['self_evaluation'] = pd.to_numeric(new_records['self_evaluation'], errors='coerce')
-                new_records['teacher_evaluation'] = pd.to_numeric(new_records['teacher_evaluation'], errors='coerce')
-                
-                # 將空字串轉換為 None
-                for col in ['clinical_scenario', 'location', 'batch', 'feedback']:
-                    new_records[col] = new_records[col].replace('', None)
-                
-                # 處理 NaN 值
-                new_records = new_records.replace({pd.NA: None, pd.NaT: None, float('nan'): None})
-                
-                # 轉換為字典列表
-                records = new_records.to_dict('records')
-                
-                st.write("準備上傳的資料（已整理）：")
-                st.write(records)
-                
-                success_count = 0
-                with st.progress(0) as progress_bar:
-                    for i, record in enumerate(records):
-                        try:
-                            st.write(f"正在處理第 {i+1} 筆資料：")
-                            st.write(record)
-                            
-                            # 移除 None 值的欄位
-                            record = {k: v for k, v in record.items() if v is not None}
-                            
-                            # 嘗試插入資料
-                            result = supabase.table('epa_evaluations').insert(record).execute()
-                            
-                            if hasattr(result, 'data') and result.data:
-                                success_count += 1
-                                st.success(f"第 {i+1} 筆資料上傳成功")
-                            else:
-                                st.error(f"第 {i+1} 筆資料上傳失敗")
-                                st.write("API 回應：", result)
-                            
-                            # 更新進度
-                            progress_bar.progress((i + 1) / len(records))
-                            
-                        except Exception as e:
-                            st.error(f"處理第 {i+1} 筆資料時發生錯誤：{str(e)}")
-                            st.write("問題資料：", record)
-                            continue
-                
-                st.success(f"成功上傳 {success_count} 筆 EPA 評核資料（共嘗試 {len(records)} 筆）")
-                
-                # 驗證資料是否確實存在
-                verification = supabase.table('epa_evaluations').select("count", count='exact').execute()
-                st.write(f"資料庫中實際資料筆數：{verification.count}")
-            else:
-                st.info("沒有新的 EPA 評核資料需要同步")
-        else:
+        if epa_df is None or epa_df.empty:
             st.error("無法載入 EPA 評核資料")
-        
-        st.success("EPA 評核資料同步完成！")
-        
+            return
+
+        progress_bar = st.progress(0.0, text=f"共 {len(epa_df)} 筆，比對既有資料中...")
+
+        def _progress(done, total):
+            progress_bar.progress(done / total, text=f"已寫入 {done}/{total} 筆")
+
+        started = time.perf_counter()
+        stats = sync_epa_evaluations(conn, epa_df, progress=_progress)
+        progress_bar.progress(1.0, text=f"完成（{time.perf_counter() - started:.1f} 秒）")
+
         # 顯示同步統計
         st.subheader("同步統計")
-        epa_count = supabase.table('epa_evaluations').select("count", count='exact').execute()
-        
-        st.write(f"EPA 評核資料總筆數：{epa_count.count}")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("新增", stats['inserted'])
+        col2.metric("更新", stats['updated'])
+        col3.metric("略過", stats['skipped'])
+        col4.metric("失敗", stats['failed'])
+        for error in stats['errors']:
+            st.error(error)
+        if not stats['failed']:
+            st.success("EPA 評核資料同步完成！")
         
     except Exception as e:
         st.error(f"資料同步過程中發生錯誤：{str(e)}")
@@ -265,5 +278,6 @@ if __name__ == "__main__":
         if st.button("開始同步"):
             sync_to_supabase()
     else:
-        st.info(f"已設定{sync_frequency}，系統將自動執行同步")
-        # 這裡可以加入排程邏輯
+        interval = 86400 if sync_frequency == "每天同步" else 7 * 86400
+        st.info(f"{sync_frequency}請在伺服器上以排程程式執行（不需開啟瀏覽器）：")
+        st.code(f"python scripts/sync_daemon.py --interval {interval}", language="bash")
@@ -3,10 +3,22 @@
 Google Sheets → Supabase 一次性遷移 + 增量同步。
 """
 
-import streamlit as st
-import pandas as pd
+import hashlib
+import os
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.local_cache import DEFAULT_CACHE_DIR, load_json_file, save_json_file
+
+# 小兒部評核 Google 表單回應試算表
+PEDIATRIC_SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1n4kc2d3Z-x9SvIDApPCCz2HSDO0wSrrk9Y5jReMhr-M/edit?usp=sharing"
+# 正式遷移未完成時的續傳點（各類型已寫入筆數與已寫入部分的內容指紋），存在 DEFAULT_CACHE_DIR，
+# 瀏覽器重新整理或伺服器重啟後仍可續傳
+MIGRATION_CHECKPOINT_FILENAME = 'pediatric_migration_checkpoint.json'
+
 
 def migrate_google_sheets_to_supabase(dry_run=True):
     """
@@ -19,10 +31,9 @@ def migrate_google_sheets_to_supabase(dry_run=True):
 
     # 1. 載入 Google Sheets 資料
     from modules.google_connection import fetch_google_form_data
-    spreadsheet_url = "https://docs.google.com/spreadsheets/d/1n4kc2d3Z-x9SvIDApPCCz2HSDO0wSrrk9Y5jReMhr-M/edit?usp=sharing"
 
     with st.spinner("正在從 Google Sheets 載入資料..."):
-        df, sheet_titles = fetch_google_form_data(spreadsheet_url=spreadsheet_url)
+        df, sheet_titles = fetch_google_form_data(spreadsheet_url=PEDIATRIC_SPREADSHEET_URL)
 
     if df is None or df.empty:
         st.error("❌ 無法從 Google Sheets 載入資料")
@@ -34,29 +45,14 @@ def migrate_google_sheets_to_supabase(dry_run=True):
     from pages.pediatric.pediatric_analysis import process_pediatric_data
     processed_df = process_pediatric_data(df)
 
-    # 3. 分類記錄
-    technical_records = []
-    meeting_records = []
-    epa_records = []
-    skipped = 0
-
-    for _, row in processed_df.iterrows():
-        eval_item = str(row.get('評核項目', '')).strip()
-
-        if eval_item == '操作技術':
-            technical_records.append(_to_technical(row))
-        elif eval_item == '會議報告':
-            meeting_records.append(_to_meeting(row))
-        elif 'EPA' in eval_item:
-            epa_records.append(_to_epa(row))
-        else:
-            skipped += 1
+    # 3. 分類並整欄轉換
+    frames, skipped = build_pediatric_frames(processed_df)
 
     st.markdown(f"""
     **分類結果：**
-    - 操作技術：**{len(technical_records)}** 筆
-    - 會議報告：**{len(meeting_records)}** 筆
-    - EPA：**{len(epa_records)}** 筆
+    - 操作技術：**{len(frames['technical_skill'])}** 筆
+    - 會議報告：**{len(frames['meeting_report'])}** 筆
+    - EPA：**{len(frames['epa'])}** 筆
     - 跳過（無法分類）：{skipped} 筆
     """)
 
@@ -64,47 +60,54 @@ def migrate_google_sheets_to_supabase(dry_run=True):
     if dry_run:
         st.warning("⚠️ **DRY RUN 模式** — 不會實際寫入資料")
 
-        if technical_records:
-            with st.expander(f"預覽操作技術（前 5 筆 / 共 {len(technical_records)} 筆）"):
-                st.json(technical_records[:5])
-        if meeting_records:
-            with st.expander(f"預覽會議報告（前 5 筆 / 共 {len(meeting_records)} 筆）"):
-                st.json(meeting_records[:5])
-        if epa_records:
-            with st.expander(f"預覽 EPA（前 5 筆 / 共 {len(epa_records)} 筆）"):
-                st.json(epa_records[:5])
+        for kind, frame in frames.items():
+            if len(frame):
+                label = PEDIATRIC_RECORD_FIELDS[kind][0]
+                with st.expander(f"預覽{label}（前 5 筆 / 共 {len(frame)} 筆）"):
+                    st.json(fill_default_dates(frame.head(5)).to_dict('records'))
         return
 
-    # 5. 正式遷移
-    from modules.supabase_connection import SupabaseConnection
-    conn = SupabaseConnection()
+    # 5. 正式遷移（分批寫入；中斷或失敗後再執行一次會從上次成功的位置續傳）
+    from modules.supabase_connection import get_shared_connection
+    conn = get_shared_connection()
+    committed, mismatched = resume_offsets(frames, load_migration_checkpoint())
+    if mismatched:
+        labels = '、'.join(PEDIATRIC_RECORD_FIELDS[kind][0] for kind in mismatched)
+        st.error(f"❌ 上次未完成的遷移與目前試算表資料不符（{labels}）：無法對應已寫入的資料，"
+                 "為避免重複寫入已停止。請確認資料庫內容後清除續傳點再重新遷移。")
+        if st.button("清除續傳點", key="clear_migration_checkpoint"):
+            clear_migration_checkpoint()
+            st.rerun()
+        return
+    if any(committed.values()):
+        st.info(f"ℹ️ 從上次中斷處續傳（已寫入 {sum(committed.values())} 筆）")
+
     total_inserted = 0
     errors = []
+    progress_bar = st.progress(0.0)
+    save_migration_checkpoint(frames, committed)
+    for kind, frame in frames.items():
+        if not len(frame):
+            continue
+        label = PEDIATRIC_RECORD_FIELDS[kind][0]
+
+        def _progress(done, total, kind=kind, label=label):
+            # 每批寫入後更新續傳點，行程中斷也只需重送最後一批之後的資料
+            committed[kind] = done
+            save_migration_checkpoint(frames, committed)
+            progress_bar.progress(done / total, text=f"{label}：已寫入 {done}/{total} 筆")
+
+        result = insert_pediatric_chunks(conn, frame, start=committed.get(kind, 0), progress=_progress)
+        committed[kind] = result['committed']
+        total_inserted += result['inserted']
+        if result['error']:
+            errors.append(f"{label}：{result['error']}，尚有 {result['total'] - result['committed']} 筆未寫入")
+        st.success(f"✅ {label}：{result['committed']}/{result['total']} 筆")
 
-    with st.spinner("正在寫入 Supabase..."):
-        # 操作技術
-        if technical_records:
-            count = conn.insert_pediatric_evaluations_batch(technical_records)
-            total_inserted += count
-            if count < len(technical_records):
-                errors.append(f"操作技術：預期 {len(technical_records)} 筆，實際 {count} 筆")
-            st.success(f"✅ 操作技術：{count} 筆")
-
-        # 會議報告
-        if meeting_records:
-            count = conn.insert_pediatric_evaluations_batch(meeting_records)
-            total_inserted += count
-            if count < len(meeting_records):
-                errors.append(f"會議報告：預期 {len(meeting_records)} 筆，實際 {count} 筆")
-            st.success(f"✅ 會議報告：{count} 筆")
-
-        # EPA
-        if epa_records:
-            count = conn.insert_pediatric_evaluations_batch(epa_records)
-            total_inserted += count
-            if count < len(epa_records):
-                errors.append(f"EPA：預期 {len(epa_records)} 筆，實際 {count} 筆")
-            st.success(f"✅ EPA：{count} 筆")
+    if errors:
+        save_migration_checkpoint(frames, committed)
+    else:
+        clear_migration_checkpoint()
 
     # 6. 記錄 log
     status = 'success' if not errors else 'partial'
@@ -113,11 +116,11 @@ def migrate_google_sheets_to_supabase(dry_run=True):
         migration_type='initial',
         status=status,
         migrated_by=st.session_state.get('username', 'system'),
-        error_details={'errors': errors} if errors else None
+        error_details={'errors': errors, 'committed': committed} if errors else None
     )
 
     if errors:
-        st.warning(f"⚠️ 部分遷移失敗：{'; '.join(errors)}")
+        st.warning(f"⚠️ 部分遷移失敗：{'; '.join(errors)}。再執行一次會從失敗的批次續傳。")
     else:
         st.success(f"🎉 遷移完成！共寫入 {total_inserted} 筆資料")
         st.balloons()
@@ -137,127 +140,274 @@ def migrate_test_data_to_supabase():
     from pages.pediatric.pediatric_analysis import process_pediatric_data
     processed_df = process_pediatric_data(df)
 
-    records = []
-    for _, row in processed_df.iterrows():
-        eval_item = str(row.get('評核項目', '')).strip()
-        if eval_item == '操作技術':
-            records.append(_to_technical(row))
-        elif eval_item == '會議報告':
-            records.append(_to_meeting(row))
-        elif 'EPA' in eval_item:
-            records.append(_to_epa(row))
-
-    if not records:
+    frames, _ = build_pediatric_frames(processed_df)
+    total = sum(len(frame) for frame in frames.values())
+
+    if not total:
         st.warning("無可遷移的記錄")
         return
 
-    from modules.supabase_connection import SupabaseConnection
-    conn = SupabaseConnection()
+    from modules.supabase_connection import get_shared_connection
+    conn = get_shared_connection()
 
-    with st.spinner(f"正在寫入 {len(records)} 筆測試資料到 Supabase..."):
-        count = conn.insert_pediatric_evaluations_batch(records)
+    count = 0
+    with st.spinner(f"正在寫入 {total} 筆測試資料到 Supabase..."):
+        for frame in frames.values():
+            count += insert_pediatric_chunks(conn, frame)['inserted']
 
     conn.log_pediatric_migration(
         record_count=count,
         migration_type='manual',
-        status='success' if count == len(records) else 'partial',
+        status='success' if count == total else 'partial',
         migrated_by='test_data_migration'
     )
 
-    st.success(f"✅ 已寫入 {count} / {len(records)} 筆測試資料")
+    st.success(f"✅ 已寫入 {count} / {total} 筆測試資料")
+
+
+# ─── 分類與轉換 ───
 
+def classify_pediatric_rows(processed_df):
+    """
+    依「評核項目」判斷每列對應的 evaluation_type
 
-# ─── 轉換函數 ───
+    Returns:
+        pd.Series: 'technical_skill' | 'meeting_report' | 'epa'，無法分類者為 None
+    """
+    if '評核項目' not in processed_df.columns:
+        return pd.Series([None] * len(processed_df), index=processed_df.index, dtype=object)
+    items = processed_df['評核項目'].fillna('').astype(str).str.strip()
+    kinds = pd.Series(None, index=processed_df.index, dtype=object)
+    kinds[items.str.contains('EPA', regex=False)] = 'epa'
+    kinds[items == '會議報告'] = 'meeting_report'
+    kinds[items == '操作技術'] = 'technical_skill'
+    return kinds
+
+
+# 各評核類型的寫入欄位：(Supabase 欄位, 來源欄位, 型別)
+_COMMON_FIELDS = [
+    ('evaluator_teacher', '評核教師', 'str'),
+    ('evaluation_date', '評核日期', 'date'),
+    ('evaluated_resident', '受評核人員', 'str'),
+    ('resident_level', '評核時級職', 'str'),
+]
+PEDIATRIC_RECORD_FIELDS = {
+    'technical_skill': ('操作技術', [
+        ('patient_id', '病歷號', 'str'),
+        ('technical_skill_item', '評核技術項目', 'str'),
+        ('sedation_medication', '鎮靜藥物', 'str'),
+        ('reliability_level', '可信賴程度_數值', 'float'),
+        ('technical_feedback', '操作技術教師回饋', 'str'),
+        ('proficiency_level', '熟練程度_數值', 'int'),
+    ]),
+    'meeting_report': ('會議報告', [
+        ('meeting_name', '會議名稱', 'str'),
+        ('content_sufficient', '內容是否充分_數值', 'int'),
+        ('data_analysis_ability', '辯證資料的能力_數值', 'int'),
+        ('presentation_clarity', '口條、呈現方式是否清晰_數值', 'int'),
+        ('innovative_ideas', '是否具開創、建設性的想法_數值', 'int'),
+        ('logical_response', '回答提問是否具邏輯、有條有理_數值', 'int'),
+        ('meeting_feedback', '會議報告教師回饋', 'str'),
+    ]),
+    'epa': ('EPA', [
+        ('epa_item', 'EPA項目', 'str'),
+        ('epa_reliability_level', 'EPA可信賴程度_數值', 'float'),
+        ('epa_qualitative_feedback', 'EPA質性回饋', 'str'),
+    ]),
+}
+# 必填的文字欄位缺值時的預設值
+_FIELD_DEFAULTS = {'evaluator_teacher': '未知', 'evaluated_resident': '未知'}
+
+# 分批寫入的每批筆數
+MIGRATION_CHUNK_SIZE = 500
+
+
+def _str_column(values):
+    """整欄轉為去除前後空白的字串，缺值與空字串為 None"""
+    text = values.astype(str).str.strip()
+    return text.where(values.notna() & (text != ''), None).astype(object)
+
+
+def _float_column(values):
+    """整欄轉為 float，無法轉換為 None"""
+    numeric = pd.to_numeric(values, errors='coerce')
+    return numeric.astype(object).where(numeric.notna(), None)
+
+
+def _int_column(values):
+    """整欄轉為 int（小數捨去），無法轉換為 None"""
+    numeric = np.trunc(pd.to_numeric(values, errors='coerce').replace([np.inf, -np.inf], np.nan))
+    return numeric.astype('Int64').astype(object).where(numeric.notna(), None)
+
+
+def _date_column(values):
+    """整欄轉為 YYYY-MM-DD，缺值或無法解析為 None（寫入前由 fill_default_dates 補今天）"""
+    dates = pd.to_datetime(values, errors='coerce')
+    return dates.dt.strftime('%Y-%m-%d').where(dates.notna(), None).astype(object)
+
+
+_CASTS = {'str': _str_column, 'float': _float_column, 'int': _int_column, 'date': _date_column}
+
+
+def build_pediatric_frame(processed_df, kind):
+    """
+    將同一評核類型的資料整欄轉換為 pediatric_evaluations 寫入格式
 
-def _safe_str(val):
-    """安全轉換為字串，None/NaN 回傳 None"""
-    if val is None or (isinstance(val, float) and pd.isna(val)):
-        return None
-    return str(val).strip() or None
+    Args:
+        processed_df (pd.DataFrame): 只含此類型的處理後資料
+        kind (str): PEDIATRIC_RECORD_FIELDS 的鍵
 
+    Returns:
+        pd.DataFrame: 欄位即寫入欄位（object 型別，缺值為 None），index 與輸入相同
+    """
+    evaluation_item, fields = PEDIATRIC_RECORD_FIELDS[kind]
+    index = processed_df.index
+    missing = pd.Series(None, index=index, dtype=object)
+    columns = {'evaluation_type': kind}
+    for i, (target, source, cast) in enumerate(_COMMON_FIELDS + fields):
+        if i == len(_COMMON_FIELDS):
+            columns['evaluation_item'] = evaluation_item
+        values = _CASTS[cast](processed_df[source] if source in processed_df.columns else missing)
+        if target in _FIELD_DEFAULTS:
+            values = values.where(values.notna(), _FIELD_DEFAULTS[target])
+        columns[target] = values
+    columns['submitted_by'] = 'migration'
+    columns['form_version'] = '1.0'
+    return pd.DataFrame(columns, index=index)
+
+
+def fill_default_dates(frame):
+    """
+    缺少評核日期的列以今天代替（寫入前才套用）
 
-def _safe_float(val):
-    """安全轉換為 float，失敗回傳 None"""
-    if val is None:
-        return None
-    try:
-        v = float(val)
-        return v if not pd.isna(v) else None
-    except (ValueError, TypeError):
-        return None
+    build_pediatric_frame 保留缺值，續傳點的內容指紋因此不含執行當天的日期，隔天續傳時指紋不變。
+    """
+    if 'evaluation_date' not in frame.columns:
+        return frame
+    dates = frame['evaluation_date']
+    return frame.assign(evaluation_date=dates.where(dates.notna(), str(datetime.now().date())))
 
 
-def _safe_int(val):
-    """安全轉換為 int，失敗回傳 None"""
-    f = _safe_float(val)
-    return int(f) if f is not None else None
+def build_pediatric_frames(processed_df, kinds=None):
+    """
+    依「評核項目」分類後，各類型整欄轉換
+
+    Args:
+        processed_df (pd.DataFrame): process_pediatric_data 處理後的評核資料
+        kinds (pd.Series, optional): classify_pediatric_rows 的結果，省略時重新分類
 
+    Returns:
+        tuple[dict, int]: ({evaluation_type: DataFrame}, 無法分類的筆數)
+    """
+    if kinds is None:
+        kinds = classify_pediatric_rows(processed_df)
+    frames = {kind: build_pediatric_frame(processed_df[kinds == kind], kind) for kind in PEDIATRIC_RECORD_FIELDS}
+    return frames, int(kinds.isna().sum())
+
+
+def build_pediatric_records(processed_df, kinds=None):
+    """
+    將 process_pediatric_data 處理後的資料轉為 pediatric_evaluations 寫入格式（不含 UI）
 
-def _safe_date(val):
-    """安全轉換為日期字串 YYYY-MM-DD"""
-    if val is None:
-        return str(datetime.now().date())
+    Returns:
+        tuple[dict, int]: ({evaluation_type: [記錄]}, 無法分類的筆數)
+    """
+    frames, skipped = build_pediatric_frames(processed_df, kinds)
+    return {kind: fill_default_dates(frame).to_dict('records') for kind, frame in frames.items()}, skipped
+
+
+def frame_fingerprint(frame):
+    """寫入資料的內容指紋（欄位名稱與各列內容，依列順序）"""
+    h = hashlib.sha1('|'.join(map(str, frame.columns)).encode('utf-8'))
+    if len(frame):
+        h.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _checkpoint_path(path=None):
+    return path or os.path.join(DEFAULT_CACHE_DIR, MIGRATION_CHECKPOINT_FILENAME)
+
+
+def load_migration_checkpoint(path=None):
+    """
+    讀取續傳點
+
+    Returns:
+        dict: {evaluation_type: {'committed': 已寫入筆數, 'prefix': 已寫入部分的 frame_fingerprint}}；
+              沒有未完成的遷移時為空 dict
+    """
+    return load_json_file(_checkpoint_path(path)).get('kinds', {})
+
+
+def save_migration_checkpoint(frames, committed, path=None):
+    """記錄各類型已寫入筆數，並以已寫入部分的內容指紋確認下次續傳時資料未變"""
+    kinds = {kind: {'committed': int(committed.get(kind, 0)),
+                    'prefix': frame_fingerprint(frame.iloc[:committed.get(kind, 0)])}
+             for kind, frame in frames.items()}
+    save_json_file({'kinds': kinds, 'updated_at': datetime.now().isoformat()}, _checkpoint_path(path))
+
+
+def clear_migration_checkpoint(path=None):
+    """遷移完成後移除續傳點"""
     try:
-        if hasattr(val, 'isoformat'):
-            return val.isoformat()
-        return str(pd.to_datetime(val).date())
-    except Exception:
-        return str(datetime.now().date())
-
-
-def _to_technical(row):
-    """DataFrame 行 → 操作技術 Supabase 記錄"""
-    return {
-        'evaluation_type': 'technical_skill',
-        'evaluator_teacher': _safe_str(row.get('評核教師')) or '未知',
-        'evaluation_date': _safe_date(row.get('評核日期')),
-        'evaluated_resident': _safe_str(row.get('受評核人員')) or '未知',
-        'resident_level': _safe_str(row.get('評核時級職')),
-        'evaluation_item': '操作技術',
-        'patient_id': _safe_str(row.get('病歷號')),
-        'technical_skill_item': _safe_str(row.get('評核技術項目')),
-        'sedation_medication': _safe_str(row.get('鎮靜藥物')),
-        'reliability_level': _safe_float(row.get('可信賴程度_數值')),
-        'technical_feedback': _safe_str(row.get('操作技術教師回饋')),
-        'proficiency_level': _safe_int(row.get('熟練程度_數值')),
-        'submitted_by': 'migration',
-        'form_version': '1.0',
-    }
-
-
-def _to_meeting(row):
-    """DataFrame 行 → 會議報告 Supabase 記錄"""
-    return {
-        'evaluation_type': 'meeting_report',
-        'evaluator_teacher': _safe_str(row.get('評核教師')) or '未知',
-        'evaluation_date': _safe_date(row.get('評核日期')),
-        'evaluated_resident': _safe_str(row.get('受評核人員')) or '未知',
-        'resident_level': _safe_str(row.get('評核時級職')),
-        'evaluation_item': '會議報告',
-        'meeting_name': _safe_str(row.get('會議名稱')),
-        'content_sufficient': _safe_int(row.get('內容是否充分_數值')),
-        'data_analysis_ability': _safe_int(row.get('辯證資料的能力_數值')),
-        'presentation_clarity': _safe_int(row.get('口條、呈現方式是否清晰_數值')),
-        'innovative_ideas': _safe_int(row.get('是否具開創、建設性的想法_數值')),
-        'logical_response': _safe_int(row.get('回答提問是否具邏輯、有條有理_數值')),
-        'meeting_feedback': _safe_str(row.get('會議報告教師回饋')),
-        'submitted_by': 'migration',
-        'form_version': '1.0',
-    }
-
-
-def _to_epa(row):
-    """DataFrame 行 → EPA Supabase 記錄"""
-    return {
-        'evaluation_type': 'epa',
-        'evaluator_teacher': _safe_str(row.get('評核教師')) or '未知',
-        'evaluation_date': _safe_date(row.get('評核日期')),
-        'evaluated_resident': _safe_str(row.get('受評核人員')) or '未知',
-        'resident_level': _safe_str(row.get('評核時級職')),
-        'evaluation_item': 'EPA',
-        'epa_item': _safe_str(row.get('EPA項目')),
-        'epa_reliability_level': _safe_float(row.get('EPA可信賴程度_數值')),
-        'epa_qualitative_feedback': _safe_str(row.get('EPA質性回饋')),
-        'submitted_by': 'migration',
-        'form_version': '1.0',
-    }
+        os.remove(_checkpoint_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def resume_offsets(frames, checkpoint):
+    """
+    依續傳點決定各類型從第幾筆開始寫入
+
+    目前資料的前 committed 筆與上次已寫入部分的指紋相同才續傳（試算表只在尾端新增資料時仍可續傳）；
+    不符時無法得知哪些資料已寫入，列為 mismatched 由呼叫端停止，避免重複寫入。
+
+    Returns:
+        tuple[dict, list]: ({evaluation_type: 起始位置}, 指紋不符的類型)
+    """
+    starts, mismatched = {}, []
+    for kind, frame in frames.items():
+        entry = (checkpoint or {}).get(kind)
+        done = int(entry['committed']) if entry else 0
+        if not done:
+            starts[kind] = 0
+        elif done <= len(frame) and frame_fingerprint(frame.iloc[:done]) == entry['prefix']:
+            starts[kind] = done
+        else:
+            mismatched.append(kind)
+    return starts, mismatched
+
+
+def insert_pediatric_chunks(conn, frame, chunk_size=MIGRATION_CHUNK_SIZE, start=0, progress=None, **options):
+    """
+    分批寫入 pediatric_evaluations，可從上次成功的位置續傳
+
+    以 SupabaseConnection.bulk_write 依序寫入（insert 不冪等，需要連續前綴才能續傳）：
+    暫時性錯誤會以指數退避重試，某批最終失敗即停止，回傳的 committed 即下次的 start。
+
+    Args:
+        conn: SupabaseConnection
+        frame (pd.DataFrame): build_pediatric_frame 的結果
+        start (int): 從第幾筆開始（續傳用）
+        progress (callable, optional): progress(已寫入位置, 總筆數)
+        **options: 傳給 bulk_write（max_retries、backoff、sleep）
+
+    Returns:
+        dict: {'inserted', 'failed', 'committed', 'total', 'retries', 'error'}；
+              failed 為失敗那一批的筆數，error 為其說明（全部成功時為 None）
+    """
+    total = len(frame)
+    report = None
+    if progress is not None:
+        report = lambda done, _: progress(start + done, total)
+    written = conn.insert_pediatric_evaluations_bulk(
+        fill_default_dates(frame.iloc[start:]), chunk_size=chunk_size, max_in_flight=1, stop_on_error=True,
+        progress=report, **options
+    )
+    error = None
+    if written.errors:
+        first, last = written.errors[0]['rows']
+        error = (f"第 {start + first + 1}–{start + last + 1} 筆寫入失敗"
+                 f"（嘗試 {written.errors[0]['attempts']} 次）：{written.errors[0]['error']}")
+    return {'inserted': written.written, 'failed': written.failed, 'committed': start + written.committed,
+            'total': total, 'retries': written.retries, 'error': error}
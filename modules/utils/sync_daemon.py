@@ -0,0 +1,347 @@
+"""
+Google Sheets → Supabase 排程同步（不需啟動 Streamlit）
+
+每個同步工作（job）讀取一份表單回應試算表，只寫入水位線（上次成功同步的最大時間戳記）之後的資料：
+- ugy：UGY EPA 評核 → epa_evaluations（data_sync.sync_epa_evaluations，upsert 冪等，
+  水位線之後含同一秒的資料重送也不會重複；--full 可忽略水位線重新比對全部資料）
+- pediatric：小兒部評核 → pediatric_evaluations（insert，依評核類型各自保存水位線並分批寫入，
+  寫入失敗時水位線停在最後成功的批次，下次從失敗的批次續傳）
+
+水位線與每次執行結果存在 DEFAULT_CACHE_DIR/sync_state.json；同一時間只允許一個同步執行，
+以 sync_daemon.lock（內含行程 PID）避免排程與手動執行重疊。每個工作結束時輸出一行 JSON log：
+    {"event": "sync_job", "job": "ugy", "status": "success", "rows_fetched": 1200, "inserted": 3, ...}
+讀取試算表失敗（缺少憑證、授權或 API 錯誤）時該工作記錄為 {"status": "failed", "error": 原因}。
+
+使用方式：
+    python scripts/sync_daemon.py --once
+    python scripts/sync_daemon.py --interval 3600 --jobs ugy,pediatric
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from modules.local_cache import DEFAULT_CACHE_DIR, load_json_file, save_json_file
+
+STATE_FILENAME = 'sync_state.json'
+LOCK_FILENAME = 'sync_daemon.lock'
+DEFAULT_INTERVAL_SECONDS = 3600
+SYNC_JOBS = ('ugy', 'pediatric')
+
+logger = logging.getLogger('cbme.sync')
+
+
+class SyncLockBusy(RuntimeError):
+    """另一個同步正在執行"""
+
+    def __init__(self, pid):
+        super().__init__(f"同步正在由行程 {pid} 執行")
+        self.pid = pid
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SyncLock:
+    """
+    以鎖定檔避免同步重疊執行
+
+    鎖定檔內容為持有者 PID；持有者已結束（例如被強制終止）時視為過期並接手。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, LOCK_FILENAME)
+
+    def _holder(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                pid = self._holder()
+                if pid and _pid_alive(pid):
+                    raise SyncLockBusy(pid)
+                # 過期的鎖定檔：移除後重試一次
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(str(os.getpid()))
+            return self
+        raise SyncLockBusy(self._holder())
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return False
+
+
+def load_sync_state(path=None):
+    """讀取同步狀態（水位線與上次執行結果），檔案不存在或損毀時回傳空 dict"""
+    return load_json_file(path or os.path.join(DEFAULT_CACHE_DIR, STATE_FILENAME))
+
+
+def save_sync_state(state, path=None):
+    """寫入同步狀態（先寫暫存檔再取代，中途中斷不會留下半個檔案）"""
+    save_json_file(state, path or os.path.join(DEFAULT_CACHE_DIR, STATE_FILENAME))
+
+
+def log_event(event, **fields):
+    """輸出一行 JSON 結構化 log"""
+    logger.info(json.dumps(dict(event=event, ts=datetime.now().isoformat(timespec='seconds'), **fields),
+                           ensure_ascii=False, default=str))
+
+
+def _default_fetch(spreadsheet_url=None, incremental=True):
+    # 不經由 st.*：憑證或 API 錯誤拋出 GoogleSheetsError，該工作記錄為 failed
+    from modules.google_connection import read_google_form_data
+    return read_google_form_data(spreadsheet_url=spreadsheet_url, incremental=incremental)
+
+
+def run_ugy_job(conn, state, fetch=None, full=False):
+    """
+    UGY EPA 評核同步
+
+    Args:
+        conn: SupabaseConnection
+        state (dict): 上次的工作狀態（{'watermark': ISO 時間}）
+        fetch (callable, optional): fetch(spreadsheet_url=None, incremental=True) -> (df, titles)
+        full (bool): 忽略水位線，重新比對全部資料
+
+    Returns:
+        tuple[dict, dict]: (執行結果, 新的工作狀態)
+    """
+    from modules.utils.data_sync import parse_form_timestamps, sync_epa_evaluations
+
+    df, _ = (fetch or _default_fetch)(incremental=True)
+    if df is None or df.empty:
+        return {'status': 'no_data', 'rows_fetched': 0}, state
+
+    timestamps = parse_form_timestamps(df['時間戳記'])
+    watermark = None if full else state.get('watermark')
+    subset = df
+    if watermark:
+        # 含水位線同一秒：upsert 冪等，重送不會產生重複列
+        subset = df[timestamps.isna() | (timestamps >= pd.Timestamp(watermark))]
+
+    stats = sync_epa_evaluations(conn, subset)
+    result = {
+        'status': 'partial' if stats['failed'] else 'success',
+        'rows_fetched': len(df),
+        'rows_considered': len(subset),
+        'inserted': stats['inserted'],
+        'updated': stats['updated'],
+        'skipped': stats['skipped'],
+        'failed': stats['failed'],
+    }
+    new_state = dict(state)
+    if not stats['failed'] and timestamps.notna().any():
+        new_state['watermark'] = timestamps.max().isoformat()
+    result['watermark'] = new_state.get('watermark')
+    return result, new_state
+
+
+# 表單時間戳記為台灣時間（不含時區），與資料庫的 created_at（TIMESTAMPTZ）比較前先換算
+FORM_TIMEZONE = timezone(timedelta(hours=8))
+
+
+def _migrated_watermarks(conn, kinds):
+    """
+    各評核類型最近一筆遷移工具匯入資料的建立時間（換算為表單時間戳記的當地時間）
+
+    遷移工具先讀取試算表再寫入，因此寫入時間之前送出的表單回應都已匯入；
+    讀取與寫入之間（通常數秒內）送出的回應不在此保證範圍內。
+
+    Returns:
+        dict: {evaluation_type: ISO 時間}，沒有匯入資料的類型不在結果中
+    """
+    watermarks = {}
+    for kind in kinds:
+        result = conn.client.table('pediatric_evaluations').select('created_at') \
+            .eq('submitted_by', 'migration').eq('evaluation_type', kind) \
+            .order('created_at', desc=True).limit(1).execute()
+        if not result.data or not result.data[0].get('created_at'):
+            continue
+        created = pd.Timestamp(result.data[0]['created_at'])
+        if created.tzinfo is not None:
+            created = created.tz_convert(FORM_TIMEZONE).tz_localize(None)
+        watermarks[kind] = created.isoformat()
+    return watermarks
+
+
+def run_pediatric_job(conn, state, fetch=None, full=False):
+    """
+    小兒部評核同步（insert，依評核類型各自的水位線只寫入新資料）
+
+    尚無水位線時（bootstrap）：pediatric_evaluations 已有遷移工具匯入的資料的類型，以最近一筆匯入資料的
+    建立時間為水位線，只寫入之後送出的表單回應；沒有匯入資料的類型全部寫入。
+    full 對此工作無效（insert 不冪等）。
+
+    Returns:
+        tuple[dict, dict]: (執行結果, 新的工作狀態)
+    """
+    from modules.utils.data_sync import parse_form_timestamps
+    from modules.utils.pediatric_migration import (
+        MIGRATION_CHUNK_SIZE,
+        PEDIATRIC_RECORD_FIELDS,
+        PEDIATRIC_SPREADSHEET_URL,
+        build_pediatric_frame,
+        classify_pediatric_rows,
+        insert_pediatric_chunks,
+    )
+    from modules.pediatric_processing import process_pediatric_data
+
+    df, _ = (fetch or _default_fetch)(spreadsheet_url=PEDIATRIC_SPREADSHEET_URL, incremental=True)
+    if df is None or df.empty:
+        return {'status': 'no_data', 'rows_fetched': 0}, state
+
+    processed = process_pediatric_data(df)
+    timestamps = parse_form_timestamps(processed['時間戳記'])
+    kinds = classify_pediatric_rows(processed)
+    watermarks = dict(state.get('watermarks') or {})
+    result = {'rows_fetched': len(df), 'rows_considered': 0, 'inserted': 0, 'updated': 0,
+              'skipped': int((timestamps.isna() | kinds.isna()).sum()), 'failed': 0}
+
+    if not watermarks:
+        watermarks = _migrated_watermarks(conn, PEDIATRIC_RECORD_FIELDS)
+        if watermarks:
+            result['bootstrap'] = dict(watermarks)
+
+    # 每類型依時間戳記排序後分批寫入，水位線推進到最後一批成功寫入的資料；
+    # 水位線那一秒若還有未寫入的資料，另記已寫入筆數（watermark_ties），下次從其後續傳
+    ties = dict(state.get('watermark_ties') or {})
+    for kind in kinds.dropna().unique():
+        ts = timestamps[(kinds == kind) & timestamps.notna()].sort_values(kind='stable')
+        previous = pd.Timestamp(watermarks[kind]) if kind in watermarks else None
+        if previous is not None:
+            keep = ts > previous
+            if kind in ties:
+                at_previous = ts == previous
+                keep |= at_previous & (at_previous.cumsum() > ties[kind])
+            ts = ts[keep]
+        if ts.empty:
+            continue
+        written = insert_pediatric_chunks(conn, build_pediatric_frame(processed.loc[ts.index], kind),
+                                          chunk_size=MIGRATION_CHUNK_SIZE)
+        result['rows_considered'] += len(ts)
+        result['inserted'] += written['inserted']
+        result['failed'] += written['total'] - written['committed']
+        if written['error']:
+            result.setdefault('errors', []).append(f"{kind}：{written['error']}")
+        committed = written['committed']
+        if not committed:
+            continue
+        last = ts.iloc[committed - 1]
+        if committed < len(ts) and ts.iloc[committed] == last:
+            carried = ties.get(kind, 0) if last == previous else 0
+            ties[kind] = carried + int((ts.iloc[:committed] == last).sum())
+        else:
+            ties.pop(kind, None)
+        watermarks[kind] = last.isoformat()
+
+    result['status'] = 'partial' if result['failed'] else 'success'
+    if result['inserted'] or result['failed']:
+        conn.log_pediatric_migration(
+            record_count=result['inserted'],
+            migration_type='incremental',
+            status=result['status'],
+            migrated_by='sync_daemon',
+            error_details={'errors': result['errors']} if result['failed'] else None
+        )
+    new_state = dict(state, watermarks=watermarks, watermark_ties=ties)
+    return dict(result, watermarks=watermarks), new_state
+
+
+JOB_RUNNERS = {
+    'ugy': run_ugy_job,
+    'pediatric': run_pediatric_job,
+}
+
+
+def run_sync_once(conn, jobs=SYNC_JOBS, state_path=None, lock_path=None, full=False, fetch=None):
+    """
+    執行一輪同步（持有鎖定檔期間依序執行各工作，每個工作結束即保存狀態）
+
+    Args:
+        conn: SupabaseConnection
+        jobs (iterable): JOB_RUNNERS 的鍵
+        state_path (str, optional): 同步狀態檔
+        lock_path (str, optional): 鎖定檔
+        full (bool): 忽略水位線（僅 upsert 冪等的工作適用）
+        fetch (callable, optional): 取代 Google Sheets 讀取（測試用）
+
+    Returns:
+        list[dict]: 各工作的執行結果；另一個同步正在執行時回傳空 list
+    """
+    try:
+        with SyncLock(lock_path):
+            return _run_jobs(conn, jobs, state_path, full, fetch)
+    except SyncLockBusy as e:
+        log_event('sync_skipped', reason='locked', pid=e.pid)
+        return []
+
+
+def _run_jobs(conn, jobs, state_path, full, fetch):
+    results = []
+    state = load_sync_state(state_path)
+    for job in jobs:
+        started = time.perf_counter()
+        job_state = state.get(job, {})
+        try:
+            result, job_state = JOB_RUNNERS[job](conn, job_state, fetch=fetch, full=full)
+        except Exception as e:
+            result = {'status': 'failed', 'error': str(e)}
+        result = dict(job=job, **result, duration_s=round(time.perf_counter() - started, 3))
+        state[job] = dict(job_state, last_run=dict(result, finished_at=datetime.now().isoformat()))
+        save_sync_state(state, state_path)
+        log_event('sync_job', **result)
+        results.append(result)
+    return results
+
+
+def run_daemon(conn_factory, interval=DEFAULT_INTERVAL_SECONDS, jobs=SYNC_JOBS, state_path=None,
+               lock_path=None, full=False, max_runs=None, sleep=time.sleep):
+    """
+    每 interval 秒執行一輪同步（從每輪開始起算，執行時間不累加到間隔上）
+
+    Args:
+        conn_factory (callable): 回傳 SupabaseConnection（例如 get_shared_connection，每輪沿用同一個連線，
+                                 不會每輪另開 HTTP 連線池）；建立失敗時該輪記錄錯誤後略過
+        max_runs (int, optional): 執行幾輪後結束（預設持續執行）
+        full (bool): 只套用在第一輪
+    """
+    runs = 0
+    while max_runs is None or runs < max_runs:
+        started = time.monotonic()
+        try:
+            conn = conn_factory()
+        except Exception as e:
+            log_event('sync_skipped', reason='connection', error=str(e))
+        else:
+            run_sync_once(conn, jobs, state_path, lock_path, full=full and runs == 0)
+        runs += 1
+        if max_runs is not None and runs >= max_runs:
+            break
+        sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -31,7 +31,7 @@ from modules.auth import (
     USER_ROLES, filter_data_by_permission,
     get_user_department,
 )
-from modules.supabase_connection import SupabaseConnection
+from modules.supabase_connection import get_shared_connection
 from modules.evaluation_forms import show_evaluation_form
 import plotly.express as px
 import plotly.graph_objects as go
@@ -53,17 +53,10 @@ for _secret_key in ['OPENAI_API_KEY', 'SUPABASE_URL', 'SUPABASE_KEY']:
         except (KeyError, FileNotFoundError):
             pass
 
-# Supabase 連線實例（全域變數，避免重複建立）
-_supabase_conn = None
-
 def get_supabase_connection():
-    """獲取 Supabase 連線實例"""
-    global _supabase_conn
-    if _supabase_conn is not None:
-        return _supabase_conn
+    """獲取行程共用的 Supabase 連線實例"""
     try:
-        _supabase_conn = SupabaseConnection()
-        return _supabase_conn
+        return get_shared_connection()
     except Exception as e:
         st.error("無法連線 Supabase，請檢查網路連線或聯繫管理員")
         return None
@@ -9,7 +9,7 @@ import pandas as pd
 from datetime import datetime
 
 from modules.auth import (
-    create_user, hash_password, USER_ROLES, update_user_role, deactivate_user,
+    create_user, create_users, hash_password, USER_ROLES, update_user_role, deactivate_user,
 )
 
 # 科部選項（與 new_dashboard.py 一致）
@@ -30,9 +30,9 @@ CREATABLE_ROLES = {
 
 
 def _get_supabase_conn():
-    """取得 Supabase 連線實例"""
-    from modules.supabase_connection import SupabaseConnection
-    return SupabaseConnection()
+    """取得行程共用的 Supabase 連線實例"""
+    from modules.supabase_connection import get_shared_connection
+    return get_shared_connection()
 
 
 def show_account_management():
@@ -193,19 +193,17 @@ def _validate_csv(df):
 
 
 def _execute_csv_import(df):
-    """執行 CSV 批次匯入（寫入 Supabase）"""
+    """執行 CSV 批次匯入（寫入 Supabase，一次查詢既有帳號後分批新增）"""
     success_count = 0
     fail_count = 0
     fail_details = []
 
     progress = st.progress(0)
     status = st.empty()
-    total = len(df)
 
-    for idx, row in df.iterrows():
-        progress.progress((idx + 1) / total)
+    users = []
+    for _, row in df.iterrows():
         username = row['帳號'].strip()
-        status.text(f"匯入中：{username}（{idx + 1}/{total}）")
 
         if not username or not row['密碼'].strip() or not row['姓名'].strip():
             fail_count += 1
@@ -218,20 +216,27 @@ def _execute_csv_import(df):
             fail_details.append(f"{username}：角色無效")
             continue
 
-        success, msg = create_user(
+        users.append(dict(
             username=username,
             password=row['密碼'].strip(),
             role=role,
             name=row['姓名'].strip(),
             department=row['科部'].strip(),
             email=row.get('email', '').strip() or None,
-        )
+        ))
 
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
-            fail_details.append(f"{username}：{msg}")
+    def _progress(done, total):
+        progress.progress(done / total)
+        status.text(f"匯入中（{done}/{total}）")
+
+    if users:
+        status.text(f"匯入中（0/{len(users)}）")
+        for username, success, msg in create_users(users, progress=_progress):
+            if success:
+                success_count += 1
+            else:
+                fail_count += 1
+                fail_details.append(f"{username}：{msg}")
 
     progress.progress(1.0)
     status.empty()
@@ -253,7 +258,7 @@ def _show_account_list():
     try:
         conn = _get_supabase_conn()
         # 包含停用帳號
-        all_users = conn.fetch_all_users(active_only=False)
+        all_users = conn.fetch_all_users(active_only=False, columns='directory')
     except Exception as e:
         st.error(f"讀取使用者列表失敗：{str(e)}")
         return
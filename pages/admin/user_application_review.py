@@ -1,19 +1,12 @@
 import streamlit as st
-from modules.supabase_connection import SupabaseConnection
+from modules.supabase_connection import get_shared_connection
 import pandas as pd
 from datetime import datetime
 
-# 全域 Supabase 連線實例
-_supabase_conn = None
-
 def get_supabase_connection():
-    """獲取 Supabase 連線實例"""
-    global _supabase_conn
-    if _supabase_conn is not None:
-        return _supabase_conn
+    """獲取行程共用的 Supabase 連線實例"""
     try:
-        _supabase_conn = SupabaseConnection()
-        return _supabase_conn
+        return get_shared_connection()
     except Exception as e:
         st.error(f"無法連線 Supabase：{str(e)}")
         return None
@@ -1,30 +1,58 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, date
+from functools import lru_cache
+import hashlib
+import json
+from modules.ccc_snapshots import get_snapshot_store
+from modules import pediatric_processing
+from modules.pediatric_processing import (
+    PEDIATRIC_EPA_ITEMS,
+    _convert_by_uniques,
+    _normalize_paren,
+    _parse_timestamp_dates,
+    _resolve_epa_item,
+    convert_proficiency_to_numeric,
+    convert_reliability_to_numeric,
+    convert_score_to_numeric,
+    derive_proficiency_from_reliability,
+)
+from modules.dataset_cache import get_dataset_cache, bump_dataset_version
+from modules.research_summary import RESEARCH_STAGES, get_research_summary
 from modules.google_connection import fetch_google_form_data, setup_google_connection
 import gspread
 from google.oauth2.service_account import Credentials
 import re
 
 # ─── Supabase 整合（可選，無 .env 設定時自動回退到 Google Sheets）───
-_supabase_conn = None
-
 def _get_supabase_conn():
-    """取得全域 Supabase 連線（懶載入，失敗回傳 None）"""
-    global _supabase_conn
-    if _supabase_conn is not None:
-        return _supabase_conn
+    """取得行程共用的 Supabase 連線（懶載入，失敗回傳 None）"""
     try:
-        from modules.supabase_connection import SupabaseConnection
-        _supabase_conn = SupabaseConnection()
-        return _supabase_conn
+        from modules.supabase_connection import get_shared_connection
+        return get_shared_connection()
     except Exception:
         return None
 
 
+def _get_data_reader():
+    """
+    取得儀表板讀取用的資料來源：優先使用本機鏡像（增量同步），
+    無法建立鏡像時回退為 Supabase 連線；兩者的 fetch_* 讀取方法介面相同。
+    """
+    try:
+        from modules.supabase_mirror import get_shared_mirror
+        mirror = get_shared_mirror()
+        if mirror is not None:
+            return mirror
+    except Exception:
+        pass
+    return _get_supabase_conn()
+
+
 def load_threshold_settings():
     """已棄用：門檻改為依年級分級（LEVEL_THRESHOLDS），保留函式以向後相容。"""
     return LEVEL_THRESHOLDS
@@ -56,6 +84,31 @@ PEDIATRIC_FORM_FIELDS = {
     'EPA質性回饋': 'epa_qualitative_feedback',
 }
 
+# Supabase 欄位名 → 中文欄位（與 Google Sheets 格式一致），供 _load_from_supabase 使用
+SUPABASE_COLUMN_MAP = {
+    'evaluator_teacher': '評核教師',
+    'evaluation_date': '評核日期',
+    'evaluated_resident': '受評核人員',
+    'resident_level': '評核時級職',
+    'evaluation_item': '評核項目',
+    'meeting_name': '會議名稱',
+    'content_sufficient': '內容是否充分',
+    'data_analysis_ability': '辯證資料的能力',
+    'presentation_clarity': '口條、呈現方式是否清晰',
+    'innovative_ideas': '是否具開創、建設性的想法',
+    'logical_response': '回答提問是否具邏輯、有條有理',
+    'meeting_feedback': '會議報告教師回饋',
+    'patient_id': '病歷號',
+    'technical_skill_item': '評核技術項目',
+    'sedation_medication': '鎮靜藥物',
+    'reliability_level': '可信賴程度',
+    'technical_feedback': '操作技術教師回饋',
+    'proficiency_level': '熟練程度',
+    'epa_item': 'EPA項目',
+    'epa_reliability_level': 'EPA可信賴程度',
+    'epa_qualitative_feedback': 'EPA質性回饋',
+}
+
 # 小兒科住院醫師技能基本要求次數
 PEDIATRIC_SKILL_REQUIREMENTS = {
     '插氣管內管': {'minimum': 3, 'description': '訓練期間最少3次'},
@@ -74,17 +127,21 @@ PEDIATRIC_SKILL_REQUIREMENTS = {
     'NRP': {'minimum': 1, 'description': '訓練期間最少1次（可信賴程度≥2.5）'},
 }
 
-# 兒科 EPA 信賴等級評估項目（表單 Q18）
-PEDIATRIC_EPA_ITEMS = ['門診表現(OPD)', '一般病人照護（WARD）', '緊急處置（ED, DR）', '重症照護（PICU, NICU）', '病歷書寫']
+def _epa_item_keys(df):
+    """
+    各列的標準 EPA 項目名稱
 
-def _normalize_paren(s):
-    """統一全形/半形括號，方便比對 EPA 項目名稱"""
-    return str(s).replace('（', '(').replace('）', ')').replace('︵', '(').replace('︶', ')')
+    優先使用 process_pediatric_data 預先算好的 EPA項目_key 欄位；
+    其他資料框（如 groupby 結果）才即時以 _resolve_epa_item 對應。
 
-def _match_epa_item(series, item):
-    """比對 EPA 項目，容許全形/半形括號差異"""
-    norm_item = _normalize_paren(item)
-    return series.astype(str).apply(lambda x: norm_item in _normalize_paren(x))
+    Returns:
+        pd.Series: 標準項目名稱或 None，index 同 df
+    """
+    if 'EPA項目_key' in df.columns:
+        return df['EPA項目_key']
+    if 'EPA項目' in df.columns:
+        return _convert_by_uniques(df['EPA項目'], _resolve_epa_item)
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
 
 # ─── 技能分組（用於 CCC 總覽和個別分析的分類進度顯示）───
 SKILL_GROUPS = {
@@ -105,21 +162,49 @@ LEVEL_THRESHOLDS = {
     'R3':   {'score_threshold': 3.5, 'skill_pass_rate': 100},
 }
 
+def get_threshold_settings():
+    """
+    目前的門檻設定（年級門檻、技能最低次數、EPA 次數要求）
+
+    門檻定義於程式碼中，行程內不會變動；'hash' 作為 CCC 快照與熱圖快取鍵的一部分，
+    改版調整門檻後舊快取自動失效。
+
+    Returns:
+        dict: {'levels', 'skills', 'total_sessions', 'epa_item_min', 'epa_items', 'hash'}
+    """
+    return dict(_threshold_settings_payload(), hash=_threshold_settings_hash())
+
+def _threshold_settings_payload():
+    return {
+        'levels': LEVEL_THRESHOLDS,
+        'skills': {k: v['minimum'] for k, v in PEDIATRIC_SKILL_REQUIREMENTS.items()},
+        'total_sessions': TOTAL_REQUIRED_SESSIONS,
+        'epa_item_min': EPA_ITEM_MIN,
+        'epa_items': PEDIATRIC_EPA_ITEMS,
+    }
+
 def _get_level_thresholds(level):
     """取得年級對應的門檻，不認識的年級 fallback 到 R1"""
     return LEVEL_THRESHOLDS.get(str(level), LEVEL_THRESHOLDS['R1'])
 
-def _filter_recent_6_months(data):
-    """過濾資料，僅保留近半年（180天）的記錄"""
-    if data.empty or '評核日期' not in data.columns:
-        return data
+def _recent_6_months_mask(data):
+    """近半年（180天）記錄的布林遮罩；無評核日期欄位或解析失敗時回傳 None（不過濾）"""
+    if '評核日期' not in data.columns:
+        return None
     try:
         from datetime import date, timedelta
         cutoff = date.today() - timedelta(days=180)
         dates = pd.to_datetime(data['評核日期'], errors='coerce').dt.date
-        return data[dates >= cutoff].copy()
+        return dates >= cutoff
     except Exception:
+        return None
+
+def _filter_recent_6_months(data):
+    """過濾資料，僅保留近半年（180天）的記錄"""
+    if data.empty:
         return data
+    mask = _recent_6_months_mask(data)
+    return data if mask is None else data[mask].copy()
 
 def show_pediatric_evaluation_section():
     """顯示小兒部住院醫師評核分頁"""
@@ -251,11 +336,19 @@ def load_pediatric_data(department=None):
                 st.error(f"❌ 測試資料檔案不存在：{test_data_path}")
                 return None, None
 
-        # ── Supabase 模式（預設）──
+        # ── Supabase 模式（預設）：跨 session 共用快取，新增評核時自動失效 ──
         else:
-            df, sheet_titles = _load_from_supabase(department=department)
-            if df is None or df.empty:
+            include_demo = st.session_state.get('include_demo_data', True)
+            cached = get_dataset_cache().get_or_load(
+                'pediatric_evaluations',
+                (department, data_source, include_demo),
+                lambda: _load_processed_from_supabase(department),
+            )
+            if cached is None:
                 st.warning("⚠️ Supabase 無資料或連線失敗")
+                st.warning("無法載入小兒部評核資料")
+                return None, None
+            return cached
 
         if df is not None and not df.empty:
             processed_df = process_pediatric_data(df)
@@ -269,6 +362,33 @@ def load_pediatric_data(department=None):
         return None, None
 
 
+def _load_processed_from_supabase(department=None):
+    """從 Supabase 載入並處理資料（load_pediatric_data 的快取 loader），無資料時回傳 None"""
+    df, sheet_titles = _load_from_supabase(department=department)
+    if df is None or df.empty:
+        return None
+    return process_pediatric_data(df), sheet_titles
+
+
+def _reload_pediatric_data():
+    """「重新載入」按鈕：清除本 session 與跨 session 快取，下次讀取時重新同步"""
+    st.session_state.pop('pediatric_data', None)
+    bump_dataset_version('pediatric_evaluations')
+
+
+def _show_cache_metrics():
+    """資料快取命中率（管理員）"""
+    stats = get_dataset_cache().stats()
+    with st.expander("🗄️ 資料快取狀態", expanded=False):
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("命中", stats['hits'])
+        c2.metric("未命中", stats['misses'])
+        c3.metric("命中率", f"{stats['hit_rate']:.0f}%")
+        c4.metric("快取條目", stats['entries'])
+        st.caption(f"過期 {stats['expired']} 次｜評核資料版本 "
+                   f"{stats['versions'].get('pediatric_evaluations', 0)}")
+
+
 def _load_from_google_sheets():
     """從 Google Sheets 載入資料"""
     spreadsheet_url = "https://docs.google.com/spreadsheets/d/1n4kc2d3Z-x9SvIDApPCCz2HSDO0wSrrk9Y5jReMhr-M/edit?usp=sharing"
@@ -281,23 +401,22 @@ def _load_from_google_sheets():
 def _load_from_supabase(department=None):
     """
     從 Supabase 載入資料並轉換為與 Google Sheets 相容的 DataFrame 格式。
+    讀取經由本機鏡像（僅增量同步），無法使用鏡像時直接查詢 Supabase。
     確保後續 process_pediatric_data() 能正常運作。
 
     Args:
         department (str, optional): 科別過濾
     """
-    conn = _get_supabase_conn()
+    conn = _get_data_reader()
     if not conn:
         return None, None
 
     try:
         filters = {'department': department} if department else None
-        records = conn.fetch_pediatric_evaluations(filters=filters)
-        if not records:
+        df = conn.fetch_pediatric_evaluations_df(filters=filters, columns='dashboard')
+        if df.empty:
             return None, None
 
-        df = pd.DataFrame(records)
-
         # 依「包含展示資料」勾選狀態過濾 demo 資料
         if not st.session_state.get('include_demo_data', True):
             if 'form_version' in df.columns:
@@ -306,30 +425,7 @@ def _load_from_supabase(department=None):
                     return None, None
 
         # 將 Supabase 欄位名映射回中文欄位（與 Google Sheets 格式一致）
-        col_map = {
-            'evaluator_teacher': '評核教師',
-            'evaluation_date': '評核日期',
-            'evaluated_resident': '受評核人員',
-            'resident_level': '評核時級職',
-            'evaluation_item': '評核項目',
-            'meeting_name': '會議名稱',
-            'content_sufficient': '內容是否充分',
-            'data_analysis_ability': '辯證資料的能力',
-            'presentation_clarity': '口條、呈現方式是否清晰',
-            'innovative_ideas': '是否具開創、建設性的想法',
-            'logical_response': '回答提問是否具邏輯、有條有理',
-            'meeting_feedback': '會議報告教師回饋',
-            'patient_id': '病歷號',
-            'technical_skill_item': '評核技術項目',
-            'sedation_medication': '鎮靜藥物',
-            'reliability_level': '可信賴程度',
-            'technical_feedback': '操作技術教師回饋',
-            'proficiency_level': '熟練程度',
-            'epa_item': 'EPA項目',
-            'epa_reliability_level': 'EPA可信賴程度',
-            'epa_qualitative_feedback': 'EPA質性回饋',
-        }
-        df = df.rename(columns=col_map)
+        df = df.rename(columns=SUPABASE_COLUMN_MAP)
 
         # Supabase 存的是數值，process_pediatric_data 裡 convert_*
         # 函數預期文字輸入，所以對數值欄位先建立 _數值 後綴欄位，
@@ -372,201 +468,20 @@ def _load_from_supabase(department=None):
         return None, None
 
 def process_pediatric_data(df):
-    """處理小兒部評核資料"""
+    """處理小兒部評核資料（轉換見 modules.pediatric_processing，此處顯示轉換警告與錯誤）"""
     try:
-        # 複製資料框
-        processed_df = df.copy()
-        # 正規化欄位名稱：去除前後空白（Google 表單匯出可能帶尾端空格）
-        processed_df.columns = [str(c).strip() if c is not None else '' for c in processed_df.columns]
-        
-        # 處理評核日期
-        if '評核日期' in processed_df.columns:
-            # 如果評核日期已經是日期格式，直接使用
-            if processed_df['評核日期'].dtype == 'object':
-                # 嘗試將字串轉換為日期
-                try:
-                    processed_df['評核日期'] = pd.to_datetime(processed_df['評核日期'], errors='coerce').dt.date
-                except Exception as e:
-                    st.warning(f"⚠️ 評核日期轉換錯誤: {str(e)}")
-        
-        # 如果沒有評核日期欄位，嘗試從時間戳記解析
-        elif '時間戳記' in processed_df.columns:
-            # 創建評核日期欄位
-            processed_df['評核日期'] = None
-            
-            # 嘗試解析時間戳記中的日期部分
-            for idx, timestamp in processed_df['時間戳記'].items():
-                if pd.notna(timestamp):
-                    timestamp_str = str(timestamp).strip()
-                    
-                    # 提取日期部分（在空格之前的部分）
-                    date_part = timestamp_str.split(' ')[0] if ' ' in timestamp_str else timestamp_str
-                    
-                    # 嘗試解析日期
-                    try:
-                        parsed_date = pd.to_datetime(date_part, format='%Y/%m/%d').date()
-                        processed_df.at[idx, '評核日期'] = parsed_date
-                    except:
-                        pass
-        
-        # 處理數值評分欄位
-        score_columns = ['內容是否充分', '辯證資料的能力', '口條、呈現方式是否清晰', 
-                        '是否具開創、建設性的想法', '回答提問是否具邏輯、有條有理']
-        
-        for col in score_columns:
-            if col in processed_df.columns:
-                # 將文字評分轉換為數值
-                processed_df[f'{col}_數值'] = processed_df[col].apply(convert_score_to_numeric)
-        
-        # 處理可信賴程度
-        if '可信賴程度' in processed_df.columns:
-            processed_df['可信賴程度_數值'] = processed_df['可信賴程度'].apply(convert_reliability_to_numeric)
-        
-        # 處理熟練程度（向後相容舊資料）
-        if '熟練程度' in processed_df.columns:
-            processed_df['熟練程度_數值'] = processed_df['熟練程度'].apply(convert_proficiency_to_numeric)
-
-        # 從可信賴程度推導熟練度（統一判定標準）
-        if '可信賴程度_數值' in processed_df.columns:
-            processed_df['熟練程度(自動判定)'] = processed_df['可信賴程度_數值'].apply(derive_proficiency_from_reliability)
-        
-        # 處理 EPA 可信賴程度（沿用兒科 convert_reliability_to_numeric 對照表）
-        if 'EPA可信賴程度' in processed_df.columns:
-            processed_df['EPA可信賴程度_數值'] = processed_df['EPA可信賴程度'].apply(convert_reliability_to_numeric)
-        
-        return processed_df
-        
+        processed_df = pediatric_processing.process_pediatric_data(df)
     except Exception as e:
         st.error(f"處理資料時發生錯誤：{str(e)}")
         return df
 
-def convert_score_to_numeric(score_text):
-    """將評分文字轉換為數值"""
-    if pd.isna(score_text) or score_text == '':
-        return None
-
-    # 如果已經是數字（例如從 Supabase 載入的整數），直接返回
-    try:
-        num_value = float(score_text)
-        if 1 <= num_value <= 5:
-            return num_value
-    except (ValueError, TypeError):
-        pass
-
-    score_text = str(score_text).strip()
-    
-    # 定義評分對應（含表單「5 卓越～1 不符合期待」）
-    score_mapping = {
-        '非常同意': 5,
-        '同意': 4,
-        '普通': 3,
-        '不同意': 2,
-        '非常不同意': 1,
-        '優秀': 5,
-        '良好': 4,
-        '待改進': 2,
-        '需加強': 1,
-        # 會議報告表單用語（有空格）
-        '5 卓越': 5,
-        '4 充分': 4,
-        '3 尚可': 3,
-        '2 稍差': 2,
-        '1 不符合期待': 1,
-        # 會議報告表單用語（數字與文字連在一起，如表格匯出）
-        '5卓越': 5,
-        '4充分': 4,
-        '3尚可': 3,
-        '2稍差': 2,
-        '1不符合期待': 1,
-        '卓越': 5,
-        '充分': 4,
-        '尚可': 3,
-        '稍差': 2,
-        '不符合期待': 1,
-    }
-    
-    return score_mapping.get(score_text, None)
-
-def convert_reliability_to_numeric(reliability_text):
-    """將可信賴程度轉換為數值（兒科專用，9級量表 → 1.5-5.0分）"""
-    if pd.isna(reliability_text) or reliability_text == '':
-        return None
-
-    reliability_text = str(reliability_text).strip()
-
-    # 如果已經是數字，直接返回
-    try:
-        num_value = float(reliability_text)
-        if 1 <= num_value <= 5:
-            return num_value
-    except (ValueError, TypeError):
-        pass
-
-    # 兒科評核表單對應（主要）
-    reliability_mapping = {
-        # 新格式：五分制小數點顯示（符合學會規範）
-        '1.5 — 允許住院醫師在旁觀察': 1.5,
-        '2.0 — 教師在旁逐步共同操作': 2.0,
-        '2.5 — 教師在旁必要時協助': 2.5,
-        '3.0 — 教師可立即到場協助，事後逐項確認': 3.0,
-        '3.3 — 教師可立即到場協助，事後重點確認': 3.3,
-        '3.6 — 教師可稍後到場協助，必要時事後確認': 3.6,
-        '4.0 — 教師on call提供監督': 4.0,
-        '4.5 — 教師不需on call，事後提供回饋及監督': 4.5,
-        '5.0 — 學員可對其他資淺的學員進行監督與教學': 5.0,
-        # 舊格式向後相容
-        '允許住院醫師在旁觀察': 1.5,
-        '教師在旁逐步共同操作': 2.0,
-        '教師在旁必要時協助': 2.5,
-        '教師可立即到場協助，事後逐項確認': 3.0,
-        '教師可立即到場協助，事後重點確認': 3.3,
-        '教師可稍後到場協助，必要時事後確認': 3.6,
-        '教師on call提供監督': 4.0,
-        '教師不需on call，事後提供回饋及監督': 4.5,
-        '學員可對其他資淺的學員進行監督與教學': 5.0,
-
-        # 向下相容：舊資料可能的格式變體
-        '不允許學員觀察': 1.0,  # 舊資料（兒科表單已無此選項）
-        '學員在旁觀察': 1.5,
-        '允許學員在旁觀察': 1.5,
-        '教師在旁必要時協助 ': 2.5,  # 尾部空格
-        '教師可立即到場協助，事後須再確認': 3.0,
-        '教師可稍後到場協助，重點須再確認': 4.0,
-        '我可獨立執行': 5.0,
-    }
-
-    return reliability_mapping.get(reliability_text, None)
-
-def derive_proficiency_from_reliability(reliability_score):
-    """
-    從可信賴程度分數推導熟練度標籤。
-    >= 3.5 → 熟練 / < 3.5 → 不熟練
-    """
-    if pd.isna(reliability_score):
-        return None
-    return '熟練' if float(reliability_score) >= 3.5 else '不熟練'
-
-
-def convert_proficiency_to_numeric(proficiency_text):
-    """[Deprecated] 將熟練程度轉換為數值 — 僅供向後相容舊資料"""
-    if pd.isna(proficiency_text) or proficiency_text == '':
-        return None
-    
-    proficiency_text = str(proficiency_text).strip()
-    
-    # 定義熟練程度對應
-    proficiency_mapping = {
-        '熟練': 5,
-        '基本熟練': 4,
-        '部分熟練': 3,
-        '初學': 2,
-        '不熟練': 1,
-        '一兩次內完成': 5,
-        '協助下完成': 3,
-        '需指導完成': 2
-    }
-    
-    return proficiency_mapping.get(proficiency_text, None)
+    if 'date_conversion_error' in processed_df.attrs:
+        st.warning(f"⚠️ 評核日期轉換錯誤: {processed_df.attrs['date_conversion_error']}")
+    unparsed = processed_df.attrs.get('unparsed_timestamps')
+    if unparsed:
+        examples = '、'.join(str(v) for v in list(unparsed.values())[:3])
+        st.warning(f"⚠️ {len(unparsed)} 筆時間戳記無法解析為評核日期（例：{examples}）")
+    return processed_df
 
 def show_skill_completion_overview(df):
     """顯示所有住院醫師技能項目完成比例概覽"""
@@ -581,13 +496,13 @@ def show_skill_completion_overview(df):
     
     # 獲取所有住院醫師
     all_residents = df['受評核人員'].unique()
+    counts_by_resident = calculate_skill_counts_by_resident(technical_data, all_residents)
     
     # 計算每個住院醫師的技能完成狀況
     resident_skill_summary = []
     
     for resident in all_residents:
-        resident_data = technical_data[technical_data['受評核人員'] == resident]
-        skill_counts = calculate_skill_counts(resident_data)
+        skill_counts = counts_by_resident[resident]
         
         # 獲取該住院醫師的階層資訊
         resident_level = "未知"
@@ -661,8 +576,7 @@ def show_skill_completion_overview(df):
             resident_names = []
             
             for resident in all_residents:
-                resident_data = technical_data[technical_data['受評核人員'] == resident]
-                skill_counts = calculate_skill_counts(resident_data)
+                skill_counts = counts_by_resident[resident]
                 
                 if skill in skill_counts:
                     completed_count = skill_counts[skill]['completed']
@@ -763,6 +677,24 @@ def _status_emoji(status):
 def _status_label(status):
     return {'PASS': '達標', 'FAIL': '未達標', 'GREEN': '進度良好', 'YELLOW': '需注意', 'RED': '需輔導'}.get(status, '未知')
 
+def _lazy_section(labels, key):
+    """
+    只執行選取區塊的分頁導覽（取代 st.tabs）
+
+    st.tabs 每次 rerun 都會執行所有分頁並序列化其中的 Plotly 圖表；
+    改用水平 radio 後，未選取的分頁完全不計算。
+
+    Args:
+        labels (list[str]): 分頁標籤
+        key (str): widget key（同一頁面內需唯一）
+
+    Returns:
+        int: 選取的分頁索引
+    """
+    choice = st.radio("分頁", options=list(range(len(labels))), format_func=lambda i: labels[i],
+                      horizontal=True, key=key, label_visibility="collapsed")
+    return min(choice or 0, len(labels) - 1)
+
 def show_ccc_overview():
     """Tab 1：CCC 總覽頁面主函數"""
     st.subheader("🏆 CCC 會議 — 小兒部住院醫師訓練進度總覽")
@@ -793,9 +725,13 @@ def show_ccc_overview():
     department_filter = selected_dept if data_source == 'supabase' else None
 
     if st.button("🔄 重新載入 Supabase 資料", key="reload_ccc"):
-        st.session_state.pop('pediatric_data', None)
+        _reload_pediatric_data()
         st.rerun()
 
+    from modules.auth import check_permission
+    if check_permission(st.session_state.get('role', 'resident'), 'can_manage_users'):
+        _show_cache_metrics()
+
     df, _ = load_pediatric_data(department=department_filter)
     if df is None or df.empty:
         st.warning("無法載入資料，請檢查 Google 表單連接")
@@ -822,46 +758,44 @@ def show_ccc_overview():
             return
 
     # 預先批次查詢所有人的研究記錄（R3 判斷用）
-    conn_ccc = _get_supabase_conn()
+    conn_ccc = _get_data_reader()
     research_published_map = {}
     if conn_ccc:
         try:
-            all_research = conn_ccc.fetch_research_progress()
-            for rec in (all_research or []):
-                rname = rec.get('resident_name', '')
-                if rec.get('current_status') in ('接受', '發表'):
-                    research_published_map[rname] = research_published_map.get(rname, 0) + 1
+            research_summary = get_research_summary(conn_ccc)
+            research_published_map = {name: agg['published']
+                                      for name, agg in research_summary['by_resident'].items()}
         except Exception:
             pass
 
-    all_status = {}  # {姓名: status_dict}
-    for name in residents:
-        res_df = df[df['受評核人員'] == name]
-        level = _get_resident_level(df, name)
-        pub_count = research_published_map.get(name, 0)
-        all_status[name] = calculate_resident_status(res_df, df, resident_level=level,
-                                                      research_published=pub_count)
-        all_status[name]['level'] = level
-
-    # ── Section C：三大主視圖（EPA / 技能 / 會議報告）──
-    ccc_tab_epa, ccc_tab_skill, ccc_tab_meeting = st.tabs([
-        "📈 EPA 趨勢", "🎯 技能完成度", "📑 會議報告"
-    ])
-
-    with ccc_tab_epa:
-        show_ccc_epa_by_item(df)
-
-    with ccc_tab_skill:
-        show_skill_heatmap(df)
-
-    with ccc_tab_meeting:
-        show_ccc_meeting_comparison(df)
+    snapshot_scope = ccc_snapshot_scope(data_source, department_filter,
+                                        st.session_state.get('include_demo_data', True))
+    all_status = calculate_cohort_status_snapshot(df, residents, research_published_map,
+                                                  scope=snapshot_scope)  # {姓名: status_dict}
+    show_ccc_status_history(all_status, snapshot_scope)
 
-    st.divider()
-
-    # ── Section D：研究進度總覽（若有 Supabase 連線）──
-    conn = _get_supabase_conn()
+    # ── Section C：主視圖（EPA / 技能 / 會議報告 / 研究進度），只計算選取的一個 ──
+    conn = _get_data_reader()
+    section_labels = ["📈 EPA 趨勢", "🎯 技能完成度", "📑 會議報告"]
     if conn:
+        section_labels.append("📚 研究進度")
+    section = _lazy_section(section_labels, key="ccc_overview_section")
+
+    if section == 0:
+        show_ccc_epa_by_item(df)
+    elif section in (1, 2):
+        # 技能與會議報告熱圖共用，跨 rerun 快取（與 load_pediatric_data 同版本失效，門檻變動時亦失效）
+        view_key = ('ccc_matrices', department_filter, data_source,
+                    st.session_state.get('include_demo_data', True), date.today().isoformat(),
+                    _threshold_settings_hash())
+        ccc_matrices = get_dataset_cache().get_or_load('pediatric_evaluations', view_key,
+                                                       lambda: build_ccc_matrices(df))
+        if section == 1:
+            show_skill_heatmap(df, ccc_matrices)
+        else:
+            show_ccc_meeting_comparison(df, ccc_matrices)
+    else:
+        # ── 研究進度總覽（若有 Supabase 連線）──
         show_research_progress_overview(conn, residents)
 
 
@@ -940,14 +874,14 @@ def show_resident_cards(all_status, df):
                     st.caption(f"📄 文章發表 {res_icon} {pub_n} 篇（R3 需 ≥1 篇）")
                 else:
                     # 非 R3 顯示研究進度筆數
-                    conn = _get_supabase_conn()
+                    conn = _get_data_reader()
                     if conn:
                         try:
-                            research_records = conn.fetch_research_progress(filters={'resident_name': name})
-                            if research_records:
+                            research_agg = get_research_summary(conn)['by_resident'].get(name)
+                            if research_agg:
                                 st.divider()
-                                st.caption(f"📚 研究進度：{len(research_records)} 項")
-                                latest = research_records[0]
+                                st.caption(f"📚 研究進度：{research_agg['count']} 項")
+                                latest = research_agg['latest']
                                 status_emoji_map = {'構思中': '💡', '撰寫中': '✍️', '投稿中': '📤', '接受': '✅'}
                                 st.caption(f"{status_emoji_map.get(latest['current_status'], '📝')} {latest['research_title']} — {latest['current_status']}")
                         except Exception:
@@ -985,53 +919,171 @@ def show_comparison_bar_chart(all_status):
     st.plotly_chart(fig, width="stretch")
 
 
-def show_skill_heatmap(df):
-    """技能熱圖矩陣：住院醫師 × 16項技能"""
-    st.subheader("🎯 技能完成度熱圖矩陣")
-    st.caption("單元格顯示 已完成/需完成 次數。綠色 = 達標、黃色 = 進行中、紅色 = 不足")
-
-    technical_data = df[df['評核項目'] == '操作技術'].copy() if '評核項目' in df.columns else pd.DataFrame()
-    if technical_data.empty:
-        st.info("目前沒有操作技術評核資料")
+def show_ccc_status_history(all_status, scope=''):
+    """達標狀態歷史比較：以 CCC 快照（同一資料範圍）對照過去某日與目前的達標狀態"""
+    store = get_snapshot_store()
+    if store is None:
+        return
+    settings_hash = _threshold_settings_hash()
+    today = date.today().isoformat()
+    try:
+        past_dates = [d for d in store.snapshot_dates(settings_hash, scope=scope) if d < today]
+    except Exception:
+        return
+    if not past_dates:
         return
 
-    residents = sorted(df['受評核人員'].unique()) if '受評核人員' in df.columns else []
+    with st.expander("🕰️ 達標狀態歷史比較", expanded=False):
+        as_of = st.selectbox("比較日期（CCC 快照）", past_dates, key="ccc_history_date")
+        past = store.status_as_of(as_of, residents=list(all_status), settings_hash=settings_hash, scope=scope)
+
+        def _fmt(value):
+            return f"{value:.1f}" if value is not None else "—"
+
+        rows = []
+        for name, now in all_status.items():
+            then = past.get(name)
+            rows.append({
+                '姓名': name,
+                '級職': now.get('level', '—'),
+                '當時': f"{_status_emoji(then['overall'])} {_status_label(then['overall'])}" if then else '—',
+                '目前': f"{_status_emoji(now['overall'])} {_status_label(now['overall'])}",
+                'EPA均分（當時→目前）': f"{_fmt(then['epa']['avg_score']) if then else '—'} → {_fmt(now['epa']['avg_score'])}",
+                '技能進度（當時→目前）': (f"{then['technical']['pass_rate']:.0f}%" if then else '—')
+                                        + f" → {now['technical']['pass_rate']:.0f}%",
+                '會議均分（當時→目前）': f"{_fmt(then['meeting']['avg_score']) if then else '—'} → {_fmt(now['meeting']['avg_score'])}",
+            })
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+
+# 會議報告五維度：(數值欄位, 原始文字欄位, 熱圖標籤)
+CCC_MEETING_DIMS = [
+    ('內容是否充分_數值',               '內容是否充分',               '內容充分'),
+    ('辯證資料的能力_數值',             '辯證資料的能力',             '辯證資料'),
+    ('口條、呈現方式是否清晰_數值',     '口條、呈現方式是否清晰',     '口條清晰'),
+    ('是否具開創、建設性的想法_數值',   '是否具開創、建設性的想法',   '開創想法'),
+    ('回答提問是否具邏輯、有條有理_數值', '回答提問是否具邏輯、有條有理', '邏輯回答'),
+]
+
+def build_ccc_matrices(df):
+    """
+    建立 CCC 技能熱圖與會議報告熱圖共用的 住院醫師 × 欄位 矩陣
+
+    技能有效次數與會議報告各維度分數放進同一張寬表，依受評核人員 groupby 一次，
+    同時得到兩張熱圖的數值、標記文字與排序（整體完成率/均分由低到高，進度慢的在上）。
+
+    Args:
+        df (pd.DataFrame): process_pediatric_data 處理後的完整資料
+
+    Returns:
+        dict: {'skill': matrix, 'meeting': matrix}；matrix 含
+            'message'（無資料時的提示文字，有資料為 None）、'residents'（排序後姓名）、
+            'columns'（欄標籤）、'z'、'text'（二維 list，列順序同 residents）、
+            'overall'（技能為達標項目百分比，會議報告為五維度整體均分）
+    """
+    def _empty(message):
+        return {'message': message, 'residents': [], 'columns': [], 'z': [], 'text': [], 'overall': []}
+
     skills = list(PEDIATRIC_SKILL_REQUIREMENTS.keys())
+    if '評核項目' not in df.columns or '受評核人員' not in df.columns or df.empty:
+        return {'skill': _empty("目前沒有操作技術評核資料"), 'meeting': _empty("目前沒有會議報告評核資料")}
+
+    n = len(df)
+    names = df['受評核人員'].to_numpy()
+    item_col = df['評核項目']
+    is_tech = (item_col == '操作技術').to_numpy()
+    is_meeting = item_col.astype(str).str.contains('會議報告', na=False).to_numpy()
+    recent = _recent_6_months_mask(df)
+    recent = np.ones(n, dtype=bool) if recent is None else recent.to_numpy(dtype=bool)
+    meeting_recent = is_meeting & recent
+
+    # ── 寬表：技能有效次數（0/1）＋ 近半年會議報告各維度分數（其他列為 NaN）──
+    if '評核技術項目' in df.columns:
+        skill_hits = _skill_membership(df['評核技術項目']) & (is_tech & _skill_counted_mask(df))[:, None]
+    else:
+        skill_hits = np.zeros((n, len(skills)), dtype=bool)
+    wide = pd.DataFrame(skill_hits.astype(np.int64), columns=skills)
+
+    meeting_dims = [(col, lbl) for col, _, lbl in CCC_MEETING_DIMS if col in df.columns]
+    if meeting_dims:
+        meeting_values = {col: pd.to_numeric(df[col], errors='coerce') for col, _ in meeting_dims}
+    else:
+        # 嘗試未轉換的原始欄位
+        meeting_dims = [(col, lbl) for col, raw, lbl in CCC_MEETING_DIMS if raw in df.columns]
+        meeting_values = {
+            col: pd.to_numeric(_convert_by_uniques(df[raw], convert_score_to_numeric), errors='coerce')
+            for col, raw, _ in CCC_MEETING_DIMS if raw in df.columns
+        }
+    meeting_cols = [col for col, _ in meeting_dims]
+    for col in meeting_cols:
+        wide[col] = np.where(meeting_recent, meeting_values[col].to_numpy(dtype=float), np.nan)
 
-    # 計算每人每項技能的 completed / required
-    z_matrix   = []   # 比值 (0-1+)
-    text_matrix = []  # 標記文字 "X/Y"
-    resident_rates = []  # 總完成率（用於排序）
+    grouped = wide.groupby(names)
+    skill_totals = grouped[skills].sum()
+    meeting_means = grouped[meeting_cols].mean() if meeting_cols else None
 
-    for name in residents:
-        res_tech = technical_data[technical_data['受評核人員'] == name]
-        counts = calculate_skill_counts(res_tech)
-        row_z    = []
-        row_text = []
-        completed_n = 0
-        for skill in skills:
-            c = counts.get(skill, {}).get('completed', 0)
-            r = counts.get(skill, {}).get('required', PEDIATRIC_SKILL_REQUIREMENTS[skill]['minimum'])
-            if r == 0:
-                # 僅記錄項目（APLS/NRP）：有紀錄就算達標（綠色）
-                row_z.append(1.0 if c > 0 else 0.5)
-                row_text.append(f"{c}/記錄")
-                if c > 0:
-                    completed_n += 1  # 僅記錄項目：有記錄才算達標
-            else:
-                row_z.append(min(c / r, 1.5))  # cap at 1.5 for color
-                row_text.append(f"{c}/{r}")
-                if c >= r:
-                    completed_n += 1
-        z_matrix.append(row_z)
-        text_matrix.append(row_text)
-        resident_rates.append(completed_n / len(skills) * 100 if skills else 0)
-
-    # 按完成率從低到高排序（進度慢的在上面，先看見）
-    order = sorted(range(len(residents)), key=lambda i: resident_rates[i])
-    sorted_residents   = [residents[i] for i in order]
-    sorted_z_matrix    = [z_matrix[i] for i in order]
-    sorted_text_matrix = [text_matrix[i] for i in order]
+    # ── 技能熱圖 ──
+    if not is_tech.any():
+        skill_matrix = _empty("目前沒有操作技術評核資料")
+    else:
+        residents = sorted(df['受評核人員'].unique())
+        counts = skill_totals.reindex(residents, fill_value=0).to_numpy()
+        required = np.array([PEDIATRIC_SKILL_REQUIREMENTS[s]['minimum'] for s in skills])
+        record_only = required == 0  # 僅記錄項目（APLS/NRP）：有紀錄就算達標（綠色）
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(record_only, np.where(counts > 0, 1.0, 0.5),
+                         np.minimum(counts / np.where(record_only, 1, required), 1.5))  # cap at 1.5 for color
+        done = np.where(record_only, counts > 0, counts >= required)
+        rates = done.sum(axis=1) / len(skills) * 100
+        required_text = ['記錄' if r == 0 else str(r) for r in required]
+        text = [[f"{c}/{r}" for c, r in zip(row, required_text)] for row in counts.tolist()]
+        skill_matrix = _sorted_ccc_matrix(residents, skills, z, text, rates)
+
+    # ── 會議報告熱圖 ──
+    if not is_meeting.any():
+        meeting_matrix = _empty("目前沒有會議報告評核資料")
+    elif not meeting_recent.any():
+        meeting_matrix = _empty("近半年內沒有會議報告評核資料")
+    elif not meeting_cols:
+        meeting_matrix = _empty("找不到會議報告評分欄位")
+    else:
+        residents = sorted(pd.unique(names[meeting_recent]))
+        means = meeting_means.loc[residents].to_numpy(dtype=float)
+        z = np.nan_to_num(means, nan=0.0)
+        text = [["—" if np.isnan(v) else f"{v:.1f}" for v in row] for row in means.tolist()]
+        positive = z > 0
+        overall = np.where(positive, z, 0).sum(axis=1) / np.maximum(positive.sum(axis=1), 1)
+        meeting_matrix = _sorted_ccc_matrix(residents, [lbl for _, lbl in meeting_dims], z, text, overall)
+
+    return {'skill': skill_matrix, 'meeting': meeting_matrix}
+
+def _sorted_ccc_matrix(residents, columns, z, text, overall):
+    """依 overall 由低到高（同值保持姓名順序）排列 build_ccc_matrices 的單張矩陣"""
+    order = np.argsort(np.asarray(overall, dtype=float), kind='stable')
+    return {
+        'message': None,
+        'residents': [residents[i] for i in order],
+        'columns': list(columns),
+        'z': np.asarray(z, dtype=float)[order].tolist(),
+        'text': [text[i] for i in order],
+        'overall': [float(overall[i]) for i in order],
+    }
+
+
+def show_skill_heatmap(df, ccc_matrices=None):
+    """技能熱圖矩陣：住院醫師 × 16項技能（ccc_matrices 為 build_ccc_matrices 的結果，未提供時即時計算）"""
+    st.subheader("🎯 技能完成度熱圖矩陣")
+    st.caption("單元格顯示 已完成/需完成 次數。綠色 = 達標、黃色 = 進行中、紅色 = 不足")
+
+    matrix = (ccc_matrices or build_ccc_matrices(df))['skill']
+    if matrix['message']:
+        st.info(matrix['message'])
+        return
+
+    skills = matrix['columns']
+    sorted_residents = matrix['residents']
+    sorted_z_matrix = matrix['z']
+    sorted_text_matrix = matrix['text']
 
     # 自定義顏色映射：z 值範圍 0-1.5，映射到 0-1 的 colorscale
     # <0.5 紅, 0.5-0.99 黃, >=1.0 綠
@@ -1059,7 +1111,7 @@ def show_skill_heatmap(df):
     ))
 
     fig.update_layout(
-        height=max(250, 60 * len(residents)),
+        height=max(250, 60 * len(sorted_residents)),
         xaxis=dict(tickangle=-35, tickfont=dict(size=11)),
         yaxis=dict(tickfont=dict(size=13)),
         margin=dict(l=100, r=30, t=30, b=100)
@@ -1098,136 +1150,83 @@ def show_ccc_epa_by_item(df):
     }
 
     # 計算各項目的全體近半年均分，用於 tab 標籤
+    item_keys = _epa_item_keys(epa_data)
+    item_cnts = item_keys.value_counts()
     item_tabs_labels = []
     for epa_item in PEDIATRIC_EPA_ITEMS:
-        item_mask = _match_epa_item(epa_data['EPA項目'], epa_item) if 'EPA項目' in epa_data.columns else pd.Series(False, index=epa_data.index)
-        item_cnt = int(item_mask.sum())
+        item_cnt = int(item_cnts.get(epa_item, 0))
         lbl = short_labels.get(epa_item, epa_item)
         item_tabs_labels.append(f"{lbl} ({item_cnt})")
 
-    epa_item_tabs = st.tabs(item_tabs_labels)
+    epa_item = PEDIATRIC_EPA_ITEMS[_lazy_section(item_tabs_labels, key="ccc_epa_item_section")]
 
-    for tab_ei, epa_item in zip(epa_item_tabs, PEDIATRIC_EPA_ITEMS):
-        with tab_ei:
-            if 'EPA項目' not in epa_data.columns:
-                st.info("資料缺少 EPA項目 欄位")
-                continue
-
-            item_mask = _match_epa_item(epa_data['EPA項目'], epa_item)
-            item_df = epa_data[item_mask].copy()
+    if 'EPA項目' not in epa_data.columns:
+        st.info("資料缺少 EPA項目 欄位")
+        return
 
-            if item_df.empty:
-                st.caption("近半年無此項目評核記錄")
-                continue
+    item_df = epa_data[item_keys == epa_item].copy()
 
-            # 各住院醫師月度平均
-            monthly = item_df.groupby(['受評核人員', '年月'])['EPA可信賴程度_數值'].mean().reset_index()
-            monthly.rename(columns={'EPA可信賴程度_數值': '月均分'}, inplace=True)
+    if item_df.empty:
+        st.caption("近半年無此項目評核記錄")
+        return
 
-            fig = go.Figure()
-            for i, resident in enumerate(residents_list):
-                res_data = monthly[monthly['受評核人員'] == resident].sort_values('年月')
-                if res_data.empty:
-                    continue
-                fig.add_trace(go.Scatter(
-                    x=res_data['年月'],
-                    y=res_data['月均分'],
-                    mode='lines+markers',
-                    name=resident,
-                    line=dict(width=2.5, color=colors[i % len(colors)]),
-                    marker=dict(size=8),
-                    hovertemplate=f'{resident}<br>%{{x}}<br>均分 %{{y:.2f}}<extra></extra>'
-                ))
+    # 各住院醫師月度平均
+    monthly = item_df.groupby(['受評核人員', '年月'])['EPA可信賴程度_數值'].mean().reset_index()
+    monthly.rename(columns={'EPA可信賴程度_數值': '月均分'}, inplace=True)
 
-            # 年級門檻線
-            fig.add_hline(y=3.5, line_dash='dot', line_color='#c0392b', line_width=1.2,
-                          annotation_text='R3 ≥3.5', annotation_position='top left',
-                          annotation_font_size=11)
-            fig.add_hline(y=3.0, line_dash='dot', line_color='#e67e22', line_width=1.2,
-                          annotation_text='R2 ≥3.0', annotation_position='top left',
-                          annotation_font_size=11)
-            fig.add_hline(y=2.5, line_dash='dot', line_color='#27ae60', line_width=1.2,
-                          annotation_text='R1 ≥2.5', annotation_position='bottom left',
-                          annotation_font_size=11)
-
-            fig.update_layout(
-                height=380,
-                margin=dict(l=10, r=10, t=30, b=10),
-                xaxis=dict(title='', tickangle=-30),
-                yaxis=dict(range=[0, 5.5], title='EPA 月均分', dtick=1),
-                hovermode='x unified',
-                legend=dict(orientation='v', yanchor='top', y=1, xanchor='left', x=1.02,
-                            bgcolor='rgba(255,255,255,0.8)', bordercolor='rgba(0,0,0,0.15)',
-                            borderwidth=1),
-                margin_r=140
-            )
-            st.plotly_chart(fig, width="stretch", key=f"ccc_epa_trend_{epa_item}")
+    fig = go.Figure()
+    for i, resident in enumerate(residents_list):
+        res_data = monthly[monthly['受評核人員'] == resident].sort_values('年月')
+        if res_data.empty:
+            continue
+        fig.add_trace(go.Scatter(
+            x=res_data['年月'],
+            y=res_data['月均分'],
+            mode='lines+markers',
+            name=resident,
+            line=dict(width=2.5, color=colors[i % len(colors)]),
+            marker=dict(size=8),
+            hovertemplate=f'{resident}<br>%{{x}}<br>均分 %{{y:.2f}}<extra></extra>'
+        ))
 
+    # 年級門檻線
+    fig.add_hline(y=3.5, line_dash='dot', line_color='#c0392b', line_width=1.2,
+                  annotation_text='R3 ≥3.5', annotation_position='top left',
+                  annotation_font_size=11)
+    fig.add_hline(y=3.0, line_dash='dot', line_color='#e67e22', line_width=1.2,
+                  annotation_text='R2 ≥3.0', annotation_position='top left',
+                  annotation_font_size=11)
+    fig.add_hline(y=2.5, line_dash='dot', line_color='#27ae60', line_width=1.2,
+                  annotation_text='R1 ≥2.5', annotation_position='bottom left',
+                  annotation_font_size=11)
 
-def show_ccc_meeting_comparison(df):
-    """CCC 會議報告：各住院醫師五維度近半年平均分 — 熱圖矩陣"""
-    st.subheader("📑 會議報告 — 各維度近半年平均分")
+    fig.update_layout(
+        height=380,
+        margin=dict(l=10, r=10, t=30, b=10),
+        xaxis=dict(title='', tickangle=-30),
+        yaxis=dict(range=[0, 5.5], title='EPA 月均分', dtick=1),
+        hovermode='x unified',
+        legend=dict(orientation='v', yanchor='top', y=1, xanchor='left', x=1.02,
+                    bgcolor='rgba(255,255,255,0.8)', bordercolor='rgba(0,0,0,0.15)',
+                    borderwidth=1),
+        margin_r=140
+    )
+    st.plotly_chart(fig, width="stretch", key=f"ccc_epa_trend_{epa_item}")
 
-    mtg_raw = df[df['評核項目'].astype(str).str.contains('會議報告', na=False)].copy() if '評核項目' in df.columns else pd.DataFrame()
-    if mtg_raw.empty:
-        st.info("目前沒有會議報告評核資料")
-        return
 
-    mtg_data = _filter_recent_6_months(mtg_raw)
-    if mtg_data.empty:
-        st.info("近半年內沒有會議報告評核資料")
-        return
-
-    dim_cols = [
-        ('內容是否充分_數值',           '內容充分'),
-        ('辯證資料的能力_數值',         '辯證資料'),
-        ('口條、呈現方式是否清晰_數值', '口條清晰'),
-        ('是否具開創、建設性的想法_數值','開創想法'),
-        ('回答提問是否具邏輯、有條有理_數值','邏輯回答'),
-    ]
-    avail_dims = [(col, lbl) for col, lbl in dim_cols if col in mtg_data.columns]
+def show_ccc_meeting_comparison(df, ccc_matrices=None):
+    """CCC 會議報告：各住院醫師五維度近半年平均分 — 熱圖矩陣（ccc_matrices 同 show_skill_heatmap）"""
+    st.subheader("📑 會議報告 — 各維度近半年平均分")
 
-    if not avail_dims:
-        # 嘗試未轉換的原始欄位
-        dim_raw = [
-            ('內容是否充分', '內容充分'), ('辯證資料的能力', '辯證資料'),
-            ('口條、呈現方式是否清晰', '口條清晰'), ('是否具開創、建設性的想法', '開創想法'),
-            ('回答提問是否具邏輯、有條有理', '邏輯回答'),
-        ]
-        for col, lbl in dim_raw:
-            if col in mtg_data.columns:
-                mtg_data[f'{col}_數值'] = mtg_data[col].apply(convert_score_to_numeric)
-        avail_dims = [(f'{col}_數值', lbl) for col, lbl in dim_raw if f'{col}_數值' in mtg_data.columns]
-
-    if not avail_dims:
-        st.info("找不到會議報告評分欄位")
+    matrix = (ccc_matrices or build_ccc_matrices(df))['meeting']
+    if matrix['message']:
+        st.info(matrix['message'])
         return
 
-    residents_sorted = sorted(mtg_data['受評核人員'].unique()) if '受評核人員' in mtg_data.columns else []
-    dim_labels = [lbl for _, lbl in avail_dims]
-
-    # 計算各住院醫師各維度平均（Z 矩陣，行=住院醫師，列=維度）
-    z_matrix   = []
-    text_matrix = []
-    overall_avgs = []
-
-    for name in residents_sorted:
-        res_df = mtg_data[mtg_data['受評核人員'] == name]
-        row_z, row_text = [], []
-        for col, _ in avail_dims:
-            vals = res_df[col].dropna()
-            avg = float(vals.mean()) if len(vals) > 0 else None
-            row_z.append(avg if avg is not None else 0)
-            row_text.append(f"{avg:.1f}" if avg is not None else "—")
-        z_matrix.append(row_z)
-        text_matrix.append(row_text)
-        overall_avgs.append(sum(v for v in row_z if v > 0) / max(len([v for v in row_z if v > 0]), 1))
-
-    # 按整體均分由低到高排列（進度慢的在上）
-    order = sorted(range(len(residents_sorted)), key=lambda i: overall_avgs[i])
-    residents_sorted = [residents_sorted[i] for i in order]
-    z_matrix   = [z_matrix[i] for i in order]
-    text_matrix = [text_matrix[i] for i in order]
+    dim_labels = matrix['columns']
+    residents_sorted = matrix['residents']
+    z_matrix = matrix['z']
+    text_matrix = matrix['text']
 
     colorscale = [
         [0.0,   '#FF6B6B'],   # 紅（0分）
@@ -1261,12 +1260,10 @@ def show_ccc_meeting_comparison(df):
 
     # 補充：各住院醫師整體均分排名
     st.caption("📊 各住院醫師會議報告五維度整體均分（近半年）")
-    ranking_data = []
-    for i, name in enumerate(reversed(residents_sorted)):  # 由高到低
-        orig_idx = len(residents_sorted) - 1 - i
-        ov = sum(float(v) for v in z_matrix[orig_idx] if v > 0)
-        cnt = len([v for v in z_matrix[orig_idx] if v > 0])
-        ranking_data.append({'姓名': name, '五維度均分': round(ov / cnt, 2) if cnt else 0})
+    ranking_data = [
+        {'姓名': name, '五維度均分': round(ov, 2)}
+        for name, ov in zip(reversed(residents_sorted), reversed(matrix['overall']))  # 由高到低
+    ]
     st.dataframe(pd.DataFrame(ranking_data), hide_index=True, use_container_width=True)
 
 
@@ -1360,7 +1357,7 @@ def show_data_overview():
     department_filter = selected_dept if data_source == 'supabase' else None
 
     if st.button("🔄 重新載入 Supabase 資料", key="reload_overview"):
-        st.session_state.pop('pediatric_data', None)
+        _reload_pediatric_data()
         st.rerun()
 
     # 載入資料
@@ -1453,7 +1450,7 @@ def show_individual_analysis():
                                          index=default_index, label_visibility="collapsed")
     with reload_col:
         if st.button("🔄 重新載入", key="reload_individual", use_container_width=True):
-            st.session_state.pop('pediatric_data', None)
+            _reload_pediatric_data()
             st.rerun()
 
     if not selected_resident:
@@ -1481,12 +1478,12 @@ def show_individual_analysis():
     # ── 計算達標狀態（供後續各區塊使用）──
     resident_level = _get_resident_level(df, selected_resident)
     th = _get_level_thresholds(resident_level)
-    _conn_ind = _get_supabase_conn()
+    _conn_ind = _get_data_reader()
     _pub_count = 0
     if _conn_ind and str(resident_level) == 'R3':
         try:
-            _recs = _conn_ind.fetch_research_progress(filters={'resident_name': selected_resident})
-            _pub_count = sum(1 for r in (_recs or []) if r.get('current_status') in ('接受', '發表'))
+            _research_agg = get_research_summary(_conn_ind)['by_resident'].get(selected_resident, {})
+            _pub_count = _research_agg.get('published', 0)
         except Exception:
             pass
     status = calculate_resident_status(resident_data, df, resident_level=resident_level,
@@ -1521,36 +1518,34 @@ def show_individual_analysis():
             warn = '' if cnt >= _item_min_disp else ' ⚠️'
             tab_titles.append(f"{short_labels.get(epa_item, epa_item)} ({cnt}){warn}")
 
-        epa_tabs = st.tabs(tab_titles)
-        for tab, epa_item in zip(epa_tabs, PEDIATRIC_EPA_ITEMS):
-            with tab:
-                item_mask = _match_epa_item(epa_data['EPA項目'], epa_item)
-                item_df = epa_data[item_mask].copy()
-                cnt = len(item_df)
-                score_col_epa = 'EPA可信賴程度_數值'
-                # 強調顯示均分與次數
-                m1, m2, m3 = st.columns([1, 1, 4])
-                if not item_df.empty and score_col_epa in item_df.columns:
-                    avg_score_epa = item_df[score_col_epa].dropna().mean()
-                    threshold_epa = _get_level_thresholds(resident_level)['score_threshold']
-                    delta_epa = round(avg_score_epa - threshold_epa, 2) if pd.notna(avg_score_epa) else None
-                    m1.metric("均分", f"{avg_score_epa:.2f}", delta=f"{delta_epa:+.2f}" if delta_epa is not None else None)
-                else:
-                    m1.metric("均分", "—")
-                warn_cnt = '' if cnt >= _item_min_disp else ' ⚠️'
-                m2.metric("評核次數", f"{cnt} 次{warn_cnt}", help=f"近半年需 ≥{_item_min_disp} 次")
-                col_left, col_right = st.columns([1.2, 0.8])
-                with col_left:
-                    show_epa_item_bar(item_df, epa_item, resident_level)
-                with col_right:
-                    avail_epa = [c for c in epa_display_cols if c in item_df.columns]
-                    if avail_epa and not item_df.empty:
-                        st.dataframe(
-                            item_df[avail_epa].sort_values('評核日期', ascending=False),
-                            width="stretch", hide_index=True, height=280
-                        )
-                    else:
-                        st.caption("尚無此項目評核記錄")
+        epa_item = PEDIATRIC_EPA_ITEMS[_lazy_section(tab_titles, key="ind_epa_item_section")]
+        item_keys = _epa_item_keys(epa_data)
+        item_df = epa_data[item_keys == epa_item].copy()
+        cnt = len(item_df)
+        score_col_epa = 'EPA可信賴程度_數值'
+        # 強調顯示均分與次數
+        m1, m2, m3 = st.columns([1, 1, 4])
+        if not item_df.empty and score_col_epa in item_df.columns:
+            avg_score_epa = item_df[score_col_epa].dropna().mean()
+            threshold_epa = _get_level_thresholds(resident_level)['score_threshold']
+            delta_epa = round(avg_score_epa - threshold_epa, 2) if pd.notna(avg_score_epa) else None
+            m1.metric("均分", f"{avg_score_epa:.2f}", delta=f"{delta_epa:+.2f}" if delta_epa is not None else None)
+        else:
+            m1.metric("均分", "—")
+        warn_cnt = '' if cnt >= _item_min_disp else ' ⚠️'
+        m2.metric("評核次數", f"{cnt} 次{warn_cnt}", help=f"近半年需 ≥{_item_min_disp} 次")
+        col_left, col_right = st.columns([1.2, 0.8])
+        with col_left:
+            show_epa_item_bar(item_df, epa_item, resident_level)
+        with col_right:
+            avail_epa = [c for c in epa_display_cols if c in item_df.columns]
+            if avail_epa and not item_df.empty:
+                st.dataframe(
+                    item_df[avail_epa].sort_values('評核日期', ascending=False),
+                    width="stretch", hide_index=True, height=280
+                )
+            else:
+                st.caption("尚無此項目評核記錄")
 
         with st.expander("📈 月度趨勢折線圖（各項目平均）"):
             if '評核日期' in epa_data.columns:
@@ -1594,35 +1589,33 @@ def show_individual_analysis():
         else:
             cnt_g = 0
         skill_group_tab_labels.append(f"{gname} ({cnt_g}筆)")
-    skill_group_tabs = st.tabs(skill_group_tab_labels)
+    group_name, group_skills = list(SKILL_GROUPS.items())[_lazy_section(skill_group_tab_labels, key="ind_skill_group_section")]
     # 以最大分組項目數為基準，固定所有分組圖表高度（與導管插管類對齊）
     _max_skill_items = max(len(g) for g in SKILL_GROUPS.values())
     _fixed_chart_h = max(_max_skill_items * 50, 160)
 
-    for tab_g, (group_name, group_skills) in zip(skill_group_tabs, SKILL_GROUPS.items()):
-        with tab_g:
-            col_left, col_right = st.columns([1.2, 0.8])
-            with col_left:
-                if _sk_data:
-                    show_grouped_skill_progress(_sk_data, technical_data, resident_level,
-                                                target_group=group_name,
-                                                chart_height=_fixed_chart_h)
-                else:
-                    st.info("無操作技術評核記錄")
-            with col_right:
-                if avail and not technical_data.empty:
-                    group_mask = technical_data['評核技術項目'].apply(
-                        lambda x: any(skill in str(x) for skill in group_skills)
-                    ) if '評核技術項目' in technical_data.columns else pd.Series(False, index=technical_data.index)
-                    group_df = technical_data[group_mask][avail].sort_values('評核日期', ascending=False)
-                    st.markdown(f"**{group_name} 詳細記錄**（{len(group_df)} 筆）")
-                    if not group_df.empty:
-                        st.dataframe(group_df, width="stretch", hide_index=True)
-                    else:
-                        st.caption("尚無此類別評核記錄")
-                else:
-                    st.markdown(f"**{group_name} 詳細記錄**")
-                    st.info("無操作技術評核記錄")
+    col_left, col_right = st.columns([1.2, 0.8])
+    with col_left:
+        if _sk_data:
+            show_grouped_skill_progress(_sk_data, technical_data, resident_level,
+                                        target_group=group_name,
+                                        chart_height=_fixed_chart_h)
+        else:
+            st.info("無操作技術評核記錄")
+    with col_right:
+        if avail and not technical_data.empty:
+            group_mask = technical_data['評核技術項目'].apply(
+                lambda x: any(skill in str(x) for skill in group_skills)
+            ) if '評核技術項目' in technical_data.columns else pd.Series(False, index=technical_data.index)
+            group_df = technical_data[group_mask][avail].sort_values('評核日期', ascending=False)
+            st.markdown(f"**{group_name} 詳細記錄**（{len(group_df)} 筆）")
+            if not group_df.empty:
+                st.dataframe(group_df, width="stretch", hide_index=True)
+            else:
+                st.caption("尚無此類別評核記錄")
+        else:
+            st.markdown(f"**{group_name} 詳細記錄**")
+            st.info("無操作技術評核記錄")
 
     # ═══ Section 4：會議報告分析（分頁，各會議類型）═══
     st.markdown("### 會議報告分析")
@@ -1649,39 +1642,47 @@ def show_individual_analysis():
             cnt_mt = int((meeting_data['會議名稱'] == mt).sum()) if not meeting_data.empty and '會議名稱' in meeting_data.columns else 0
             mtg_tab_labels.append(f"{mt} ({cnt_mt})")
 
-    mtg_tabs_list = st.tabs(mtg_tab_labels)
+    mt = mtg_all_types[_lazy_section(mtg_tab_labels, key="ind_meeting_section")]
     feedback_col = '會議報告教師回饋'
     mtg_display_cols = ['評核日期', '評核教師', '會議名稱',
                         '內容是否充分', '辯證資料的能力', '口條、呈現方式是否清晰',
                         '是否具開創、建設性的想法', '回答提問是否具邏輯、有條有理',
                         '會議報告教師回饋']
 
-    for mtg_tab, mt in zip(mtg_tabs_list, mtg_all_types):
-        with mtg_tab:
-            if mt == '全部':
-                mt_data = meeting_data
-                # 同儕：同一年級、所有會議類型
-                mt_peer = peer_meeting
-            else:
-                mt_data = meeting_data[meeting_data['會議名稱'] == mt].copy() if not meeting_data.empty and '會議名稱' in meeting_data.columns else pd.DataFrame()
-                # 同儕：同一年級 & 同一會議類型
-                mt_peer = peer_meeting[peer_meeting['會議名稱'] == mt].copy() if not peer_meeting.empty and '會議名稱' in peer_meeting.columns else pd.DataFrame()
-
-            col_left, col_right = st.columns([1.2, 0.8])
-            with col_left:
-                _mt_safe = re.sub(r'[^A-Za-z0-9\u4e00-\u9fff]', '_', str(mt))
-                show_meeting_radar_large(mt_data, mt_peer, selected_resident, resident_level,
-                                         chart_key=f"mtg_radar_{_mt_safe}_{selected_resident}")
-
-            with col_right:
-                st.markdown("**教師回饋**")
-                if not mt_data.empty and feedback_col in mt_data.columns:
-                    feedback_rows = mt_data[mt_data[feedback_col].notna() &
-                                           (mt_data[feedback_col].astype(str).str.strip() != '')]
-                    if '評核日期' in feedback_rows.columns:
-                        feedback_rows = feedback_rows.sort_values('評核日期', ascending=False)
-                    if not feedback_rows.empty:
-                        for _, row in feedback_rows.head(3).iterrows():
+    if mt == '全部':
+        mt_data = meeting_data
+        # 同儕：同一年級、所有會議類型
+        mt_peer = peer_meeting
+    else:
+        mt_data = meeting_data[meeting_data['會議名稱'] == mt].copy() if not meeting_data.empty and '會議名稱' in meeting_data.columns else pd.DataFrame()
+        # 同儕：同一年級 & 同一會議類型
+        mt_peer = peer_meeting[peer_meeting['會議名稱'] == mt].copy() if not peer_meeting.empty and '會議名稱' in peer_meeting.columns else pd.DataFrame()
+
+    col_left, col_right = st.columns([1.2, 0.8])
+    with col_left:
+        _mt_safe = re.sub(r'[^A-Za-z0-9\u4e00-\u9fff]', '_', str(mt))
+        show_meeting_radar_large(mt_data, mt_peer, selected_resident, resident_level,
+                                 chart_key=f"mtg_radar_{_mt_safe}_{selected_resident}")
+
+    with col_right:
+        st.markdown("**教師回饋**")
+        if not mt_data.empty and feedback_col in mt_data.columns:
+            feedback_rows = mt_data[mt_data[feedback_col].notna() &
+                                   (mt_data[feedback_col].astype(str).str.strip() != '')]
+            if '評核日期' in feedback_rows.columns:
+                feedback_rows = feedback_rows.sort_values('評核日期', ascending=False)
+            if not feedback_rows.empty:
+                for _, row in feedback_rows.head(3).iterrows():
+                    with st.container(border=True):
+                        d = row.get('評核日期', '')
+                        if hasattr(d, 'strftime'):
+                            d = d.strftime('%Y-%m-%d')
+                        teacher = row.get('評核教師', '')
+                        st.caption(f"{d} | {teacher}")
+                        st.write(str(row.get(feedback_col, '')))
+                if len(feedback_rows) > 3:
+                    with st.expander(f"查看全部回饋（共 {len(feedback_rows)} 筆）"):
+                        for _, row in feedback_rows.iloc[3:].iterrows():
                             with st.container(border=True):
                                 d = row.get('評核日期', '')
                                 if hasattr(d, 'strftime'):
@@ -1689,36 +1690,26 @@ def show_individual_analysis():
                                 teacher = row.get('評核教師', '')
                                 st.caption(f"{d} | {teacher}")
                                 st.write(str(row.get(feedback_col, '')))
-                        if len(feedback_rows) > 3:
-                            with st.expander(f"查看全部回饋（共 {len(feedback_rows)} 筆）"):
-                                for _, row in feedback_rows.iloc[3:].iterrows():
-                                    with st.container(border=True):
-                                        d = row.get('評核日期', '')
-                                        if hasattr(d, 'strftime'):
-                                            d = d.strftime('%Y-%m-%d')
-                                        teacher = row.get('評核教師', '')
-                                        st.caption(f"{d} | {teacher}")
-                                        st.write(str(row.get(feedback_col, '')))
-                    else:
-                        st.caption("尚無教師回饋")
-                else:
-                    st.info("無會議報告評核記錄")
-
-                # 完整記錄表格
-                st.caption("**完整評核記錄**")
-                if not mt_data.empty:
-                    avail_mtg = [c for c in mtg_display_cols if c in mt_data.columns]
-                    if avail_mtg:
-                        with st.container(border=True, height=250):
-                            st.dataframe(
-                                mt_data[avail_mtg].sort_values('評核日期', ascending=False),
-                                width="stretch", hide_index=True
-                            )
-                else:
-                    st.info("無會議報告評核記錄")
+            else:
+                st.caption("尚無教師回饋")
+        else:
+            st.info("無會議報告評核記錄")
+
+        # 完整記錄表格
+        st.caption("**完整評核記錄**")
+        if not mt_data.empty:
+            avail_mtg = [c for c in mtg_display_cols if c in mt_data.columns]
+            if avail_mtg:
+                with st.container(border=True, height=250):
+                    st.dataframe(
+                        mt_data[avail_mtg].sort_values('評核日期', ascending=False),
+                        width="stretch", hide_index=True
+                    )
+        else:
+            st.info("無會議報告評核記錄")
 
     # ═══ Section 5：研究進度（若有 Supabase 連線）═══
-    conn = _get_supabase_conn()
+    conn = _get_data_reader()
     if conn:
         st.markdown("### 📚 研究進度")
         show_resident_research_progress(conn, selected_resident)
@@ -1806,9 +1797,10 @@ def show_epa_trend_chart(epa_data, resident_name, resident_level='R1'):
     epa_data_copy['評核日期'] = pd.to_datetime(epa_data_copy['評核日期'], errors='coerce')
     epa_data_copy = epa_data_copy.dropna(subset=['評核日期'])
     epa_data_copy['年月'] = epa_data_copy['評核日期'].dt.to_period('M')
+    epa_data_copy['EPA項目_key'] = _epa_item_keys(epa_data_copy)
 
-    # 按年月和EPA項目分組計算平均
-    monthly_avg = epa_data_copy.groupby(['年月', 'EPA項目'])['EPA可信賴程度_數值'].mean().reset_index()
+    # 按年月和標準 EPA 項目分組計算平均（同一項目的不同寫法合併計算）
+    monthly_avg = epa_data_copy.groupby(['年月', 'EPA項目_key'])['EPA可信賴程度_數值'].mean().reset_index()
     monthly_avg['年月'] = monthly_avg['年月'].astype(str)
 
     if monthly_avg.empty:
@@ -1820,7 +1812,7 @@ def show_epa_trend_chart(epa_data, resident_name, resident_level='R1'):
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']  # 最多 6 種顏色
 
     for i, epa_item in enumerate(PEDIATRIC_EPA_ITEMS):
-        item_data = monthly_avg[_match_epa_item(monthly_avg['EPA項目'], epa_item)]
+        item_data = monthly_avg[monthly_avg['EPA項目_key'] == epa_item]
         if not item_data.empty:
             fig.add_trace(go.Scatter(
                 x=item_data['年月'],
@@ -2038,23 +2030,23 @@ def _show_threshold_settings_ui():
     st.markdown("#### 各年級達標標準")
     st.markdown("判定方式：**二級制（達標 / 未達標）**，三維度中任一未達標即為整體未達標。")
 
+    # 門檻相同的相鄰年級合併為一列（如 PGY2 / R1）
+    rows = []
+    for level, th in get_threshold_settings()['levels'].items():
+        if rows and rows[-1][1] == th:
+            rows[-1][0].append(level)
+        else:
+            rows.append(([level], th))
+
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("**會議報告 & EPA（均分門檻）**")
-        st.markdown(
-            "| 年級 | 達標門檻 |\n|------|--------|\n"
-            "| PGY2 / R1 | ≥ 2.5 分 |\n"
-            "| R2 | ≥ 3.0 分 |\n"
-            "| R3 | ≥ 3.5 分 |"
-        )
+        st.markdown("| 年級 | 達標門檻 |\n|------|--------|\n" + "\n".join(
+            f"| {' / '.join(levels)} | ≥ {th['score_threshold']:.1f} 分 |" for levels, th in rows))
     with col2:
         st.markdown("**操作技術（達標項目佔比，≥2.5 分算完成）**")
-        st.markdown(
-            "| 年級 | 達標比例 |\n|------|--------|\n"
-            "| PGY2 / R1 | ≥ 30% |\n"
-            "| R2 | ≥ 60% |\n"
-            "| R3 | ≥ 100% |"
-        )
+        st.markdown("| 年級 | 達標比例 |\n|------|--------|\n" + "\n".join(
+            f"| {' / '.join(levels)} | ≥ {th['skill_pass_rate']:.0f}% |" for levels, th in rows))
 
     st.info("門檻標準定義於程式碼中（LEVEL_THRESHOLDS），如需調整請聯繫系統管理員。")
 
@@ -2064,7 +2056,7 @@ def show_data_management():
     st.subheader("⚙️ 資料管理")
 
     if st.button("🔄 重新載入 Supabase 資料", key="reload_management"):
-        st.session_state.pop('pediatric_data', None)
+        _reload_pediatric_data()
         st.rerun()
 
     # ─── 門檻設定 UI（管理員專用）───
@@ -2193,36 +2185,49 @@ def show_skill_tracking():
 
 def calculate_skill_counts(resident_data):
     """計算住院醫師各項技能完成次數（可信賴程度 ≥2.5 才列入完成）"""
-    skill_counts = {}
-
     # 從評核技術項目欄位中提取技能資訊
-    if '評核技術項目' in resident_data.columns:
-        technical_items = resident_data['評核技術項目'].dropna()
-
-        for skill in PEDIATRIC_SKILL_REQUIREMENTS.keys():
-            # 計算該技能出現的次數（只計算可信賴程度 ≥2.5 的記錄）
-            count = 0
-            for idx, item in technical_items.items():
-                if skill in str(item):
-                    # 檢查該記錄的可信賴程度
-                    if '可信賴程度_數值' in resident_data.columns:
-                        reliability_score = resident_data.loc[idx, '可信賴程度_數值']
-                        # 可信賴程度 ≥2.5（黃燈以上）才計入完成
-                        if pd.notna(reliability_score) and reliability_score >= 2.5:
-                            count += 1
-                    else:
-                        count += 1
-            
-            req = PEDIATRIC_SKILL_REQUIREMENTS[skill]['minimum']
-            skill_counts[skill] = {
-                'completed': count,
-                'required': req,
-                'capped': min(count, req) if req > 0 else (1 if count > 0 else 0),
-                'description': PEDIATRIC_SKILL_REQUIREMENTS[skill]['description'],
-                'progress': min(count / req * 100, 100) if req > 0 else (100.0 if count > 0 else 0.0)
-            }
-    
-    return skill_counts
+    if '評核技術項目' not in resident_data.columns:
+        return {}
+    totals = (_skill_membership(resident_data['評核技術項目'])
+              & _skill_counted_mask(resident_data)[:, None]).sum(axis=0)
+    return _skill_counts_from_totals(dict(zip(PEDIATRIC_SKILL_REQUIREMENTS, totals)))
+
+def calculate_skill_counts_by_resident(data, residents):
+    """
+    一次計算多位住院醫師的技能完成次數（結果與逐人呼叫 calculate_skill_counts 相同）
+
+    技能歸屬矩陣只對整份資料建立一次，每人只需一次遮罩加總。
+
+    Args:
+        data (pd.DataFrame): 含「受評核人員」「評核技術項目」的評核資料
+        residents (list): 住院醫師姓名
+
+    Returns:
+        dict: {姓名: calculate_skill_counts 的回傳結構}
+    """
+    if '評核技術項目' not in data.columns:
+        return {name: {} for name in residents}
+    hits = _skill_membership(data['評核技術項目']) & _skill_counted_mask(data)[:, None]
+    totals = pd.DataFrame(hits, columns=list(PEDIATRIC_SKILL_REQUIREMENTS)).groupby(
+        data['受評核人員'].to_numpy()).sum()
+    return {
+        name: _skill_counts_from_totals(totals.loc[name] if name in totals.index else {})
+        for name in residents
+    }
+
+def _skill_counted_mask(data):
+    """可列入技能完成次數的列：評核技術項目非空，且可信賴程度 ≥2.5（無此欄位時不檢查）"""
+    counted = data['評核技術項目'].notna().to_numpy()
+    if '可信賴程度_數值' in data.columns:
+        # 可信賴程度 ≥2.5（黃燈以上）才計入完成
+        counted &= (pd.to_numeric(data['可信賴程度_數值'], errors='coerce') >= 2.5).to_numpy()
+    return counted
+
+# ─── 達標判定常數 ───
+TOTAL_REQUIRED_SESSIONS = 40  # 所有技能最低次數加總固定值
+EPA_ITEM_MIN = 3  # 每項目近半年最低評核次數
+MEETING_SCORE_COLS = ['內容是否充分_數值', '辯證資料的能力_數值', '口條、呈現方式是否清晰_數值',
+                      '是否具開創、建設性的想法_數值', '回答提問是否具邏輯、有條有理_數值']
 
 def calculate_resident_status(resident_data, full_df, resident_level='R1', research_published=0):
     """計算住院醫師的達標狀態（依年級分級門檻）
@@ -2231,33 +2236,11 @@ def calculate_resident_status(resident_data, full_df, resident_level='R1', resea
     取所有維度中最差者為 overall 狀態（二級制：PASS / FAIL）
     無資料的維度視為 FAIL
     """
-    th = _get_level_thresholds(resident_level)
-    score_threshold = th['score_threshold']
-    skill_pass_rate = th['skill_pass_rate']
-
-    def _pass_fail(value, threshold):
-        if value is None:
-            return 'FAIL'
-        return 'PASS' if value >= threshold else 'FAIL'
-
     # ── 維度 1：技能完成進度（各技能有效次數 / 固定分母40次）──
-    # 每技能有效次數上限為該技能最低要求次數（超過不重複計算）
-    TOTAL_REQUIRED_SESSIONS = 40  # 所有技能最低次數加總固定值
     technical_data = resident_data[resident_data['評核項目'] == '操作技術'] if '評核項目' in resident_data.columns else pd.DataFrame()
     skill_counts = calculate_skill_counts(technical_data) if not technical_data.empty else {}
-    total_skills = len(PEDIATRIC_SKILL_REQUIREMENTS)
-    completed_skills = sum(
-        1 for d in skill_counts.values()
-        if (d['required'] > 0 and d['completed'] >= d['required'])
-        or (d['required'] == 0 and d['completed'] > 0)
-    )
-    total_required_sessions = TOTAL_REQUIRED_SESSIONS
-    completed_sessions = sum(d['capped'] for d in skill_counts.values()) if skill_counts else 0
-    tech_rate = completed_sessions / TOTAL_REQUIRED_SESSIONS * 100
-    tech_status = _pass_fail(tech_rate, skill_pass_rate)
 
     # ── 維度 2：EPA 均分（近半年）+ 各項目次數（各 ≥3 次）──
-    EPA_ITEM_MIN = 3  # 每項目近半年最低評核次數
     epa_data_all = resident_data[resident_data['評核項目'].astype(str).str.contains('EPA', na=False)] if '評核項目' in resident_data.columns else pd.DataFrame()
     epa_data = _filter_recent_6_months(epa_data_all)
     if not epa_data.empty and 'EPA可信賴程度_數值' in epa_data.columns:
@@ -2268,30 +2251,58 @@ def calculate_resident_status(resident_data, full_df, resident_level='R1', resea
     # 計算各項目近半年次數
     epa_item_counts = {}
     if not epa_data.empty and 'EPA項目' in epa_data.columns:
+        key_counts = _epa_item_keys(epa_data).value_counts()
         for item in PEDIATRIC_EPA_ITEMS:
-            epa_item_counts[item] = int(epa_data[_match_epa_item(epa_data['EPA項目'], item)].shape[0])
+            epa_item_counts[item] = int(key_counts.get(item, 0))
     else:
         epa_item_counts = {item: 0 for item in PEDIATRIC_EPA_ITEMS}
-    all_items_enough = all(c >= EPA_ITEM_MIN for c in epa_item_counts.values())
-    # 均分達標 且 所有項目各 ≥3 次，才算 EPA PASS
-    if epa_avg is not None and epa_avg >= score_threshold and all_items_enough:
-        epa_status = 'PASS'
-    else:
-        epa_status = 'FAIL'
 
     # ── 維度 3：會議報告均分（近半年）──
     meeting_data = _filter_recent_6_months(
         resident_data[resident_data['評核項目'] == '會議報告'] if '評核項目' in resident_data.columns else pd.DataFrame()
     )
-    meeting_score_cols = ['內容是否充分_數值', '辯證資料的能力_數值', '口條、呈現方式是否清晰_數值',
-                          '是否具開創、建設性的想法_數值', '回答提問是否具邏輯、有條有理_數值']
-    available_score_cols = [c for c in meeting_score_cols if c in meeting_data.columns] if not meeting_data.empty else []
+    available_score_cols = [c for c in MEETING_SCORE_COLS if c in meeting_data.columns] if not meeting_data.empty else []
     if available_score_cols:
         all_meeting_scores = meeting_data[available_score_cols].values.flatten()
         valid = all_meeting_scores[~pd.isna(all_meeting_scores)]
         meeting_avg = float(valid.mean()) if len(valid) > 0 else None
     else:
         meeting_avg = None
+
+    return _assemble_resident_status(resident_level, skill_counts, epa_avg, epa_item_counts,
+                                     meeting_avg, research_published)
+
+def _assemble_resident_status(resident_level, skill_counts, epa_avg, epa_item_counts,
+                              meeting_avg, research_published):
+    """由各維度的原始統計組出 calculate_resident_status 的回傳結構（逐人與全體計算共用）"""
+    th = _get_level_thresholds(resident_level)
+    score_threshold = th['score_threshold']
+    skill_pass_rate = th['skill_pass_rate']
+
+    def _pass_fail(value, threshold):
+        if value is None:
+            return 'FAIL'
+        return 'PASS' if value >= threshold else 'FAIL'
+
+    # 每技能有效次數上限為該技能最低要求次數（超過不重複計算）
+    total_skills = len(PEDIATRIC_SKILL_REQUIREMENTS)
+    completed_skills = sum(
+        1 for d in skill_counts.values()
+        if (d['required'] > 0 and d['completed'] >= d['required'])
+        or (d['required'] == 0 and d['completed'] > 0)
+    )
+    total_required_sessions = TOTAL_REQUIRED_SESSIONS
+    completed_sessions = sum(d['capped'] for d in skill_counts.values()) if skill_counts else 0
+    tech_rate = completed_sessions / TOTAL_REQUIRED_SESSIONS * 100
+    tech_status = _pass_fail(tech_rate, skill_pass_rate)
+
+    all_items_enough = all(c >= EPA_ITEM_MIN for c in epa_item_counts.values())
+    # 均分達標 且 所有項目各 ≥3 次，才算 EPA PASS
+    if epa_avg is not None and epa_avg >= score_threshold and all_items_enough:
+        epa_status = 'PASS'
+    else:
+        epa_status = 'FAIL'
+
     meeting_status = _pass_fail(meeting_avg, score_threshold)
 
     # ── 維度 4（R3 專屬）：文章發表（至少 1 篇接受/發表）──
@@ -2318,6 +2329,231 @@ def calculate_resident_status(resident_data, full_df, resident_level='R1', resea
         'research':  {'status': research_status, 'published_count': research_published},
     }
 
+def _skill_counts_from_totals(totals):
+    """由 {技能: 有效次數} 組出 calculate_skill_counts 的回傳結構"""
+    skill_counts = {}
+    for skill, req_info in PEDIATRIC_SKILL_REQUIREMENTS.items():
+        count = int(totals.get(skill, 0))
+        req = req_info['minimum']
+        skill_counts[skill] = {
+            'completed': count,
+            'required': req,
+            'capped': min(count, req) if req > 0 else (1 if count > 0 else 0),
+            'description': req_info['description'],
+            'progress': min(count / req * 100, 100) if req > 0 else (100.0 if count > 0 else 0.0)
+        }
+    return skill_counts
+
+def calculate_cohort_status(df, residents=None, research_published_map=None):
+    """
+    一次計算多位住院醫師的達標狀態（結果與逐人呼叫 calculate_resident_status 相同）
+
+    評核類別、近半年、技能與 EPA 項目比對等逐列判斷只對整份資料做一次，
+    次數以 groupby 加總；均分則依各人原始列順序計算，確保浮點結果一致。
+
+    Args:
+        df (pd.DataFrame): process_pediatric_data 處理後的完整資料
+        residents (list, optional): 要計算的住院醫師，預設為資料中所有受評核人員
+        research_published_map (dict, optional): {姓名: 已接受/發表篇數}（R3 判定用）
+
+    Returns:
+        dict: {姓名: status_dict}，status_dict 另含 'level'（_get_resident_level 的結果）
+    """
+    research_published_map = research_published_map or {}
+    if residents is None:
+        residents = sorted(df['受評核人員'].unique()) if '受評核人員' in df.columns else []
+    if df.empty or '受評核人員' not in df.columns:
+        return {}
+
+    n = len(df)
+    names = df['受評核人員'].to_numpy()
+    positions = df.groupby('受評核人員', sort=False).indices
+    no_rows = np.array([], dtype=np.intp)
+
+    # ── 逐列判斷（整份資料一次）──
+    if '評核項目' in df.columns:
+        item_col = df['評核項目']
+        is_tech = (item_col == '操作技術').to_numpy()
+        is_epa = item_col.astype(str).str.contains('EPA', na=False).to_numpy()
+        is_meeting = (item_col == '會議報告').to_numpy()
+    else:
+        is_tech = is_epa = is_meeting = np.zeros(n, dtype=bool)
+    recent = _recent_6_months_mask(df)
+    recent = np.ones(n, dtype=bool) if recent is None else recent.to_numpy(dtype=bool)
+    epa_recent = is_epa & recent
+    meeting_recent = is_meeting & recent
+
+    # 技能：各技能有效次數（可信賴程度 ≥2.5）
+    skill_names = list(PEDIATRIC_SKILL_REQUIREMENTS.keys())
+    if '評核技術項目' in df.columns:
+        counted = is_tech & _skill_counted_mask(df)
+        skill_hits = _skill_membership(df['評核技術項目']) & counted[:, None]
+    else:
+        skill_hits = np.zeros((n, len(skill_names)), dtype=bool)
+    skill_totals = pd.DataFrame(skill_hits, columns=skill_names).groupby(names).sum()
+
+    # EPA：各項目近半年次數
+    if 'EPA項目' in df.columns:
+        epa_keys = _epa_item_keys(df).to_numpy()
+        epa_hits = (epa_keys[:, None] == np.array(PEDIATRIC_EPA_ITEMS, dtype=object)) & epa_recent[:, None]
+    else:
+        epa_hits = np.zeros((n, len(PEDIATRIC_EPA_ITEMS)), dtype=bool)
+    epa_item_totals = pd.DataFrame(epa_hits, columns=PEDIATRIC_EPA_ITEMS).groupby(names).sum()
+
+    epa_scores = df['EPA可信賴程度_數值'] if 'EPA可信賴程度_數值' in df.columns else None
+    meeting_cols = [c for c in MEETING_SCORE_COLS if c in df.columns]
+    meeting_values = df[meeting_cols].values if meeting_cols else None
+    levels = df['評核時級職'] if '評核時級職' in df.columns else None
+
+    all_status = {}
+    for name in residents:
+        idx = positions.get(name, no_rows)
+
+        if levels is not None:
+            lvs = levels.iloc[idx].dropna()
+            level = lvs.mode().iloc[0] if len(lvs) > 0 else '未知'
+        else:
+            level = '未知'
+
+        has_tech = bool(is_tech[idx].any())
+        skill_counts = (_skill_counts_from_totals(skill_totals.loc[name])
+                        if has_tech and '評核技術項目' in df.columns else {})
+
+        epa_idx = idx[epa_recent[idx]]
+        epa_avg = None
+        if len(epa_idx) > 0 and epa_scores is not None:
+            epa_avg = epa_scores.iloc[epa_idx].dropna().mean()
+            epa_avg = float(epa_avg) if pd.notna(epa_avg) else None
+        if len(epa_idx) > 0 and 'EPA項目' in df.columns:
+            epa_item_counts = {item: int(epa_item_totals.at[name, item]) for item in PEDIATRIC_EPA_ITEMS}
+        else:
+            epa_item_counts = {item: 0 for item in PEDIATRIC_EPA_ITEMS}
+
+        meeting_idx = idx[meeting_recent[idx]]
+        meeting_avg = None
+        if len(meeting_idx) > 0 and meeting_values is not None:
+            all_meeting_scores = meeting_values[meeting_idx].flatten()
+            valid = all_meeting_scores[~pd.isna(all_meeting_scores)]
+            meeting_avg = float(valid.mean()) if len(valid) > 0 else None
+
+        status = _assemble_resident_status(level, skill_counts, epa_avg, epa_item_counts,
+                                           meeting_avg, research_published_map.get(name, 0))
+        status['level'] = level
+        all_status[name] = status
+    return all_status
+
+# 達標判定會用到的欄位（快照指紋只涵蓋這些欄位，其他欄位變動不需重新計算）
+_STATUS_INPUT_COLUMNS = ['評核項目', '評核日期', '評核時級職', '評核技術項目', '可信賴程度_數值',
+                         'EPA項目', 'EPA項目_key', 'EPA可信賴程度_數值'] + MEETING_SCORE_COLS
+
+@lru_cache(maxsize=1)
+def _threshold_settings_hash():
+    """門檻設定的雜湊（門檻為程式碼常數，每個行程只計算一次），作為快照鍵的一部分"""
+    encoded = json.dumps(_threshold_settings_payload(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+def _resident_fingerprints(df, residents, research_published_map=None):
+    """
+    各住院醫師評核資料的指紋（達標判定輸入欄位的列雜湊 + 文章發表篇數）
+
+    列雜湊排序後再合併，與列順序無關；任一筆相關評核新增、修改或刪除時指紋即改變。
+
+    Returns:
+        dict: {姓名: 指紋字串}
+    """
+    research_published_map = research_published_map or {}
+    cols = [c for c in _STATUS_INPUT_COLUMNS if c in df.columns]
+    if cols and not df.empty and '受評核人員' in df.columns:
+        row_hashes = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+        positions = df.groupby('受評核人員', sort=False).indices
+    else:
+        row_hashes, positions = np.array([], dtype=np.uint64), {}
+    header = '|'.join(cols).encode('utf-8')
+    fingerprints = {}
+    for name in residents:
+        h = hashlib.sha1(header)
+        idx = positions.get(name)
+        if idx is not None:
+            h.update(np.sort(row_hashes[idx]).tobytes())
+        h.update(f"|research={research_published_map.get(name, 0)}".encode('utf-8'))
+        fingerprints[name] = h.hexdigest()
+    return fingerprints
+
+def ccc_snapshot_scope(data_source, department=None, include_demo=True):
+    """CCC 快照的資料範圍：資料來源、科別與是否包含展示資料各自保留快照"""
+    return f"{data_source}|{department or ''}|{'demo' if include_demo else 'no-demo'}"
+
+def calculate_cohort_status_snapshot(df, residents=None, research_published_map=None, store=None, as_of=None,
+                                     scope=''):
+    """
+    以快照加速的 calculate_cohort_status：只重新計算評核資料有變動的住院醫師
+
+    快照鍵為 (當天日期, 門檻設定雜湊, 資料範圍, 住院醫師, 級職)，並比對評核資料指紋；
+    需要重新計算的住院醫師只傳入其本人的評核資料。快照存放區無法使用時直接全部重新計算。
+
+    Args:
+        df, residents, research_published_map: 同 calculate_cohort_status
+        store (CCCSnapshotStore, optional): 快照存放區，預設 get_snapshot_store()
+        as_of (str, optional): 快照日期，預設今天（須與近半年視窗的基準日一致）
+        scope (str): 資料範圍（見 ccc_snapshot_scope）
+
+    Returns:
+        dict: {姓名: status_dict}，與 calculate_cohort_status 相同
+    """
+    if residents is None:
+        residents = sorted(df['受評核人員'].unique()) if '受評核人員' in df.columns else []
+    store = store if store is not None else get_snapshot_store()
+    if store is None:
+        return calculate_cohort_status(df, residents, research_published_map)
+
+    as_of = as_of or date.today().isoformat()
+    settings_hash = _threshold_settings_hash()
+    fingerprints = _resident_fingerprints(df, residents, research_published_map)
+    try:
+        cached = store.load(as_of, settings_hash, residents, scope=scope)
+    except Exception as e:
+        print(f"讀取 CCC 快照失敗: {str(e)}")
+        cached = {}
+
+    all_status = {}
+    stale = []
+    for name in residents:
+        snapshot = cached.get(name, {}).get(fingerprints[name])
+        if snapshot is None:
+            stale.append(name)
+        else:
+            all_status[name] = snapshot
+
+    if stale:
+        stale_df = df
+        if len(stale) < len(residents) and '受評核人員' in df.columns:
+            stale_df = df[df['受評核人員'].isin(stale)]
+        fresh = calculate_cohort_status(stale_df, stale, research_published_map)
+        all_status.update(fresh)
+        try:
+            store.save(as_of, settings_hash, [(name, fingerprints[name], fresh[name]) for name in fresh],
+                       scope=scope)
+        except Exception as e:
+            print(f"寫入 CCC 快照失敗: {str(e)}")
+    return {name: all_status[name] for name in residents if name in all_status}
+
+def _skill_membership(technical_items):
+    """
+    技能歸屬矩陣：第 i 列第 j 欄為「評核技術項目」第 i 筆是否包含第 j 項技能名稱
+    （欄位順序同 PEDIATRIC_SKILL_REQUIREMENTS，子字串比對）
+
+    Returns:
+        np.ndarray: shape = (筆數, 技能數) 的布林矩陣
+    """
+    codes, uniques = pd.factorize(technical_items.astype(str))
+    table = np.array([_skills_in_item(u) for u in uniques], dtype=bool)
+    return table.reshape(len(uniques), len(PEDIATRIC_SKILL_REQUIREMENTS))[codes]
+
+@lru_cache(maxsize=4096)
+def _skills_in_item(item_text):
+    """單一「評核技術項目」文字包含哪些技能（跨資料集與 rerun 共用的快取）"""
+    return tuple(skill in item_text for skill in PEDIATRIC_SKILL_REQUIREMENTS)
+
 def show_skill_progress(skill_counts, resident_name):
     """顯示技能進度條"""
     st.subheader("技能完成進度")
@@ -2888,7 +3124,7 @@ def show_research_progress_overview(conn, residents):
     """
     st.subheader("📚 住院醫師研究進度泳道圖")
 
-    STAGES = ['構思中', '撰寫中', '投稿中', '接受', '發表']
+    STAGES = RESEARCH_STAGES
     STAGE_POS = {s: i for i, s in enumerate(STAGES)}
     STAGE_COLORS = {
         '構思中': '#74B9FF',
@@ -2900,17 +3136,14 @@ def show_research_progress_overview(conn, residents):
     STATUS_EMOJI = {'構思中': '💡', '撰寫中': '✍️', '投稿中': '📤', '接受': '✅', '發表': '🏆'}
 
     try:
-        all_research = conn.fetch_research_progress()
+        research_summary = get_research_summary(conn)
+        all_research = research_summary['records']
         if not all_research:
             st.info("目前尚無住院醫師登記研究進度")
             return
 
         # 統計摘要
-        status_counts = {s: 0 for s in STAGES}
-        for rec in all_research:
-            s = rec.get('current_status', '構思中')
-            if s in status_counts:
-                status_counts[s] += 1
+        status_counts = research_summary['stage_counts']
 
         summary_cols = st.columns(len(STAGES))
         for i, s in enumerate(STAGES):
@@ -2919,10 +3152,7 @@ def show_research_progress_overview(conn, residents):
         st.markdown("---")
 
         # 整理每位住院醫師的研究項目
-        resident_papers = {}
-        for rec in all_research:
-            name = rec.get('resident_name', '未知')
-            resident_papers.setdefault(name, []).append(rec)
+        resident_papers = {name: agg['records'] for name, agg in research_summary['by_resident'].items()}
 
         sorted_residents = sorted(resident_papers.keys())
 
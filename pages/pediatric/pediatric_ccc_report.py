@@ -0,0 +1,354 @@
+"""
+CCC 會議批次報告：每位住院醫師一份報告（HTML 或 Excel）＋ 全體摘要
+
+達標判定在主行程以 calculate_cohort_status 一次算完，各住院醫師的圖表與表格
+再分散到 process pool 產生；報告以串流方式逐段寫檔（HTML 逐段寫入檔案、
+Excel 使用 openpyxl write-only 模式），不在記憶體中組出整份文件。
+
+可在沒有 Streamlit 的環境執行（見 scripts/export_ccc_reports.py）。
+
+使用方式：
+    from pages.pediatric.pediatric_ccc_report import export_ccc_reports
+    result = export_ccc_reports(processed_df, 'reports/2026-10', fmt='html')
+"""
+
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs_version
+
+from pages.pediatric.pediatric_analysis import (
+    CCC_MEETING_DIMS,
+    PEDIATRIC_EPA_ITEMS,
+    _epa_item_keys,
+    _filter_recent_6_months,
+    _status_label,
+    calculate_cohort_status,
+    calculate_skill_counts_by_resident,
+)
+
+REPORT_FORMATS = ('html', 'xlsx')
+SUMMARY_BASENAME = 'ccc_summary'
+
+# 報告中的評核紀錄欄位
+_RECORD_COLUMNS = {
+    'EPA': ['評核日期', '評核教師', 'EPA項目', 'EPA可信賴程度', 'EPA質性回饋'],
+    '操作技術': ['評核日期', '評核教師', '評核技術項目', '可信賴程度', '操作技術教師回饋'],
+    '會議報告': ['評核日期', '評核教師', '會議名稱', '會議報告教師回饋'],
+}
+
+
+def export_ccc_reports(df, output_dir, fmt='html', residents=None, research_published_map=None,
+                       workers=None):
+    """
+    產生所有住院醫師的 CCC 報告與全體摘要
+
+    Args:
+        df (pd.DataFrame): process_pediatric_data 處理後的完整資料
+        output_dir (str): 輸出目錄（不存在時建立）
+        fmt (str): 'html' 或 'xlsx'
+        residents (list, optional): 只產生這些住院醫師，預設全部
+        research_published_map (dict, optional): {姓名: 已接受/發表篇數}（R3 判定用）
+        workers (int, optional): process pool 大小，預設 CPU 數；1 表示在本行程依序產生
+
+    Returns:
+        dict: {'reports': {姓名: 檔案路徑}, 'summary': 摘要檔路徑}
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"不支援的報告格式：{fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+    if residents is None:
+        residents = sorted(df['受評核人員'].dropna().unique()) if '受評核人員' in df.columns else []
+
+    all_status = calculate_cohort_status(df, residents, research_published_map)
+    technical = df[df['評核項目'] == '操作技術'] if '評核項目' in df.columns else df.iloc[0:0]
+    skill_counts = calculate_skill_counts_by_resident(technical, residents)
+    as_of = date.today().isoformat()
+
+    by_resident = df.groupby('受評核人員', sort=False) if residents else None
+    tasks = []
+    used_names = {SUMMARY_BASENAME}
+    for name in residents:
+        resident_df = by_resident.get_group(name) if name in by_resident.groups else df.iloc[0:0]
+        path = os.path.join(output_dir, f"{_unique_filename(_safe_filename(name), used_names)}.{fmt}")
+        tasks.append((name, resident_df, all_status[name], skill_counts[name], path, fmt, as_of))
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        paths = [_write_resident_report(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            paths = list(pool.map(_write_resident_report, tasks, chunksize=chunksize))
+
+    reports = dict(zip(residents, paths))
+    summary_path = os.path.join(output_dir, f"{SUMMARY_BASENAME}.{fmt}")
+    rows = [_summary_row(name, all_status[name], reports[name], output_dir) for name in residents]
+    if fmt == 'html':
+        _write_summary_html(summary_path, rows, as_of)
+    else:
+        _write_summary_xlsx(summary_path, rows)
+    return {'reports': reports, 'summary': summary_path}
+
+
+def _safe_filename(name):
+    """住院醫師姓名轉為安全的檔名"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(name)).strip('_') or 'unnamed'
+
+
+def _unique_filename(base, used):
+    """檔名不重複：不同姓名轉成相同檔名（只差空白、/ 或大小寫）時加上 _2、_3… 後綴，避免互相覆寫"""
+    candidate, i = base, 2
+    while candidate.lower() in used:
+        candidate, i = f"{base}_{i}", i + 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _fmt_score(value, digits=2):
+    return f"{value:.{digits}f}" if value is not None else '—'
+
+
+def _summary_row(name, status, path, output_dir):
+    """全體摘要的一列"""
+    return {
+        '姓名': name,
+        '級職': status.get('level', '—'),
+        '整體': _status_label(status['overall']),
+        'EPA均分': _fmt_score(status['epa']['avg_score']),
+        'EPA': _status_label(status['epa']['status']),
+        '技能完成進度': f"{status['technical']['pass_rate']:.0f}%",
+        '技能': _status_label(status['technical']['status']),
+        '會議報告均分': _fmt_score(status['meeting']['avg_score']),
+        '會議報告': _status_label(status['meeting']['status']),
+        '文章發表': (_status_label(status['research']['status'])
+                   if status['research']['status'] is not None else '—'),
+        '報告': os.path.relpath(path, output_dir),
+    }
+
+
+# =============================================
+# 單一住院醫師報告（process pool 的工作單位）
+# =============================================
+
+def _resident_tables(resident_df, status, skill_counts):
+    """整理報告用的表格，回傳 [(標題, DataFrame)]"""
+    th = status['thresholds']
+    summary = pd.DataFrame([
+        {'維度': 'EPA 均分（近半年）', '數值': _fmt_score(status['epa']['avg_score']),
+         '門檻': f"≥ {th['score_threshold']}，各項 ≥ {status['epa']['item_min']} 次",
+         '狀態': _status_label(status['epa']['status'])},
+        {'維度': '技能完成進度', '數值': f"{status['technical']['pass_rate']:.0f}%",
+         '門檻': f"≥ {th['skill_pass_rate']}%", '狀態': _status_label(status['technical']['status'])},
+        {'維度': '會議報告均分（近半年）', '數值': _fmt_score(status['meeting']['avg_score']),
+         '門檻': f"≥ {th['score_threshold']}", '狀態': _status_label(status['meeting']['status'])},
+    ])
+    if status['research']['status'] is not None:
+        summary.loc[len(summary)] = ['文章發表', f"{status['research']['published_count']} 篇", '≥ 1 篇',
+                                     _status_label(status['research']['status'])]
+
+    epa_items = pd.DataFrame([{'EPA 項目': item, '近半年次數': cnt}
+                              for item, cnt in status['epa']['item_counts'].items()])
+    skills = pd.DataFrame([{'技能': skill, '完成次數': d['completed'], '最低要求': d['required'],
+                            '進度 (%)': round(d['progress'], 1)}
+                           for skill, d in skill_counts.items()]) if skill_counts else pd.DataFrame()
+
+    tables = [('達標摘要', summary), ('EPA 各項目次數', epa_items), ('技能完成次數', skills)]
+    item_col = resident_df['評核項目'].astype(str) if '評核項目' in resident_df.columns else None
+    for kind, cols in _RECORD_COLUMNS.items():
+        if item_col is None:
+            break
+        records = resident_df[item_col.str.contains(kind, na=False)]
+        avail = [c for c in cols if c in records.columns]
+        if avail and not records.empty:
+            records = records[avail]
+            if '評核日期' in avail:
+                records = records.sort_values('評核日期', ascending=False)
+            tables.append((f"{kind} 評核紀錄", records))
+    return tables
+
+
+def _resident_figures(resident_df, skill_counts, status):
+    """報告用的 Plotly 圖表，回傳 [(標題, Figure)]"""
+    figures = []
+    threshold = status['thresholds']['score_threshold']
+
+    # EPA 各項目月均分（近半年）
+    epa = resident_df[resident_df['評核項目'].astype(str).str.contains('EPA', na=False)] \
+        if '評核項目' in resident_df.columns else resident_df.iloc[0:0]
+    epa = _filter_recent_6_months(epa)
+    if not epa.empty and 'EPA可信賴程度_數值' in epa.columns:
+        months = pd.to_datetime(epa['評核日期'], errors='coerce').dt.to_period('M').astype(str)
+        monthly = epa.assign(年月=months, 項目=_epa_item_keys(epa)).dropna(subset=['項目']) \
+            .groupby(['項目', '年月'])['EPA可信賴程度_數值'].mean()
+        if not monthly.empty:
+            fig = go.Figure()
+            for item in PEDIATRIC_EPA_ITEMS:
+                if item in monthly.index.get_level_values(0):
+                    series = monthly.loc[item].sort_index()
+                    fig.add_trace(go.Scatter(x=series.index, y=series.values, mode='lines+markers', name=item))
+            fig.add_hline(y=threshold, line_dash='dot', line_color='#c0392b')
+            fig.update_layout(height=360, yaxis=dict(range=[0, 5.5], title='EPA 月均分'))
+            figures.append(('EPA 月度趨勢（近半年）', fig))
+
+    # 技能完成次數 vs 最低要求
+    if skill_counts:
+        skills = list(skill_counts)
+        fig = go.Figure()
+        fig.add_trace(go.Bar(y=skills, x=[skill_counts[s]['required'] for s in skills],
+                             orientation='h', name='最低要求', marker_color='#dfe6e9'))
+        fig.add_trace(go.Bar(y=skills, x=[skill_counts[s]['completed'] for s in skills],
+                             orientation='h', name='完成次數', marker_color='#4A90D9'))
+        fig.update_layout(barmode='overlay', height=max(300, 28 * len(skills)),
+                          yaxis=dict(autorange='reversed'))
+        figures.append(('技能完成次數', fig))
+
+    # 會議報告各維度均分（近半年）
+    meeting = _filter_recent_6_months(
+        resident_df[resident_df['評核項目'].astype(str).str.contains('會議報告', na=False)]
+        if '評核項目' in resident_df.columns
+        else resident_df.iloc[0:0]
+    )
+    dims = [(col, lbl) for col, _, lbl in CCC_MEETING_DIMS if col in meeting.columns]
+    if not meeting.empty and dims:
+        means = meeting[[col for col, _ in dims]].mean()
+        if means.notna().any():
+            fig = go.Figure(go.Bar(x=[lbl for _, lbl in dims], y=means.values, marker_color='#F5A623'))
+            fig.add_hline(y=threshold, line_dash='dot', line_color='#c0392b')
+            fig.update_layout(height=320, yaxis=dict(range=[0, 5.5], title='均分'))
+            figures.append(('會議報告各維度均分（近半年）', fig))
+    return figures
+
+
+def _write_resident_report(task):
+    """產生一位住院醫師的報告，回傳檔案路徑"""
+    name, resident_df, status, skill_counts, path, fmt, as_of = task
+    tables = _resident_tables(resident_df, status, skill_counts)
+    if fmt == 'html':
+        figures = _resident_figures(resident_df, skill_counts, status)
+        _write_resident_html(path, name, status, tables, figures, as_of)
+    else:
+        _write_resident_xlsx(path, tables)
+    return path
+
+
+# =============================================
+# HTML（逐段寫入檔案）
+# =============================================
+
+_HTML_STYLE = """
+body { font-family: -apple-system, "Noto Sans TC", "Microsoft JhengHei", sans-serif; margin: 24px; color: #2c3e50; }
+table { border-collapse: collapse; margin: 8px 0 24px; font-size: 14px; }
+th, td { border: 1px solid #dfe6e9; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f5f6fa; }
+h1 { margin-bottom: 4px; }
+"""
+
+
+def _html_head(out, title):
+    out.write('<!DOCTYPE html>\n<html lang="zh-Hant">\n<head>\n<meta charset="utf-8">\n')
+    out.write(f'<title>{html.escape(title)}</title>\n<style>{_HTML_STYLE}</style>\n')
+    out.write(f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>\n')
+    out.write('</head>\n<body>\n')
+
+
+def _write_resident_html(path, name, status, tables, figures, as_of):
+    with open(path, 'w', encoding='utf-8') as out:
+        _html_head(out, f"{name} — CCC 報告")
+        out.write(f"<h1>{html.escape(str(name))}</h1>\n")
+        out.write(f"<p>級職：{html.escape(str(status.get('level', '—')))}　"
+                  f"整體：<b>{_status_label(status['overall'])}</b>　報告日期：{as_of}</p>\n")
+        for title, table in tables[:3]:
+            out.write(f"<h2>{html.escape(title)}</h2>\n")
+            out.write(table.to_html(index=False, border=0) if not table.empty else '<p>無資料</p>')
+            out.write('\n')
+        for title, fig in figures:
+            out.write(f"<h2>{html.escape(title)}</h2>\n")
+            out.write(fig.to_html(full_html=False, include_plotlyjs=False))
+            out.write('\n')
+        for title, table in tables[3:]:
+            out.write(f"<h2>{html.escape(title)}</h2>\n")
+            out.write(table.to_html(index=False, border=0, na_rep=''))
+            out.write('\n')
+        out.write('</body>\n</html>\n')
+
+
+def _write_summary_html(path, rows, as_of):
+    with open(path, 'w', encoding='utf-8') as out:
+        _html_head(out, 'CCC 全體摘要')
+        out.write(f"<h1>CCC 全體摘要</h1>\n<p>報告日期：{as_of}　共 {len(rows)} 位住院醫師</p>\n")
+        if rows:
+            out.write('<table>\n<tr>' + ''.join(f'<th>{html.escape(c)}</th>' for c in rows[0]) + '</tr>\n')
+            for row in rows:
+                cells = [html.escape(str(v)) for k, v in row.items() if k != '報告']
+                link = html.escape(row['報告'])
+                out.write('<tr>' + ''.join(f'<td>{c}</td>' for c in cells)
+                          + f'<td><a href="{link}">{link}</a></td></tr>\n')
+            out.write('</table>\n')
+        else:
+            out.write('<p>無資料</p>\n')
+        out.write('</body>\n</html>\n')
+
+
+# =============================================
+# Excel（openpyxl write-only，逐列寫入）
+# =============================================
+
+def _excel_sheet_title(title, used):
+    """Excel 工作表名稱：去除不允許字元、限 31 字且不重複"""
+    base = re.sub(r'[\[\]:*?/\\]', '_', title)[:31] or 'Sheet'
+    candidate, i = base, 2
+    while candidate in used:
+        suffix = f"_{i}"
+        candidate, i = base[:31 - len(suffix)] + suffix, i + 1
+    used.add(candidate)
+    return candidate
+
+
+def _excel_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, 'item'):  # numpy 純量
+        return value.item()
+    return value if isinstance(value, (int, float, str, date)) else str(value)
+
+
+def _write_resident_xlsx(path, tables):
+    from openpyxl import Workbook
+    from openpyxl.chart import BarChart, Reference
+
+    wb = Workbook(write_only=True)
+    used = set()
+    for title, table in tables:
+        ws = wb.create_sheet(_excel_sheet_title(title, used))
+        ws.append(list(table.columns))
+        for row in table.itertuples(index=False, name=None):
+            ws.append([_excel_value(v) for v in row])
+        if title == '技能完成次數' and not table.empty:
+            # 完成次數 vs 最低要求（Excel 原生長條圖）
+            chart = BarChart()
+            chart.type = 'bar'
+            chart.title = title
+            chart.height = max(7.5, 0.5 * len(table))
+            data = Reference(ws, min_col=2, max_col=3, min_row=1, max_row=len(table) + 1)
+            chart.add_data(data, titles_from_data=True)
+            chart.set_categories(Reference(ws, min_col=1, min_row=2, max_row=len(table) + 1))
+            ws.add_chart(chart, 'F2')
+    wb.save(path)
+
+
+def _write_summary_xlsx(path, rows):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('CCC 全體摘要')
+    if rows:
+        ws.append(list(rows[0]))
+        for row in rows:
+            ws.append([_excel_value(v) for v in row.values()])
+    wb.save(path)
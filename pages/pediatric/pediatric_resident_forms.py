@@ -167,7 +167,7 @@ def _show_my_research_list(supabase_conn, resident_name):
     """顯示住院醫師的研究清單（可編輯/刪除）"""
     try:
         records = supabase_conn.fetch_research_progress(
-            filters={'resident_name': resident_name}
+            filters={'resident_name': resident_name}, columns='summary'
         )
         if not records:
             st.info("尚無研究記錄")
@@ -323,7 +323,7 @@ def _show_my_reflection_list(supabase_conn, resident_name):
     """顯示住院醫師最近的反思記錄"""
     try:
         records = supabase_conn.fetch_learning_reflections(
-            filters={'resident_name': resident_name, 'include_private': True}
+            filters={'resident_name': resident_name, 'include_private': True}, columns='list'
         )
         if not records:
             st.info("尚無反思記錄")
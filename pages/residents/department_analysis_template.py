@@ -22,10 +22,10 @@ from modules.visualization.unified_radar import UnifiedRadarVisualization
 # ─── 共用工具 ───────────────────────────────────────────
 
 def _get_supabase_conn():
-    """取得 Supabase 連線（懶載入）"""
+    """取得行程共用的 Supabase 連線（懶載入）"""
     try:
-        from modules.supabase_connection import SupabaseConnection
-        return SupabaseConnection()
+        from modules.supabase_connection import get_shared_connection
+        return get_shared_connection()
     except Exception:
         return None
 
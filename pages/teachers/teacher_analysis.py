@@ -5,23 +5,14 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from io import BytesIO
 import re
-from google.oauth2.service_account import Credentials
-import gspread
 import json
 from scipy import stats
 from modules.data_processing import process_epa_level
+from modules.google_connection import fetch_google_worksheets, get_google_client
 
 # 預設 Google 試算表連結
 DEFAULT_SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1VZRYRrsSMNUKoWM32gc5D9FykCHm7IRgcmR1_qXx8_w/edit?resourcekey=&gid=1986457679#gid=1986457679"
 
-def extract_spreadsheet_id(url):
-    """從 Google 試算表 URL 中提取 spreadsheet ID"""
-    # 正則表達式匹配 spreadsheet ID
-    match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
-    if match:
-        return match.group(1)
-    return None
-
 def extract_gid(url):
     """從 Google 試算表 URL 中提取 gid"""
     # 正則表達式匹配 gid
@@ -55,9 +46,8 @@ def setup_google_connection():
                 'https://www.googleapis.com/auth/drive'
             ]
             
-            # 建立認證
-            creds = Credentials.from_service_account_info(credentials, scopes=scope)
-            client = gspread.authorize(creds)
+            # 建立認證（同一組憑證共用已授權的用戶端）
+            client = get_google_client(credentials, scopes=scope)
             
             return client
         else:
@@ -81,9 +71,8 @@ def setup_google_connection():
                 # 從憑證建立連接
                 credentials_dict = json.loads(credentials_json)
                 
-                # 建立認證
-                creds = Credentials.from_service_account_info(credentials_dict, scopes=scope)
-                client = gspread.authorize(creds)
+                # 建立認證（同一組憑證共用已授權的用戶端）
+                client = get_google_client(credentials_dict, scopes=scope)
                 
                 # 儲存到 session state 以便後續使用
                 st.session_state.google_credentials = credentials_dict
@@ -101,61 +90,6 @@ def setup_google_connection():
         st.error(f"連接 Google API 時發生錯誤：{str(e)}")
         return None
 
-def fetch_google_form_data(spreadsheet_url=None, selected_sheet_title=None):
-    """從 Google 表單獲取評核資料"""
-    try:
-        # 如果沒有提供 URL，使用預設 URL
-        if not spreadsheet_url:
-            spreadsheet_url = DEFAULT_SPREADSHEET_URL
-        
-        client = setup_google_connection()
-        if client is None:
-            return None, None
-        
-        # 從 URL 提取 spreadsheet ID
-        spreadsheet_id = extract_spreadsheet_id(spreadsheet_url)
-        if not spreadsheet_id:
-            st.error("無法從 URL 提取 spreadsheet ID，請檢查 URL 格式")
-            return None, None
-        
-        # 開啟指定的 Google 試算表
-        try:
-            spreadsheet = client.open_by_key(spreadsheet_id)
-        except Exception as e:
-            st.error(f"無法開啟試算表：{str(e)}")
-            st.info("請確保您的 Google API 服務帳號有權限訪問此試算表。您需要在試算表的共享設定中添加服務帳號的電子郵件地址。")
-            return None, None
-        
-        # 獲取所有工作表
-        all_worksheets = spreadsheet.worksheets()
-        sheet_titles = [sheet.title for sheet in all_worksheets]
-        
-        # 如果沒有提供工作表標題，則返回工作表標題列表供選擇
-        if not selected_sheet_title:
-            return None, sheet_titles
-        
-        # 使用提供的工作表標題
-        try:
-            worksheet = spreadsheet.worksheet(selected_sheet_title)
-        except Exception as e:
-            st.error(f"無法開啟工作表 {selected_sheet_title}：{str(e)}")
-            return None, sheet_titles
-        
-        # 獲取所有資料
-        data = worksheet.get_all_records()
-        
-        if not data:
-            st.warning("試算表中沒有資料或資料格式不正確")
-            return None, sheet_titles
-        
-        # 轉換為 DataFrame
-        df = pd.DataFrame(data)
-        
-        return df, sheet_titles
-    except Exception as e:
-        st.error(f"獲取 Google 表單資料時發生錯誤：{str(e)}")
-        return None, None
-
 def process_epa_form_data(df):
     """處理 EPA 表單資料的函數"""
     # 2. 創建一個資料副本進行轉換
@@ -585,8 +519,12 @@ def show_teacher_analysis_section():
     # 設定 Google Sheet URL
     sheet_url = DEFAULT_SPREADSHEET_URL
     
-    # 自動獲取工作表列表
-    df, sheet_titles = fetch_google_form_data(sheet_url)
+    # 憑證來自 Secrets 或上傳的憑證檔（見 setup_google_connection）
+    client = setup_google_connection()
+
+    # 取得工作表列表並載入第一個工作表（一次開啟試算表）
+    frames, sheet_titles = (fetch_google_worksheets(sheet_url, worksheets=[0], client=client)
+                            if client is not None else (None, None))
     
     if sheet_titles:
         # 自動選擇第一個工作表
@@ -594,7 +532,10 @@ def show_teacher_analysis_section():
         
         if selected_sheet:
             # 自動載入資料
-            df, _ = fetch_google_form_data(sheet_url, selected_sheet)
+            df = frames.get(selected_sheet)
+            if df is not None and df.empty:
+                st.warning("試算表中沒有資料或資料格式不正確")
+                df = None
             if df is not None:
                 st.session_state.teacher_analysis_data = df
                 
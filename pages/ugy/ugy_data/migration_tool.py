@@ -1,6 +1,6 @@
 # migration_tool.py
 import pandas as pd
-from modules.google_connection import fetch_google_form_data
+from modules.google_connection import fetch_google_worksheets
 from supabase import create_client
 import os
 from dotenv import load_dotenv
@@ -17,11 +17,14 @@ def migrate_to_supabase():
         # 建立 Supabase 連線
         supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
         
-        # 載入 EPA 評核資料
-        st.write("正在載入 EPA 評核資料...")
-        epa_df, _ = fetch_google_form_data()
+        # 一次載入 EPA 評核資料（第一個工作表）與訓練科部資料
+        st.write("正在載入 EPA 評核資料與訓練科部資料...")
+        sheets, sheet_titles = fetch_google_worksheets(worksheets=[0, "訓練科部"])
+        sheets = sheets or {}
+        epa_df = sheets.get(sheet_titles[0]) if sheet_titles else None
+        dept_df = sheets.get("訓練科部")
         
-        if epa_df is not None:
+        if epa_df is not None and not epa_df.empty:
             # 重命名欄位
             column_mapping = {
                 '時間戳記': 'timestamp',
@@ -62,11 +65,8 @@ def migrate_to_supabase():
             
             st.success("EPA 評核資料遷移完成！")
         
-        # 載入訓練科部資料
-        st.write("正在載入訓練科部資料...")
-        dept_df, _ = fetch_google_form_data(sheet_title="訓練科部")
-        
-        if dept_df is not None:
+        # 訓練科部資料
+        if dept_df is not None and not dept_df.empty:
             # 重命名欄位
             dept_mapping = {
                 '學號': 'student_id',
@@ -9,7 +9,7 @@ import streamlit as st
 from datetime import datetime
 
 from config.epa_constants import EPA_LEVEL_MAPPING
-from modules.data_processing import convert_date_to_batch
+from modules.data_processing import dates_to_batches
 
 # ═══════════════════════════════════════════════════════
 # 快取 Key
@@ -25,8 +25,8 @@ _COMPAT_KEY = 'processed_df'  # 向後相容
 def fetch_supabase_records() -> pd.DataFrame | None:
     """從 Supabase ugy_epa_records 取得系統內 EPA 評核紀錄"""
     try:
-        from modules.supabase_connection import SupabaseConnection
-        conn = SupabaseConnection()
+        from modules.supabase_connection import get_shared_connection
+        conn = get_shared_connection()
         result = conn.client.table('ugy_epa_records').select('*').order(
             '時間戳記', desc=True
         ).execute()
@@ -38,10 +38,10 @@ def fetch_supabase_records() -> pd.DataFrame | None:
 
 
 def fetch_google_sheet_data(sheet_title=None) -> pd.DataFrame | None:
-    """從 Google Sheets 取得 EPA 評核資料"""
+    """從 Google Sheets 取得 EPA 評核資料（增量讀取：只抓上次之後新增的列）"""
     try:
         from modules.google_connection import fetch_google_form_data
-        df, _ = fetch_google_form_data(sheet_title=sheet_title)
+        df, _ = fetch_google_form_data(sheet_title=sheet_title, incremental=True)
         return df
     except Exception:
         return None
@@ -50,8 +50,8 @@ def fetch_google_sheet_data(sheet_title=None) -> pd.DataFrame | None:
 def _build_student_id_map() -> dict:
     """從 Supabase 學生名冊建立 姓名→學號 對照表"""
     try:
-        from modules.supabase_connection import SupabaseConnection
-        conn = SupabaseConnection()
+        from modules.supabase_connection import get_shared_connection
+        conn = get_shared_connection()
         result = conn.client.table('pediatric_users').select(
             'username, full_name'
         ).eq('user_type', 'student').eq('is_active', True).execute()
@@ -159,21 +159,17 @@ def process_epa_data(df: pd.DataFrame, filter_teacher: bool = True) -> pd.DataFr
         has_timestamp = '時間戳記' in df.columns
 
         if has_eval_date or has_timestamp:
-            def _pick_date(row):
-                """優先取 evaluation_date，無值時取時間戳記"""
-                if has_eval_date:
-                    v = row.get('evaluation_date')
-                    if pd.notna(v) and str(v).strip() not in ('', 'None', 'nan', 'NaT'):
-                        return str(v)
-                if has_timestamp:
-                    v = row.get('時間戳記')
-                    if pd.notna(v) and str(v).strip() not in ('', 'None', 'nan', 'NaT'):
-                        return str(v)
-                return ''
-
-            df.loc[mask_no_batch, '梯次'] = (
-                df.loc[mask_no_batch].apply(_pick_date, axis=1).apply(convert_date_to_batch)
-            )
+            # 優先取 evaluation_date，無值時取時間戳記
+            picked = pd.Series(None, index=df.index[mask_no_batch], dtype=object)
+            for col, present in (('時間戳記', has_timestamp), ('evaluation_date', has_eval_date)):
+                if not present:
+                    continue
+                v = df.loc[mask_no_batch, col]
+                text = v.astype(str)
+                usable = v.notna() & ~text.str.strip().isin(['', 'None', 'nan', 'NaT'])
+                picked = text.where(usable, picked)
+
+            df.loc[mask_no_batch, '梯次'] = dates_to_batches(picked.fillna(''))
 
     # ── 階層清理 ──
     if '階層' in df.columns:
@@ -12,6 +12,7 @@ import streamlit as st
 import pandas as pd
 from datetime import date, datetime
 from config.epa_constants import EPA_LEVEL_MAPPING
+from modules.dataset_cache import bump_dataset_version
 from modules.voice_input import (
     _transcribe_audio, _refine_with_gpt,
     _check_role, _remaining_quota,
@@ -20,8 +21,8 @@ from modules.voice_input import (
 
 
 def _get_supabase_conn():
-    from modules.supabase_connection import SupabaseConnection
-    return SupabaseConnection()
+    from modules.supabase_connection import get_shared_connection
+    return get_shared_connection()
 
 
 # ═══════════════════════════════════════════════════════
@@ -91,6 +92,7 @@ def _submit_ugy_epa(data):
                 'submitted_by': data.get('教師'),
             }
             result = conn.client.table('pediatric_evaluations').insert(fallback_data).execute()
+            bump_dataset_version('pediatric_evaluations')
             return result.data[0] if result.data else None
         except Exception as e2:
             st.error(f"提交失敗：{str(e2)}")
@@ -17,8 +17,8 @@ from config.epa_constants import EPA_LEVEL_MAPPING
 
 
 def _get_supabase_conn():
-    from modules.supabase_connection import SupabaseConnection
-    return SupabaseConnection()
+    from modules.supabase_connection import get_shared_connection
+    return get_shared_connection()
 
 
 def _fetch_student_epa_records(student_name):
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+基準測試：批次寫入 — 逐筆 upsert vs bulk_write（依序 / 多批同時進行）
+
+以 FakeSupabaseClient 模擬每次請求的網路往返（預設 30 ms），寫入合成的使用者資料。
+
+用法：
+    python scripts/bench_bulk_write.py [筆數] [每次請求延遲毫秒]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from fake_supabase import FakeSupabaseClient, make_connection
+import modules.supabase_connection  # noqa: F401  先載入，避免計入第一次量測
+
+
+def _rows(n):
+    return [{'username': f'user{i:05d}', 'full_name': f'使用者{i}', 'user_type': 'resident'} for i in range(n)]
+
+
+def _latency_client(latency):
+    client = FakeSupabaseClient()
+    client.fail_when = lambda *args: time.sleep(latency)
+    return client
+
+
+def per_row(records, latency):
+    """舊的 batch_upsert_users：每筆一次 upsert"""
+    client = _latency_client(latency)
+    for rec in records:
+        client.table('pediatric_users').upsert(rec, on_conflict='username').execute()
+    return len(client.calls)
+
+
+def bulk(records, latency, max_in_flight):
+    client = _latency_client(latency)
+    result = make_connection(client).bulk_write('pediatric_users', records, on_conflict='username',
+                                                max_in_flight=max_in_flight)
+    assert result.ok
+    return len(client.calls)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 30) / 1000
+    records = _rows(n_rows)
+
+    print(f"{n_rows} 筆，每次請求延遲 {latency * 1000:.0f} ms\n")
+    print(f"{'做法':<28}{'請求數':>8}{'耗時 (s)':>10}")
+    for label, fn in [
+        ('逐筆 upsert', lambda: per_row(records, latency)),
+        ('bulk_write（依序）', lambda: bulk(records, latency, 1)),
+        ('bulk_write（4 批同時）', lambda: bulk(records, latency, 4)),
+    ]:
+        t0 = time.perf_counter()
+        requests = fn()
+        print(f"{label:<28}{requests:>8}{time.perf_counter() - t0:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
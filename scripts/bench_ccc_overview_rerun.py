@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+基準測試：CCC 總覽頁面的 rerun 延遲（Streamlit AppTest，無需瀏覽器）
+
+以測試資料（pages/pediatric/test_data_pediatric_evaluations.csv）放大成多位住院醫師、日期平移到近期，
+執行 show_ccc_overview 一次暖機後，量測之後每次 rerun 的耗時。
+
+用法：
+    python scripts/bench_ccc_overview_rerun.py [重複次數] [放大倍數]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+
+def _app():
+    """AppTest 腳本：以放大後的測試資料取代 load_pediatric_data，執行 CCC 總覽"""
+    import os
+    import sys
+
+    import pandas as pd
+    import streamlit as st
+
+    sys.path.insert(0, st.session_state['_bench_root'])
+    from pages.pediatric import pediatric_analysis as pa
+
+    if '_bench_df' not in st.session_state:
+        raw = pd.read_csv(os.path.join(st.session_state['_bench_root'],
+                                       'pages/pediatric/test_data_pediatric_evaluations.csv'),
+                          encoding='utf-8-sig')
+        copies = []
+        for i in range(st.session_state['_bench_scale']):
+            part = raw.copy()
+            part['受評核人員'] = part['受評核人員'].astype(str) + f'-{i:02d}'
+            copies.append(part)
+        processed = pa.process_pediatric_data(pd.concat(copies, ignore_index=True))
+        # 測試資料日期較舊：整體平移到今天，讓近半年的 EPA／會議報告圖表都有資料
+        dates = pd.to_datetime(processed['評核日期'], errors='coerce')
+        processed['評核日期'] = (dates + (pd.Timestamp.today().normalize() - dates.max())).dt.date
+        st.session_state['_bench_df'] = processed
+
+    df = st.session_state['_bench_df']
+    pa.load_pediatric_data = lambda department=None: (df.copy(), ['測試資料'])
+    pa._get_data_reader = lambda: None
+    pa.show_ccc_overview()
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    at = AppTest.from_function(_app, default_timeout=120)
+    at.session_state['_bench_root'] = ROOT
+    at.session_state['_bench_scale'] = scale
+    at.session_state['role'] = 'admin'
+    at.session_state['pediatric_data_source'] = 'test'
+    at.run()  # 暖機：載入並處理資料
+    if at.exception:
+        raise SystemExit(at.exception)
+
+    n_residents = at.session_state['_bench_df']['受評核人員'].nunique()
+    n_rows = len(at.session_state['_bench_df'])
+    print(f"{n_residents} 位住院醫師 × {n_rows} 筆評核，每個視圖 rerun {repeat} 次\n")
+    print(f"{'視圖':<12}{'圖表數':>8}{'中位數 (ms)':>14}{'最小 (ms)':>12}")
+
+    # 主視圖導覽（ccc_overview_section）逐一切換；不存在時（st.tabs 版本）只量測一次
+    sections = [0, 1, 2] if 'ccc_overview_section' in at.session_state else [None]
+    for section in sections:
+        if section is not None:
+            at.session_state['ccc_overview_section'] = section
+            at.run()
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            at.run()
+            timings.append(time.perf_counter() - t0)
+        label = '全部分頁' if section is None else ['EPA 趨勢', '技能完成度', '會議報告'][section]
+        print(f"{label:<12}{len(at.get('plotly_chart')):>8}"
+              f"{statistics.median(timings) * 1000:>14.0f}{min(timings) * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+基準測試：CCC 總覽達標判定 — 逐人 calculate_resident_status vs calculate_cohort_status
+
+合成資料與 tests/test_pediatric_cohort_status.py 相同（process_pediatric_data 輸出形狀），
+並確認兩種算法結果完全一致。
+
+用法：
+    python scripts/bench_cohort_status.py [筆數] [住院醫師人數]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from test_pediatric_cohort_status import make_processed_df
+from pages.pediatric.pediatric_analysis import (
+    _get_resident_level,
+    calculate_cohort_status,
+    calculate_resident_status,
+)
+
+
+def per_resident(df):
+    """show_ccc_overview 原本的逐人迴圈"""
+    all_status = {}
+    for name in sorted(df['受評核人員'].unique()):
+        level = _get_resident_level(df, name)
+        all_status[name] = calculate_resident_status(df[df['受評核人員'] == name], df,
+                                                     resident_level=level)
+        all_status[name]['level'] = level
+    return all_status
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_residents = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    df = make_processed_df(n_rows, n_residents)
+
+    t_loop, expected = best_of(lambda: per_resident(df))
+    t_cohort, actual = best_of(lambda: calculate_cohort_status(df))
+    assert actual == expected, "calculate_cohort_status 與逐人計算結果不一致"
+
+    print(f"{n_residents} 位住院醫師 × {n_rows} 筆評核（結果一致）\n")
+    print(f"{'算法':<24}{'耗時 (ms)':>12}")
+    print(f"{'逐人 calculate_resident_status':<24}{t_loop * 1000:>12.1f}")
+    print(f"{'calculate_cohort_status':<24}{t_cohort * 1000:>12.1f}")
+    print(f"\n加速：{t_loop / t_cohort:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
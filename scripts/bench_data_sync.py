@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+基準測試：EPA 評核資料同步 — 逐筆 insert vs 批次冪等 upsert
+
+合成資料與 tests/test_data_sync.py 相同，寫入 FakeSupabaseClient（記憶體，不含網路延遲），
+比較請求次數與耗時；實際環境每次請求另需一次網路往返（約 50–200 ms）。
+
+用法：
+    python scripts/bench_data_sync.py [筆數]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from test_data_sync import CountingClient, make_form_df
+from modules.utils.data_sync import (
+    EPA_COLUMN_MAPPING,
+    EPA_SYNC_TABLE,
+    sync_epa_evaluations,
+)
+
+
+def _legacy_convert_tw_time(time_str):
+    """舊做法的逐筆時間轉換（上午/下午 → AM/PM）"""
+    try:
+        if pd.isna(time_str):
+            return None
+        time_str = time_str.replace('上午', 'AM').replace('下午', 'PM')
+        return pd.to_datetime(time_str, format='%Y/%m/%d %p %I:%M:%S')
+    except Exception:
+        return None
+
+
+def _legacy_sanitize_float(value):
+    """舊做法的逐筆數值轉換（NaN、無限大為 None）"""
+    try:
+        float_val = float(value)
+    except (TypeError, ValueError):
+        return None
+    if pd.isna(float_val) or float_val in (float('inf'), float('-inf')):
+        return None
+    return float_val
+
+
+def legacy_sync(client, epa_df):
+    """舊做法：逐列轉換時間與數值，每筆資料一次 insert；回傳請求次數"""
+    df = epa_df.rename(columns=EPA_COLUMN_MAPPING)
+    df['timestamp'] = df['timestamp'].apply(_legacy_convert_tw_time)
+    df['self_evaluation'] = df['self_evaluation'].apply(_legacy_sanitize_float)
+    df['teacher_evaluation'] = df['teacher_evaluation'].apply(_legacy_sanitize_float)
+    df['timestamp'] = pd.to_datetime(df['timestamp']).dt.tz_localize('Asia/Taipei').dt.strftime('%Y-%m-%dT%H:%M:%S%z')
+    df['student_id'] = df['student_id'].astype(str)
+    df = df.replace({pd.NA: None, pd.NaT: None, float('nan'): None})
+    requests = 0
+    for record in df.to_dict('records'):
+        client.table(EPA_SYNC_TABLE).insert(record).execute()
+        requests += 1
+    return requests
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    df = make_form_df(n_rows)
+
+    t0 = time.perf_counter()
+    legacy_requests = legacy_sync(FakeSupabaseClient(), df)
+    t_legacy = time.perf_counter() - t0
+
+    client = CountingClient()
+    t0 = time.perf_counter()
+    first = sync_epa_evaluations(make_connection(client), df)
+    t_first = time.perf_counter() - t0
+    first_requests = client.upserts
+
+    client.calls.clear()
+    t0 = time.perf_counter()
+    again = sync_epa_evaluations(make_connection(client), df)
+    t_again = time.perf_counter() - t0
+
+    print(f"{n_rows} 筆 EPA 評核")
+    print(f"{'做法':<28}{'寫入請求':>10}{'時間 (ms)':>12}")
+    print(f"{'逐筆 insert':<28}{legacy_requests:>10}{t_legacy * 1000:>12.1f}")
+    print(f"{'批次 upsert（首次）':<28}{first_requests:>10}{t_first * 1000:>12.1f}  新增 {first['inserted']}")
+    print(f"{'批次 upsert（重跑）':<28}{client.upserts:>10}{t_again * 1000:>12.1f}  略過 {again['skipped']}")
+
+
+if __name__ == '__main__':
+    main()
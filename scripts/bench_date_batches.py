@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+基準測試：評核日期 → 梯次 — 逐列 convert_date_to_batch vs 整欄 dates_to_batches
+
+合成資料與 tests/test_ugy_date_batches.py 相同（約 1% 其他格式與空值），
+並確認兩種做法的梯次名稱一致。
+
+用法：
+    python scripts/bench_date_batches.py [筆數]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from test_ugy_date_batches import _reference_batches, make_dates
+from modules.data_processing import dates_to_batches
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    values = make_dates(n_rows)
+
+    t_loop, expected = best_of(lambda: _reference_batches(values), repeat=1)
+    t_vec, batches = best_of(lambda: dates_to_batches(values))
+    assert batches.equals(expected), "梯次結果不一致"
+
+    print(f"{n_rows} 筆評核日期（結果一致，{batches.nunique()} 個梯次）\n")
+    print(f"{'做法':<28}{'耗時 (ms)':>12}")
+    print(f"{'逐列 convert_date_to_batch':<28}{t_loop * 1000:>12.1f}")
+    print(f"{'dates_to_batches':<28}{t_vec * 1000:>12.1f}")
+    print(f"\n加速：{t_loop / t_vec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+基準測試：每次載入 Google 試算表前的認證成本 — 每次重新授權 vs 共用 gspread 用戶端
+
+分段計時（每次載入）：
+- credentials：建立 service_account.Credentials（解析私鑰）
+- authorize：gspread.authorize（建立 AuthorizedSession / 連線池）
+- token：新 Credentials 第一次請求前須取得存取權杖（離線只計 JWT 簽章，不含 token 端點往返）
+- probe：test_connection（list_spreadsheet_files，一次 Drive API 往返）
+
+預設離線執行：以臨時產生的 RSA 金鑰組成服務帳號憑證，probe 只計次數不連網。
+加上 --live 時改用 Streamlit Secrets 或 modules/credentials.json 的真實憑證並實際連線。
+
+用法：
+    python scripts/bench_google_auth.py [載入次數] [--live]
+"""
+
+import os
+import sys
+import time
+
+import gspread
+import rsa
+from google.oauth2 import service_account
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import modules.google_connection as gc
+
+
+def offline_credentials():
+    """臨時產生的服務帳號憑證（不對應任何真實帳號）"""
+    _, private_key = rsa.newkeys(2048)
+    return {
+        'type': 'service_account', 'project_id': 'bench', 'private_key_id': 'bench-key',
+        'private_key': private_key.save_pkcs1().decode('ascii'),
+        'client_email': 'bench@bench.iam.gserviceaccount.com', 'client_id': '0',
+        'auth_uri': 'https://accounts.google.com/o/oauth2/auth',
+        'token_uri': 'https://oauth2.googleapis.com/token',
+        'auth_provider_x509_cert_url': '', 'client_x509_cert_url': '',
+    }
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    loads = int(args[0]) if args else 20
+    live = '--live' in sys.argv
+
+    if live:
+        credentials = gc.get_credentials_from_secrets() or gc.get_credentials_from_file()
+        if not credentials:
+            sys.exit('找不到 Google API 憑證')
+        probe = gc.test_connection
+    else:
+        credentials = offline_credentials()
+        probe = lambda client: True  # noqa: E731 — 離線時只計次數
+    gc.test_connection = probe
+
+    # 修改前：每次載入都重新建立 Credentials、authorize 並測試連線
+    phases = {'credentials': 0.0, 'authorize': 0.0, 'token': 0.0, 'probe': 0.0}
+    for _ in range(loads):
+        t0 = time.perf_counter()
+        creds = service_account.Credentials.from_service_account_info(credentials, scopes=gc.GOOGLE_API_SCOPES)
+        t1 = time.perf_counter()
+        client = gspread.authorize(creds)
+        t2 = time.perf_counter()
+        creds._make_authorization_grant_assertion()
+        t3 = time.perf_counter()
+        probe(client)
+        t4 = time.perf_counter()
+        phases['credentials'] += t1 - t0
+        phases['authorize'] += t2 - t1
+        phases['token'] += t3 - t2
+        phases['probe'] += t4 - t3
+        client.http_client.session.close()
+
+    # 修改後：共用用戶端，首次建立時測試一次連線
+    gc.reset_google_clients()
+    t0 = time.perf_counter()
+    first = gc.get_google_client(credentials, gc.GOOGLE_API_SCOPES, probe=True)
+    t_first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(loads - 1):
+        assert gc.get_google_client(credentials, gc.GOOGLE_API_SCOPES, probe=True) is first
+    t_rest = time.perf_counter() - t0
+    stats = gc.get_client_stats()
+
+    print(f"{loads} 次載入（{'連網' if live else '離線，probe 不連網'}），每次載入的認證成本（ms）")
+    print(f"{'':<16}{'credentials':>12}{'authorize':>10}{'token':>8}{'probe':>8}{'合計':>9}"
+          f"{'token 次數':>11}{'probe 次數':>11}")
+    before = {k: v / loads * 1000 for k, v in phases.items()}
+    print(f"{'每次重新授權':<14}{before['credentials']:>12.2f}{before['authorize']:>10.2f}"
+          f"{before['token']:>8.2f}{before['probe']:>8.2f}{sum(before.values()):>9.2f}{loads:>11}{loads:>11}")
+    after = (t_first + t_rest) / loads * 1000
+    print(f"{'共用用戶端':<15}{'':>12}{'':>10}{'':>8}{'':>8}{after:>9.3f}{1:>11}{stats['probes']:>11}")
+    print(f"  首次建立 {t_first * 1000:.2f} ms，之後每次 {t_rest / max(loads - 1, 1) * 1000:.4f} ms"
+          f"（created={stats['created']}, reused={stats['reused']}）")
+    print("  共用用戶端的存取權杖由 AuthorizedSession 於過期時自動 refresh（約每小時一次），不在上表計時內")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+基準測試：Google Sheets 每次重新整理的 API 呼叫數與傳輸量 — 整張 get_all_records vs 增量讀取
+
+以 tests/fake_gspread.py 的記憶體試算表模擬（回應大小以 JSON 位元組數計），
+情境：資料未變、新增 10 列。
+
+用法：
+    python scripts/bench_google_incremental.py [列數] [欄數]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from fake_gspread import FakeGspreadClient
+import modules.google_connection as gc
+
+URL = 'https://docs.google.com/spreadsheets/d/bench/edit'
+
+
+def make_rows(start, stop, n_cols):
+    return [[f'2026/4/{i % 28 + 1} 上午 10:{i % 60:02d}:00'] +
+            [f'回答 {i}-{c}' if c % 3 else str(i % 5) for c in range(1, n_cols)]
+            for i in range(start, stop)]
+
+
+def measure(client, fn):
+    calls, size = client.calls, client.bytes
+    t0 = time.perf_counter()
+    df = fn()
+    return client.calls - calls, client.bytes - size, (time.perf_counter() - t0) * 1000, df
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_cols = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    header = ['時間戳記'] + [f'題目{c}' for c in range(1, n_cols)]
+    client = FakeGspreadClient({'表單回應 1': [header] + make_rows(0, n_rows, n_cols)})
+    gc.setup_google_connection = lambda: client
+
+    def full():
+        ws = client.open_by_key('bench').worksheets()[0]
+        return pd.DataFrame(ws.get_all_records())
+
+    def incremental():
+        return gc.fetch_google_form_data(URL, incremental=True)[0]
+
+    gc.reset_sheet_cache()
+    incremental()  # 建立水位（首次整張讀取）
+
+    print(f"{n_rows} 列 × {n_cols} 欄，每次重新整理")
+    print(f"{'情境':<12}{'做法':<10}{'API 呼叫':>10}{'傳輸量 (KB)':>14}{'時間 (ms)':>12}")
+    for label, added in (('資料未變', 0), ('新增 10 列', 10)):
+        ws = client.sheet()
+        ws.rows.extend(make_rows(len(ws.rows) - 1, len(ws.rows) - 1 + added, n_cols))
+        f_calls, f_bytes, f_ms, f_df = measure(client, full)
+        i_calls, i_bytes, i_ms, i_df = measure(client, incremental)
+        pd.testing.assert_frame_equal(f_df, i_df)
+        print(f"{label:<10}{'整張讀取':<8}{f_calls:>10}{f_bytes / 1024:>14.1f}{f_ms:>12.1f}")
+        print(f"{'':<12}{'增量讀取':<8}{i_calls:>10}{i_bytes / 1024:>14.2f}{i_ms:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+基準測試：工作表資料 → DataFrame — get_all_records + pd.DataFrame vs values_to_frame
+
+合成資料與 tests/test_google_values_to_frame.py 相同（時間戳記、姓名、分數、比例、混合型別、
+回饋、空欄，列長不一），兩種做法都從 get_all_values 的二維串列開始計時（不含網路傳輸）。
+
+用法：
+    python scripts/bench_google_values_to_frame.py [列數]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from test_google_values_to_frame import _payload, _records_frame
+from modules.google_connection import values_to_frame
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    values = _payload(n_rows)
+
+    t_records, expected = best_of(lambda: _records_frame(values))
+    t_columnar, df = best_of(lambda: values_to_frame(values))
+    t_raw, _ = best_of(lambda: values_to_frame(values, numericise_values=False))
+    pd.testing.assert_frame_equal(df, expected)
+
+    print(f"{n_rows} 列 × {len(values[0])} 欄")
+    print(f"{'做法':<36}{'時間 (ms)':>12}")
+    print(f"{'get_all_records + pd.DataFrame':<36}{t_records * 1000:>12.1f}")
+    print(f"{'values_to_frame':<36}{t_columnar * 1000:>12.1f}  ({t_records / t_columnar:.1f}x)")
+    print(f"{'values_to_frame(numericise_values=False)':<36}{t_raw * 1000:>12.1f}  ({t_records / t_raw:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+基準測試：載入同一試算表的多張工作表 — 逐張 fetch_google_form_data vs fetch_google_worksheets
+
+以 tests/fake_gspread.py 的記憶體試算表模擬，比較 API 呼叫數（佔每分鐘 60 次讀取配額的比例）
+與以每次呼叫 RTT 毫秒估計的網路等待時間。
+
+用法：
+    python scripts/bench_google_worksheets.py [工作表數] [每張列數] [RTT 毫秒]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from fake_gspread import FakeGspreadClient
+import modules.google_connection as gc
+
+URL = 'https://docs.google.com/spreadsheets/d/bench/edit'
+
+
+def main():
+    n_sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rtt_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 150.0
+    header = ['時間戳記', '姓名', '項目', '分數', '回饋']
+    sheets = {f'工作表{s}': [header] + [[f'2026/4/{i % 28 + 1}', f'學員{i % 30}', f'項目{i % 7}', str(i % 5), f'回饋 {i}']
+                                       for i in range(n_rows)]
+              for s in range(n_sheets)}
+    client = FakeGspreadClient(sheets)
+    gc.setup_google_connection = lambda: client
+    gc._sheets_read_limiter = gc.TokenBucket(10_000)
+    titles = list(sheets)
+
+    def one_by_one():
+        return {t: gc.fetch_google_form_data(URL, sheet_title=t)[0] for t in titles}
+
+    def batched():
+        return gc.fetch_google_worksheets(URL)[0]
+
+    print(f"{n_sheets} 張工作表 × {n_rows} 列，估計 RTT {rtt_ms:.0f} ms")
+    print(f"{'做法':<22}{'API 呼叫':>10}{'配額佔比':>10}{'本機 (ms)':>12}{'估計網路等待 (ms)':>20}")
+    results = {}
+    for label, fn in (('逐張 fetch_google_form_data', one_by_one), ('fetch_google_worksheets', batched)):
+        calls = client.calls
+        t0 = time.perf_counter()
+        results[label] = fn()
+        local_ms = (time.perf_counter() - t0) * 1000
+        used = client.calls - calls
+        print(f"{label:<24}{used:>8}{used / gc.SHEETS_READ_REQUESTS_PER_MINUTE:>10.0%}{local_ms:>12.1f}"
+              f"{used * rtt_ms:>20.0f}")
+
+    a, b = results.values()
+    for t in titles:
+        pd.testing.assert_frame_equal(a[t], b[t])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+基準測試：小兒部遷移記錄轉換 — iterrows 逐列 _to_* vs 依評核項目分類後整欄轉換
+
+資料為 pages/pediatric/test_data_pediatric_evaluations.csv 重複到指定筆數（已經過 process_pediatric_data），
+並確認兩種做法產生的記錄完全一致。
+
+用法：
+    python scripts/bench_pediatric_migration.py [筆數]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from test_pediatric_migration import _reference_records, make_processed_df
+from modules.utils.pediatric_migration import build_pediatric_frames, build_pediatric_records
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = make_processed_df(n_rows)
+
+    t_rows, expected = best_of(lambda: _reference_records(df))
+    t_frames, _ = best_of(lambda: build_pediatric_frames(df))
+    t_records, (actual, _) = best_of(lambda: build_pediatric_records(df))
+    assert actual == expected
+
+    print(f"{n_rows} 筆評核（結果一致）\n")
+    print(f"{'做法':<24}{'耗時 (ms)':>12}")
+    print(f"{'iterrows 逐列 _to_*':<24}{t_rows * 1000:>12.1f}")
+    print(f"{'整欄轉換（DataFrame）':<24}{t_frames * 1000:>12.1f}")
+    print(f"{'整欄轉換 + to_dict':<24}{t_records * 1000:>12.1f}")
+    print(f"\n加速：{t_rows / t_records:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+基準測試：process_pediatric_data 評分欄位轉換 — 逐列 .apply vs 不重複值查表
+
+合成資料與 tests/test_pediatric_process_conversions.py 相同，
+並確認兩種做法輸出的欄位（含 dtype）完全一致。
+
+用法：
+    python scripts/bench_process_conversions.py [筆數]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from test_pediatric_process_conversions import _reference_conversions, make_raw_df
+from pages.pediatric.pediatric_analysis import process_pediatric_data
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    df = make_raw_df(n_rows)
+
+    t_apply, expected = best_of(lambda: _reference_conversions(df))
+    t_lookup, actual = best_of(lambda: process_pediatric_data(df))
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+    print(f"{n_rows} 筆評核、9 個轉換欄位（結果一致）\n")
+    print(f"{'做法':<20}{'耗時 (ms)':>12}")
+    print(f"{'逐列 .apply':<20}{t_apply * 1000:>12.1f}")
+    print(f"{'不重複值查表':<20}{t_lookup * 1000:>12.1f}")
+    print(f"\n加速：{t_apply / t_lookup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+基準測試：本機鏡像冷啟動 vs 暖啟動 vs 每次直接查詢 Supabase
+
+以記憶體內假 client（tests/fake_supabase.py）加上模擬網路延遲：
+- 每次請求固定往返延遲（RTT）
+- 回應經 JSON 序列化／解析，模擬傳輸與解碼成本
+
+比較 load_pediatric_data 讀取評核資料的三種情境：
+- 直接查詢：每次畫面渲染都完整分頁下載（原本行為）
+- 鏡像冷啟動：第一次完整同步到 SQLite 後讀取
+- 鏡像暖啟動：只增量同步（有少量新資料），再從 SQLite 讀取
+
+用法：
+    python scripts/bench_supabase_mirror.py [筆數] [RTT 毫秒]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from fake_supabase import FakeQuery, FakeSupabaseClient, make_connection
+from modules.supabase_mirror import SupabaseMirror
+
+FEEDBACK = '學員對操作流程熟悉，能在指導下完成操作，建議多練習以提升熟練度並加強與家屬溝通。'
+
+
+class LatencyQuery(FakeQuery):
+    def execute(self):
+        time.sleep(self.client.rtt)
+        response = super().execute()
+        response.data = json.loads(json.dumps(response.data, ensure_ascii=False))
+        return response
+
+
+class LatencyClient(FakeSupabaseClient):
+    """每次 execute() 加上 RTT 與 JSON 編解碼的假 client"""
+
+    def __init__(self, tables, rtt):
+        super().__init__(tables)
+        self.rtt = rtt
+
+    def table(self, name):
+        return LatencyQuery(self, name)
+
+
+def make_rows(n):
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [{
+        'id': i,
+        'evaluation_date': (date(2024, 1, 1) + timedelta(days=i % 600)).isoformat(),
+        'evaluated_resident': f'住院醫師{i % 50}',
+        'evaluator_teacher': f'教師{i % 20}',
+        'resident_level': ['R1', 'R2', 'R3'][i % 3],
+        'evaluation_type': 'epa',
+        'evaluation_item': 'EPA',
+        'epa_item': '門診表現(OPD)',
+        'epa_reliability_level': 3.0,
+        'epa_qualitative_feedback': FEEDBACK,
+        'form_version': '1.0',
+        'department': '小兒部',
+        'is_deleted': False,
+        'updated_at': (t0 + timedelta(minutes=i)).isoformat(),
+    } for i in range(1, n + 1)]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rtt = (float(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+    filters = {'department': '小兒部'}
+
+    client = LatencyClient({'pediatric_evaluations': make_rows(n)}, rtt)
+    conn = make_connection(client)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = SupabaseMirror(conn, path=os.path.join(tmp, 'mirror.sqlite3'), min_sync_interval=0)
+
+        client.calls.clear()
+        t_direct, df_direct = timed(lambda: conn.fetch_pediatric_evaluations_df(filters=filters,
+                                                                                 columns='dashboard'))
+        calls_direct = len(client.calls)
+
+        client.calls.clear()
+        t_cold, df_cold = timed(lambda: mirror.fetch_pediatric_evaluations_df(filters=filters,
+                                                                               columns='dashboard'))
+        calls_cold = len(client.calls)
+
+        # 暖啟動前新增 20 筆評核
+        last = client.tables['pediatric_evaluations'][-1]
+        for k in range(1, 21):
+            client.tables['pediatric_evaluations'].append({
+                **last, 'id': n + k,
+                'updated_at': (datetime.now(timezone.utc) + timedelta(seconds=k)).isoformat(),
+            })
+        client.calls.clear()
+        t_warm, df_warm = timed(lambda: mirror.fetch_pediatric_evaluations_df(filters=filters,
+                                                                               columns='dashboard'))
+        calls_warm = len(client.calls)
+
+    assert df_cold['id'].tolist() == df_direct['id'].tolist()
+    assert len(df_warm) == n + 20
+
+    print(f"pediatric_evaluations：{n} 筆，模擬 RTT {rtt * 1000:.0f} ms\n")
+    print(f"{'情境':<14}{'請求數':>8}{'耗時 (ms)':>12}")
+    print(f"{'直接查詢':<14}{calls_direct:>8}{t_direct * 1000:>12.0f}")
+    print(f"{'鏡像冷啟動':<14}{calls_cold:>8}{t_cold * 1000:>12.0f}")
+    print(f"{'鏡像暖啟動':<14}{calls_warm:>8}{t_warm * 1000:>12.0f}")
+    print(f"\n暖啟動相較直接查詢：{t_direct / t_warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+基準測試：pediatric_evaluations 欄位投影 vs select('*')
+
+以合成資料模擬 PostgREST 回應（JSON），比較：
+- 回應 payload 大小（bytes）
+- 解析時間：json.loads → DataFrame → 套用型別對照
+
+用法：
+    python scripts/bench_supabase_projection.py [筆數]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from modules.supabase_connection import (
+    PEDIATRIC_EVALUATION_COLUMNS,
+    PEDIATRIC_EVALUATION_DTYPES,
+    apply_dtypes,
+)
+
+SKILLS = ['插氣管內管', '腰椎穿刺', '心臟超音波', '腎臟超音波', 'NRP']
+EPA_ITEMS = ['門診表現(OPD)', '一般病人照護（WARD）', '緊急處置（ED, DR）', '病歷書寫']
+FEEDBACK = '學員對操作流程熟悉，能在指導下完成操作，建議多練習以提升熟練度並加強與家屬溝通。'
+
+
+def make_rows(n):
+    """產生與 pediatric_evaluations 全欄位相同形狀的記錄"""
+    random.seed(42)
+    base = date(2024, 1, 1)
+    rows = []
+    for i in range(1, n + 1):
+        kind = random.choice(['technical_skill', 'meeting_report', 'epa'])
+        row = {
+            'id': i,
+            'created_at': '2025-03-01T08:00:00.000000+00:00',
+            'updated_at': '2025-03-01T08:00:00.000000+00:00',
+            'evaluation_type': kind,
+            'evaluator_teacher': f'教師{i % 20}',
+            'evaluation_date': (base + timedelta(days=i % 600)).isoformat(),
+            'evaluated_resident': f'住院醫師{i % 50}',
+            'resident_level': random.choice(['R1', 'R2', 'R3']),
+            'evaluation_item': {'technical_skill': '操作技術', 'meeting_report': '會議報告', 'epa': 'EPA'}[kind],
+            'meeting_name': None, 'content_sufficient': None, 'data_analysis_ability': None,
+            'presentation_clarity': None, 'innovative_ideas': None, 'logical_response': None,
+            'meeting_feedback': None,
+            'patient_id': None, 'technical_skill_item': None, 'sedation_medication': None,
+            'reliability_level': None, 'technical_feedback': None, 'proficiency_level': None,
+            'epa_item': None, 'epa_reliability_level': None, 'epa_qualitative_feedback': None,
+            'submitted_by': 'bench', 'form_version': '1.0', 'is_deleted': False,
+            'department': '小兒部',
+        }
+        if kind == 'technical_skill':
+            row.update(technical_skill_item=random.choice(SKILLS), patient_id=f'P{i:07d}',
+                       reliability_level=random.choice([2.0, 2.5, 3.0, 3.6, 4.0]),
+                       technical_feedback=FEEDBACK * random.randint(1, 3))
+        elif kind == 'meeting_report':
+            row.update(meeting_name='Journal Meeting', meeting_feedback=FEEDBACK * random.randint(1, 4),
+                       **{c: random.randint(2, 5) for c in ['content_sufficient', 'data_analysis_ability',
+                                                            'presentation_clarity', 'innovative_ideas',
+                                                            'logical_response']})
+        else:
+            row.update(epa_item=random.choice(EPA_ITEMS),
+                       epa_reliability_level=random.choice([2.5, 3.0, 3.3, 4.0]),
+                       epa_qualitative_feedback=FEEDBACK * random.randint(1, 2))
+        rows.append(row)
+    return rows
+
+
+def project(rows, columns):
+    if columns is None:
+        return rows
+    return [{c: r.get(c) for c in columns} for r in rows]
+
+
+def measure(payload, repeat=5):
+    """回傳最佳解析時間（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        df = pd.DataFrame(json.loads(payload))
+        apply_dtypes(df, PEDIATRIC_EVALUATION_DTYPES)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = make_rows(n)
+    print(f"pediatric_evaluations 合成資料：{n} 筆\n")
+    print(f"{'投影':<12}{'欄位數':>8}{'payload (KB)':>16}{'解析 (ms)':>12}{'payload 比例':>14}")
+
+    baseline_bytes = None
+    for name, columns in [('*', None),
+                          ('dashboard', PEDIATRIC_EVALUATION_COLUMNS['dashboard']),
+                          ('scores', PEDIATRIC_EVALUATION_COLUMNS['scores'])]:
+        payload = json.dumps(project(rows, columns), ensure_ascii=False).encode('utf-8')
+        size = len(payload)
+        baseline_bytes = baseline_bytes or size
+        elapsed = measure(payload)
+        n_cols = len(rows[0]) if columns is None else len(columns)
+        print(f"{name:<12}{n_cols:>8}{size / 1024:>16.1f}{elapsed * 1000:>12.1f}{size / baseline_bytes:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+基準測試：時間戳記 → 評核日期 — 逐列 pd.to_datetime vs 向量化 _parse_timestamp_dates
+
+合成資料與 tests/test_pediatric_timestamp_dates.py 相同（約 1% 格式錯誤），
+並確認兩種做法解析出的日期一致。
+
+用法：
+    python scripts/bench_timestamp_dates.py [筆數]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from test_pediatric_timestamp_dates import _reference_dates, make_timestamps
+from pages.pediatric.pediatric_analysis import _parse_timestamp_dates
+
+
+def best_of(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    timestamps = make_timestamps(n_rows)
+
+    t_loop, expected = best_of(lambda: _reference_dates(timestamps), repeat=1)
+    t_vec, (dates, unparsed) = best_of(lambda: _parse_timestamp_dates(timestamps))
+    assert list(dates) == [None if pd.isna(d) else d for d in expected], "解析結果不一致"
+
+    print(f"{n_rows} 筆時間戳記（結果一致，{len(unparsed)} 筆無法解析）\n")
+    print(f"{'做法':<24}{'耗時 (ms)':>12}")
+    print(f"{'逐列 pd.to_datetime':<24}{t_loop * 1000:>12.1f}")
+    print(f"{'_parse_timestamp_dates':<24}{t_vec * 1000:>12.1f}")
+    print(f"\n加速：{t_loop / t_vec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+CCC 會議批次報告（命令列，不需啟動 Streamlit）
+
+為每位住院醫師產生一份報告（HTML 或 Excel）以及全體摘要，
+資料來源可為 Supabase（經本機鏡像）或匯出的 CSV。
+
+用法：
+    python scripts/export_ccc_reports.py --out reports/ccc [--format html|xlsx]
+        [--source supabase|csv] [--csv 檔案] [--department 小兒部] [--workers N]
+        [--exclude-demo]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+
+from pages.pediatric.pediatric_analysis import _get_data_reader, _load_from_supabase, process_pediatric_data
+from pages.pediatric.pediatric_ccc_report import REPORT_FORMATS, export_ccc_reports
+
+
+def load_data(args):
+    """依參數載入處理後的評核資料與文章發表篇數"""
+    if args.source == 'csv':
+        return process_pediatric_data(pd.read_csv(args.csv, encoding='utf-8-sig')), {}
+
+    import streamlit as st
+    from modules.research_summary import get_research_summary
+
+    st.session_state['include_demo_data'] = not args.exclude_demo
+    df, _ = _load_from_supabase(department=args.department)
+    if df is None:
+        return None, {}
+    research_map = {}
+    reader = _get_data_reader()
+    if reader is not None:
+        summary = get_research_summary(reader)
+        research_map = {name: agg['published'] for name, agg in summary['by_resident'].items()}
+    return process_pediatric_data(df), research_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description='產生 CCC 會議批次報告')
+    parser.add_argument('--out', required=True, help='輸出目錄')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='html', help='報告格式')
+    parser.add_argument('--source', choices=['supabase', 'csv'], default='supabase', help='資料來源')
+    parser.add_argument('--csv', default='pages/pediatric/test_data_pediatric_evaluations.csv',
+                        help='--source csv 時讀取的檔案')
+    parser.add_argument('--department', default='小兒部', help='科別（Supabase 來源）')
+    parser.add_argument('--workers', type=int, default=None, help='平行工作數，預設 CPU 數')
+    parser.add_argument('--exclude-demo', action='store_true', help='排除展示資料（Supabase 來源）')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df, research_map = load_data(args)
+    if df is None or df.empty:
+        print("沒有可用的評核資料")
+        return 1
+    t1 = time.perf_counter()
+
+    result = export_ccc_reports(df, args.out, fmt=args.format,
+                                research_published_map=research_map, workers=args.workers)
+    t2 = time.perf_counter()
+
+    print(f"載入 {len(df)} 筆評核：{t1 - t0:.1f} 秒")
+    print(f"產生 {len(result['reports'])} 份報告：{t2 - t1:.1f} 秒")
+    print(f"全體摘要：{result['summary']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
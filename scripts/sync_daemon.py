@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Google Sheets → Supabase 排程同步（命令列，不需啟動 Streamlit）
+
+依 modules/utils/sync_daemon.py 的水位線只同步新資料；同一時間只會有一個同步在執行，
+每個工作輸出一行 JSON log（筆數與耗時）。
+
+用法：
+    python scripts/sync_daemon.py --once [--jobs ugy,pediatric] [--full]
+    python scripts/sync_daemon.py --interval 3600 [--log-file logs/sync.log]
+
+可搭配 cron（--once）或 systemd（常駐）使用；SUPABASE_URL / SUPABASE_KEY 由 .env 或環境變數提供，
+Google 憑證依序取自 GOOGLE_APPLICATION_CREDENTIALS、.streamlit/secrets.toml、modules/credentials.json。
+--once 有任何工作未完整成功（failed：讀不到試算表等；partial：部分資料寫入失敗）時以非零狀態碼結束。
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.utils.sync_daemon import (
+    DEFAULT_INTERVAL_SECONDS,
+    JOB_RUNNERS,
+    SYNC_JOBS,
+    run_daemon,
+    run_sync_once,
+)
+
+# --once 視為成功的工作狀態；partial（部分資料寫入失敗）與 failed 以非零狀態碼結束，讓 cron 看得到
+OK_STATUSES = ('success', 'no_data')
+
+
+def parse_jobs(value):
+    jobs = [j.strip() for j in value.split(',') if j.strip()]
+    unknown = [j for j in jobs if j not in JOB_RUNNERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的同步工作：{', '.join(unknown)}（可用：{', '.join(JOB_RUNNERS)}）")
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Google Sheets → Supabase 排程同步')
+    parser.add_argument('--jobs', type=parse_jobs, default=list(SYNC_JOBS), help='同步工作，以逗號分隔')
+    parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL_SECONDS, help='同步間隔（秒）')
+    parser.add_argument('--once', action='store_true', help='只執行一輪後結束')
+    parser.add_argument('--full', action='store_true', help='忽略水位線重新比對全部資料（僅 ugy）')
+    parser.add_argument('--state', default=None, help='同步狀態檔（預設 .cache/sync_state.json）')
+    parser.add_argument('--lock', default=None, help='鎖定檔（預設 .cache/sync_daemon.lock）')
+    parser.add_argument('--log-file', default=None, help='另外寫入的 log 檔')
+    args = parser.parse_args()
+
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if args.log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(args.log_file)), exist_ok=True)
+        handlers.append(logging.FileHandler(args.log_file, encoding='utf-8'))
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=handlers)
+
+    from modules.supabase_connection import get_shared_connection
+
+    if args.once:
+        results = run_sync_once(get_shared_connection(), args.jobs, args.state, args.lock, full=args.full)
+        return 0 if results and all(r['status'] in OK_STATUSES for r in results) else 1
+
+    try:
+        run_daemon(get_shared_connection, args.interval, args.jobs, args.state, args.lock, full=args.full)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+-- ==========================================
+-- 遷移腳本：epa_evaluations 新增 record_key / row_hash 欄位（冪等同步用）
+-- 日期：2026-10-16
+-- 說明：modules/utils/data_sync.py 以自然鍵（學員姓名、EPA 項目、教師、時間戳記）的 md5
+--       作為 record_key，批次 upsert(on_conflict='record_key')；row_hash 為其餘欄位內容的雜湊，
+--       用來區分「更新」與「未變動略過」。
+-- ==========================================
+
+ALTER TABLE epa_evaluations
+    ADD COLUMN IF NOT EXISTS record_key TEXT;
+
+ALTER TABLE epa_evaluations
+    ADD COLUMN IF NOT EXISTS row_hash TEXT;
+
+-- 既有資料回填 record_key（與 data_sync.natural_record_keys 相同的算法：
+-- 以 '|' 串接、空值視為空字串、時間戳記為台北時間 YYYY-MM-DDTHH:MM:SS）
+UPDATE epa_evaluations
+SET record_key = md5(concat_ws('|',
+        coalesce(student_name, ''),
+        coalesce(epa_item, ''),
+        coalesce(teacher_name, ''),
+        coalesce(to_char("timestamp" AT TIME ZONE 'Asia/Taipei', 'YYYY-MM-DD"T"HH24:MI:SS'), '')))
+WHERE record_key IS NULL;
+
+-- 舊同步方式可能留下重複資料：同一 record_key 只保留 id 最小的一筆
+DELETE FROM epa_evaluations a
+USING epa_evaluations b
+WHERE a.record_key = b.record_key
+  AND a.id > b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_epa_evaluations_record_key
+    ON epa_evaluations (record_key);
@@ -0,0 +1,112 @@
+"""
+測試用的最小 gspread 替身：以記憶體中的二維串列模擬試算表
+
+只實作 google_connection 用到的 API（open_by_key、worksheets、worksheet、get、
+get_all_records、batch_get、values_batch_get），並記錄 API 呼叫次數與回應資料量（JSON 位元組數）。
+回傳的列與 Sheets API 相同：不含尾端空白儲存格與尾端空白列。
+"""
+
+import json
+import re
+
+from gspread.utils import a1_to_rowcol, numericise_all, to_records
+
+
+def _trim(rows):
+    rows = [list(r) for r in rows]
+    for r in rows:
+        while r and r[-1] == '':
+            r.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows, sheet_id=0):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows = [list(r) for r in rows]
+
+    def _record(self, payload):
+        self.spreadsheet.client.calls += 1
+        self.spreadsheet.client.bytes += len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        return payload
+
+    def get(self, pad_values=False):
+        values = _trim(self.rows) or [[]]
+        self._record(values)
+        if pad_values and values != [[]]:
+            width = max(len(r) for r in values)
+            values = [r + [''] * (width - len(r)) for r in values]
+        return values
+
+    def get_all_values(self):
+        return self.get(pad_values=True)
+
+    def get_all_records(self):
+        values = self.get(pad_values=True)
+        if values == [[]]:
+            return []
+        return to_records(values[0], [numericise_all(r) for r in values[1:]])
+
+    def _range(self, a1):
+        """'1:1' 或 'A5:AD' 形式的範圍"""
+        if re.fullmatch(r'\d+:\d+', a1):
+            first, last = (int(x) for x in a1.split(':'))
+            return _trim(self.rows[first - 1:last])
+        start, end = a1.split(':')
+        row, _ = a1_to_rowcol(start)
+        _, col = a1_to_rowcol(f'{end}1')
+        return _trim([r[:col] for r in self.rows[row - 1:]])
+
+    def batch_get(self, ranges):
+        return self._record([self._range(r) for r in ranges])
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, sheets):
+        self.client = client
+        self._worksheets = [FakeWorksheet(self, title, rows, i) for i, (title, rows) in enumerate(sheets.items())]
+
+    def worksheets(self):
+        self.client.calls += 1
+        return list(self._worksheets)
+
+    def values_batch_get(self, ranges):
+        """ranges 為 "'工作表標題'" 形式（整張工作表）"""
+        by_title = {ws.title: ws for ws in self._worksheets}
+        value_ranges = []
+        for r in ranges:
+            title = r.strip("'").replace("''", "'")
+            value_ranges.append({'range': r, 'values': _trim(by_title[title].rows)})
+        return self._worksheets[0]._record({'valueRanges': value_ranges})
+
+    def worksheet(self, title):
+        self.client.calls += 1
+        for ws in self._worksheets:
+            if ws.title == title:
+                return ws
+        raise KeyError(title)
+
+
+class FakeGspreadClient:
+    """
+    Args:
+        sheets (dict): {工作表標題: 二維串列（第一列為標題列）}，依序為第一、第二…張
+    """
+
+    def __init__(self, sheets):
+        self.calls = 0
+        self.bytes = 0
+        self.spreadsheet = FakeSpreadsheet(self, sheets)
+
+    def open_by_key(self, key):
+        self.calls += 1
+        return self.spreadsheet
+
+    def sheet(self, title=None):
+        """直接修改資料用：取得工作表（預設第一張）"""
+        return self.spreadsheet._worksheets[0] if title is None else next(
+            ws for ws in self.spreadsheet._worksheets if ws.title == title)
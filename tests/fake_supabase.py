@@ -0,0 +1,223 @@
+"""
+測試用的假 Supabase client（記憶體內資料表）
+
+模擬 supabase-py / postgrest 的鏈式查詢介面，僅實作本專案用到的部分：
+select / eq / neq / gt / gte / lt / lte / in_ / or_ / order / limit / range /
+insert / upsert / update / execute。
+"""
+
+import copy
+import re
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _cmp_key(value):
+    """讓 None 排在最前，其餘依原值比較"""
+    return (value is not None, value)
+
+
+class FakeQuery:
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.columns = '*'
+        self.predicates = []
+        self.orders = []
+        self.limit_n = None
+        self.offset_n = 0
+        self.action = 'select'
+        self.payload = None
+        self.on_conflict = None
+
+    # ── 查詢 ──
+    def select(self, columns='*', count=None):
+        self.columns = columns
+        return self
+
+    def eq(self, col, val):
+        self.predicates.append(lambda r: r.get(col) == val)
+        return self
+
+    def neq(self, col, val):
+        self.predicates.append(lambda r: r.get(col) != val)
+        return self
+
+    def gt(self, col, val):
+        self.predicates.append(lambda r: r.get(col) is not None and str(r.get(col)) > str(val))
+        return self
+
+    def gte(self, col, val):
+        self.predicates.append(lambda r: r.get(col) is not None and str(r.get(col)) >= str(val))
+        return self
+
+    def lt(self, col, val):
+        self.predicates.append(lambda r: r.get(col) is not None and str(r.get(col)) < str(val))
+        return self
+
+    def lte(self, col, val):
+        self.predicates.append(lambda r: r.get(col) is not None and str(r.get(col)) <= str(val))
+        return self
+
+    def in_(self, col, values):
+        values = list(values)
+        self.predicates.append(lambda r: r.get(col) in values)
+        return self
+
+    def or_(self, expr):
+        """支援 keyset 分頁使用的 `a.lt.X,and(a.eq.X,b.lt.Y)` 形式（X 可加雙引號）"""
+        m = re.fullmatch(
+            r'(\w+)\.(lt|gt)\.("[^"]*"|[^,]+),and\(\1\.eq\.\3,(\w+)\.(lt|gt)\.([^)]+)\)', expr
+        )
+        if not m:
+            raise ValueError(f"FakeQuery 不支援的 or_ 表達式：{expr}")
+        col1, op1, val1, col2, op2, val2 = m.groups()
+        val1 = val1.strip('"')
+
+        def _test(v, op, target):
+            if v is None:
+                return False
+            if isinstance(v, (int, float)):
+                target = type(v)(target)
+            else:
+                v, target = str(v), str(target)
+            return v < target if op == 'lt' else v > target
+
+        def _pred(r):
+            if _test(r.get(col1), op1, val1):
+                return True
+            return str(r.get(col1)) == val1 and _test(r.get(col2), op2, val2)
+
+        self.predicates.append(_pred)
+        return self
+
+    def order(self, col, desc=False):
+        self.orders.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def range(self, start, end):
+        self.offset_n = start
+        self.limit_n = end - start + 1
+        return self
+
+    # ── 寫入 ──
+    def insert(self, data):
+        self.action = 'insert'
+        self.payload = data
+        return self
+
+    def upsert(self, data, on_conflict=None, **kwargs):
+        self.action = 'upsert'
+        self.payload = data
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, data):
+        self.action = 'update'
+        self.payload = data
+        return self
+
+    # ── 執行 ──
+    def _project(self, row):
+        if self.columns in ('*', None):
+            return copy.deepcopy(row)
+        cols = [c.strip() for c in self.columns.split(',') if c.strip()]
+        return {c: copy.deepcopy(row.get(c)) for c in cols}
+
+    def execute(self):
+        self.client.calls.append((self.table_name, self.action))
+        if self.client.fail_next:
+            exc = self.client.fail_next.pop(0)
+            if exc is not None:
+                raise exc
+        if self.client.fail_when is not None:
+            exc = self.client.fail_when(self.table_name, self.action, self.payload)
+            if exc is not None:
+                raise exc
+        table = self.client.tables.setdefault(self.table_name, [])
+
+        if self.action == 'select':
+            rows = [r for r in table if all(p(r) for p in self.predicates)]
+            for col, desc in reversed(self.orders):
+                rows.sort(key=lambda r: _cmp_key(r.get(col)), reverse=desc)
+            rows = rows[self.offset_n:]
+            if self.limit_n is not None:
+                rows = rows[:self.limit_n]
+            return FakeResponse([self._project(r) for r in rows])
+
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        if self.action == 'insert':
+            inserted = []
+            for rec in payload:
+                rec = dict(rec)
+                rec.setdefault('id', self.client.next_id())
+                table.append(rec)
+                inserted.append(copy.deepcopy(rec))
+            return FakeResponse(inserted)
+
+        if self.action == 'upsert':
+            keys = [k.strip() for k in (self.on_conflict or 'id').split(',')]
+            index = {tuple(r.get(k) for k in keys): r for r in table}
+            out = []
+            for rec in payload:
+                key = tuple(rec.get(k) for k in keys)
+                existing = index.get(key)
+                if existing is not None:
+                    existing.update(rec)
+                    out.append(copy.deepcopy(existing))
+                else:
+                    rec = dict(rec)
+                    rec.setdefault('id', self.client.next_id())
+                    table.append(rec)
+                    index[key] = rec
+                    out.append(copy.deepcopy(rec))
+            return FakeResponse(out)
+
+        if self.action == 'update':
+            out = []
+            for r in table:
+                if all(p(r) for p in self.predicates):
+                    r.update(self.payload)
+                    out.append(copy.deepcopy(r))
+            return FakeResponse(out)
+
+        raise ValueError(f"未知動作：{self.action}")
+
+
+class FakeSupabaseClient:
+    """記憶體內的假 Supabase client，`tables` 為 {表名: [row dict]}"""
+
+    def __init__(self, tables=None):
+        self.tables = {k: [dict(r) for r in v] for k, v in (tables or {}).items()}
+        self.calls = []       # [(表名, 動作)]，用來斷言 round trip 次數
+        self.fail_next = []   # 依序在 execute() 時拋出的例外（None 表示不拋）
+        self.fail_when = None  # fail_when(表名, 動作, payload) 回傳例外時拋出
+        self._id = max(
+            [r.get('id', 0) for rows in self.tables.values() for r in rows
+             if isinstance(r.get('id'), int)] or [0]
+        )
+
+    def next_id(self):
+        self._id += 1
+        return self._id
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def make_connection(client):
+    """不讀取環境變數，直接以假 client 建立 SupabaseConnection"""
+    from modules.supabase_connection import SupabaseConnection
+    conn = SupabaseConnection.__new__(SupabaseConnection)
+    conn.url = 'http://fake'
+    conn.key = 'fake'
+    conn.client = client
+    return conn
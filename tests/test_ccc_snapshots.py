@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+測試 CCC 達標狀態快照：結果與直接計算一致，且只重新計算評核資料或門檻設定有變動的住院醫師
+"""
+
+from unittest import mock
+
+import pandas as pd
+
+from test_pediatric_cohort_status import make_processed_df
+from modules.ccc_snapshots import CCCSnapshotStore
+from pages.pediatric import pediatric_analysis
+from pages.pediatric.pediatric_analysis import (
+    calculate_cohort_status,
+    calculate_cohort_status_snapshot,
+    get_threshold_settings,
+)
+
+
+def _recomputed(df, store, as_of='2026-01-05', research_map=None, scope='', frames=None):
+    """回傳 (結果, 重新計算的住院醫師)；frames 收集傳給 calculate_cohort_status 的資料"""
+    calls = []
+    real = pediatric_analysis.calculate_cohort_status
+
+    def spy(data, residents=None, research_published_map=None):
+        calls.extend(residents)
+        if frames is not None:
+            frames.append(data)
+        return real(data, residents, research_published_map)
+
+    with mock.patch.object(pediatric_analysis, 'calculate_cohort_status', spy):
+        result = calculate_cohort_status_snapshot(df, research_published_map=research_map,
+                                                  store=store, as_of=as_of, scope=scope)
+    return result, calls
+
+
+def test_matches_direct_and_reuses_snapshots(tmp_path):
+    """第一次全部計算；資料不變時全部沿用快照，結果與直接計算相同"""
+    store = CCCSnapshotStore(path=str(tmp_path / 'snap.sqlite3'))
+    df = make_processed_df(1500, 12, seed=21)
+    research_map = {'住院醫師03': 1}
+    expected = calculate_cohort_status(df, research_published_map=research_map)
+
+    first, calls = _recomputed(df, store, research_map=research_map)
+    assert first == expected
+    assert len(calls) == 12
+
+    second, calls = _recomputed(df.sample(frac=1, random_state=0), store, research_map=research_map)
+    assert second == expected
+    assert calls == []
+
+
+def test_only_affected_residents_recomputed(tmp_path):
+    """新增評核或發表篇數變動時只重新計算相關住院醫師；隔天與門檻變動則全部重算"""
+    store = CCCSnapshotStore(path=str(tmp_path / 'snap.sqlite3'))
+    df = make_processed_df(1500, 12, seed=22)
+    _recomputed(df, store)
+
+    new_row = df[df['受評核人員'] == '住院醫師05'].head(1)
+    grown = pd.concat([df, new_row], ignore_index=True)
+    frames = []
+    result, calls = _recomputed(grown, store, research_map={'住院醫師07': 1}, frames=frames)
+    assert sorted(calls) == ['住院醫師05', '住院醫師07']
+    # 只傳入需要重新計算的住院醫師本人的評核資料
+    assert set(frames[0]['受評核人員']) == {'住院醫師05', '住院醫師07'}
+    assert result == calculate_cohort_status(grown, research_published_map={'住院醫師07': 1})
+
+    _, calls = _recomputed(grown, store, as_of='2026-01-06', research_map={'住院醫師07': 1})
+    assert len(calls) == 12
+
+    with mock.patch.object(pediatric_analysis, '_threshold_settings_hash', lambda: 'changed'):
+        _, calls = _recomputed(grown, store, as_of='2026-01-06', research_map={'住院醫師07': 1})
+    assert len(calls) == 12
+
+
+def test_threshold_settings_hash_follows_code_constants():
+    """門檻設定取自程式碼常數，雜湊每個行程計算一次且與設定內容對應"""
+    settings = get_threshold_settings()
+    assert settings['levels'] is pediatric_analysis.LEVEL_THRESHOLDS
+    assert settings['hash'] == get_threshold_settings()['hash']
+    assert pediatric_analysis._get_level_thresholds('PGY9') == settings['levels']['R1']
+
+    pediatric_analysis._threshold_settings_hash.cache_clear()
+    try:
+        with mock.patch.dict(pediatric_analysis.LEVEL_THRESHOLDS['R2'], {'score_threshold': 3.2}):
+            assert get_threshold_settings()['hash'] != settings['hash']
+    finally:
+        pediatric_analysis._threshold_settings_hash.cache_clear()
+    assert get_threshold_settings()['hash'] == settings['hash']
+
+
+def test_status_as_of_history(tmp_path):
+    """可查詢某日（含）之前最近一次的快照"""
+    store = CCCSnapshotStore(path=str(tmp_path / 'snap.sqlite3'))
+    old = {'overall': 'FAIL', 'level': 'R1'}
+    new = {'overall': 'PASS', 'level': 'R2'}
+    store.save('2026-01-01', 'h', [('A', 'fp1', old)])
+    store.save('2026-02-01', 'h', [('A', 'fp2', new), ('B', 'fp3', old)])
+
+    assert store.snapshot_dates() == ['2026-02-01', '2026-01-01']
+    assert store.status_as_of('2026-01-15') == {'A': dict(old, as_of='2026-01-01')}
+    history = store.status_as_of('2026-03-01', residents=['A'], settings_hash='h')
+    assert history == {'A': dict(new, as_of='2026-02-01')}
+    assert store.load('2026-02-01', 'h', ['A', 'C']) == {'A': {'fp2': new}}
+
+
+def test_scopes_keep_separate_snapshots(tmp_path):
+    """切換資料範圍（例如是否包含展示資料）時各自保留快照，切回來不需重新計算"""
+    store = CCCSnapshotStore(path=str(tmp_path / 'snap.sqlite3'))
+    df = make_processed_df(1200, 8, seed=23)
+    without_demo = df[df['受評核人員'] != '住院醫師02']
+    with_demo, without = (pediatric_analysis.ccc_snapshot_scope('supabase', '小兒部', flag) for flag in (True, False))
+
+    _, calls = _recomputed(df, store, scope=with_demo)
+    assert len(calls) == 8
+    _, calls = _recomputed(without_demo.head(900), store, scope=without)
+    assert len(calls) == 7
+    result, calls = _recomputed(df, store, scope=with_demo)
+    assert calls == [] and result == calculate_cohort_status(df)
+    assert store.snapshot_dates(scope=without) == ['2026-01-05']
+
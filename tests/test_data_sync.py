@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+測試 EPA 評核資料同步：重複執行冪等、只寫入新增或變動的資料、每 500 筆一次 upsert
+"""
+
+import math
+
+import pandas as pd
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.utils.data_sync import (
+    EPA_SYNC_TABLE,
+    SYNC_CHUNK_SIZE,
+    prepare_epa_records,
+    sync_epa_evaluations,
+)
+
+
+def make_form_df(n, start=0):
+    """產生 Google 表單格式（中文欄名、上午/下午時間）的 EPA 評核資料"""
+    rows = []
+    for i in range(start, start + n):
+        hour = i % 12 + 1
+        rows.append({
+            '時間戳記': f"2025/{i % 12 + 1}/{i % 28 + 1} {'上午' if i % 2 else '下午'} {hour}:{i % 60:02d}:{i % 59:02d}",
+            '學號': 1000 + i % 40,
+            '學員姓名': f"學員{i % 40}",
+            '梯次': '' if i % 7 == 0 else f"第{i % 5}梯",
+            'EPA評核項目': f"EPA{i % 13 + 1}",
+            '學員自評EPA等級': str(i % 5 + 1),
+            '教師評核EPA等級': '' if i % 11 == 0 else str(i % 5 + 1),
+            '教師': f"教師{i % 9}",
+            '回饋': f"回饋 {i}",
+            '臨床情境': '門診',
+            '地點': '',
+        })
+    return pd.DataFrame(rows)
+
+
+class CountingClient(FakeSupabaseClient):
+    """記錄 upsert 次數的 FakeSupabaseClient（calls.clear() 歸零）"""
+
+    @property
+    def upserts(self):
+        return sum(1 for _, action in self.calls if action == 'upsert')
+
+
+def test_first_sync_inserts_and_resync_is_noop():
+    """第一次全部新增（每 500 筆一次 upsert）；再同步一次全部略過、不送出任何請求"""
+    df = make_form_df(1200)
+    client = CountingClient()
+
+    stats = sync_epa_evaluations(make_connection(client), df)
+    assert stats['inserted'] == 1200 and stats['updated'] == 0 and stats['failed'] == 0
+    assert client.upserts == math.ceil(1200 / SYNC_CHUNK_SIZE)
+    assert len(client.tables[EPA_SYNC_TABLE]) == 1200
+
+    client.calls.clear()
+    stats = sync_epa_evaluations(make_connection(client), df)
+    assert stats == {'inserted': 0, 'updated': 0, 'skipped': 1200, 'failed': 0, 'errors': []}
+    assert client.upserts == 0
+    assert len(client.tables[EPA_SYNC_TABLE]) == 1200
+
+
+def test_changed_and_new_rows():
+    """回饋修改的列計為更新，新增的列計為新增，資料表不產生重複"""
+    client = CountingClient()
+    sync_epa_evaluations(make_connection(client), make_form_df(100))
+
+    df = make_form_df(110)
+    df.loc[3, '回饋'] = '修改後的回饋'
+    stats = sync_epa_evaluations(make_connection(client), df)
+    assert (stats['inserted'], stats['updated'], stats['skipped']) == (10, 1, 99)
+
+    rows = client.tables[EPA_SYNC_TABLE]
+    assert len(rows) == 110
+    assert sum(r['feedback'] == '修改後的回饋' for r in rows) == 1
+
+
+def test_invalid_and_duplicate_rows_skipped():
+    """時間戳記無法解析與表單內重複的列計為略過；空字串欄位寫入 NULL、時間帶台北時區"""
+    df = make_form_df(5)
+    df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+    df.loc[5, '回饋'] = '重複送出'
+    df.loc[len(df)] = dict(df.iloc[1], **{'時間戳記': '不是時間'})
+
+    records, skipped = prepare_epa_records(df)
+    assert skipped == 2 and len(records) == 5
+    # 重複列保留最後一筆
+    assert records.loc[records['feedback'] == '重複送出'].shape[0] == 1
+    first = records.iloc[0]
+    assert first['location'] is None
+    assert first['timestamp'].endswith('+0800')
+
+    client = CountingClient()
+    stats = sync_epa_evaluations(make_connection(client), df)
+    assert (stats['inserted'], stats['skipped']) == (5, 2)
+
+
+def test_failed_chunk_does_not_stop_sync():
+    """單一批次寫入失敗時記錄失敗筆數，其餘批次照常寫入；下次同步補上失敗的資料"""
+    client = CountingClient()
+    client.fail_when = lambda table, action, payload: (
+        ValueError('boom') if action == 'upsert' and len(payload) == 200 else None)
+    stats = sync_epa_evaluations(make_connection(client), make_form_df(1200))
+    assert stats['failed'] == 200
+    assert stats['inserted'] == 1000
+    assert len(stats['errors']) == 1 and 'boom' in stats['errors'][0]
+
+    client.fail_when = None
+    stats = sync_epa_evaluations(make_connection(client), make_form_df(1200))
+    assert (stats['inserted'], stats['skipped']) == (200, 1000)
+    assert len(client.tables[EPA_SYNC_TABLE]) == 1200
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+測試跨 session 資料集快取（DatasetCache）與寫入時的版本失效
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.dataset_cache import DatasetCache, bump_dataset_version, dataset_version
+
+
+def test_hit_miss_and_copy():
+    """第二次讀取命中快取，且回傳副本不會被呼叫端修改影響"""
+    cache = DatasetCache(ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return pd.DataFrame({'a': [1, 2]}), ['Supabase']
+
+    df1, _ = cache.get_or_load('ds_copy', ('小兒部',), loader)
+    df1['a'] = 0
+    df2, titles = cache.get_or_load('ds_copy', ('小兒部',), loader)
+
+    assert len(calls) == 1
+    assert df2['a'].tolist() == [1, 2]
+    assert titles == ['Supabase']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_keys_ttl_and_none():
+    """不同 key 分開快取；過期後重新載入；loader 回傳 None 不寫入"""
+    cache = DatasetCache(ttl=0.05)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load('ds_ttl', ('A',), loader) == 1
+    assert cache.get_or_load('ds_ttl', ('B',), loader) == 2
+    assert cache.get_or_load('ds_ttl', ('A',), loader) == 1
+    time.sleep(0.06)
+    assert cache.get_or_load('ds_ttl', ('A',), loader) == 3
+    assert cache.stats()['expired'] == 1
+
+    assert cache.get_or_load('ds_ttl', ('C',), lambda: None) is None
+    assert cache.get_or_load('ds_ttl', ('C',), lambda: 'ok') == 'ok'
+
+
+def test_version_bump_invalidates():
+    """資料集版本號變更後不再命中舊條目，且舊條目被取代"""
+    cache = DatasetCache(ttl=60)
+    counter = iter(range(100))
+
+    first = cache.get_or_load('ds_version', (), lambda: next(counter))
+    bump_dataset_version('ds_version')
+    second = cache.get_or_load('ds_version', (), lambda: next(counter))
+
+    assert (first, second) == (0, 1)
+    assert cache.stats()['entries'] == 1
+
+
+def test_concurrent_misses_load_once():
+    """多個 session 同時未命中時只載入一次"""
+    cache = DatasetCache(ttl=60)
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'data'
+
+    def worker():
+        barrier.wait()
+        assert cache.get_or_load('ds_concurrent', (), loader) == 'data'
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+
+
+def test_insert_bumps_evaluation_version():
+    """新增評核成功時 pediatric_evaluations 版本號遞增，失敗時不變"""
+    client = FakeSupabaseClient({'pediatric_evaluations': []})
+    conn = make_connection(client)
+
+    before = dataset_version('pediatric_evaluations')
+    conn.insert_pediatric_evaluation({'evaluated_resident': 'A'})
+    conn.insert_evaluation({'evaluated_resident': 'B', 'department': '內科部'})
+    assert dataset_version('pediatric_evaluations') == before + 2
+
+    client.fail_next = [RuntimeError('down')]
+    assert conn.insert_evaluation({'evaluated_resident': 'C'}) is None
+    assert dataset_version('pediatric_evaluations') == before + 2
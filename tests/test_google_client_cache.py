@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+測試共用 gspread 用戶端（get_google_client）：每組憑證只授權與測試連線一次
+"""
+
+import threading
+
+import pytest
+import rsa
+
+import modules.google_connection as gc
+
+
+@pytest.fixture(scope='module')
+def private_key():
+    return rsa.newkeys(1024)[1].save_pkcs1().decode('ascii')
+
+
+def _credentials(private_key, key_id='k1'):
+    return {
+        'type': 'service_account', 'project_id': 'test', 'private_key_id': key_id,
+        'private_key': private_key, 'client_email': 'test@test.iam.gserviceaccount.com',
+        'client_id': '0', 'auth_uri': 'https://accounts.google.com/o/oauth2/auth',
+        'token_uri': 'https://oauth2.googleapis.com/token',
+        'auth_provider_x509_cert_url': '', 'client_x509_cert_url': '',
+    }
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(gc, 'test_connection', lambda client: calls.append(client) or True)
+    monkeypatch.setattr(gc, '_client_stats', {'created': 0, 'reused': 0, 'probes': 0})
+    gc.reset_google_clients()
+    yield calls
+    gc.reset_google_clients()
+
+
+def test_one_client_per_credential_set(private_key, probes):
+    """同一組憑證重用同一用戶端且只測試一次連線；不同金鑰或 scopes 另建用戶端"""
+    creds = _credentials(private_key)
+    first = gc.get_google_client(creds, probe=True)
+    assert gc.get_google_client(dict(creds), probe=True) is first
+    assert len(probes) == 1
+
+    other_key = gc.get_google_client(_credentials(private_key, key_id='k2'))
+    other_scope = gc.get_google_client(creds, scopes=gc.GOOGLE_API_SCOPES[:3])
+    assert len({id(first), id(other_key), id(other_scope)}) == 3
+    assert gc.get_client_stats() == {'created': 3, 'reused': 1, 'probes': 1}
+
+
+def test_failed_probe_not_cached(private_key, monkeypatch, probes):
+    """連線測試失敗時不快取，下次重新授權"""
+    monkeypatch.setattr(gc, 'test_connection', lambda client: False)
+    assert gc.get_google_client(_credentials(private_key), probe=True) is None
+    monkeypatch.setattr(gc, 'test_connection', lambda client: True)
+    assert gc.get_google_client(_credentials(private_key), probe=True) is not None
+    assert gc.get_client_stats()['created'] == 1
+
+
+def test_concurrent_first_use_authorizes_once(private_key, probes):
+    """多執行緒同時首次取得時只授權一次"""
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(gc.get_google_client(_credentials(private_key), probe=True))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(r) for r in results}) == 1
+    assert len(probes) == 1
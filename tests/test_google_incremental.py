@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+測試 Google Sheets 增量讀取（fetch_google_form_data(incremental=True)）：
+結果與整張 get_all_records 相同，無新增列時只需一次小量 API 呼叫
+"""
+
+import pandas as pd
+import pytest
+
+import modules.google_connection as gc
+from fake_gspread import FakeGspreadClient
+
+URL = 'https://docs.google.com/spreadsheets/d/abc123/edit'
+HEADER = ['時間戳記', '學員姓名', 'EPA評核項目', '分數', '回饋']
+
+
+def _row(i):
+    return [f'2026/4/{i % 28 + 1} 上午 10:00:00', f'學員{i % 7}', f'EPA{i % 5}', str(i % 5 + 1),
+            '' if i % 3 else f'回饋{i}']
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    client = FakeGspreadClient({'表單回應 1': [HEADER] + [_row(i) for i in range(200)], '訓練科部': [['科部']]})
+    monkeypatch.setattr(gc, 'setup_google_connection', lambda: client)
+    monkeypatch.setattr(gc, '_sheet_stats', {'full': 0, 'incremental': 0, 'unchanged': 0, 'rows_fetched': 0})
+    monkeypatch.setattr(gc, '_sheets_read_limiter', gc.TokenBucket(10_000))
+    gc.reset_sheet_cache()
+    yield client
+    gc.reset_sheet_cache()
+
+
+def _full_frame(client):
+    return pd.DataFrame(client.sheet().get_all_records())
+
+
+def _fetch():
+    return gc.fetch_google_form_data(URL, incremental=True)
+
+
+def test_matches_get_all_records_and_unchanged_is_cheap(sheet):
+    """首次整張讀取；資料未變時只呼叫一次 batch_get，且回傳副本"""
+    df, titles = _fetch()
+    assert titles == ['表單回應 1', '訓練科部']
+    pd.testing.assert_frame_equal(df, _full_frame(sheet))
+
+    df['新欄位'] = 1
+    calls, size = sheet.calls, sheet.bytes
+    again, _ = _fetch()
+    assert sheet.calls - calls == 1
+    assert sheet.bytes - size < 400
+    assert '新欄位' not in again.columns
+    assert gc.get_sheet_fetch_stats() == {'full': 1, 'incremental': 0, 'unchanged': 1, 'rows_fetched': 200}
+
+
+def test_appended_rows_fetched_incrementally(sheet):
+    """新增列只讀取新的範圍，結果與整張重新讀取相同"""
+    _fetch()
+    sheet.sheet().rows.extend(_row(i) for i in range(200, 230))
+    calls = sheet.calls
+    df, _ = _fetch()
+    assert sheet.calls - calls == 1
+    pd.testing.assert_frame_equal(df, _full_frame(sheet))
+    stats = gc.get_sheet_fetch_stats()
+    assert (stats['full'], stats['incremental'], stats['rows_fetched']) == (1, 1, 230)
+
+
+@pytest.mark.parametrize('change', ['header', 'tail', 'deleted'])
+def test_falls_back_to_full_reload(sheet, change):
+    """標題列改變、最後一筆被修改或刪除時整張重新讀取"""
+    _fetch()
+    rows = sheet.sheet().rows
+    if change == 'header':
+        rows[0] = HEADER + ['新題目']
+        rows.append(_row(300) + ['新答案'])
+    elif change == 'tail':
+        rows[-1][3] = '9'
+    else:
+        rows.pop()
+    df, _ = _fetch()
+    pd.testing.assert_frame_equal(df, _full_frame(sheet))
+    assert gc.get_sheet_fetch_stats()['full'] == 2
+
+
+def test_per_worksheet_state_and_expiry(sheet, monkeypatch):
+    """每張工作表各自記錄水位；超過重新讀取間隔時整張重新讀取"""
+    _fetch()
+    dept, titles = gc.fetch_google_form_data(URL, sheet_title='訓練科部', incremental=True)
+    assert dept is None and titles == ['表單回應 1', '訓練科部']
+    monkeypatch.setattr(gc, 'INCREMENTAL_FULL_RELOAD_SECONDS', 0)
+    _fetch()
+    assert gc.get_sheet_fetch_stats()['full'] == 3
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+測試 values_to_frame：逐欄建立的 DataFrame 與 get_all_records 結果相同，並處理重複／空白標題與型別提示
+"""
+
+import random
+
+import pandas as pd
+from gspread.utils import numericise_all, to_records
+
+from modules.google_connection import values_to_frame
+
+
+def _records_frame(values):
+    """原本的做法：get_all_records（補齊列寬、逐列 numericise）→ pd.DataFrame"""
+    width = max(len(r) for r in values)
+    padded = [list(r) + [''] * (width - len(r)) for r in values]
+    return pd.DataFrame(to_records(padded[0], [numericise_all(r) for r in padded[1:]]))
+
+
+def _payload(n_rows, seed=0):
+    rng = random.Random(seed)
+    header = ['時間戳記', '姓名', '分數', '比例', '混合', '回饋', '空欄']
+    rows = []
+    for i in range(n_rows):
+        row = [f'2026/4/{i % 28 + 1} 下午 3:{i % 60:02d}:00', f'學員{rng.randint(1, 40)}',
+               str(rng.randint(1, 5)), f'{rng.random():.2f}', rng.choice(['3', '3.5', 'N/A', '', ' 4 ', '1e3']),
+               rng.choice(['', '很好', '需加強']), '']
+        rows.append(row[:rng.randint(4, len(row))])  # API 不回傳列尾空白，列長不一
+    return [header] + rows
+
+
+def test_matches_get_all_records():
+    values = _payload(500)
+    pd.testing.assert_frame_equal(values_to_frame(values), _records_frame(values))
+
+
+def test_duplicate_and_blank_headers():
+    """空白標題改為 Unnamed: i，重複標題加上 .1、.2"""
+    df = values_to_frame([['姓名', '', '分數', '分數', '', '分數'], ['甲', 'x', '1', '2', 'y', '3']])
+    assert list(df.columns) == ['姓名', 'Unnamed: 1', '分數', '分數.1', 'Unnamed: 4', '分數.2']
+    assert df.loc[0, '分數.2'] == 3
+
+
+def test_dtype_hints_and_raw_strings():
+    values = [['學號', '分數', '日期', '備註'], ['00123', '4', '2026-04-01', '5'], ['00456', '', 'x', '']]
+    df = values_to_frame(values, dtypes={'學號': 'str', '分數': 'int', '日期': 'datetime'})
+    assert df['學號'].tolist() == ['00123', '00456']
+    assert str(df['分數'].dtype) == 'Int64' and df['分數'].isna().tolist() == [False, True]
+    assert df['日期'].iloc[0] == pd.Timestamp('2026-04-01') and pd.isna(df['日期'].iloc[1])
+    assert df['備註'].tolist() == [5, '']
+
+    raw = values_to_frame(values, numericise_values=False)
+    assert raw['分數'].tolist() == ['4', ''] and raw['學號'].tolist() == ['00123', '00456']
+
+
+def test_empty_inputs():
+    assert values_to_frame([]).empty
+    assert values_to_frame([[]]).empty
+    header_only = values_to_frame([['a', 'b']])
+    assert header_only.empty and list(header_only.columns) == ['a', 'b']
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+測試多工作表載入（fetch_google_worksheets）與讀取配額 token bucket
+"""
+
+import pandas as pd
+import pytest
+
+import modules.google_connection as gc
+from fake_gspread import FakeGspreadClient
+
+URL = 'https://docs.google.com/spreadsheets/d/abc123/edit'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _sheets():
+    return {
+        'EPA': [['時間戳記', '學員姓名', '分數']] + [[f'2026/4/{i % 28 + 1}', f'學員{i}', str(i % 5)] for i in range(50)],
+        '訓練科部': [['學號', '姓名', '科部'], ['A1', '甲', '小兒部'], ['A2', '乙']],
+        '空白': [],
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeGspreadClient(_sheets())
+    clock = FakeClock()
+    monkeypatch.setattr(gc, 'setup_google_connection', lambda: client)
+    monkeypatch.setattr(gc, '_sheets_read_limiter', gc.TokenBucket(60, clock=clock, sleep=clock.sleep))
+    client.clock = clock
+    return client
+
+
+def _expected(client, title):
+    return pd.DataFrame(client.sheet(title).get_all_records())
+
+
+def test_batch_loads_all_worksheets_in_one_call(client):
+    """所有工作表以一次 values_batch_get 載入，結果與逐張 get_all_records 相同"""
+    frames, titles = gc.fetch_google_worksheets(URL)
+    assert client.calls == 3  # open_by_key、worksheets、values_batch_get
+    assert titles == list(frames) == ['EPA', '訓練科部', '空白']
+    for title in ('EPA', '訓練科部'):
+        pd.testing.assert_frame_equal(frames[title], _expected(client, title))
+    assert frames['空白'].empty
+
+
+def test_select_by_title_or_index(client):
+    """可用標題或索引指定工作表，不存在者略過，結果依工作表順序"""
+    frames, _ = gc.fetch_google_worksheets(URL, worksheets=['訓練科部', 0, '不存在', 'EPA'])
+    assert list(frames) == ['EPA', '訓練科部']
+
+
+def test_uses_given_client(client, monkeypatch):
+    """傳入頁面自有的用戶端（例如上傳憑證建立的）時不另外建立連線"""
+    monkeypatch.setattr(gc, 'setup_google_connection', lambda: pytest.fail('不應另外建立連線'))
+    frames, titles = gc.fetch_google_worksheets(URL, worksheets=[0], client=client)
+    assert list(frames) == ['EPA'] and titles == ['EPA', '訓練科部', '空白']
+
+
+def test_falls_back_to_concurrent_reads(client, monkeypatch):
+    """批次讀取失敗時改為並行逐張讀取"""
+    def broken(ranges):
+        raise RuntimeError('response too large')
+    monkeypatch.setattr(client.spreadsheet, 'values_batch_get', broken)
+    frames, _ = gc.fetch_google_worksheets(URL, max_workers=2)
+    pd.testing.assert_frame_equal(frames['EPA'], _expected(client, 'EPA'))
+    pd.testing.assert_frame_equal(frames['訓練科部'], _expected(client, '訓練科部'))
+
+
+def test_quota_error_pauses_bucket_and_retries(client, monkeypatch):
+    """配額錯誤時暫停 token bucket 後重試，不逐張各自 sleep"""
+    real = client.spreadsheet.values_batch_get
+    failures = iter([True, True])
+
+    def flaky(ranges):
+        if next(failures, False):
+            raise RuntimeError('APIError: [429]: RESOURCE_EXHAUSTED')
+        return real(ranges)
+    monkeypatch.setattr(client.spreadsheet, 'values_batch_get', flaky)
+
+    frames, _ = gc.fetch_google_worksheets(URL)
+    assert list(frames) == ['EPA', '訓練科部', '空白']
+    # 第一次失敗暫停 2 秒（等待 3 秒取得下一個 token），第二次暫停 4 秒（等待 5 秒）
+    assert client.clock.slept == pytest.approx([3.0, 5.0])
+
+
+def test_token_bucket_paces_requests():
+    """超過突發量後依速率等待"""
+    clock = FakeClock()
+    bucket = gc.TokenBucket(60, capacity=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+    clock.now += 10
+    assert bucket.acquire() == 0
+    bucket.penalize(5)
+    assert bucket.acquire() == pytest.approx(6.0)
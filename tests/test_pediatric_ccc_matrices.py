@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+測試 build_ccc_matrices 與原本 show_skill_heatmap / show_ccc_meeting_comparison 逐人迴圈的結果一致
+"""
+
+import numpy as np
+import pandas as pd
+
+from test_pediatric_cohort_status import make_processed_df
+from pages.pediatric.pediatric_analysis import (
+    CCC_MEETING_DIMS,
+    PEDIATRIC_SKILL_REQUIREMENTS,
+    _filter_recent_6_months,
+    build_ccc_matrices,
+    calculate_skill_counts_by_resident,
+    convert_score_to_numeric,
+)
+
+
+def reference_skill_matrix(df):
+    """原本 show_skill_heatmap 的逐人 × 逐技能迴圈"""
+    technical_data = df[df['評核項目'] == '操作技術']
+    residents = sorted(df['受評核人員'].unique())
+    skills = list(PEDIATRIC_SKILL_REQUIREMENTS.keys())
+    z_matrix, text_matrix, resident_rates = [], [], []
+    counts_by_resident = calculate_skill_counts_by_resident(technical_data, residents)
+    for name in residents:
+        counts = counts_by_resident[name]
+        row_z, row_text, completed_n = [], [], 0
+        for skill in skills:
+            c = counts.get(skill, {}).get('completed', 0)
+            r = counts.get(skill, {}).get('required', PEDIATRIC_SKILL_REQUIREMENTS[skill]['minimum'])
+            if r == 0:
+                row_z.append(1.0 if c > 0 else 0.5)
+                row_text.append(f"{c}/記錄")
+                if c > 0:
+                    completed_n += 1
+            else:
+                row_z.append(min(c / r, 1.5))
+                row_text.append(f"{c}/{r}")
+                if c >= r:
+                    completed_n += 1
+        z_matrix.append(row_z)
+        text_matrix.append(row_text)
+        resident_rates.append(completed_n / len(skills) * 100)
+    order = sorted(range(len(residents)), key=lambda i: resident_rates[i])
+    return ([residents[i] for i in order], [z_matrix[i] for i in order],
+            [text_matrix[i] for i in order])
+
+
+def reference_meeting_matrix(df):
+    """原本 show_ccc_meeting_comparison 的逐人 × 逐維度迴圈"""
+    mtg_data = _filter_recent_6_months(df[df['評核項目'].astype(str).str.contains('會議報告', na=False)].copy())
+    avail_dims = [(col, lbl) for col, _, lbl in CCC_MEETING_DIMS if col in mtg_data.columns]
+    if not avail_dims:
+        for col, raw, lbl in CCC_MEETING_DIMS:
+            if raw in mtg_data.columns:
+                mtg_data[col] = mtg_data[raw].apply(convert_score_to_numeric)
+        avail_dims = [(col, lbl) for col, raw, lbl in CCC_MEETING_DIMS if raw in mtg_data.columns]
+    residents_sorted = sorted(mtg_data['受評核人員'].unique())
+    z_matrix, text_matrix, overall_avgs = [], [], []
+    for name in residents_sorted:
+        res_df = mtg_data[mtg_data['受評核人員'] == name]
+        row_z, row_text = [], []
+        for col, _ in avail_dims:
+            vals = res_df[col].dropna()
+            avg = float(vals.mean()) if len(vals) > 0 else None
+            row_z.append(avg if avg is not None else 0)
+            row_text.append(f"{avg:.1f}" if avg is not None else "—")
+        z_matrix.append(row_z)
+        text_matrix.append(row_text)
+        overall_avgs.append(sum(v for v in row_z if v > 0) / max(len([v for v in row_z if v > 0]), 1))
+    order = sorted(range(len(residents_sorted)), key=lambda i: overall_avgs[i])
+    return ([residents_sorted[i] for i in order], [z_matrix[i] for i in order],
+            [text_matrix[i] for i in order], [lbl for _, lbl in avail_dims])
+
+
+def test_skill_matrix_matches_reference():
+    """技能熱圖的排序、比值與標記文字與原實作相同"""
+    df = make_processed_df(3000, 25, seed=5)
+    residents, z, text = reference_skill_matrix(df)
+
+    matrix = build_ccc_matrices(df)['skill']
+    assert matrix['message'] is None
+    assert matrix['columns'] == list(PEDIATRIC_SKILL_REQUIREMENTS)
+    assert matrix['residents'] == residents
+    assert matrix['text'] == text
+    np.testing.assert_allclose(matrix['z'], z)
+
+
+def test_meeting_matrix_matches_reference():
+    """會議報告熱圖的排序、均分與標記文字與原實作相同"""
+    df = make_processed_df(3000, 25, seed=6)
+    residents, z, text, labels = reference_meeting_matrix(df)
+
+    matrix = build_ccc_matrices(df)['meeting']
+    assert matrix['message'] is None
+    assert matrix['columns'] == labels
+    assert matrix['residents'] == residents
+    assert matrix['text'] == text
+    np.testing.assert_allclose(matrix['z'], z)
+
+
+def test_meeting_matrix_from_raw_score_text():
+    """沒有 _數值 欄位時改由原始評分文字轉換"""
+    df = make_processed_df(600, 8, seed=7)
+    score_text = {1: '非常不同意', 2: '不同意', 3: '普通', 4: '同意', 5: '5 卓越'}
+    for col, raw, _ in CCC_MEETING_DIMS:
+        df[raw] = df.pop(col).map(score_text)
+    residents, z, text, labels = reference_meeting_matrix(df)
+
+    matrix = build_ccc_matrices(df)['meeting']
+    assert matrix['columns'] == labels
+    assert matrix['residents'] == residents
+    assert matrix['text'] == text
+    np.testing.assert_allclose(matrix['z'], z)
+
+
+def test_empty_messages():
+    """缺少資料時回傳各熱圖原本的提示文字"""
+    df = make_processed_df(300, 5, seed=8)
+
+    only_epa = build_ccc_matrices(df[df['評核項目'] == 'EPA'].reset_index(drop=True))
+    assert only_epa['skill']['message'] == "目前沒有操作技術評核資料"
+    assert only_epa['meeting']['message'] == "目前沒有會議報告評核資料"
+
+    no_scores = build_ccc_matrices(df.drop(columns=[col for col, _, _ in CCC_MEETING_DIMS]))
+    assert no_scores['meeting']['message'] == "找不到會議報告評分欄位"
+    assert no_scores['skill']['message'] is None
+
+    old = df.copy()
+    old['評核日期'] = pd.Timestamp('2000-01-01').date()
+    assert build_ccc_matrices(old)['meeting']['message'] == "近半年內沒有會議報告評核資料"
+
+    assert build_ccc_matrices(pd.DataFrame())['skill']['residents'] == []
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+測試 export_ccc_reports：每位住院醫師一份報告與全體摘要，process pool 與依序產生結果一致
+"""
+
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from test_pediatric_cohort_status import make_processed_df
+from pages.pediatric.pediatric_ccc_report import SUMMARY_BASENAME, export_ccc_reports
+
+
+def test_html_reports_and_summary(tmp_path):
+    """HTML：每人一份報告，摘要列出所有住院醫師並連結到個人報告"""
+    df = make_processed_df(600, 4)
+    result = export_ccc_reports(df, str(tmp_path), fmt='html', workers=1)
+
+    residents = sorted(df['受評核人員'].unique())
+    assert sorted(result['reports']) == residents
+    assert result['summary'] == os.path.join(str(tmp_path), f'{SUMMARY_BASENAME}.html')
+    summary = open(result['summary'], encoding='utf-8').read()
+    for name, path in result['reports'].items():
+        assert os.path.isfile(path)
+        assert name in summary and os.path.basename(path) in summary
+        assert name in open(path, encoding='utf-8').read()
+
+
+def test_xlsx_pool_matches_sequential(tmp_path):
+    """XLSX：process pool 產生的工作表內容與依序產生相同"""
+    df = make_processed_df(600, 4)
+    seq = export_ccc_reports(df, str(tmp_path / 'seq'), fmt='xlsx', workers=1)
+    par = export_ccc_reports(df, str(tmp_path / 'par'), fmt='xlsx', workers=2)
+
+    assert sorted(seq['reports']) == sorted(par['reports'])
+    for name in seq['reports']:
+        a = load_workbook(seq['reports'][name], read_only=True)
+        b = load_workbook(par['reports'][name], read_only=True)
+        assert a.sheetnames == b.sheetnames
+        for sheet in a.sheetnames:
+            assert list(a[sheet].values) == list(b[sheet].values)
+
+    summary = load_workbook(par['summary'], read_only=True)
+    rows = list(summary.active.values)
+    assert [r[0] for r in rows[1:]] == sorted(seq['reports'])
+
+
+def test_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_ccc_reports(make_processed_df(10, 1), str(tmp_path), fmt='pdf')
+
+
+def test_colliding_names_get_separate_files(tmp_path):
+    """姓名轉成相同檔名時各自一份報告，不會互相覆寫"""
+    df = make_processed_df(60, 3)
+    df['受評核人員'] = df['受評核人員'].map({'住院醫師00': '王 小明', '住院醫師01': '王/小明',
+                                           '住院醫師02': 'ccc summary'})
+    result = export_ccc_reports(df, str(tmp_path), fmt='html', workers=1)
+
+    paths = list(result['reports'].values())
+    assert len(set(paths)) == 3 and result['summary'] not in paths
+    for name, path in result['reports'].items():
+        assert name in open(path, encoding='utf-8').read()
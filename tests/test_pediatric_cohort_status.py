@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+測試全體住院醫師達標計算（calculate_cohort_status）與逐人 calculate_resident_status 結果一致
+"""
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from pages.pediatric.pediatric_analysis import (
+    PEDIATRIC_SKILL_REQUIREMENTS,
+    _get_resident_level,
+    calculate_cohort_status,
+    calculate_resident_status,
+)
+
+EPA_ITEM_VARIANTS = ['門診表現(OPD)', '門診表現（OPD）', '一般病人照護（WARD）', '一般病人照護(WARD)',
+                     '緊急處置（ED, DR）', '重症照護（PICU, NICU）', '病歷書寫', None]
+
+
+def make_processed_df(n_rows, n_residents, seed=0):
+    """產生與 process_pediatric_data 輸出同形狀的合成資料"""
+    rng = random.Random(seed)
+    skills = list(PEDIATRIC_SKILL_REQUIREMENTS)
+    today = date.today()
+    rows = []
+    for _ in range(n_rows):
+        kind = rng.choice(['操作技術', '操作技術', 'EPA', 'EPA', '會議報告', '其他'])
+        row = {
+            '受評核人員': f'住院醫師{rng.randrange(n_residents):02d}',
+            '評核時級職': rng.choice(['PGY2', 'R1', 'R2', 'R3', None]),
+            '評核項目': kind,
+            '評核日期': rng.choice([today - timedelta(days=rng.randrange(400)), None]),
+            '評核技術項目': None, '可信賴程度_數值': np.nan,
+            'EPA項目': None, 'EPA可信賴程度_數值': np.nan,
+        }
+        for col in ['內容是否充分_數值', '辯證資料的能力_數值', '口條、呈現方式是否清晰_數值',
+                    '是否具開創、建設性的想法_數值', '回答提問是否具邏輯、有條有理_數值']:
+            row[col] = np.nan
+        if kind == '操作技術':
+            picked = rng.sample(skills, rng.choice([1, 1, 2]))
+            row['評核技術項目'] = rng.choice([', '.join(picked), None])
+            row['可信賴程度_數值'] = rng.choice([1.5, 2.0, 2.5, 3.0, 3.3, 3.6, 4.0, np.nan])
+        elif kind == 'EPA':
+            row['EPA項目'] = rng.choice(EPA_ITEM_VARIANTS)
+            row['EPA可信賴程度_數值'] = rng.choice([1.5, 2.5, 3.0, 3.3, 3.6, 4.0, 4.5, np.nan])
+        elif kind == '會議報告':
+            for col in ['內容是否充分_數值', '辯證資料的能力_數值', '口條、呈現方式是否清晰_數值',
+                        '是否具開創、建設性的想法_數值', '回答提問是否具邏輯、有條有理_數值']:
+                row[col] = rng.choice([1, 2, 3, 4, 5, np.nan])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _per_resident(df, research_map):
+    expected = {}
+    for name in sorted(df['受評核人員'].unique()):
+        level = _get_resident_level(df, name)
+        status = calculate_resident_status(df[df['受評核人員'] == name], df, resident_level=level,
+                                           research_published=research_map.get(name, 0))
+        status['level'] = level
+        expected[name] = status
+    return expected
+
+
+def test_cohort_matches_per_resident():
+    """各維度數值、項目次數與 PASS/FAIL 與逐人計算完全相同"""
+    df = make_processed_df(3000, 25)
+    research_map = {'住院醫師01': 1, '住院醫師02': 2}
+
+    assert calculate_cohort_status(df, research_published_map=research_map) == _per_resident(df, research_map)
+
+
+def test_cohort_matches_with_missing_columns():
+    """缺少部分欄位（如無 EPA 或技能欄位）時結果仍一致"""
+    df = make_processed_df(800, 10, seed=3)
+    for dropped in (['EPA項目'], ['評核技術項目'], ['可信賴程度_數值', '評核日期'], ['評核項目']):
+        sub = df.drop(columns=dropped)
+        assert calculate_cohort_status(sub) == _per_resident(sub, {})
+
+
+def test_cohort_subset_of_residents():
+    """只計算指定的住院醫師；不存在的姓名與逐人計算一樣得到全 FAIL"""
+    df = make_processed_df(500, 5, seed=7)
+    result = calculate_cohort_status(df, residents=['住院醫師00', '不存在'])
+
+    assert list(result) == ['住院醫師00', '不存在']
+    assert result['住院醫師00'] == _per_resident(df, {})['住院醫師00']
+    assert result['不存在']['overall'] == 'FAIL'
+    assert result['不存在']['level'] == '未知'
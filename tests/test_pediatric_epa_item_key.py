@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+測試 EPA項目_key 標準化欄位與原本逐項子字串比對（_match_epa_item）的篩選結果一致
+"""
+
+import numpy as np
+import pandas as pd
+
+from pages.pediatric.pediatric_analysis import (
+    PEDIATRIC_EPA_ITEMS,
+    _epa_item_keys,
+    _normalize_paren,
+    _resolve_epa_item,
+    process_pediatric_data,
+)
+
+RAW_VARIANTS = ['門診表現(OPD)', '門診表現（OPD）', ' 一般病人照護(WARD) ', '緊急處置︵ED, DR︶',
+                '重症照護（PICU, NICU）', '病歷書寫', 'Q18 病歷書寫', '其他', '', None, np.nan]
+
+
+def _reference_mask(series, item):
+    """原本的 _match_epa_item"""
+    norm_item = _normalize_paren(item)
+    return series.astype(str).apply(lambda x: norm_item in _normalize_paren(x))
+
+
+def test_key_filters_match_substring_scan():
+    """每個 EPA 項目以 key 相等篩選出的列與原本子字串比對相同"""
+    rng = np.random.default_rng(2)
+    raw = pd.DataFrame({'EPA項目': [RAW_VARIANTS[i] for i in rng.integers(0, len(RAW_VARIANTS), 2000)]})
+    processed = process_pediatric_data(raw)
+
+    for item in PEDIATRIC_EPA_ITEMS:
+        expected = _reference_mask(raw['EPA項目'], item)
+        assert ((processed['EPA項目_key'] == item) == expected).all()
+
+
+def test_resolver_variants():
+    """全形/半形括號、前後文字都對應到標準名稱；無對應與空值為 None"""
+    assert _resolve_epa_item('門診表現（OPD）') == '門診表現(OPD)'
+    assert _resolve_epa_item('一般病人照護(WARD)') == '一般病人照護（WARD）'
+    assert _resolve_epa_item('Q18 病歷書寫') == '病歷書寫'
+    assert _resolve_epa_item('其他') is None
+    assert _resolve_epa_item(None) is None
+    assert _resolve_epa_item(np.nan) is None
+
+
+def test_keys_without_precomputed_column():
+    """沒有 EPA項目_key 欄位的資料框即時對應；連 EPA項目 都沒有時全為 None"""
+    df = pd.DataFrame({'EPA項目': ['病歷書寫', '門診表現（OPD）']}, index=[3, 7])
+    assert _epa_item_keys(df).tolist() == ['病歷書寫', '門診表現(OPD)']
+    assert _epa_item_keys(df.drop(columns=['EPA項目'])).tolist() == [None, None]
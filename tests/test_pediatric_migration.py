@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+測試小兒部遷移：整欄轉換的寫入格式、分批寫入的重試與續傳
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from postgrest.exceptions import APIError
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.utils.pediatric_migration import (
+    PEDIATRIC_RECORD_FIELDS,
+    build_pediatric_frame,
+    build_pediatric_frames,
+    build_pediatric_records,
+    clear_migration_checkpoint,
+    fill_default_dates,
+    insert_pediatric_chunks,
+    load_migration_checkpoint,
+    resume_offsets,
+    save_migration_checkpoint,
+)
+from pages.pediatric.pediatric_analysis import process_pediatric_data
+
+PEDIATRIC_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'pages', 'pediatric', 'test_data_pediatric_evaluations.csv')
+
+
+def _processed():
+    return process_pediatric_data(pd.read_csv(PEDIATRIC_CSV, encoding='utf-8-sig'))
+
+
+def _safe_str(val):
+    if val is None or (isinstance(val, float) and pd.isna(val)):
+        return None
+    return str(val).strip() or None
+
+
+def _safe_float(val):
+    try:
+        v = float(val)
+        return v if not pd.isna(v) else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _safe_int(val):
+    f = _safe_float(val)
+    return int(f) if f is not None else None
+
+
+def _safe_date(val):
+    return val.isoformat() if hasattr(val, 'isoformat') else str(pd.to_datetime(val).date())
+
+
+_REFERENCE_CASTS = {'str': _safe_str, 'float': _safe_float, 'int': _safe_int, 'date': _safe_date}
+_COMMON = [('evaluator_teacher', '評核教師', 'str'), ('evaluation_date', '評核日期', 'date'),
+           ('evaluated_resident', '受評核人員', 'str'), ('resident_level', '評核時級職', 'str')]
+
+
+def _reference_records(processed_df):
+    """原本的做法：iterrows 逐列分類，逐格轉換（_to_technical / _to_meeting / _to_epa）"""
+    kinds = {'操作技術': 'technical_skill', '會議報告': 'meeting_report'}
+    records = {kind: [] for kind in PEDIATRIC_RECORD_FIELDS}
+    for _, row in processed_df.iterrows():
+        eval_item = str(row.get('評核項目', '')).strip()
+        kind = kinds.get(eval_item) or ('epa' if 'EPA' in eval_item else None)
+        if kind is None:
+            continue
+        item, fields = PEDIATRIC_RECORD_FIELDS[kind]
+        rec = {'evaluation_type': kind}
+        for target, source, cast in _COMMON:
+            rec[target] = _REFERENCE_CASTS[cast](row.get(source))
+        rec['evaluator_teacher'] = rec['evaluator_teacher'] or '未知'
+        rec['evaluated_resident'] = rec['evaluated_resident'] or '未知'
+        rec['evaluation_item'] = item
+        for target, source, cast in fields:
+            rec[target] = _REFERENCE_CASTS[cast](row.get(source))
+        rec['submitted_by'] = 'migration'
+        rec['form_version'] = '1.0'
+        records[kind].append(rec)
+    return records
+
+
+def make_processed_df(n_rows):
+    """把測試資料重複到 n_rows 筆（基準測試用）"""
+    processed = _processed()
+    return pd.concat([processed] * (n_rows // len(processed) + 1), ignore_index=True).iloc[:n_rows]
+
+
+def flaky_connection(fail_calls):
+    """第 fail_calls 次（從 1 起算）insert 時回應 503（暫時性錯誤）"""
+    client = FakeSupabaseClient()
+    calls = []
+
+    def fail_when(table, action, payload):
+        if action != 'insert':
+            return None
+        calls.append(len(payload))
+        if len(calls) in fail_calls:
+            return APIError({'message': 'Service Unavailable', 'code': 503})
+        return None
+
+    client.fail_when = fail_when
+    return make_connection(client)
+
+
+def test_frames_split_by_item_with_typed_columns():
+    """依評核項目分類；整欄轉換後型別與欄位順序與寫入格式一致"""
+    processed = _processed()
+    records, skipped = build_pediatric_records(processed)
+    counts = processed['評核項目'].value_counts()
+    assert len(records['epa']) == counts['EPA']
+    assert len(records['technical_skill']) == counts['操作技術']
+    assert len(records['meeting_report']) == counts['會議報告']
+    assert skipped == 0
+
+    tech = records['technical_skill'][0]
+    assert list(tech)[:6] == ['evaluation_type', 'evaluator_teacher', 'evaluation_date',
+                              'evaluated_resident', 'resident_level', 'evaluation_item']
+    assert list(tech)[-2:] == ['submitted_by', 'form_version']
+    assert tech['evaluation_item'] == '操作技術'
+    assert isinstance(tech['proficiency_level'], int)
+    assert isinstance(tech['reliability_level'], float)
+    assert all(isinstance(r['content_sufficient'], (int, type(None))) for r in records['meeting_report'])
+    # 其他類型的欄位不會出現
+    assert 'meeting_name' not in tech and 'epa_item' not in tech
+
+
+def test_matches_row_by_row_reference():
+    """整欄轉換與原本逐列轉換的結果（值、型別、欄位順序）完全相同"""
+    processed = _processed()
+    records, _ = build_pediatric_records(processed)
+    expected = _reference_records(processed)
+    for kind in expected:
+        assert records[kind] == expected[kind]
+        for actual, ref in zip(records[kind], expected[kind]):
+            assert list(actual) == list(ref)
+            assert [type(v) for v in actual.values()] == [type(v) for v in ref.values()]
+
+
+def test_missing_values_and_defaults():
+    """缺值轉為 None、空白字串視為缺值、必填文字欄位補「未知」、日期缺值補今天、小數捨去為 int"""
+    df = pd.DataFrame({
+        '評核教師': ['  王醫師 ', None],
+        '評核日期': [datetime(2026, 3, 5).date(), None],
+        '受評核人員': ['', '住院醫師A'],
+        '評核時級職': ['R1', np.nan],
+        '會議名稱': ['晨會', '  '],
+        '內容是否充分_數值': [3.9, 'abc'],
+        '辯證資料的能力_數值': [np.inf, 2],
+    })
+    frame = build_pediatric_frame(df, 'meeting_report')
+    assert frame['evaluation_date'].tolist() == ['2026-03-05', None]
+    [first, second] = fill_default_dates(frame).to_dict('records')
+    assert first['evaluator_teacher'] == '王醫師' and second['evaluator_teacher'] == '未知'
+    assert first['evaluated_resident'] == '未知'
+    assert first['evaluation_date'] == '2026-03-05'
+    assert second['evaluation_date'] == str(datetime.now().date())
+    assert second['resident_level'] is None and second['meeting_name'] is None
+    assert first['content_sufficient'] == 3 and second['content_sufficient'] is None
+    assert first['data_analysis_ability'] is None and second['data_analysis_ability'] == 2
+    # 來源沒有的欄位為 None
+    assert first['logical_response'] is None
+
+
+def test_chunked_insert_retries_and_resumes():
+    """失敗的批次會重試；重試後仍失敗即停止，從 committed 續傳後資料完整且不重複"""
+    frame = build_pediatric_frames(_processed())[0]['epa']
+    sleeps = []
+
+    conn = flaky_connection(fail_calls={2, 3})
+    result = insert_pediatric_chunks(conn, frame, chunk_size=50, sleep=sleeps.append, backoff=1)
+    assert result['inserted'] == len(frame) and result['error'] is None
+    assert result['retries'] == 2 and sleeps == [1, 2]
+
+    conn = flaky_connection(fail_calls={3, 4, 5})
+    result = insert_pediatric_chunks(conn, frame, chunk_size=50, max_retries=2, sleep=sleeps.append)
+    assert result['committed'] == 100 and result['failed'] == 50 and result['error']
+    resumed = insert_pediatric_chunks(conn, frame, chunk_size=50, start=result['committed'], sleep=sleeps.append)
+    assert resumed['committed'] == len(frame) and resumed['inserted'] == len(frame) - 100
+
+    rows = conn.client.tables['pediatric_evaluations']
+    assert len(rows) == len(frame)
+    assert [r['epa_item'] for r in rows] == frame['epa_item'].tolist()
+
+
+def test_checkpoint_persists_and_checks_content(tmp_path):
+    """續傳點存在檔案中（重新開啟後仍在）；資料只在尾端新增時續傳，已寫入部分改變時停止"""
+    path = str(tmp_path / 'checkpoint.json')
+    frames = build_pediatric_frames(_processed())[0]
+    save_migration_checkpoint(frames, {'epa': 100, 'technical_skill': 20}, path=path)
+
+    checkpoint = load_migration_checkpoint(path=path)
+    assert checkpoint['epa']['committed'] == 100 and checkpoint['meeting_report']['committed'] == 0
+    assert resume_offsets(frames, checkpoint) == ({'technical_skill': 20, 'meeting_report': 0, 'epa': 100}, [])
+
+    grown = dict(frames, epa=pd.concat([frames['epa'], frames['epa'].head(3)]))
+    assert resume_offsets(grown, checkpoint)[0]['epa'] == 100
+
+    # 相同筆數但內容改變：不可依筆數續傳
+    changed = dict(frames, epa=frames['epa'].iloc[::-1])
+    assert resume_offsets(changed, checkpoint)[1] == ['epa']
+    shrunk = dict(frames, technical_skill=frames['technical_skill'].head(10))
+    assert resume_offsets(shrunk, checkpoint)[1] == ['technical_skill']
+
+    clear_migration_checkpoint(path=path)
+    assert load_migration_checkpoint(path=path) == {}
+
+
+def test_checkpoint_ignores_defaulted_dates(tmp_path):
+    """缺少評核日期的資料隔天續傳時指紋不變，寫入時以寫入當天補日期"""
+    from unittest import mock
+    from modules.utils import pediatric_migration
+
+    path = str(tmp_path / 'checkpoint.json')
+    df = pd.DataFrame({'評核教師': ['王醫師'] * 4, '評核日期': [None, '2026-03-05', None, None],
+                       '受評核人員': ['A', 'B', 'C', 'D'], 'EPA項目': ['病歷書寫'] * 4})
+    frames = {'epa': build_pediatric_frame(df, 'epa')}
+    save_migration_checkpoint(frames, {'epa': 2}, path=path)
+
+    class NextDay(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2030, 1, 2)
+
+    with mock.patch.object(pediatric_migration, 'datetime', NextDay):
+        frames = {'epa': build_pediatric_frame(df, 'epa')}
+        starts, mismatched = resume_offsets(frames, load_migration_checkpoint(path=path))
+        assert (starts, mismatched) == ({'epa': 2}, [])
+        conn = flaky_connection(fail_calls=set())
+        insert_pediatric_chunks(conn, frames['epa'], start=starts['epa'])
+    rows = conn.client.tables['pediatric_evaluations']
+    assert [r['evaluation_date'] for r in rows] == ['2030-01-02', '2030-01-02']
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+測試 process_pediatric_data 的查表轉換與原本逐列 .apply 的結果（含 dtype）完全相同
+"""
+
+import numpy as np
+import pandas as pd
+
+from pages.pediatric.pediatric_analysis import (
+    _convert_by_uniques,
+    convert_proficiency_to_numeric,
+    convert_reliability_to_numeric,
+    convert_score_to_numeric,
+    derive_proficiency_from_reliability,
+    process_pediatric_data,
+)
+
+SCORE_COLUMNS = ['內容是否充分', '辯證資料的能力', '口條、呈現方式是否清晰',
+                 '是否具開創、建設性的想法', '回答提問是否具邏輯、有條有理']
+
+SCORE_VALUES = ['5 卓越', '4 充分', ' 3 尚可 ', '2稍差', '不符合期待', '同意', '4', 4, 3.0, '7',
+                '其他', '', None, np.nan]
+RELIABILITY_VALUES = ['1.5 — 允許住院醫師在旁觀察', '3.6 — 教師可稍後到場協助，必要時事後確認',
+                      '允許住院醫師在旁觀察', ' 4.5 ', '2.5', 3, 9, '不明', '', None, np.nan]
+PROFICIENCY_VALUES = ['熟練', ' 基本熟練', '協助下完成', '未知', '', None, np.nan]
+
+
+def make_raw_df(n_rows, seed=0):
+    """產生 Google 表單匯出形狀的原始評分欄位"""
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return [values[i] for i in rng.integers(0, len(values), n_rows)]
+
+    data = {col: pick(SCORE_VALUES) for col in SCORE_COLUMNS}
+    data['可信賴程度'] = pick(RELIABILITY_VALUES)
+    data['EPA可信賴程度'] = pick(RELIABILITY_VALUES)
+    data['熟練程度'] = pick(PROFICIENCY_VALUES)
+    return pd.DataFrame(data, index=pd.RangeIndex(10, 10 + n_rows))
+
+
+def _reference_conversions(df):
+    """原本的逐列 .apply 實作"""
+    out = df.copy()
+    for col in SCORE_COLUMNS:
+        out[f'{col}_數值'] = out[col].apply(convert_score_to_numeric)
+    out['可信賴程度_數值'] = out['可信賴程度'].apply(convert_reliability_to_numeric)
+    out['熟練程度_數值'] = out['熟練程度'].apply(convert_proficiency_to_numeric)
+    out['熟練程度(自動判定)'] = out['可信賴程度_數值'].apply(derive_proficiency_from_reliability)
+    out['EPA可信賴程度_數值'] = out['EPA可信賴程度'].apply(convert_reliability_to_numeric)
+    return out
+
+
+def test_process_matches_apply():
+    """整份資料處理後的轉換欄位與 .apply 完全相同"""
+    df = make_raw_df(3000, seed=3)
+    pd.testing.assert_frame_equal(process_pediatric_data(df), _reference_conversions(df), check_exact=True)
+
+
+def test_dtype_follows_apply_inference():
+    """全部可轉換、全部空值、僅數值欄位等情況的 dtype 與 .apply 推斷相同"""
+    cases = [
+        (pd.Series(['同意', '普通', '同意']), convert_score_to_numeric),
+        (pd.Series(['4', 5, '同意']), convert_score_to_numeric),
+        (pd.Series([None, np.nan, '']), convert_score_to_numeric),
+        (pd.Series(['熟練', '初學']), convert_proficiency_to_numeric),
+        (pd.Series([1.5, np.nan, 4.0, 3.5]), derive_proficiency_from_reliability),
+        (pd.Series([], dtype=object), convert_reliability_to_numeric),
+        (pd.Series([], dtype=float), derive_proficiency_from_reliability),
+    ]
+    for series, converter in cases:
+        expected = series.apply(converter)
+        actual = _convert_by_uniques(series, converter)
+        pd.testing.assert_series_equal(actual, expected, check_exact=True)
+
+
+def test_converter_called_once_per_unique():
+    """每個不重複值（以及空值）只呼叫一次轉換函數"""
+    calls = []
+
+    def converter(value):
+        calls.append(value)
+        return convert_score_to_numeric(value)
+
+    series = pd.Series(['同意', '普通', None, '同意', np.nan, '普通'] * 1000)
+    _convert_by_uniques(series, converter)
+    assert len(calls) == 3
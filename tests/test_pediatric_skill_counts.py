@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+測試向量化的 calculate_skill_counts 與原本逐技能、逐列計算的結果一致
+"""
+
+import numpy as np
+import pandas as pd
+
+from test_pediatric_cohort_status import make_processed_df
+from pages.pediatric.pediatric_analysis import (
+    PEDIATRIC_SKILL_REQUIREMENTS,
+    calculate_skill_counts,
+    calculate_skill_counts_by_resident,
+)
+
+
+def _reference_skill_counts(resident_data):
+    """原本的逐技能 × 逐列實作"""
+    skill_counts = {}
+    if '評核技術項目' in resident_data.columns:
+        technical_items = resident_data['評核技術項目'].dropna()
+        for skill in PEDIATRIC_SKILL_REQUIREMENTS.keys():
+            count = 0
+            for idx, item in technical_items.items():
+                if skill in str(item):
+                    if '可信賴程度_數值' in resident_data.columns:
+                        reliability_score = resident_data.loc[idx, '可信賴程度_數值']
+                        if pd.notna(reliability_score) and reliability_score >= 2.5:
+                            count += 1
+                    else:
+                        count += 1
+            req = PEDIATRIC_SKILL_REQUIREMENTS[skill]['minimum']
+            skill_counts[skill] = {
+                'completed': count,
+                'required': req,
+                'capped': min(count, req) if req > 0 else (1 if count > 0 else 0),
+                'description': PEDIATRIC_SKILL_REQUIREMENTS[skill]['description'],
+                'progress': min(count / req * 100, 100) if req > 0 else (100.0 if count > 0 else 0.0)
+            }
+    return skill_counts
+
+
+def test_matches_reference_per_resident():
+    """每位住院醫師的 completed/required/capped/progress 與原實作相同"""
+    df = make_processed_df(2000, 12, seed=11)
+    technical = df[df['評核項目'] == '操作技術']
+    residents = sorted(df['受評核人員'].unique())
+
+    by_resident = calculate_skill_counts_by_resident(technical, residents)
+    for name in residents:
+        res_tech = technical[technical['受評核人員'] == name]
+        expected = _reference_skill_counts(res_tech)
+        assert calculate_skill_counts(res_tech) == expected
+        assert by_resident[name] == expected
+
+
+def test_without_reliability_column_counts_every_row():
+    """沒有可信賴程度欄位時每筆都計入；沒有技術項目欄位時回傳空 dict"""
+    data = pd.DataFrame({
+        '受評核人員': ['A'] * 4,
+        '評核技術項目': ['插氣管內管（訓練期間最少3次）', '腰椎穿刺, 插氣管內管', np.nan, '心臟超音波'],
+    })
+    counts = calculate_skill_counts(data)
+
+    assert counts == _reference_skill_counts(data)
+    assert counts['插氣管內管']['completed'] == 2
+    assert calculate_skill_counts(data.drop(columns=['評核技術項目'])) == {}
+
+
+def test_empty_frame():
+    """空資料時各技能皆為 0"""
+    empty = pd.DataFrame(columns=['受評核人員', '評核技術項目', '可信賴程度_數值'])
+    assert calculate_skill_counts(empty) == _reference_skill_counts(empty)
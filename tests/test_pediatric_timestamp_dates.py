@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+測試向量化的時間戳記 → 評核日期解析與原本逐列解析結果相同，並回報無法解析的列
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from pages.pediatric.pediatric_analysis import _parse_timestamp_dates, process_pediatric_data
+
+TIMESTAMP_VALUES = ['2024/3/5 下午 2:15:30', '2024/03/05 上午 9:01:02', '2023/12/31',
+                    ' 2025/1/2 上午 11:00:00 ', '2024-03-05 10:00:00', '2024/13/40 下午 1:00:00',
+                    '無', '', 20240305, None, np.nan]
+
+
+def make_timestamps(n_rows, seed=0):
+    """產生 Google 表單匯出形狀的時間戳記欄位（含少量格式錯誤）"""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp('2022-08-01') + pd.to_timedelta(rng.integers(0, 900, n_rows), unit='D')
+    values = [f"{d.year}/{d.month}/{d.day} {'上午' if h < 12 else '下午'} {h % 12 or 12}:{m:02d}:00"
+              for d, h, m in zip(days, rng.integers(0, 24, n_rows), rng.integers(0, 60, n_rows))]
+    for i in rng.choice(n_rows, size=max(1, n_rows // 100), replace=False):
+        values[i] = TIMESTAMP_VALUES[i % len(TIMESTAMP_VALUES)]
+    return pd.Series(values, index=pd.RangeIndex(5, 5 + n_rows), dtype=object)
+
+
+def _reference_dates(timestamps):
+    """原本的逐列解析"""
+    df = pd.DataFrame({'時間戳記': timestamps})
+    df['評核日期'] = None
+    for idx, timestamp in df['時間戳記'].items():
+        if pd.notna(timestamp):
+            timestamp_str = str(timestamp).strip()
+            date_part = timestamp_str.split(' ')[0] if ' ' in timestamp_str else timestamp_str
+            try:
+                df.at[idx, '評核日期'] = pd.to_datetime(date_part, format='%Y/%m/%d').date()
+            except:
+                pass
+    return df['評核日期']
+
+
+def test_matches_row_loop():
+    """每一列的解析結果與逐列實作相同（逐列實作對空白字串存 NaT，這裡統一為 None）"""
+    timestamps = make_timestamps(3000, seed=4)
+    dates, _ = _parse_timestamp_dates(timestamps)
+    expected = [None if pd.isna(d) else d for d in _reference_dates(timestamps)]
+    assert list(dates) == expected
+
+
+def test_unparsed_report():
+    """非空但無法解析的列列入回報；空值與空白字串不列入"""
+    timestamps = pd.Series(TIMESTAMP_VALUES, index=range(100, 100 + len(TIMESTAMP_VALUES)))
+    dates, unparsed = _parse_timestamp_dates(timestamps)
+
+    assert list(dates[:4]) == [date(2024, 3, 5), date(2024, 3, 5), date(2023, 12, 31), date(2025, 1, 2)]
+    assert unparsed.to_dict() == {104: '2024-03-05 10:00:00', 105: '2024/13/40 下午 1:00:00',
+                                  106: '無', 108: 20240305}
+
+
+def test_process_pediatric_data_uses_parser():
+    """沒有評核日期欄位時從時間戳記產生，並把無法解析的列記在 attrs"""
+    df = pd.DataFrame({'時間戳記': ['2024/3/5 下午 2:15:30', '壞資料', None]})
+    processed = process_pediatric_data(df)
+
+    assert processed['評核日期'].tolist() == [date(2024, 3, 5), None, None]
+    assert processed.attrs['unparsed_timestamps'] == {1: '壞資料'}
+
+    empty = process_pediatric_data(pd.DataFrame({'時間戳記': pd.Series([], dtype=object)}))
+    assert empty['評核日期'].tolist() == []
+    assert 'unparsed_timestamps' not in empty.attrs
+
+
+def test_processing_module_leaves_warnings_to_the_page():
+    """modules.pediatric_processing 不呼叫 st.*；頁面的 process_pediatric_data 才顯示無法解析的警告"""
+    from unittest import mock
+    from modules import pediatric_processing
+    from pages.pediatric import pediatric_analysis
+
+    df = pd.DataFrame({'時間戳記': ['2024/3/5 下午 2:15:30', '壞資料']})
+    with mock.patch.object(pediatric_analysis.st, 'warning') as warning:
+        processed = pediatric_processing.process_pediatric_data(df)
+        warning.assert_not_called()
+        pediatric_analysis.process_pediatric_data(df)
+    assert processed.attrs['unparsed_timestamps'] == {1: '壞資料'}
+    assert '壞資料' in warning.call_args[0][0]
+    assert not hasattr(pediatric_processing, 'st')
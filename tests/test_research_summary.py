@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+測試研究進度彙總（get_research_summary）：單次投影查詢、每人統計與寫入時失效
+"""
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.dataset_cache import bump_dataset_version
+from modules.research_summary import get_research_summary, summarize_research_progress
+
+RECORDS = [
+    {'id': 1, 'resident_name': '王小明', 'current_status': '投稿中', 'research_title': 'A',
+     'updated_at': '2026-03-01T00:00:00', 'is_deleted': False, 'progress_notes': '長文字'},
+    {'id': 2, 'resident_name': '王小明', 'current_status': '接受', 'research_title': 'B',
+     'updated_at': '2026-02-01T00:00:00', 'is_deleted': False},
+    {'id': 3, 'resident_name': '李小華', 'current_status': '發表', 'research_title': 'C',
+     'updated_at': '2026-04-01T00:00:00', 'is_deleted': False},
+    {'id': 4, 'resident_name': '李小華', 'current_status': '構思中', 'research_title': 'D',
+     'updated_at': '2026-01-01T00:00:00', 'is_deleted': True},
+]
+
+
+def test_summarize_counts_and_latest():
+    """全體與每人的階段件數、發表篇數，latest 為最近更新的一筆"""
+    summary = summarize_research_progress([
+        {'resident_name': 'A', 'current_status': '發表'},
+        {'resident_name': 'A', 'current_status': '撰寫中'},
+        {'resident_name': 'B', 'current_status': '其他'},
+        {'resident_name': 'B'},
+    ])
+
+    assert summary['stage_counts'] == {'構思中': 1, '撰寫中': 1, '投稿中': 0, '接受': 0, '發表': 1}
+    a, b = summary['by_resident']['A'], summary['by_resident']['B']
+    assert (a['count'], a['published'], a['latest']['current_status']) == (2, 1, '發表')
+    assert (b['count'], b['published']) == (2, 0)
+    assert b['stage_counts']['構思中'] == 1
+    assert summarize_research_progress(None)['by_resident'] == {}
+
+
+def test_single_projected_query_and_invalidation():
+    """重複讀取只查詢一次；新增、更新、刪除研究進度後重新查詢"""
+    client = FakeSupabaseClient({'pediatric_research_progress': RECORDS})
+    conn = make_connection(client)
+
+    def selects():
+        return client.calls.count(('pediatric_research_progress', 'select'))
+
+    bump_dataset_version('pediatric_research_progress')  # 不受其他測試留下的快取影響
+    summary = get_research_summary(conn)
+    assert get_research_summary(conn) == summary
+    assert selects() == 1
+
+    assert set(summary['by_resident']) == {'王小明', '李小華'}
+    assert summary['by_resident']['王小明']['published'] == 1
+    assert summary['by_resident']['王小明']['latest']['research_title'] == 'A'
+    assert summary['by_resident']['李小華']['count'] == 1  # 已軟刪除的不列入
+    assert 'progress_notes' not in summary['records'][0]
+
+    before = selects()
+    conn.insert_research_progress({'resident_name': '王小明', 'current_status': '發表',
+                                   'updated_at': '2026-05-01T00:00:00', 'is_deleted': False})
+    assert get_research_summary(conn)['by_resident']['王小明']['published'] == 2
+    conn.update_research_progress(1, {'current_status': '發表'})
+    assert get_research_summary(conn)['by_resident']['王小明']['published'] == 3
+    conn.delete_research_progress(2)
+    assert get_research_summary(conn)['by_resident']['王小明']['published'] == 2
+    assert selects() == before + 3
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+測試 SupabaseConnection.bulk_write：分批、同時進行的批次數上限、429/5xx 重試、失敗列位置
+"""
+
+import threading
+import time
+
+import httpx
+from postgrest.exceptions import APIError
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.supabase_connection import is_retryable_write_error
+
+
+def _rows(n):
+    return [{'username': f'user{i:04d}', 'full_name': f'使用者{i}'} for i in range(n)]
+
+
+def test_chunks_and_bounded_in_flight():
+    """每批一次請求；同時進行的批次不超過 max_in_flight"""
+    client = FakeSupabaseClient()
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def track(table, action, payload):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return None
+
+    client.fail_when = track
+    conn = make_connection(client)
+    progress = []
+    result = conn.bulk_write('pediatric_users', _rows(1234), chunk_size=100, max_in_flight=3,
+                             progress=lambda done, total: progress.append((done, total)))
+
+    assert result.ok and result.written == result.committed == 1234 and result.failed_rows == []
+    assert client.calls.count(('pediatric_users', 'insert')) == 13
+    assert 1 < peak[0] <= 3
+    assert progress[-1] == (1234, 1234) and len(progress) == 13
+    assert sorted(r['username'] for r in client.tables['pediatric_users']) == [r['username'] for r in _rows(1234)]
+
+
+def test_transient_errors_retried_with_backoff():
+    """429 與 503 以指數退避重試後成功"""
+    client = FakeSupabaseClient()
+    client.fail_next = [APIError({'message': 'Too Many Requests', 'code': 429}),
+                        APIError({'message': 'Service Unavailable', 'code': 503})]
+    sleeps = []
+    result = make_connection(client).bulk_write('pediatric_users', _rows(10), backoff=0.5, sleep=sleeps.append)
+    assert result.ok and result.retries == 2
+    assert sleeps == [0.5, 1.0]
+
+
+def test_failed_rows_reported_and_other_chunks_written():
+    """資料錯誤不重試，回報該批的列位置，其他批次照常寫入；重試用盡也列為失敗"""
+    client = FakeSupabaseClient()
+    client.fail_when = lambda table, action, payload: (
+        APIError({'message': 'duplicate key', 'code': '23505'}) if payload[0]['username'] == 'user0020' else None)
+    result = make_connection(client).bulk_write('pediatric_users', _rows(50), chunk_size=10, sleep=lambda s: None)
+    assert result.written == 40 and result.failed == 10
+    assert result.failed_rows == list(range(20, 30))
+    assert result.committed == 20
+    assert result.errors[0]['rows'] == (20, 29) and result.errors[0]['attempts'] == 1
+    assert 'duplicate key' in result.errors[0]['error']
+
+    client = FakeSupabaseClient()
+    client.fail_when = lambda *args: httpx.ConnectError('connection refused')
+    result = make_connection(client).bulk_write('pediatric_users', _rows(5), max_retries=2, sleep=lambda s: None)
+    assert result.failed_rows == [0, 1, 2, 3, 4] and result.errors[0]['attempts'] == 3
+
+
+def test_insert_not_retried_when_request_may_have_committed():
+    """insert 遇到讀取逾時或 504（伺服器可能已提交）不重試，避免重複寫入；upsert 冪等照常重試"""
+    for error in (httpx.ReadTimeout('timeout'), APIError({'message': 'Gateway Timeout', 'code': 504})):
+        client = FakeSupabaseClient()
+        client.fail_next = [error]
+        result = make_connection(client).bulk_write('pediatric_users', _rows(5), sleep=lambda s: None)
+        assert result.failed_rows == [0, 1, 2, 3, 4] and result.errors[0]['attempts'] == 1
+
+        client = FakeSupabaseClient()
+        client.fail_next = [error]
+        result = make_connection(client).bulk_write('pediatric_users', _rows(5), on_conflict='username',
+                                                    sleep=lambda s: None)
+        assert result.ok and result.retries == 1
+
+
+def test_stop_on_error_keeps_committed_prefix():
+    """stop_on_error 時失敗後不再送出新批次，已寫入的為連續前綴"""
+    client = FakeSupabaseClient()
+    client.fail_when = lambda table, action, payload: (
+        ValueError('boom') if payload[0]['username'] == 'user0030' else None)
+    result = make_connection(client).bulk_write('pediatric_users', _rows(100), chunk_size=10,
+                                                max_in_flight=1, stop_on_error=True)
+    assert result.committed == result.written == 30
+    assert result.failed_rows == list(range(30, 40))
+    assert len(client.tables['pediatric_users']) == 30
+
+
+def test_batch_upsert_users_uses_chunked_upsert():
+    """CSV 匯入：一次 upsert 多筆，失敗時錯誤訊息列出該批帳號"""
+    client = FakeSupabaseClient({'pediatric_users': [{'id': 1, 'username': 'user0001', 'full_name': '舊名'}]})
+    conn = make_connection(client)
+    count, errors = conn.batch_upsert_users(_rows(3))
+    assert (count, errors) == (3, [])
+    assert client.calls == [('pediatric_users', 'upsert')]
+    assert {r['username']: r['full_name'] for r in client.tables['pediatric_users']}['user0001'] == '使用者1'
+    assert all('updated_at' in r for r in client.tables['pediatric_users'])
+
+    client.fail_when = lambda *args: ValueError('欄位錯誤')
+    count, errors = conn.batch_upsert_users(_rows(2))
+    assert count == 0 and errors == ['user0000、user0001: 欄位錯誤']
+
+
+def test_retryable_error_classification():
+    assert is_retryable_write_error(APIError({'code': 503}))
+    assert is_retryable_write_error(APIError({'code': '429'}))
+    assert is_retryable_write_error(APIError({'code': '40P01', 'message': 'deadlock detected'}))
+    assert is_retryable_write_error(httpx.ReadTimeout('timeout'))
+    assert not is_retryable_write_error(APIError({'code': '23505'}))
+    assert not is_retryable_write_error(APIError({'code': 400}))
+    assert not is_retryable_write_error(ValueError('bad'))
+
+    # insert：只重試確定未寫入的錯誤
+    for error in (httpx.ConnectError('refused'), httpx.PoolTimeout('pool'), APIError({'code': 503}),
+                  APIError({'code': 429}), APIError({'code': '40P01', 'message': 'deadlock detected'})):
+        assert is_retryable_write_error(error, idempotent=False)
+    for error in (httpx.ReadTimeout('timeout'), httpx.RemoteProtocolError('closed'),
+                  APIError({'code': 502}), APIError({'code': 504}), APIError({'code': 500})):
+        assert not is_retryable_write_error(error, idempotent=False)
+
+
+def test_batch_create_users_reports_each_row():
+    """CSV 匯入：一次查詢既有帳號、分批 insert；已存在、檔案內重複與寫入失敗的帳號逐筆回報"""
+    client = FakeSupabaseClient({'pediatric_users': [{'id': 1, 'username': 'user0001', 'full_name': '舊名'}]})
+    client.fail_when = lambda table, action, payload: (
+        APIError({'message': 'duplicate key value', 'code': '23505'})
+        if action == 'insert' and any(r['username'] == 'user0007'
+                                      for r in (payload if isinstance(payload, list) else [payload])) else None)
+    conn = make_connection(client)
+    records = _rows(10) + [{'username': 'user0003', 'full_name': '重複'}]
+
+    outcomes = conn.batch_create_users(records)
+    assert [name for name, _, _ in outcomes] == [r['username'] for r in records]
+    failed = {name: msg for name, ok, msg in outcomes if not ok}
+    assert list(failed) == ['user0001', 'user0007', 'user0003']
+    assert set(failed.values()) == {'使用者名稱已存在'}
+    assert client.calls.count(('pediatric_users', 'select')) == 1
+    names = sorted(r['username'] for r in client.tables['pediatric_users'])
+    assert names == sorted(r['username'] for r in _rows(10) if r['username'] != 'user0007')
+    assert {r['username']: r['full_name'] for r in client.tables['pediatric_users']}['user0001'] == '舊名'
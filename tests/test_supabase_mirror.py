@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+測試 Supabase 本機鏡像（SupabaseMirror）的增量同步
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.supabase_mirror import SupabaseMirror
+
+_T0 = datetime(2025, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _ts(minutes):
+    return (_T0 + timedelta(minutes=minutes)).isoformat()
+
+
+def _evaluations(n):
+    return [{
+        'id': i,
+        'evaluation_date': (date(2025, 1, 1) + timedelta(days=i // 3)).isoformat(),
+        'evaluated_resident': f'R{i % 4}',
+        'evaluation_type': 'epa',
+        'department': '小兒部' if i % 5 else '內科部',
+        'is_deleted': False,
+        'updated_at': _ts(i),
+    } for i in range(1, n + 1)]
+
+
+def _setup(tmp_path, tables):
+    client = FakeSupabaseClient(tables)
+    conn = make_connection(client)
+    mirror = SupabaseMirror(conn, path=str(tmp_path / 'mirror.sqlite3'),
+                            page_size=50, min_sync_interval=0)
+    return client, conn, mirror
+
+
+def test_cold_sync_matches_direct_fetch(tmp_path):
+    """冷啟動同步後，鏡像讀取結果與直接查詢 Supabase 相同"""
+    client, conn, mirror = _setup(tmp_path, {'pediatric_evaluations': _evaluations(333)})
+
+    for filters in (None, {'department': '小兒部'}, {'evaluated_resident': 'R1', 'date_from': '2025-02-01'}):
+        expected = conn.fetch_pediatric_evaluations_df(filters=filters)
+        actual = mirror.fetch_pediatric_evaluations_df(filters=filters)
+        assert actual['id'].tolist() == expected['id'].tolist()
+
+
+def test_warm_sync_fetches_only_delta(tmp_path):
+    """暖啟動只取水位之後的記錄，並處理新增、修改與軟刪除"""
+    client, conn, mirror = _setup(tmp_path, {'pediatric_evaluations': _evaluations(500)})
+    mirror.sync('pediatric_evaluations')
+
+    table = client.tables['pediatric_evaluations']
+    table[9]['is_deleted'] = True
+    table[9]['updated_at'] = _ts(1000)
+    table[19]['evaluated_resident'] = 'R9'
+    table[19]['updated_at'] = _ts(1001)
+    table.append({**_evaluations(1)[0], 'id': 501, 'updated_at': _ts(1002)})
+
+    client.calls.clear()
+    changed = mirror.sync('pediatric_evaluations')
+
+    assert len(client.calls) == 1
+    # 往回 SYNC_OVERLAP 的重疊區間也會被重新寫入（冪等）
+    assert 3 <= changed < 50
+    ids = mirror.fetch_pediatric_evaluations_df()['id'].tolist()
+    assert 10 not in ids
+    assert 501 in ids
+    assert len(ids) == 500
+    assert mirror.fetch_records('pediatric_evaluations', {'evaluated_resident': 'R9'})[0]['id'] == 20
+
+
+def test_projection_and_private_filter(tmp_path):
+    """欄位投影與反思的私人記錄過濾語意與 SupabaseConnection 相同"""
+    reflections = [{
+        'id': i, 'resident_name': 'A', 'reflection_date': f'2025-01-{i:02d}',
+        'reflection_title': f't{i}', 'reflection_type': '臨床', 'is_private': i % 2 == 0,
+        'is_deleted': False, 'department': '小兒部', 'updated_at': _ts(i), 'what_happened': '長文字',
+    } for i in range(1, 9)]
+    client, conn, mirror = _setup(tmp_path, {'pediatric_learning_reflections': reflections})
+
+    for filters in (None, {'resident_name': 'A'}, {'resident_name': 'A', 'include_private': True}):
+        expected = conn.fetch_learning_reflections(filters=filters, columns='list')
+        assert mirror.fetch_learning_reflections(filters=filters, columns='list') == expected
+
+
+def test_sync_failure(tmp_path):
+    """從未同步過時失敗改走直接查詢；已有鏡像時失敗則沿用舊資料"""
+    client, conn, mirror = _setup(tmp_path, {'pediatric_research_progress': [
+        {'id': 1, 'resident_name': 'A', 'is_deleted': False, 'updated_at': _ts(1)},
+    ]})
+
+    client.fail_next = [RuntimeError('timeout')]
+    assert [r['id'] for r in mirror.fetch_research_progress()] == [1]
+    assert not mirror.has_synced('pediatric_research_progress')
+
+    mirror.sync('pediatric_research_progress')
+    client.tables['pediatric_research_progress'].append(
+        {'id': 2, 'resident_name': 'B', 'is_deleted': False, 'updated_at': _ts(2)})
+    client.fail_next = [RuntimeError('timeout')]
+    assert [r['id'] for r in mirror.fetch_research_progress()] == [1]
+    assert [r['id'] for r in mirror.fetch_research_progress()] == [2, 1]
+
+
+def test_local_write_skips_min_interval(tmp_path):
+    """本行程新增評核後（版本號變更），即使在最短間隔內也會重新同步"""
+    client = FakeSupabaseClient({'pediatric_evaluations': _evaluations(10)})
+    conn = make_connection(client)
+    mirror = SupabaseMirror(conn, path=str(tmp_path / 'mirror.sqlite3'), min_sync_interval=3600)
+    mirror.sync('pediatric_evaluations')
+
+    conn.insert_pediatric_evaluation({**_evaluations(1)[0], 'id': 11, 'updated_at': _ts(100)})
+
+    assert mirror.sync('pediatric_evaluations') >= 1
+    assert mirror.sync('pediatric_evaluations') == 0
+    assert len(mirror.fetch_pediatric_evaluations_df()) == 11
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+測試 SupabaseConnection 的 keyset 分頁查詢
+"""
+
+from datetime import date, timedelta
+
+from fake_supabase import FakeSupabaseClient, make_connection
+
+
+def _make_rows(n, n_deleted=0):
+    """產生 n 筆評核記錄，刻意讓多筆落在同一天以測試 (date, id) 游標"""
+    base = date(2025, 1, 1)
+    rows = []
+    for i in range(1, n + 1):
+        rows.append({
+            'id': i,
+            'evaluation_date': (base + timedelta(days=i // 7)).isoformat(),
+            'evaluated_resident': f'R{i % 5}',
+            'evaluation_type': 'epa',
+            'department': '小兒部',
+            'is_deleted': i <= n_deleted,
+        })
+    return rows
+
+
+def test_pages_return_every_row_once():
+    """分頁走完後每一筆未刪除記錄都恰好出現一次，且順序與單次查詢一致"""
+    client = FakeSupabaseClient({'pediatric_evaluations': _make_rows(2503, n_deleted=3)})
+    conn = make_connection(client)
+
+    pages = list(conn.iter_pediatric_evaluation_pages(page_size=100))
+
+    assert all(0 < len(p) <= 100 for p in pages)
+    ids = [r['id'] for p in pages for r in p]
+    assert len(ids) == 2500
+    assert len(set(ids)) == 2500
+    assert set(ids) == set(range(4, 2504))
+
+    keys = [(r['evaluation_date'], r['id']) for p in pages for r in p]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_exact_multiple_of_page_size():
+    """筆數剛好為 page_size 倍數時，最後多一次空查詢即停止"""
+    client = FakeSupabaseClient({'pediatric_evaluations': _make_rows(300)})
+    conn = make_connection(client)
+
+    pages = list(conn.iter_pediatric_evaluation_pages(page_size=100))
+
+    assert [len(p) for p in pages] == [100, 100, 100]
+    assert len(client.calls) == 4
+
+
+def test_filters_apply_to_every_page():
+    """過濾條件在每一頁都生效"""
+    client = FakeSupabaseClient({'pediatric_evaluations': _make_rows(1000)})
+    conn = make_connection(client)
+
+    rows = conn.fetch_pediatric_evaluations(filters={'evaluated_resident': 'R1'}, page_size=37)
+
+    assert len(rows) == 200
+    assert {r['evaluated_resident'] for r in rows} == {'R1'}
+
+
+def test_dataframe_helper_matches_list_fetch():
+    """DataFrame helper 與 list 版本內容相同"""
+    client = FakeSupabaseClient({'pediatric_evaluations': _make_rows(1234)})
+    conn = make_connection(client)
+
+    df = conn.fetch_pediatric_evaluations_df(page_size=250)
+    rows = conn.fetch_pediatric_evaluations(page_size=1000)
+
+    assert len(df) == 1234
+    assert df['id'].tolist() == [r['id'] for r in rows]
+
+
+def test_failure_returns_empty_instead_of_partial():
+    """中途查詢失敗時不回傳不完整資料"""
+    client = FakeSupabaseClient({'pediatric_evaluations': _make_rows(500)})
+    client.fail_next = [None, RuntimeError('timeout')]
+    conn = make_connection(client)
+
+    assert conn.fetch_pediatric_evaluations(page_size=100) == []
+    client.fail_next = [None, RuntimeError('timeout')]
+    assert conn.fetch_pediatric_evaluations_df(page_size=100).empty
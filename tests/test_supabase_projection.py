@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+測試 SupabaseConnection 的欄位投影與型別對照
+"""
+
+import pytest
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from modules.supabase_connection import (
+    PEDIATRIC_EVALUATION_COLUMNS,
+    _select_clause,
+)
+
+
+def _rows():
+    return [
+        {'id': 1, 'evaluation_date': '2025-01-02', 'evaluation_type': 'technical_skill',
+         'evaluated_resident': 'A', 'reliability_level': '3.5', 'technical_feedback': '很長的回饋',
+         'is_deleted': False, 'department': '小兒部'},
+        {'id': 2, 'evaluation_date': '2025-01-01', 'evaluation_type': 'epa',
+         'evaluated_resident': 'B', 'epa_reliability_level': 4, 'epa_qualitative_feedback': '回饋',
+         'is_deleted': False, 'department': '小兒部'},
+    ]
+
+
+def test_select_clause():
+    """view 名稱展開為欄位清單，分頁必要欄位自動補上"""
+    assert _select_clause(PEDIATRIC_EVALUATION_COLUMNS, None) == '*'
+    assert _select_clause(PEDIATRIC_EVALUATION_COLUMNS, '*', required=('id',)) == '*'
+    assert _select_clause(PEDIATRIC_EVALUATION_COLUMNS, ['evaluated_resident'],
+                          required=('evaluation_date', 'id')) == 'evaluated_resident,evaluation_date,id'
+    assert _select_clause(PEDIATRIC_EVALUATION_COLUMNS, 'scores') == ','.join(
+        PEDIATRIC_EVALUATION_COLUMNS['scores'])
+    with pytest.raises(ValueError):
+        _select_clause(PEDIATRIC_EVALUATION_COLUMNS, 'no_such_view')
+
+
+def test_projection_drops_feedback_columns():
+    """scores 投影不回傳文字回饋欄位"""
+    conn = make_connection(FakeSupabaseClient({'pediatric_evaluations': _rows()}))
+
+    df = conn.fetch_pediatric_evaluations_df(columns='scores')
+
+    assert list(df.columns) == PEDIATRIC_EVALUATION_COLUMNS['scores']
+    assert 'technical_feedback' not in df.columns
+    assert df['id'].tolist() == [1, 2]
+
+
+def test_dtypes_are_applied():
+    """分數欄位轉為 float64、id 為可空整數"""
+    conn = make_connection(FakeSupabaseClient({'pediatric_evaluations': _rows()}))
+
+    df = conn.fetch_pediatric_evaluations_df(columns='dashboard')
+
+    assert str(df['id'].dtype) == 'Int64'
+    assert df['reliability_level'].dtype == 'float64'
+    assert df['reliability_level'].iloc[0] == 3.5
+    assert df['epa_reliability_level'].iloc[1] == 4.0
+
+
+def test_dashboard_projection_covers_page_column_map():
+    """_load_from_supabase 欄位對照中的每個欄位都包含在 dashboard 投影內"""
+    from pages.pediatric.pediatric_analysis import SUPABASE_COLUMN_MAP
+
+    missing = set(SUPABASE_COLUMN_MAP) - set(PEDIATRIC_EVALUATION_COLUMNS['dashboard'])
+
+    assert not missing
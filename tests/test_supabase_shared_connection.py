@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+測試行程共用的 Supabase 連線（get_shared_connection）
+"""
+
+import threading
+import time
+
+import pytest
+
+import modules.supabase_connection as sc
+
+
+class _SlowConnection:
+    """建立時稍作停頓，放大多執行緒競爭"""
+    instances = 0
+
+    def __init__(self):
+        time.sleep(0.01)
+        type(self).instances += 1
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(sc, 'SupabaseConnection', _SlowConnection)
+    monkeypatch.setattr(sc, '_connection_stats', {'created': 0, 'reused': 0})
+    _SlowConnection.instances = 0
+    sc.reset_shared_connection()
+    yield sc
+    sc.reset_shared_connection()
+
+
+def test_same_instance_and_counters(registry):
+    """重複取得回傳同一實例，並正確計數建立／重用次數"""
+    first = registry.get_shared_connection()
+    assert registry.get_shared_connection() is first
+    assert registry.get_shared_connection() is first
+    assert registry.get_connection_stats() == {'created': 1, 'reused': 2}
+
+
+def test_concurrent_first_use_creates_once(registry):
+    """多執行緒同時首次取得時只建立一個連線"""
+    results = []
+    barrier = threading.Barrier(16)
+
+    def worker():
+        barrier.wait()
+        results.append(registry.get_shared_connection())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert _SlowConnection.instances == 1
+    assert len({id(r) for r in results}) == 1
+    assert registry.get_connection_stats() == {'created': 1, 'reused': 15}
+
+
+def test_reset_recreates(registry):
+    """reset 後重新建立新的連線"""
+    first = registry.get_shared_connection()
+    registry.reset_shared_connection()
+    assert registry.get_shared_connection() is not first
+    assert registry.get_connection_stats()['created'] == 2
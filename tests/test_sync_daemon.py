@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+測試排程同步：水位線只送出新資料、鎖定檔避免重疊執行、每個工作輸出 JSON log
+"""
+
+import json
+import logging
+import os
+
+import pandas as pd
+
+from fake_supabase import FakeSupabaseClient, make_connection
+from test_data_sync import make_form_df
+from modules.utils import sync_daemon
+from modules.utils.sync_daemon import SyncLock, load_sync_state, run_daemon, run_sync_once
+
+PEDIATRIC_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'pages', 'pediatric', 'test_data_pediatric_evaluations.csv')
+
+
+class FakeFetch:
+    """依試算表網址回傳目前的表單資料（None 網址為 UGY）"""
+
+    def __init__(self, ugy=None, pediatric=None):
+        self.frames = {'ugy': ugy, 'pediatric': pediatric}
+
+    def __call__(self, spreadsheet_url=None, incremental=True):
+        df = self.frames['ugy' if spreadsheet_url is None else 'pediatric']
+        return (None if df is None else df.copy()), []
+
+
+def _paths(tmp_path):
+    return str(tmp_path / 'state.json'), str(tmp_path / 'sync.lock')
+
+
+def test_ugy_watermark_only_sends_new_rows(tmp_path):
+    """第一次全部新增；之後只比對水位線之後的資料，狀態檔保存水位線與執行結果"""
+    conn = make_connection(FakeSupabaseClient())
+    state_path, lock_path = _paths(tmp_path)
+    df = make_form_df(300).sort_values('時間戳記')
+    fetch = FakeFetch(ugy=df)
+
+    [first] = run_sync_once(conn, ['ugy'], state_path, lock_path, fetch=fetch)
+    assert first['status'] == 'success' and first['inserted'] == 300
+
+    new_rows = make_form_df(2, start=300)
+    new_rows['時間戳記'] = ['2026/1/1 上午 9:00:00', '2026/1/2 下午 3:00:00']
+    fetch.frames['ugy'] = pd.concat([df, new_rows], ignore_index=True)
+    [second] = run_sync_once(conn, ['ugy'], state_path, lock_path, fetch=fetch)
+    assert second['inserted'] == 2 and second['rows_considered'] < 10
+    assert len(conn.client.tables['epa_evaluations']) == 302
+
+    state = load_sync_state(state_path)
+    assert state['ugy']['watermark'] == '2026-01-02T15:00:00'
+    assert state['ugy']['last_run']['inserted'] == 2
+    assert not os.path.exists(lock_path)
+
+
+def test_pediatric_inserts_once_per_row(tmp_path):
+    """小兒部：第一次全部寫入，重跑不重複寫入，新表單回應只寫入一筆"""
+    conn = make_connection(FakeSupabaseClient())
+    state_path, lock_path = _paths(tmp_path)
+    raw = pd.read_csv(PEDIATRIC_CSV, encoding='utf-8-sig')
+    fetch = FakeFetch(pediatric=raw)
+
+    [first] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert first['status'] == 'success' and first['inserted'] == len(raw)
+    [again] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert again['inserted'] == 0
+
+    extra = raw.iloc[[0]].copy()
+    extra['時間戳記'] = '2099/01/01 08:00:00'
+    fetch.frames['pediatric'] = pd.concat([raw, extra], ignore_index=True)
+    [third] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert third['inserted'] == 1
+    assert len(conn.client.tables['pediatric_evaluations']) == len(raw) + 1
+    assert [log['migration_type'] for log in conn.client.tables['pediatric_migration_log']] == \
+        ['incremental', 'incremental']
+
+
+def test_pediatric_bootstrap_after_manual_migration(tmp_path):
+    """已用遷移工具匯入過時，以各類型最近一筆匯入資料的建立時間為水位線：只寫入之後送出的表單回應"""
+    migrated_at = '2026-03-07T00:30:00+00:00'  # 台灣時間 08:30，晚於 CSV 的 08:26:44
+    client = FakeSupabaseClient({'pediatric_evaluations': [
+        {'id': i, 'submitted_by': 'migration', 'evaluation_type': kind, 'created_at': migrated_at}
+        for i, kind in enumerate(['epa', 'technical_skill', 'meeting_report'], start=1)]})
+    conn = make_connection(client)
+    state_path, lock_path = _paths(tmp_path)
+    raw = pd.read_csv(PEDIATRIC_CSV, encoding='utf-8-sig')
+    kinds = raw['評核項目'].astype(str)
+    newer = pd.concat([raw[kinds.str.contains('EPA')].iloc[[0]], raw[kinds == '操作技術'].iloc[[0]]])
+    newer['時間戳記'] = ['2026/03/07 09:00:00', '2026/03/10 14:00:00']
+    before_migration = raw[kinds == '會議報告'].iloc[[0]].copy()
+    before_migration['時間戳記'] = '2026/03/07 08:29:00'
+    fetch = FakeFetch(pediatric=pd.concat([raw, before_migration, newer], ignore_index=True))
+
+    [result] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert result['status'] == 'success' and result['inserted'] == 2
+    assert result['bootstrap'] == {kind: '2026-03-07T08:30:00'
+                                   for kind in ['epa', 'technical_skill', 'meeting_report']}
+    inserted = [r for r in client.tables['pediatric_evaluations'] if 'created_at' not in r]
+    assert sorted(r['evaluation_type'] for r in inserted) == ['epa', 'technical_skill']
+
+    [again] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert again['inserted'] == 0 and 'bootstrap' not in again
+    assert load_sync_state(state_path)['pediatric']['watermarks']['technical_skill'] == '2026-03-10T14:00:00'
+
+
+def test_lock_prevents_overlap_and_stale_lock_is_reclaimed(tmp_path, caplog):
+    """鎖定檔由存活中的行程持有時略過本輪；持有者已結束時接手"""
+    conn = make_connection(FakeSupabaseClient())
+    state_path, lock_path = _paths(tmp_path)
+    fetch = FakeFetch(ugy=make_form_df(10))
+
+    with caplog.at_level(logging.INFO, logger='cbme.sync'):
+        with SyncLock(lock_path):
+            assert run_sync_once(conn, ['ugy'], state_path, lock_path, fetch=fetch) == []
+        skipped = json.loads(caplog.records[-1].getMessage())
+        assert skipped['event'] == 'sync_skipped' and skipped['pid'] == os.getpid()
+
+        with open(lock_path, 'w') as f:
+            f.write('999999999')
+        [result] = run_sync_once(conn, ['ugy'], state_path, lock_path, fetch=fetch)
+        assert result['inserted'] == 10
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged['event'] == 'sync_job' and logged['job'] == 'ugy'
+    assert logged['inserted'] == 10 and 'duration_s' in logged
+
+
+def test_failed_job_does_not_stop_others(tmp_path, monkeypatch):
+    """單一工作發生例外時記錄為 failed，其他工作照常執行；常駐模式依間隔重複執行"""
+    conn = make_connection(FakeSupabaseClient())
+    state_path, lock_path = _paths(tmp_path)
+    fetch = FakeFetch(ugy=make_form_df(5), pediatric=pd.DataFrame({'評核項目': ['EPA']}))
+
+    results = run_sync_once(conn, ['pediatric', 'ugy'], state_path, lock_path, fetch=fetch)
+    assert [r['status'] for r in results] == ['failed', 'success']
+
+    calls, sleeps = [], []
+    monkeypatch.setattr(sync_daemon, 'run_sync_once', lambda *a, **k: calls.append(k['full']))
+    run_daemon(lambda: conn, interval=60, max_runs=3, full=True, sleep=sleeps.append)
+    assert calls == [True, False, False]
+    assert len(sleeps) == 2 and all(0 < s <= 60 for s in sleeps)
+
+
+def test_pediatric_resumes_after_failed_chunk(tmp_path, monkeypatch):
+    """批次寫入失敗時水位線停在最後成功的批次（同一秒跨批次也能續傳），下次補齊且不重複"""
+    from modules.utils import pediatric_migration
+    monkeypatch.setattr(pediatric_migration, 'MIGRATION_CHUNK_SIZE', 40)
+
+    client = FakeSupabaseClient()
+    client.fail_when = lambda table, action, payload: (
+        ValueError('寫入失敗') if action == 'insert' and len(client.tables.get(table, [])) >= 80 else None)
+    conn = make_connection(client)
+
+    state_path, lock_path = _paths(tmp_path)
+    raw = pd.read_csv(PEDIATRIC_CSV, encoding='utf-8-sig')
+    raw['時間戳記'] = '2026/03/07 08:00:00'  # 全部同一秒
+    fetch = FakeFetch(pediatric=raw)
+
+    [first] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert first['status'] == 'partial' and first['inserted'] == 80
+    assert first['inserted'] + first['failed'] == len(raw)
+
+    client.fail_when = None
+    [second] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert second['status'] == 'success' and second['inserted'] == len(raw) - 80
+    [third] = run_sync_once(conn, ['pediatric'], state_path, lock_path, fetch=fetch)
+    assert third['inserted'] == 0
+    assert len(conn.client.tables['pediatric_evaluations']) == len(raw)
+    assert load_sync_state(state_path)['pediatric']['watermark_ties'] == {}
+
+
+def test_unreadable_sheet_fails_job_and_cli_exit_code(tmp_path, monkeypatch, caplog):
+    """讀不到 Google 試算表（缺少憑證）時不是 no_data：工作記錄為 failed 與原因，--once 以非零狀態碼結束"""
+    import importlib.util
+    import sys
+    from modules import supabase_connection
+
+    monkeypatch.setenv('GOOGLE_APPLICATION_CREDENTIALS', str(tmp_path / 'missing.json'))
+    conn = make_connection(FakeSupabaseClient())
+    state_path, lock_path = _paths(tmp_path)
+
+    with caplog.at_level(logging.INFO, logger='cbme.sync'):
+        results = run_sync_once(conn, ['ugy', 'pediatric'], state_path, lock_path)
+    assert [r['status'] for r in results] == ['failed', 'failed']
+    assert all('憑證檔不存在' in r['error'] for r in results)
+    assert json.loads(caplog.records[-1].getMessage())['status'] == 'failed'
+    assert 'watermark' not in load_sync_state(state_path)['ugy']
+
+    spec = importlib.util.spec_from_file_location(
+        'sync_daemon_cli', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                        'scripts', 'sync_daemon.py'))
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+    monkeypatch.setattr(supabase_connection, 'get_shared_connection', lambda: conn)
+    monkeypatch.setattr(sys, 'argv', ['sync_daemon.py', '--once', '--state', state_path, '--lock', lock_path])
+    assert cli.main() == 1
+
+    # 部分資料寫入失敗（partial）同樣以非零狀態碼結束
+    for statuses, code in ((['success', 'no_data'], 0), (['success', 'partial'], 1)):
+        monkeypatch.setattr(cli, 'run_sync_once', lambda *a, **kw: [{'status': s} for s in statuses])
+        assert cli.main() == code
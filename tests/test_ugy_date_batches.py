@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+測試整欄日期 → 梯次轉換（dates_to_batches）與逐列 convert_date_to_batch 結果相同
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from modules.data_processing import convert_date_to_batch, dates_to_batches
+from pages.ugy.ugy_data_service import process_epa_data
+
+DATE_VALUES = ['2025/5/2 下午 2:15:30', '2025/05/02 上午 9:01:02', ' 2024/12/31 ', '2025-05-02',
+               '2025-05-02T10:00:00+08:00', '2025-05-02 00:00:00', 'May 2, 2025', '2025.05.02',
+               '2025/13/40', 'nan', 'None', 'NaT', '', '無', None, np.nan,
+               date(2025, 5, 2), datetime(2020, 6, 28, 23, 0), pd.Timestamp('2020-06-29'), 20250502]
+
+
+def make_dates(n_rows, seed=0):
+    """產生表單匯出形狀的評核日期欄位（含少量其他格式與空值）"""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 2500, n_rows), unit='D')
+    values = [f"{d.year}/{d.month}/{d.day}" if i % 2 else d.strftime('%Y-%m-%d')
+              for i, d in enumerate(days)]
+    for i in rng.choice(n_rows, size=max(1, n_rows // 100), replace=False):
+        values[i] = DATE_VALUES[i % len(DATE_VALUES)]
+    return pd.Series(values, index=pd.RangeIndex(3, 3 + n_rows), dtype=object)
+
+
+def _reference_batches(values):
+    """原本的逐列轉換"""
+    return values.apply(convert_date_to_batch)
+
+
+def test_matches_row_apply():
+    """混合格式欄位的每一列與逐列實作相同，index 保持不變"""
+    values = make_dates(3000, seed=2)
+    result = dates_to_batches(values)
+    pd.testing.assert_series_equal(result, _reference_batches(values), check_dtype=False)
+
+
+def test_edge_values():
+    """上午/下午、含時區 ISO、空值字串與日期物件逐一比對"""
+    values = pd.Series(DATE_VALUES, dtype=object)
+    assert list(dates_to_batches(values)) == [convert_date_to_batch(v) for v in DATE_VALUES]
+
+
+def test_every_day_of_range():
+    """2015–2030 每一天（datetime64 與字串兩種輸入）的梯次邊界都相同"""
+    days = pd.Series(pd.date_range('2015-01-01', '2030-12-31', freq='D'))
+    expected = [convert_date_to_batch(d) for d in days.dt.strftime('%Y/%m/%d')]
+    assert list(dates_to_batches(days)) == expected
+    assert list(dates_to_batches(days.dt.strftime('%Y-%m-%d'))) == expected
+
+
+def test_normalize_prefers_evaluation_date():
+    """UGY 資料處理：沒有梯次的列優先用 evaluation_date，無值時改用時間戳記，已有梯次不覆蓋"""
+    df = pd.DataFrame({
+        '梯次': [None, '', '2020/01/06', '未知梯次'],
+        'evaluation_date': ['2025-05-02', None, '2025-05-02', 'nan'],
+        '時間戳記': ['2024/1/1 上午 9:00:00', '2024/1/1 上午 9:00:00', '2024/1/1', ''],
+    })
+    result = process_epa_data(df, filter_teacher=False)
+    assert list(result['梯次']) == ['2025/04/28', '2023/12/25', '2020/01/06', '未知梯次']
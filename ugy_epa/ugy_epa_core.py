@@ -5,14 +5,14 @@ import plotly.graph_objects as go
 from modules.google_connection import fetch_google_form_data, SHOW_DIAGNOSTICS
 from modules.data_processing import (
     process_epa_level, 
-    convert_date_to_batch, 
+    dates_to_batches,
     convert_tw_time,
     process_training_departments,
     get_student_departments,
     merge_epa_with_departments
 )
 from modules.visualization import plot_radar_chart, plot_epa_trend_px
-from modules.supabase_connection import SupabaseConnection
+from modules.supabase_connection import get_shared_connection
 # 暫時註解掉不需要的導入
 # from modules.data_analysis import analyze_epa_data
 
@@ -30,7 +30,7 @@ def load_sheet_data(sheet_title=None, show_info=True):
     """
     try:
         # 建立 Supabase 連線
-        supabase_conn = SupabaseConnection()
+        supabase_conn = get_shared_connection()
         
         # 根據 sheet_title 決定要載入哪種資料
         if sheet_title == "訓練科部":
@@ -98,7 +98,7 @@ def process_data(df):
                     df['評核日期'] = pd.to_datetime(df['評核時間']).dt.date
                 
                 if '評核日期' in df.columns:
-                    df['梯次'] = df['評核日期'].astype(str).apply(convert_date_to_batch)
+                    df['梯次'] = dates_to_batches(df['評核日期'].astype(str))
                     show_diagnostic("日期轉換成功", "info")
                 else:
                     st.warning("找不到日期欄位，跳過梯次處理")
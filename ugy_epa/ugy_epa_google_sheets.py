@@ -2,10 +2,10 @@ import re
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from modules.google_connection import fetch_google_form_data, SHOW_DIAGNOSTICS
+from modules.google_connection import fetch_google_form_data, fetch_google_worksheets, SHOW_DIAGNOSTICS
 from modules.data_processing import (
     process_epa_level, 
-    convert_date_to_batch, 
+    dates_to_batches,
     convert_tw_time,
     process_training_departments,
     get_student_departments,
@@ -885,7 +885,7 @@ def process_data(df):
                 
                 # 如果有有效的評核日期，進行梯次處理
                 if '評核日期' in df.columns and not df['評核日期'].isna().all():
-                    df['梯次'] = df['評核日期'].astype(str).apply(convert_date_to_batch)
+                    df['梯次'] = dates_to_batches(df['評核日期'].astype(str))
                     show_diagnostic("日期轉換和梯次處理成功", "info")
                 else:
                     st.warning("找不到有效的日期欄位，跳過梯次處理")
@@ -1519,21 +1519,18 @@ def show_UGY_EPA_section():
 
     # 檢查是否需要重新載入/處理資料
     if 'processed_df' not in st.session_state or st.button("重新載入 Google Sheet 資料"):
-        # 執行資料載入與處理流程
-        raw_df, sheet_titles = load_sheet_data(show_info=False)
-        
+        # 執行資料載入與處理流程：一次批次載入 EPA 評核資料（第一個工作表）與訓練科部資料
+        sheets, sheet_titles = fetch_google_worksheets(worksheets=[0, "訓練科部"])
+        sheets = sheets or {}
+
         # 除錯訊息已隱藏
         # st.write("除錯訊息：")
         # st.write(f"1. 工作表列表：{sheet_titles}")
-        # st.write(f"2. 原始資料是否為空：{raw_df is None or raw_df.empty}")
-        
-        # 嘗試載入實習科部資料，如果失敗則嘗試載入訓練科部資料
-        dept_df = None
+
+        dept_df = sheets.get("訓練科部")
         processed_dept_df = None
-        
-        # 優先嘗試載入「訓練科部」工作表
+
         try:
-            dept_df, _ = load_sheet_data(sheet_title="訓練科部", show_info=False)
             if dept_df is not None and not dept_df.empty:
                 # 使用新的安全處理函數
                 processed_dept_df = safe_process_departments(dept_df)
@@ -1546,30 +1543,13 @@ def show_UGY_EPA_section():
             else:
                 st.warning("訓練科部工作表為空")
         except Exception as e:
-            st.warning(f"載入實習科部資料失敗：{str(e)}")
-            # 如果實習科部載入失敗，嘗試載入訓練科部資料
-            try:
-                st.info("嘗試載入訓練科部資料作為備用...")
-                dept_df, _ = load_sheet_data(sheet_title="訓練科部", show_info=False)
-                if dept_df is not None and not dept_df.empty:
-                    # 使用新的安全處理函數
-                    processed_dept_df = safe_process_departments(dept_df)
-                    if processed_dept_df is not None:
-                        show_diagnostic("成功載入並處理訓練科部資料（備用）", "success")
-                        with st.expander("訓練科部資料（備用）", expanded=False):
-                            display_dept_data(processed_dept_df)
-                    else:
-                        show_diagnostic("訓練科部資料處理失敗", "warning")
-                else:
-                    st.warning("訓練科部資料也無法載入")
-            except Exception as e2:
-                st.error(f"載入訓練科部資料也失敗：{str(e2)}")
-                st.info("將繼續處理EPA資料，但無法合併科部資訊")
+            st.warning(f"處理訓練科部資料失敗：{str(e)}")
+            st.info("將繼續處理EPA資料，但無法合併科部資訊")
 
         current_processed_df = None
         if sheet_titles:
             selected_sheet = sheet_titles[0] # 假設第一個是主要的EPA資料表
-            epa_raw_df, _ = load_sheet_data(sheet_title=selected_sheet, show_info=False)
+            epa_raw_df = sheets.get(selected_sheet)
 
             # 除錯訊息已隱藏
             # st.write(f"3. EPA原始資料是否為空：{epa_raw_df is None or epa_raw_df.empty}")
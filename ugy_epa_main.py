@@ -1,7 +1,5 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 from io import BytesIO
 import os
 import re
@@ -12,6 +10,7 @@ from datetime import datetime
 import json
 import scipy.stats as stats
 from modules.epa_constants import EPA_LEVEL_MAPPING
+from modules.google_connection import get_google_client
 
 # 預設 Google 試算表連結
 DEFAULT_SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1VZRYRrsSMNUKoWM32gc5D9FykCHm7IRgcmR1_qXx8_w/edit?resourcekey=&gid=1986457679#gid=1986457679"
@@ -57,9 +56,8 @@ def setup_google_connection():
                 'https://www.googleapis.com/auth/drive'
             ]
             
-            # 建立認證
-            creds = Credentials.from_service_account_info(credentials, scopes=scope)
-            client = gspread.authorize(creds)
+            # 建立認證（同一組憑證共用已授權的用戶端）
+            client = get_google_client(credentials, scopes=scope)
             
             return client
         else:
@@ -83,9 +81,8 @@ def setup_google_connection():
                 # 從憑證建立連接
                 credentials_dict = json.loads(credentials_json)
                 
-                # 建立認證
-                creds = Credentials.from_service_account_info(credentials_dict, scopes=scope)
-                client = gspread.authorize(creds)
+                # 建立認證（同一組憑證共用已授權的用戶端）
+                client = get_google_client(credentials_dict, scopes=scope)
                 
                 # 儲存到 session state 以便後續使用
                 st.session_state.google_credentials = credentials_dict